@@ -5,8 +5,39 @@
  */
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+const LIVE_URL = `${API_BASE_URL.replace(/^http/, 'ws')}/api/live`;
+const LIVE_RECONNECT_MS = 3000;
+
+const topicKey = ({ tool, underlying, expiration }) => `${tool}|${underlying}|${expiration}`;
+
+/**
+ * Apply a live "update" message (added/changed/removed contracts) to the
+ * previous result. Mirrors Server/utils/diff.py apply_diff.
+ * @param {object} current - Previous snapshot data
+ * @param {object} message - Update message from /api/live
+ * @returns {object} - New result (current is not modified)
+ */
+export function applyLiveUpdate(current, message) {
+  const updated = { ...current, ...message.fields };
+  for (const table of ['calls', 'puts']) {
+    const diff = message[table];
+    if (!diff) continue;
+    const rows = new Map((current?.[table] || []).map((row) => [row.contractSymbol, row]));
+    diff.removed.forEach((symbol) => rows.delete(symbol));
+    [...diff.added, ...diff.changed].forEach((row) => rows.set(row.contractSymbol, row));
+    updated[table] = [...rows.values()].sort(
+      (a, b) => (a.strike - b.strike) || a.contractSymbol.localeCompare(b.contractSymbol)
+    );
+  }
+  return updated;
+}
 
 class MCPClient {
+  constructor() {
+    this.socket = null;
+    this.liveHandlers = new Map(); // topic key -> Set of callbacks
+  }
+
   /**
    * Call an MCP tool with given arguments
    * @param {string} toolName - Name of the tool to call
@@ -34,33 +65,66 @@ class MCPClient {
     return result.data;
   }
 
+  /**
+   * Call a cacheable tool through GET so the browser revalidates the result
+   * with its ETag (the server answers 304 while the market data is unchanged)
+   * @param {string} toolName - Name of the tool to call
+   * @param {object} toolArgs - Tool arguments (objects and arrays are sent as JSON)
+   * @returns {Promise<object>} - Tool response data
+   */
+  async getTool(toolName, toolArgs) {
+    const params = new URLSearchParams();
+    for (const [name, value] of Object.entries(toolArgs)) {
+      if (value === undefined || value === null) continue;
+      params.set(name, typeof value === 'object' ? JSON.stringify(value) : String(value));
+    }
+    const response = await fetch(`${API_BASE_URL}/api/mcp/call-tool/${toolName}?${params}`, {
+      cache: 'no-cache'
+    });
+
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.detail || 'API call failed');
+    }
+
+    const result = await response.json();
+
+    if (!result.success) {
+      throw new Error(result.error || 'Tool execution failed');
+    }
+
+    return result.data;
+  }
+
   /**
    * Get all available expiration dates for a ticker
    * @param {string} underlying - Stock ticker symbol
    * @returns {Promise<object>} - Expirations data
    */
   async getExpirations(underlying) {
-    return this.callTool('get_expirations', { underlying });
+    return this.getTool('get_expirations', { underlying });
   }
 
   /**
    * Get option chain (calls and puts) for a specific expiration
    * @param {string} underlying - Stock ticker symbol
    * @param {string} expiration - Expiration date (YYYY-MM-DD)
-   * @returns {Promise<object>} - Option chain data
+   * @param {string} since - Optional snapshot_token of a previous response
+   * @returns {Promise<object>} - Option chain data, or only the changes since the snapshot
    */
-  async getChain(underlying, expiration) {
-    return this.callTool('get_chain', { underlying, expiration });
+  async getChain(underlying, expiration, since) {
+    return this.getTool('get_chain', { underlying, expiration, since });
   }
 
   /**
    * Compute Greeks for all options at a specific expiration
    * @param {string} underlying - Stock ticker symbol
    * @param {string} expiration - Expiration date (YYYY-MM-DD)
-   * @returns {Promise<object>} - Greeks data
+   * @param {string} since - Optional snapshot_token of a previous response
+   * @returns {Promise<object>} - Greeks data, or only the changes since the snapshot
    */
-  async computeGreeks(underlying, expiration) {
-    return this.callTool('compute_greeks', { underlying, expiration });
+  async computeGreeks(underlying, expiration, since) {
+    return this.getTool('compute_greeks', { underlying, expiration, since });
   }
 
   /**
@@ -72,7 +136,7 @@ class MCPClient {
    * @returns {Promise<object>} - Distribution data
    */
   async getDistribution(underlying, expiration, minMoneyness = 0.7, maxMoneyness = 1.3) {
-    return this.callTool('get_distribution', {
+    return this.getTool('get_distribution', {
       underlying,
       expiration,
       min_moneyness: minMoneyness,
@@ -114,13 +178,85 @@ class MCPClient {
    * @returns {Promise<object>} - Historical price data
    */
   async getHistoricalPrices(underlying, period = '3mo', interval = '1d') {
-    return this.callTool('get_historical_prices_tool', {
+    return this.getTool('get_historical_prices_tool', {
       underlying,
       period,
       interval
     });
   }
 
+  /**
+   * Subscribe to live updates of a chain or Greeks table over /api/live.
+   * The callback receives "snapshot", "update" and "error" messages; all
+   * subscriptions share one WebSocket, which reconnects and resubscribes
+   * if the connection drops.
+   * @param {string} tool - 'get_chain' or 'compute_greeks'
+   * @param {string} underlying - Stock ticker symbol
+   * @param {string} expiration - Expiration date (YYYY-MM-DD)
+   * @param {function} onMessage - Called with each message for this topic
+   * @returns {function} - Unsubscribe function
+   */
+  subscribe(tool, underlying, expiration, onMessage) {
+    const topic = { tool, underlying: underlying.toUpperCase(), expiration };
+    const key = topicKey(topic);
+    if (!this.liveHandlers.has(key)) {
+      this.liveHandlers.set(key, new Set());
+      this._sendLive({ action: 'subscribe', ...topic });
+    }
+    this.liveHandlers.get(key).add(onMessage);
+    this._connectLive();
+
+    return () => {
+      const handlers = this.liveHandlers.get(key);
+      if (!handlers) return;
+      handlers.delete(onMessage);
+      if (handlers.size === 0) {
+        this.liveHandlers.delete(key);
+        this._sendLive({ action: 'unsubscribe', ...topic });
+      }
+      if (this.liveHandlers.size === 0 && this.socket) {
+        this.socket.close();
+        this.socket = null;
+      }
+    };
+  }
+
+  _sendLive(message) {
+    if (this.socket?.readyState === WebSocket.OPEN) {
+      this.socket.send(JSON.stringify(message));
+    }
+  }
+
+  _connectLive() {
+    if (this.socket) return;
+    const socket = new WebSocket(LIVE_URL);
+    this.socket = socket;
+
+    socket.onopen = () => {
+      for (const key of this.liveHandlers.keys()) {
+        const [tool, underlying, expiration] = key.split('|');
+        socket.send(JSON.stringify({ action: 'subscribe', tool, underlying, expiration }));
+      }
+    };
+
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (!message.topic) {
+        console.warn('Live channel error:', message.error);
+        return;
+      }
+      this.liveHandlers.get(topicKey(message.topic))?.forEach((handler) => handler(message));
+    };
+
+    socket.onclose = () => {
+      if (this.socket !== socket) return;
+      this.socket = null;
+      if (this.liveHandlers.size > 0) {
+        setTimeout(() => this._connectLive(), LIVE_RECONNECT_MS);
+      }
+    };
+  }
+
   /**
    * Get list of available tools
    * @returns {Promise<object>} - Tools metadata
@@ -16,6 +16,8 @@ export default function Toolbar() {
     setExpiration,
     fetchExpirations,
     fetchChain,
+    startLive,
+    liveUnsubscribers,
   } = useTerminalStore();
 
   // Fetch expirations on mount
@@ -38,7 +40,11 @@ export default function Toolbar() {
   };
 
   const handleRefresh = () => {
-    if (selectedUnderlying && selectedExpiration) {
+    if (!selectedUnderlying || !selectedExpiration) return;
+    // En vivo, volver a suscribirse trae snapshots nuevos por el canal
+    if (liveUnsubscribers.length > 0) {
+      startLive();
+    } else {
       fetchChain();
     }
   };
@@ -17,7 +17,8 @@ export default function OptionChainTab() {
     greeksData,
     loading,
     fetchChain,
-    fetchGreeks,
+    startLive,
+    stopLive,
   } = useTerminalStore();
 
   const [modalOpen, setModalOpen] = useState(false);
@@ -31,12 +32,14 @@ export default function OptionChainTab() {
     }
   }, [selectedUnderlying, selectedExpiration]);
 
-  // Cargar griegas cuando hay datos de cadena de opciones
+  // Con la cadena cargada, la cadena y las griegas se actualizan por el canal
+  // en vivo (snapshot al suscribirse y después sólo diferencias)
+  const chainLoaded = Boolean(optionChainData);
   useEffect(() => {
-    if (optionChainData && !greeksData && showGreeks) {
-      fetchGreeks();
-    }
-  }, [optionChainData, showGreeks]);
+    if (!selectedUnderlying || !selectedExpiration || !chainLoaded) return;
+    startLive();
+    return () => stopLive();
+  }, [selectedUnderlying, selectedExpiration, chainLoaded]);
 
   const handleRowClick = (optionData, type) => {
     setSelectedOption(optionData);
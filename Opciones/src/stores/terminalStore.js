@@ -8,7 +8,7 @@
  */
 
 import { create } from 'zustand';
-import { mcpClient } from '../api/mcpClient';
+import { applyLiveUpdate, mcpClient } from '../api/mcpClient';
 
 export const useTerminalStore = create((set, get) => ({
   // UI State
@@ -39,23 +39,32 @@ export const useTerminalStore = create((set, get) => ({
   // Error State
   error: null,
 
+  // Live updates (unsubscribe functions of the active /api/live topics)
+  liveUnsubscribers: [],
+
   // UI Actions
   setActiveTab: (tab) => set({ activeTab: tab }),
 
-  setUnderlying: (ticker) => set({
-    selectedUnderlying: ticker,
-    selectedExpiration: null,
-    optionChainData: null,
-    greeksData: null,
-    distributionData: null,
-  }),
+  setUnderlying: (ticker) => {
+    get().stopLive();
+    set({
+      selectedUnderlying: ticker,
+      selectedExpiration: null,
+      optionChainData: null,
+      greeksData: null,
+      distributionData: null,
+    });
+  },
 
-  setExpiration: (expiration) => set({
-    selectedExpiration: expiration,
-    optionChainData: null,
-    greeksData: null,
-    distributionData: null,
-  }),
+  setExpiration: (expiration) => {
+    get().stopLive();
+    set({
+      selectedExpiration: expiration,
+      optionChainData: null,
+      greeksData: null,
+      distributionData: null,
+    });
+  },
 
   openModal: (data) => set({ modalOpen: true, modalData: data }),
   closeModal: () => set({ modalOpen: false, modalData: null }),
@@ -179,6 +188,41 @@ export const useTerminalStore = create((set, get) => ({
     }
   },
 
+  // Live Updates: once the chain is loaded, the chain and Greeks of the
+  // selection arrive over /api/live instead of being fetched again
+  startLive: () => {
+    const { selectedUnderlying, selectedExpiration } = get();
+    if (!selectedUnderlying || !selectedExpiration) return;
+    get().stopLive();
+
+    const follow = (tool, field) => mcpClient.subscribe(
+      tool,
+      selectedUnderlying,
+      selectedExpiration,
+      (message) => {
+        if (message.type === 'snapshot') {
+          set({ [field]: message.data });
+        } else if (message.type === 'update') {
+          set((state) => ({ [field]: applyLiveUpdate(state[field], message) }));
+        } else if (message.type === 'error') {
+          console.error(`Live ${tool} failed:`, message.error);
+        }
+      }
+    );
+
+    set({
+      liveUnsubscribers: [
+        follow('get_chain', 'optionChainData'),
+        follow('compute_greeks', 'greeksData'),
+      ]
+    });
+  },
+
+  stopLive: () => {
+    get().liveUnsubscribers.forEach((unsubscribe) => unsubscribe());
+    set({ liveUnsubscribers: [] });
+  },
+
   // Payoff Position Management
   addPosition: async (position) => {
     const { selectedUnderlying, selectedExpiration, optionChainData } = get();
@@ -5,10 +5,18 @@ This server exposes REST endpoints that directly call the MCP tool functions,
 allowing the React frontend to access options analysis capabilities via HTTP.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+import asyncio
+import json
+from contextlib import asynccontextmanager
+import importlib
+import inspect
 import logging
 import uvicorn
 import sys
@@ -17,22 +25,43 @@ import os
 # Add Server directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-# Import MCP tool functions directly
-from Server.core.tools.get_expiration import get_option_expiration
-from Server.core.tools.get_option_chain import get_option_chain
-from Server.core.tools.greeks import compute_greeks_chain
-from Server.core.tools.get_implied_distribution import get_implied_distribution
-from Server.core.tools.compute_payoff import compute_option_payoff
-from Server.core.tools.get_historical_prices import get_historical_prices
+from Server.utils.live import LIVE_TOOLS, LiveHub, Subscriber
+from Server.utils.etag import compute_etag, etag_matches, market_snapshot
+from Server.utils.metrics import render_metrics, track_tool
+from Server.utils.prefetch import start_prefetch_from_env
+from Server.utils.profiling import profile_call
+from Server.utils.tracing import span, start_trace
+from Server.utils.upstream import UpstreamUnavailable
+from Server.utils.serialization import (
+    ARROW_STREAM_MEDIA_TYPE,
+    COMPRESS_MIN_BYTES,
+    arrow_available,
+    choose_encoding,
+    compress,
+    convert_to_dict,
+    encode_arrow,
+    wants_arrow,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the background prefetch of PREFETCH_WATCHLIST tickers, if configured."""
+    scheduler = start_prefetch_from_env()
+    yield
+    if scheduler is not None:
+        scheduler.stop(timeout=5)
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Options Terminal API",
     description="HTTP bridge to options analysis tools",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -74,6 +103,7 @@ class ToolCallRequest(BaseModel):
     """Request model for tool calls."""
     tool: str
     arguments: Dict[str, Any] = Field(default_factory=dict)
+    debug_timings: bool = False
 
 
 class ToolCallResponse(BaseModel):
@@ -81,19 +111,41 @@ class ToolCallResponse(BaseModel):
     success: bool
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    timings: Optional[List[Dict[str, Any]]] = None
 
 
-# Tool dispatch map
+# Tool dispatch map: "module:function" paths, imported on first call so the
+# server starts without loading yfinance, pandas or SciPy.
 TOOL_MAP = {
-    "get_expirations": get_option_expiration,
-    "get_chain": get_option_chain,
-    "compute_greeks": compute_greeks_chain,
-    "get_distribution": get_implied_distribution,
-    "compute_payoff_profile": compute_option_payoff,
-    "get_historical_prices_tool": get_historical_prices,
+    "get_expirations": "Server.core.tools.get_expiration:get_option_expiration",
+    "get_chain": "Server.core.tools.get_option_chain:get_option_chain",
+    "compute_greeks": "Server.core.tools.greeks:compute_greeks_chain",
+    "get_distribution": "Server.core.tools.get_implied_distribution:get_implied_distribution",
+    "compute_payoff_profile": "Server.core.tools.compute_payoff:compute_option_payoff",
+    "get_historical_prices_tool": "Server.core.tools.get_historical_prices:get_historical_prices",
+    "compute_strategy_payoff": "Server.core.tools.compute_strategy_payoff:compute_option_strategy",
+    "simulate_strategy_pnl": "Server.core.tools.simulate_pnl:simulate_strategy_pnl",
+    "compute_portfolio_risk": "Server.core.tools.portfolio_risk:compute_portfolio_risk",
+    "get_gamma_exposure": "Server.core.tools.gamma_exposure:get_gamma_exposure",
+    "get_iv_history": "Server.core.tools.iv_history:get_iv_history",
+    "screen_iv_rank": "Server.core.tools.iv_rank:screen_iv_rank",
+    "backtest_strategy": "Server.core.tools.backtest:backtest_strategy",
+    "get_expected_move": "Server.core.tools.expected_move:get_expected_move",
+    "get_price_probability": "Server.core.tools.expected_move:get_price_probability",
 }
 
 
+def resolve_tool(name: str):
+    """Return the function for a tool, importing its module on first use."""
+    target = TOOL_MAP.get(name)
+    if target is None or callable(target):
+        return target
+    module_name, _, attr = target.partition(":")
+    func = getattr(importlib.import_module(module_name), attr)
+    TOOL_MAP[name] = func
+    return func
+
+
 # API endpoints
 @app.get("/api/health")
 async def health_check():
@@ -121,15 +173,18 @@ async def list_tools():
                 "description": "Get complete option chain (calls and puts) for a specific expiration",
                 "parameters": [
                     {"name": "underlying", "type": "str", "required": True, "description": "Stock ticker symbol"},
-                    {"name": "expiration", "type": "str", "required": True, "description": "Expiration date in YYYY-MM-DD format"}
+                    {"name": "expiration", "type": "str", "required": True, "description": "Expiration date in YYYY-MM-DD format"},
+                    {"name": "since", "type": "str", "required": False, "description": "snapshot_token of a previous response: return only the changed contracts"}
                 ]
             },
             {
                 "name": "compute_greeks",
-                "description": "Calculate Black-Scholes Greeks (delta, gamma, theta, vega, rho) for all options",
+                "description": "Calculate Greeks (delta, gamma, theta, vega, rho) for all options",
                 "parameters": [
                     {"name": "underlying", "type": "str", "required": True, "description": "Stock ticker symbol"},
-                    {"name": "expiration", "type": "str", "required": True, "description": "Expiration date in YYYY-MM-DD format"}
+                    {"name": "expiration", "type": "str", "required": True, "description": "Expiration date in YYYY-MM-DD format"},
+                    {"name": "since", "type": "str", "required": False, "description": "snapshot_token of a previous response: return only the changed contracts"},
+                    {"name": "model", "type": "str", "required": False, "description": "'european' (Black-Scholes, default) or 'american' (binomial lattice)"}
                 ]
             },
             {
@@ -152,7 +207,11 @@ async def list_tools():
                     {"name": "strike", "type": "float", "required": True, "description": "Strike price"},
                     {"name": "expiration", "type": "str", "required": True, "description": "Expiration date in YYYY-MM-DD format"},
                     {"name": "spot_min", "type": "float", "required": False, "description": "Minimum spot price for payoff range"},
-                    {"name": "spot_max", "type": "float", "required": False, "description": "Maximum spot price for payoff range"}
+                    {"name": "spot_max", "type": "float", "required": False, "description": "Maximum spot price for payoff range"},
+                    {"name": "include_surface", "type": "bool", "required": False, "description": "Also return the spot x date x vol-shift P&L surface"},
+                    {"name": "surface_spot_points", "type": "int", "required": False, "description": "Spot prices in the surface (default: 200)"},
+                    {"name": "surface_date_points", "type": "int", "required": False, "description": "Valuation dates in the surface (default: 30)"},
+                    {"name": "vol_shifts", "type": "list", "required": False, "description": "Absolute IV shifts for the surface, e.g. [-0.05, 0, 0.05]"}
                 ]
             },
             {
@@ -163,6 +222,106 @@ async def list_tools():
                     {"name": "period", "type": "str", "required": False, "description": "Time period (e.g., '1mo', '3mo', '6mo', '1y')"},
                     {"name": "interval", "type": "str", "required": False, "description": "Data interval (e.g., '1d', '1h', '1wk')"}
                 ]
+            },
+            {
+                "name": "compute_strategy_payoff",
+                "description": "Calculate payoff, P&L and position Greeks for a multi-leg option strategy",
+                "parameters": [
+                    {"name": "underlying", "type": "str", "required": True, "description": "Stock ticker symbol"},
+                    {"name": "legs", "type": "list", "required": True, "description": "Legs: [{side, option_type, strike, expiration, quantity}]"},
+                    {"name": "spot_min", "type": "float", "required": False, "description": "Minimum spot price for payoff range"},
+                    {"name": "spot_max", "type": "float", "required": False, "description": "Maximum spot price for payoff range"},
+                    {"name": "num_points", "type": "int", "required": False, "description": "Number of spot prices in the grid (default: 50)"},
+                    {"name": "include_surface", "type": "bool", "required": False, "description": "Also return the spot x date x vol-shift P&L surface"},
+                    {"name": "surface_spot_points", "type": "int", "required": False, "description": "Spot prices in the surface (default: 200)"},
+                    {"name": "surface_date_points", "type": "int", "required": False, "description": "Valuation dates in the surface (default: 30)"},
+                    {"name": "vol_shifts", "type": "list", "required": False, "description": "Absolute IV shifts for the surface, e.g. [-0.05, 0, 0.05]"}
+                ]
+            },
+            {
+                "name": "simulate_strategy_pnl",
+                "description": "Monte Carlo P&L distribution of a position: probability of profit, expected P&L, quantiles and expected shortfall",
+                "parameters": [
+                    {"name": "underlying", "type": "str", "required": True, "description": "Stock ticker symbol"},
+                    {"name": "legs", "type": "list", "required": True, "description": "Legs: [{side, option_type, strike, expiration, quantity}]"},
+                    {"name": "model", "type": "str", "required": False, "description": "'implied' (default), 'gbm' or 'jump'"},
+                    {"name": "n_paths", "type": "int", "required": False, "description": "Number of simulated paths (default: 1000000)"},
+                    {"name": "batch_size", "type": "int", "required": False, "description": "Paths per vectorized batch (default: 200000)"},
+                    {"name": "seed", "type": "int", "required": False, "description": "Random seed"},
+                    {"name": "volatility", "type": "float", "required": False, "description": "Volatility for gbm/jump (default: ATM IV)"},
+                    {"name": "jump_intensity", "type": "float", "required": False, "description": "Jumps per year for the jump model (default: 1.0)"},
+                    {"name": "jump_mean", "type": "float", "required": False, "description": "Mean log-jump for the jump model (default: -0.05)"},
+                    {"name": "jump_std", "type": "float", "required": False, "description": "Log-jump std for the jump model (default: 0.10)"},
+                    {"name": "min_moneyness", "type": "float", "required": False, "description": "Minimum strike/spot ratio for the implied density (default: 0.7)"},
+                    {"name": "max_moneyness", "type": "float", "required": False, "description": "Maximum strike/spot ratio for the implied density (default: 1.3)"}
+                ]
+            },
+            {
+                "name": "compute_portfolio_risk",
+                "description": "Net and dollar Greeks per underlying and in total, plus a spot-shock x vol-shock scenario P&L matrix for a book of positions",
+                "parameters": [
+                    {"name": "positions", "type": "list", "required": True, "description": "Positions: [{underlying, side, option_type, strike, expiration, quantity}]"},
+                    {"name": "spot_shocks", "type": "list", "required": False, "description": "Relative spot shocks, e.g. [-0.1, 0, 0.1]"},
+                    {"name": "vol_shocks", "type": "list", "required": False, "description": "Absolute IV shocks, e.g. [-0.05, 0, 0.05]"}
+                ]
+            },
+            {
+                "name": "get_gamma_exposure",
+                "description": "Dealer gamma, delta and vanna exposure per strike and in aggregate across all expirations, with the zero-gamma level",
+                "parameters": [
+                    {"name": "underlying", "type": "str", "required": True, "description": "Stock ticker symbol"},
+                    {"name": "max_expirations", "type": "int", "required": False, "description": "Only the N nearest expirations (default: all)"},
+                    {"name": "spot_range", "type": "float", "required": False, "description": "Relative half-width of the spot grid (default: 0.2)"},
+                    {"name": "grid_points", "type": "int", "required": False, "description": "Spot prices in the gamma profile (default: 101)"}
+                ]
+            },
+            {
+                "name": "get_iv_history",
+                "description": "Recorded intraday implied-volatility time series (ATM/25-delta summary or one contract), read from the local IV store",
+                "parameters": [
+                    {"name": "underlying", "type": "str", "required": True, "description": "Stock ticker symbol"},
+                    {"name": "start", "type": "str", "required": False, "description": "First date YYYY-MM-DD (inclusive)"},
+                    {"name": "end", "type": "str", "required": False, "description": "Last date YYYY-MM-DD (inclusive)"},
+                    {"name": "expiration", "type": "str", "required": False, "description": "Only this expiration"},
+                    {"name": "contract", "type": "str", "required": False, "description": "contractSymbol: return this contract's IV series"}
+                ]
+            },
+            {
+                "name": "screen_iv_rank",
+                "description": "IV rank, IV percentile, ATM term structure and 25-delta risk reversal for a list of tickers, from the local IV store (no live chain fetches)",
+                "parameters": [
+                    {"name": "underlyings", "type": "list", "required": True, "description": "Stock ticker symbols"},
+                    {"name": "lookback_days", "type": "int", "required": False, "description": "Recorded sessions in the window (default: 252)"},
+                    {"name": "include_history", "type": "bool", "required": False, "description": "Add the daily series with the rolling IV rank (default: false)"}
+                ]
+            },
+            {
+                "name": "backtest_strategy",
+                "description": "Backtest option rules (legs chosen by DTE and delta/moneyness, exit by DTE, take profit or stop loss) over recorded chain snapshots",
+                "parameters": [
+                    {"name": "underlying", "type": "str", "required": True, "description": "Stock ticker symbol"},
+                    {"name": "strategies", "type": "list", "required": True, "description": "Rules: [{legs: [{side, option_type, dte, delta|moneyness, quantity}], exit_dte, take_profit, stop_loss, name}]"},
+                    {"name": "start", "type": "str", "required": False, "description": "First snapshot date YYYY-MM-DD"},
+                    {"name": "end", "type": "str", "required": False, "description": "Last snapshot date YYYY-MM-DD"},
+                    {"name": "workers", "type": "int", "required": False, "description": "Parallel processes (default: BACKTEST_WORKERS or CPU count)"}
+                ]
+            },
+            {
+                "name": "get_expected_move",
+                "description": "Expected move (market straddle, or total-variance interpolated between expirations) into any date",
+                "parameters": [
+                    {"name": "underlying", "type": "str", "required": True, "description": "Stock ticker symbol"},
+                    {"name": "target_date", "type": "str", "required": True, "description": "Date YYYY-MM-DD, not after the last expiration"}
+                ]
+            },
+            {
+                "name": "get_price_probability",
+                "description": "Risk-neutral probability of closing above/below price levels on any date, from the cached smile",
+                "parameters": [
+                    {"name": "underlying", "type": "str", "required": True, "description": "Stock ticker symbol"},
+                    {"name": "target_date", "type": "str", "required": True, "description": "Date YYYY-MM-DD, not after the last expiration"},
+                    {"name": "levels", "type": "list", "required": True, "description": "Price levels, e.g. [580, 600, 620]"}
+                ]
             }
         ]
     }
@@ -181,9 +340,11 @@ async def call_tool_info():
             "method": "POST",
             "endpoint": "/api/mcp/call-tool",
             "content_type": "application/json",
+            "accept": f"application/json (default) or {ARROW_STREAM_MEDIA_TYPE}",
             "body": {
                 "tool": "string (required)",
-                "arguments": "object (optional)"
+                "arguments": "object (optional)",
+                "debug_timings": "bool (optional): include per-phase timings"
             },
             "example": {
                 "tool": "get_expirations",
@@ -196,59 +357,106 @@ async def call_tool_info():
     }
 
 
-@app.post("/api/mcp/call-tool", response_model=ToolCallResponse)
-async def call_tool(request: ToolCallRequest):
+# Tools whose result depends only on their arguments and market data: they get
+# an ETag and a GET variant. Monte Carlo simulations are excluded (unseeded
+# runs differ on every call), and so are the IV history, the IV rank screen and
+# the backtester (they grow between calls without any market data being re-read).
+CACHEABLE_TOOLS = frozenset({
+    "get_expirations",
+    "get_chain",
+    "compute_greeks",
+    "get_distribution",
+    "compute_payoff_profile",
+    "get_historical_prices_tool",
+    "compute_strategy_payoff",
+    "compute_portfolio_risk",
+    "get_gamma_exposure",
+    "get_expected_move",
+    "get_price_probability",
+})
+
+
+def _send(body: bytes, media_type: str, headers: Dict[str, str], accept_encoding: Optional[str]) -> Response:
+    """Build the response, compressing the body when it is large and the client accepts it."""
+    encoding = choose_encoding(accept_encoding)
+    if encoding and len(body) >= COMPRESS_MIN_BYTES:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def _run_tool(tool: str, args: Dict[str, Any], debug_timings: bool, accept: Optional[str],
+              accept_encoding: Optional[str], if_none_match: Optional[str]) -> Response:
     """
-    Call a tool with the given arguments.
+    Run a tool and build its HTTP response (shared by the POST and GET endpoints).
 
-    Args:
-        request: ToolCallRequest containing tool name and arguments
-
-    Returns:
-        ToolCallResponse with success status, data, or error message
+    Cacheable tools get an ETag from the request and the market data the
+    call read (see Server/utils/etag.py); when it matches If-None-Match the
+    response is a 304 and the result is never serialized.
     """
-    # Get arguments, default to empty dict if not provided
-    args = request.arguments or {}
-    
-    logger.info(f"Calling tool: {request.tool} with args: {args}")
+    logger.info(f"Calling tool: {tool} with args: {args}")
 
     try:
         # Get the tool function
-        tool_func = TOOL_MAP.get(request.tool)
+        tool_func = resolve_tool(tool)
         if not tool_func:
             raise HTTPException(
                 status_code=404,
-                detail=f"Tool '{request.tool}' not found. Available tools: {list(TOOL_MAP.keys())}"
+                detail=f"Tool '{tool}' not found. Available tools: {list(TOOL_MAP.keys())}"
             )
 
         # Special handling for compute_payoff_profile (parameter name mapping)
-        if request.tool == "compute_payoff_profile":
+        if tool == "compute_payoff_profile":
             # Map 'strike' to 'Strike' (capital S) as the function expects
             if "strike" in args:
                 args["Strike"] = args.pop("strike")
 
-        # Call the tool function
-        result = tool_func(**args)
-
-        # Convert result to dict if it's a dataclass
-        if hasattr(result, '__dict__'):
-            result_dict = vars(result)
-        else:
-            result_dict = result
-
-        # Handle nested dataclasses (like calls/puts lists in option chains)
-        def convert_to_dict(obj):
-            if isinstance(obj, list):
-                return [convert_to_dict(item) for item in obj]
-            elif hasattr(obj, '__dict__'):
-                return {k: convert_to_dict(v) for k, v in vars(obj).items()}
-            else:
-                return obj
-
-        result_dict = convert_to_dict(result_dict)
-
-        logger.info(f"Tool {request.tool} executed successfully")
-        return ToolCallResponse(success=True, data=result_dict)
+        use_arrow = wants_arrow(accept)
+        if use_arrow and not arrow_available():
+            logger.warning("Arrow response requested but pyarrow is not installed; falling back to JSON")
+            use_arrow = False
+
+        # Call the tool function (phases are recorded as trace spans)
+        with start_trace(tool) as trace:
+            with market_snapshot() as reads:
+                with track_tool(tool), profile_call(tool, tool_func, args):
+                    result = tool_func(**args)
+
+            headers = {"Vary": "Accept, Accept-Encoding"}
+            if tool in CACHEABLE_TOOLS and not debug_timings:
+                etag = compute_etag(tool, args, "arrow" if use_arrow else "json", reads)
+                # No ETag if a market read was reloaded while the tool ran
+                if etag is not None:
+                    headers.update({"ETag": etag, "Cache-Control": "no-cache"})
+                    if etag_matches(if_none_match, etag):
+                        logger.info(f"Tool {tool} not modified")
+                        return Response(status_code=304, headers=headers)
+
+            with span("serialize", format="arrow" if use_arrow else "json"):
+                if use_arrow:
+                    body = encode_arrow(result)
+                else:
+                    # Convert result (dataclasses, columnar chains) to plain dicts
+                    result_dict = convert_to_dict(result)
+
+        if debug_timings:
+            headers["Server-Timing"] = trace.server_timing()
+
+        if use_arrow:
+            logger.info(f"Tool {tool} executed successfully (arrow)")
+            return _send(body, ARROW_STREAM_MEDIA_TYPE, headers, accept_encoding)
+
+        logger.info(f"Tool {tool} executed successfully")
+        payload = ToolCallResponse(
+            success=True,
+            data=result_dict,
+            timings=trace.to_timings() if debug_timings else None,
+        )
+        body = JSONResponse(jsonable_encoder(payload)).body
+        return _send(body, "application/json", headers, accept_encoding)
+
+    except HTTPException:
+        raise
 
     except TypeError as e:
         # Handle invalid arguments
@@ -260,12 +468,196 @@ async def call_tool(request: ToolCallRequest):
         logger.error(f"Validation error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+    except UpstreamUnavailable as e:
+        # Yahoo/FRED circuit open or saturated and nothing cached to fall back on
+        logger.warning(f"Upstream unavailable: {e}")
+        raise HTTPException(status_code=503, detail=str(e),
+                            headers={"Retry-After": str(max(int(e.retry_after), 1))})
+
     except Exception as e:
         # Handle other errors
         logger.error(f"Tool execution failed: {e}")
         raise HTTPException(status_code=500, detail=f"Tool execution failed: {str(e)}")
 
 
+@app.post("/api/mcp/call-tool", response_model=ToolCallResponse)
+async def call_tool(
+    request: ToolCallRequest,
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Call a tool with the given arguments.
+
+    The response format is negotiated through the Accept header: JSON by
+    default, or an Arrow IPC stream (application/vnd.apache.arrow.stream)
+    with the tabular parts of the result when the client prefers it and
+    pyarrow is installed. Bodies above COMPRESS_MIN_BYTES are compressed
+    with brotli or gzip according to Accept-Encoding.
+
+    Results of cacheable tools carry an ETag; sending it back in
+    If-None-Match returns 304 Not Modified while the market data behind the
+    result has not been refreshed.
+
+    With debug_timings=true the per-phase spans of the call (spot, chain,
+    IV solve, Greeks, serialization...) are returned in `timings` and in a
+    Server-Timing header. Set TRACE_FILE to also append every call to a
+    Chrome trace file. With SLOW_CALL_PROFILE_MS set, calls slower than
+    that threshold are saved as sampled profiles that can be replayed
+    offline (see Server/utils/profiling.py).
+
+    Args:
+        request: ToolCallRequest containing tool name and arguments
+        accept: Accept header sent by the client
+        accept_encoding: Accept-Encoding header sent by the client
+        if_none_match: ETag of a previous response, for a conditional request
+
+    Returns:
+        ToolCallResponse with success status, data, or error message,
+        or the Arrow IPC stream of the result, or 304 Not Modified
+    """
+    # Get arguments, default to empty dict if not provided
+    args = request.arguments or {}
+    # Tools block (downloads, upstream rate limiting): run them in the thread
+    # pool so the event loop keeps serving other calls, /metrics and /api/live.
+    # The context is copied, so ETag reads and trace spans are still captured.
+    return await run_in_threadpool(_run_tool, request.tool, args, request.debug_timings,
+                                   accept, accept_encoding, if_none_match)
+
+
+def _query_arguments(tool_func, params: Dict[str, str]) -> Dict[str, Any]:
+    """Convert query string values to the types annotated on the tool function."""
+    try:
+        annotations = inspect.signature(tool_func).parameters
+    except (TypeError, ValueError):
+        annotations = {}
+    args: Dict[str, Any] = {}
+    for name, value in params.items():
+        parameter = annotations.get(name)
+        annotation = parameter.annotation if parameter is not None else str
+        try:
+            if annotation is float or annotation == Optional[float]:
+                args[name] = float(value)
+            elif annotation is int or annotation == Optional[int]:
+                args[name] = int(value)
+            elif annotation is bool:
+                args[name] = value.lower() in ("1", "true", "yes")
+            elif annotation in (str, Optional[str], inspect.Parameter.empty):
+                args[name] = value
+            else:
+                # Lists and nested objects (strategy legs) travel as JSON
+                args[name] = json.loads(value)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid value for '{name}': {value!r}")
+    return args
+
+
+@app.get("/api/mcp/call-tool/{tool}", response_model=ToolCallResponse)
+async def call_tool_get(
+    tool: str,
+    request: Request,
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    GET variant of call-tool for cacheable tools, so that browsers and HTTP
+    caches can revalidate results with If-None-Match. Arguments are passed
+    as query parameters (lists and objects as JSON), e.g.
+    /api/mcp/call-tool/compute_greeks?underlying=SPY&expiration=2025-01-17
+    """
+    if tool not in CACHEABLE_TOOLS:
+        raise HTTPException(status_code=405, detail=f"Tool '{tool}' must be called with POST /api/mcp/call-tool")
+    params = dict(request.query_params)
+    debug_timings = params.pop("debug_timings", "").lower() in ("1", "true", "yes")
+    if tool == "compute_payoff_profile" and "strike" in params:
+        params["Strike"] = params.pop("strike")
+    tool_func = resolve_tool(tool)
+    args = _query_arguments(tool_func, params)
+    return await run_in_threadpool(_run_tool, tool, args, debug_timings, accept, accept_encoding, if_none_match)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metrics: per-tool request/error counts, latency histograms and
+    in-flight gauges, upstream latency and failures per data source, and
+    cache hit ratios.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _compute_live(topic) -> Dict[str, Any]:
+    """Compute a live topic (tool, underlying, expiration) as a JSON-ready dict."""
+    tool, underlying, expiration = topic
+    tool_func = resolve_tool(tool)
+    with track_tool(tool):
+        return convert_to_dict(tool_func(underlying=underlying, expiration=expiration))
+
+
+# One hub for all connections: each topic is computed once per refresh tick
+live_hub = LiveHub(_compute_live, interval=float(os.getenv("LIVE_REFRESH_SECONDS", "15")))
+
+
+def _parse_live_request(text: str):
+    """Validate a client message; returns (action, topic) or raises ValueError."""
+    try:
+        message = json.loads(text)
+    except json.JSONDecodeError:
+        raise ValueError("Invalid JSON message")
+    if not isinstance(message, dict):
+        raise ValueError("Message must be a JSON object")
+    action = message.get("action")
+    if action not in ("subscribe", "unsubscribe"):
+        raise ValueError("action must be 'subscribe' or 'unsubscribe'")
+    tool = message.get("tool")
+    if tool not in LIVE_TOOLS:
+        raise ValueError(f"tool must be one of {list(LIVE_TOOLS)}")
+    underlying, expiration = message.get("underlying"), message.get("expiration")
+    if not isinstance(underlying, str) or not underlying or not isinstance(expiration, str) or not expiration:
+        raise ValueError("underlying and expiration are required")
+    return action, (tool, underlying.upper(), expiration)
+
+
+@app.websocket("/api/live")
+async def live(websocket: WebSocket):
+    """
+    Live chain and Greeks updates.
+
+    Client messages: {"action": "subscribe" | "unsubscribe", "tool": "get_chain" |
+    "compute_greeks", "underlying": "SPY", "expiration": "2025-01-17"}.
+    Server messages: a full "snapshot" on subscribe, then "update" messages with
+    only the added/changed/removed contracts (see Server/utils/live.py).
+    """
+    await websocket.accept()
+    subscriber = Subscriber()
+
+    async def writer():
+        while True:
+            await websocket.send_text(await subscriber.next())
+
+    sender = asyncio.create_task(writer())
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                action, topic = _parse_live_request(text)
+            except ValueError as e:
+                error = json.dumps({"type": "error", "error": str(e)})
+                subscriber.offer(error, lambda: error)
+                continue
+            if action == "subscribe":
+                await live_hub.subscribe(topic, subscriber)
+            else:
+                live_hub.unsubscribe(topic, subscriber)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        live_hub.drop(subscriber)
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -277,7 +669,9 @@ async def root():
         "endpoints": {
             "health": "/api/health",
             "tools": "/api/mcp/tools",
-            "call_tool": "/api/mcp/call-tool"
+            "call_tool": "/api/mcp/call-tool",
+            "metrics": "/metrics",
+            "live": "/api/live"
         }
     }
 
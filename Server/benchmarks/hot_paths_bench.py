@@ -0,0 +1,373 @@
+"""
+Benchmarks offline de los caminos calientes de las tools.
+
+Corre las tools reales (IV, griegas, densidad implícita, payoff con
+superficie, histórico y serialización de respuestas) contra cadenas
+sintéticas de distintos tamaños o contra los datos grabados en un perfil de
+`utils/profiling.py`, sin acceder a Yahoo ni a FRED. Los resultados se
+guardan en JSON para comparar entre commits.
+
+Uso:
+    python benchmarks/hot_paths_bench.py --output results/$(git rev-parse --short HEAD).json
+    python benchmarks/hot_paths_bench.py --compare results/base.json --output results/new.json
+    python benchmarks/hot_paths_bench.py --strikes 50,200 --expirations 1 --only greeks,iv_solve
+    python benchmarks/hot_paths_bench.py --recorded /tmp/options-slow-calls/profile-....json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Server.benchmarks.synthetic import make_chain_frames
+from Server.core.tools.compute_payoff import compute_option_payoff
+from Server.core.tools.get_historical_prices import get_historical_prices
+from Server.core.tools.get_implied_distribution import compute_implied_density
+from Server.core.tools.greeks import compute_greeks_chain
+from Server.utils.bs import implied_volatility_vec
+from Server.utils.profiling import load_market_data, load_profile, serve_market_data
+from Server.utils.serialization import arrow_available, convert_to_dict, encode_arrow
+
+UNDERLYING = "BENCH"
+SPOT = 100.0
+# Curva plana aproximada: (madurez en años, tasa)
+RISK_FREE_CURVE = ([1 / 12, 0.25, 0.5, 1.0, 2.0, 5.0], [0.043, 0.042, 0.041, 0.039, 0.037, 0.036])
+
+DEFAULT_STRIKES = (50, 200, 1000)
+DEFAULT_EXPIRATIONS = (1, 30)
+DEFAULT_HISTORY_ROWS = (63, 1260, 5000)
+DEFAULT_SURFACES = ((50, 10), (200, 30), (500, 90))
+
+MarketData = Dict[Tuple[str, Tuple], Any]
+
+
+# --- Datos de mercado --------------------------------------------------------
+
+def synthetic_chain(expiration: str, n_strikes: int, spot: float = SPOT, r: float = 0.04) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Cadena (calls, puts) con el formato de yfinance, sonrisa de volatilidad y precios redondeados al centavo."""
+    t = max((date.fromisoformat(expiration) - date.today()).days, 1) / 365.0
+    strikes = np.round(np.linspace(spot * 0.5, spot * 1.5, n_strikes), 2)
+    moneyness = np.log(strikes / spot)
+    sigma = 0.22 - 0.15 * moneyness + 0.4 * moneyness ** 2
+    return make_chain_frames(UNDERLYING, expiration, spot, t, r, sigma, strikes, min_spread=0.01)
+
+
+def synthetic_history(rows: int, spot: float = SPOT, seed: int = 7) -> pd.DataFrame:
+    """Histórico OHLCV diario con el formato de `Ticker.history`."""
+    rng = np.random.default_rng(seed)
+    close = spot * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=rows, tz="America/New_York")
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.002, rows)),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 5_000_000, rows),
+        "Dividends": 0.0,
+        "Stock Splits": 0.0,
+    }, index=index)
+
+
+def synthetic_market(n_strikes: int, n_expirations: int) -> MarketData:
+    """Datos de mercado en el formato de `use_market_data` para `n_expirations` vencimientos semanales."""
+    today = date.today()
+    expirations = tuple((today + timedelta(days=7 * (i + 1))).isoformat() for i in range(n_expirations))
+    data: MarketData = {
+        ("spot", (UNDERLYING,)): SPOT,
+        ("expirations", (UNDERLYING,)): expirations,
+        ("risk_free_curve", ()): RISK_FREE_CURVE,
+    }
+    for expiration in expirations:
+        data[("chain", (UNDERLYING, expiration))] = synthetic_chain(expiration, n_strikes)
+    return data
+
+
+def recorded_market(path: str) -> MarketData:
+    """
+    Datos de mercado grabados en un perfil de `utils/profiling.py`.
+
+    Sólo se usan las cadenas que todavía no vencieron; si el perfil no trae
+    spot, vencimientos o curva, se completan con valores aproximados.
+    """
+    recorded = load_market_data(load_profile(path), os.path.dirname(os.path.abspath(path)))
+    chains = {key: frames for (kind, key), frames in recorded.items()
+              if kind == "chain" and date.fromisoformat(key[1]) > date.today()}
+    if not chains:
+        raise ValueError(f"El perfil {path} no tiene cadenas de opciones vigentes")
+    underlying = next(iter(chains))[0]
+    chains = {key: frames for key, frames in chains.items() if key[0] == underlying}
+    calls = next(iter(chains.values()))[0]
+
+    data: MarketData = {("chain", key): frames for key, frames in chains.items()}
+    data[("spot", (underlying,))] = recorded.get(("spot", (underlying,)), float(calls["strike"].median()))
+    data[("expirations", (underlying,))] = tuple(sorted(key[1] for key in chains))
+    data[("risk_free_curve", ())] = recorded.get(("risk_free_curve", ()), RISK_FREE_CURVE)
+    return data
+
+
+def market_underlying(data: MarketData) -> str:
+    return next(key[0] for kind, key in data if kind == "spot")
+
+
+def market_expirations(data: MarketData) -> Tuple[str, ...]:
+    return data[("expirations", (market_underlying(data),))]
+
+
+# --- Casos -------------------------------------------------------------------
+
+def bench_iv_solve(data: MarketData) -> Callable[[], Any]:
+    """IV vectorizada de todos los contratos de todos los vencimientos."""
+    spot = data[("spot", (market_underlying(data),))]
+    batches = []
+    for expiration in market_expirations(data):
+        t = (date.fromisoformat(expiration) - date.today()).days / 365.0
+        for frame, is_call in zip(data[("chain", (market_underlying(data), expiration))], (True, False)):
+            bid, ask = frame["bid"].to_numpy(float), frame["ask"].to_numpy(float)
+            price = np.where((bid > 0) & (ask > 0), (bid + ask) / 2, frame["lastPrice"].to_numpy(float))
+            batches.append((frame["strike"].to_numpy(float), t, price, is_call))
+
+    def run():
+        for K, t, price, is_call in batches:
+            implied_volatility_vec(spot, K, t, 0.04, price, is_call)
+    return run
+
+
+def bench_greeks(data: MarketData) -> Callable[[], Any]:
+    """`compute_greeks_chain` para cada vencimiento."""
+    underlying = market_underlying(data)
+    return lambda: [compute_greeks_chain(underlying, e) for e in market_expirations(data)]
+
+
+def bench_implied_density(data: MarketData) -> Callable[[], Any]:
+    """`compute_implied_density` (Breeden-Litzenberger) para cada vencimiento."""
+    underlying = market_underlying(data)
+    return lambda: [compute_implied_density(underlying, e) for e in market_expirations(data)]
+
+
+def bench_serialize_json(data: MarketData) -> Callable[[], Any]:
+    """Respuesta JSON del puente HTTP con las griegas de todos los vencimientos."""
+    results = bench_greeks(data)()
+    return lambda: json.dumps({"success": True, "data": convert_to_dict(results), "error": None}).encode()
+
+
+def bench_serialize_arrow(data: MarketData) -> Callable[[], Any]:
+    """Respuesta Arrow IPC con las griegas de cada vencimiento."""
+    results = bench_greeks(data)()
+    return lambda: [encode_arrow(r) for r in results]
+
+
+def bench_payoff_grid(data: MarketData, spot_points: int, date_points: int) -> Callable[[], Any]:
+    """Payoff de un call ATM con superficie de P&L (5 desplazamientos de vol)."""
+    underlying = market_underlying(data)
+    expiration = market_expirations(data)[-1]
+    calls = data[("chain", (underlying, expiration))][0]
+    spot = data[("spot", (underlying,))]
+    strike = float(calls["strike"].iloc[(calls["strike"] - spot).abs().argmin()])
+    return lambda: compute_option_payoff(
+        side="long", option_type="call", underlying=underlying, Strike=strike, expiration=expiration,
+        include_surface=True, surface_spot_points=spot_points, surface_date_points=date_points,
+        vol_shifts=[-0.1, -0.05, 0.0, 0.05, 0.1],
+    )
+
+
+def bench_history(data: MarketData) -> Callable[[], Any]:
+    """`get_historical_prices` sobre el histórico grabado."""
+    return lambda: get_historical_prices(UNDERLYING, "max", "1d")
+
+
+CHAIN_BENCHMARKS = {
+    "iv_solve": bench_iv_solve,
+    "greeks": bench_greeks,
+    "implied_density": bench_implied_density,
+    "serialize_json": bench_serialize_json,
+    "serialize_arrow": bench_serialize_arrow,
+}
+BENCHMARKS = tuple(CHAIN_BENCHMARKS) + ("payoff_grid", "history")
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Estadísticas (ms) de `repeat` ejecuciones de `fn`, tras una de calentamiento."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "max_ms": round(max(samples), 4),
+        "repeat": repeat,
+    }
+
+
+def iter_cases(strikes: Iterable[int], expirations: Iterable[int], history_rows: Iterable[int],
+               surfaces: Iterable[Tuple[int, int]], recorded: Optional[str] = None
+               ) -> Iterable[Tuple[str, Dict[str, Any], MarketData, Callable[[], Callable[[], Any]]]]:
+    """Casos (nombre, parámetros, datos de mercado, armado de la función a medir)."""
+    markets = []
+    if recorded:
+        data = recorded_market(recorded)
+        first = data[("chain", (market_underlying(data), market_expirations(data)[0]))][0]
+        markets.append(({"source": f"recorded:{os.path.basename(recorded)}", "strikes": len(first),
+                         "expirations": len(market_expirations(data))}, data))
+    else:
+        for n_strikes in strikes:
+            for n_expirations in expirations:
+                markets.append(({"source": "synthetic", "strikes": n_strikes, "expirations": n_expirations},
+                                synthetic_market(n_strikes, n_expirations)))
+
+    for params, data in markets:
+        for name, bench in CHAIN_BENCHMARKS.items():
+            if name == "serialize_arrow" and not arrow_available():
+                continue
+            yield name, params, data, lambda bench=bench, data=data: bench(data)
+
+    payoff_data = markets[0][1] if recorded else synthetic_market(200, 1)
+    for spot_points, date_points in surfaces:
+        params = {"source": "recorded" if recorded else "synthetic",
+                  "spot_points": spot_points, "date_points": date_points}
+        yield "payoff_grid", params, payoff_data, \
+            lambda s=spot_points, d=date_points: bench_payoff_grid(payoff_data, s, d)
+
+    for rows in history_rows:
+        data = {
+            ("spot", (UNDERLYING,)): SPOT,
+            ("ticker_info", (UNDERLYING,)): {"longName": "Bench Corp", "currency": "USD", "currentPrice": SPOT},
+            ("history", (UNDERLYING, "max", "1d")): synthetic_history(rows),
+        }
+        yield "history", {"source": "synthetic", "rows": rows}, data, lambda data=data: bench_history(data)
+
+
+def run_benchmarks(strikes=DEFAULT_STRIKES, expirations=DEFAULT_EXPIRATIONS, history_rows=DEFAULT_HISTORY_ROWS,
+                   surfaces=DEFAULT_SURFACES, repeat: int = 5, only: Optional[Iterable[str]] = None,
+                   recorded: Optional[str] = None, progress: Callable[[str], None] = lambda line: None) -> dict:
+    """Corre los casos seleccionados y devuelve el documento de resultados."""
+    selected = set(only or BENCHMARKS)
+    results = []
+    for name, params, data, build in iter_cases(strikes, expirations, history_rows, surfaces, recorded):
+        if name not in selected:
+            continue
+        with serve_market_data(data):
+            stats = timed(build(), repeat)
+        results.append({"name": name, "params": params, **stats})
+        progress(format_row(results[-1]))
+    return {"meta": environment(), "results": results}
+
+
+# --- Resultados --------------------------------------------------------------
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        out = subprocess.run(["git", *args], capture_output=True, text=True, timeout=5,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def environment() -> dict:
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def case_key(result: dict) -> str:
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def format_row(result: dict) -> str:
+    return f"{case_key(result):<72} {result['median_ms']:>11.3f} ms  (min {result['min_ms']:.3f})"
+
+
+def compare(baseline: dict, current: dict, threshold: float = 1.2) -> List[dict]:
+    """
+    Compara la mediana de cada caso con la de `baseline`.
+
+    Devuelve una fila por caso presente en ambos, con `ratio` = actual / base
+    y `regression` si el ratio supera `threshold`.
+    """
+    base = {case_key(r): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        key = case_key(result)
+        if key not in base:
+            continue
+        ratio = result["median_ms"] / base[key]["median_ms"] if base[key]["median_ms"] else float("inf")
+        rows.append({"case": key, "baseline_ms": base[key]["median_ms"], "current_ms": result["median_ms"],
+                     "ratio": round(ratio, 3), "regression": ratio > threshold})
+    return rows
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _surfaces(value: str) -> List[Tuple[int, int]]:
+    return [tuple(int(x) for x in v.split("x")) for v in value.split(",") if v]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strikes", type=_int_list, default=list(DEFAULT_STRIKES), help="Strikes por lado (ej. 50,200,1000)")
+    parser.add_argument("--expirations", type=_int_list, default=list(DEFAULT_EXPIRATIONS), help="Vencimientos (ej. 1,30)")
+    parser.add_argument("--history-rows", type=_int_list, default=list(DEFAULT_HISTORY_ROWS), help="Filas del histórico")
+    parser.add_argument("--surfaces", type=_surfaces, default=list(DEFAULT_SURFACES),
+                        help="Superficies de payoff spot x fechas (ej. 50x10,200x30)")
+    parser.add_argument("--only", type=lambda v: v.split(","), help=f"Casos a correr: {','.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por caso")
+    parser.add_argument("--recorded", help="Perfil de utils/profiling.py cuyas cadenas se usan en lugar de las sintéticas")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--compare", help="Resultados JSON de referencia (ej. de otro commit)")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Ratio a partir del cual un caso es regresión")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.only or ()) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Casos desconocidos: {', '.join(sorted(unknown))}")
+
+    document = run_benchmarks(args.strikes, args.expirations, args.history_rows, args.surfaces,
+                              args.repeat, args.only, args.recorded, progress=print)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=1)
+        print(f"\nResultados guardados en {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(baseline, document, args.threshold)
+        print(f"\nComparación con {baseline['meta'].get('commit')} (umbral x{args.threshold}):")
+        for row in rows:
+            flag = "  REGRESIÓN" if row["regression"] else ""
+            print(f"{row['case']:<72} {row['baseline_ms']:>10.3f} -> {row['current_ms']:>10.3f} ms  x{row['ratio']:.2f}{flag}")
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Benchmark: JSON vs Arrow IPC para las respuestas del puente HTTP.
+
+Compara tamaño del payload (crudo y gzip) y tiempo de codificación /
+decodificación sobre la misma cadena sintética, sus griegas y una
+superficie de P&L. No requiere red.
+
+Uso:
+    python benchmarks/serialization_bench.py [--strikes 400] [--repeat 20]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Server.benchmarks.synthetic import make_chain_frames
+from Server.core.tools.greeks import greeks_from_frame
+from Server.model.options import Greeks, Option_Chain
+from Server.utils.option_quote import frame_to_option_columns
+from Server.utils.pnl_surface import compute_pnl_surface
+from Server.utils.serialization import arrow_available, convert_to_dict, encode_arrow
+
+
+def build_payloads(n_strikes: int) -> dict:
+    strikes = np.round(np.linspace(20.0, 250.0, n_strikes), 2)
+    calls_df, puts_df = make_chain_frames(strikes=strikes)
+
+    chain = Option_Chain(
+        underlying="TEST", long_name="Test Corp", currency="USD", expiration="2030-01-18",
+        as_of="2024-01-02", spot=100.0,
+        calls=frame_to_option_columns(calls_df), puts=frame_to_option_columns(puts_df),
+    )
+    greeks = Greeks(
+        underlying="TEST", expiration="2030-01-18",
+        calls=greeks_from_frame(calls_df, 100.0, 0.25, 0.04, "call"),
+        puts=greeks_from_frame(puts_df, 100.0, 0.25, 0.04, "put"),
+    )
+    surface = compute_pnl_surface(
+        spot_range=np.linspace(60.0, 140.0, 200),
+        days_to_expiry=np.array([30.0, 60.0]),
+        K=np.array([100.0, 110.0]), r=np.array([0.04, 0.04]), sigma=np.array([0.25, 0.23]),
+        is_call=np.array([True, True]), weight=np.array([1.0, -1.0]), premium=np.array([3.0, 1.0]),
+        num_dates=30, vol_shifts=[-0.05, 0.0, 0.05],
+    )
+    return {"chain": chain, "greeks": greeks, "pnl_surface": surface}
+
+
+def timed(fn, repeat: int) -> float:
+    """Mediana del tiempo de `fn` en milisegundos."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def encode_json(result) -> bytes:
+    return json.dumps({"success": True, "data": convert_to_dict(result), "error": None}).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strikes", type=int, default=400, help="Strikes por lado de la cadena")
+    parser.add_argument("--repeat", type=int, default=20, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    if not arrow_available():
+        sys.exit("pyarrow no está instalado (pip install pyarrow)")
+    import pyarrow as pa
+
+    header = f"{'payload':<12} {'formato':<7} {'bytes':>10} {'gzip':>10} {'encode ms':>10} {'decode ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, result in build_payloads(args.strikes).items():
+        json_body = encode_json(result)
+        arrow_body = encode_arrow(result)
+        rows = [
+            ("json", json_body, lambda: encode_json(result), lambda: json.loads(json_body)),
+            ("arrow", arrow_body, lambda: encode_arrow(result),
+             lambda: pa.ipc.open_stream(arrow_body).read_all()),
+        ]
+        for fmt, body, encode, decode in rows:
+            print(f"{name:<12} {fmt:<7} {len(body):>10,} {len(gzip.compress(body)):>10,} "
+                  f"{timed(encode, args.repeat):>10.2f} {timed(decode, args.repeat):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Cadenas de opciones sintéticas con el formato de yfinance.
+
+Las comparten los tests (tests/conftest.py) y los benchmarks
+(hot_paths_bench.py, serialization_bench.py): precios Black-Scholes, bid y
+ask alrededor del precio justo y las columnas de `Ticker.option_chain`.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from Server.utils.bs import bs_price_vec
+
+
+def make_chain_frames(underlying: str = "TEST", expiration: str = "2030-01-18", spot: float = 100.0,
+                      t: float = 0.25, r: float = 0.04, sigma=0.25, strikes=None,
+                      min_spread: float = 0.0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Cadena sintética (calls, puts) con precios Black-Scholes redondeados al centavo.
+
+    Args:
+        sigma: Volatilidad única o una por strike (para simular una sonrisa)
+        strikes: Strikes de la cadena (por defecto de 50 a 150 cada 5)
+        min_spread (float): Spread bid-ask mínimo; el spread es el 2% del precio justo
+
+    Returns:
+        Tupla (calls, puts) como la de `Ticker.option_chain`
+    """
+    if strikes is None:
+        strikes = np.arange(50.0, 151.0, 5.0)
+    strikes = np.asarray(strikes, dtype=float)
+    frames = []
+    for is_call, letter in ((True, "C"), (False, "P")):
+        fair = bs_price_vec(spot, strikes, t, r, sigma, is_call)
+        spread = np.maximum(fair * 0.02, min_spread)
+        frames.append(pd.DataFrame({
+            "contractSymbol": [f"{underlying}{expiration.replace('-', '')[2:]}{letter}{int(k * 1000):08d}" for k in strikes],
+            "lastTradeDate": pd.Timestamp("2024-01-02 15:30", tz="UTC"),
+            "strike": strikes,
+            "lastPrice": np.round(fair, 2),
+            "bid": np.round(np.maximum(fair - spread / 2, 0.0), 2),
+            "ask": np.round(fair + spread / 2, 2),
+            "change": 0.0,
+            "percentChange": 0.0,
+            "volume": 100.0,
+            "openInterest": 1000,
+            "impliedVolatility": sigma,
+            "inTheMoney": (strikes < spot) if is_call else (strikes > spot),
+            "contractSize": "REGULAR",
+            "currency": "USD",
+        }))
+    return frames[0], frames[1]
@@ -0,0 +1,288 @@
+from Server.model.options import BacktestReport, BacktestResult, BacktestTrade
+from Server.utils.bs import bs_price_vec, compute_greeks_vec
+from Server.utils.iv_store import iter_daily_chains, iv_store_dir
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import multiprocessing
+import numpy as np
+import os
+from typing import Any, Dict, List, Optional
+
+CONTRACT_MULTIPLIER = 100
+_EPOCH = date(1970, 1, 1)
+
+
+def _parse_rule_leg(leg: Dict[str, Any]) -> Dict[str, Any]:
+    """Valida una pata de regla: qué contrato abrir cada vez (por DTE y delta o moneyness)."""
+    try:
+        side = str(leg["side"]).lower()
+        option_type = str(leg["option_type"]).lower()
+        dte = int(leg["dte"])
+    except KeyError as e:
+        raise ValueError(f"Falta el campo {e} en la pata {leg}. Campos requeridos: side, option_type, dte.")
+
+    quantity = int(leg.get("quantity", 1))
+    if side not in ("long", "short"):
+        raise ValueError(f"side debe ser 'long' o 'short' (recibido: {leg['side']}).")
+    if option_type not in ("call", "put"):
+        raise ValueError(f"option_type debe ser 'call' o 'put' (recibido: {leg['option_type']}).")
+    if quantity <= 0:
+        raise ValueError(f"quantity debe ser un entero positivo (recibido: {quantity}).")
+    if dte <= 0:
+        raise ValueError(f"dte debe ser positivo (recibido: {dte}).")
+    if "delta" in leg and "moneyness" in leg:
+        raise ValueError("Cada pata se elige por delta o por moneyness, no por ambos.")
+
+    parsed = {"side": side, "option_type": option_type, "dte": dte, "quantity": quantity}
+    if "delta" in leg:
+        delta = abs(float(leg["delta"]))
+        if not 0 < delta < 1:
+            raise ValueError(f"delta debe estar entre 0 y 1 (recibido: {leg['delta']}).")
+        parsed["delta"] = delta
+    else:
+        parsed["moneyness"] = float(leg.get("moneyness", 1.0))
+    return parsed
+
+
+def _parse_rule(rule: Dict[str, Any]) -> Dict[str, Any]:
+    """Valida y normaliza una regla de backtest."""
+    legs = rule.get("legs") or []
+    if not legs:
+        raise ValueError("Cada regla debe tener al menos una pata.")
+    parsed = {
+        "legs": [_parse_rule_leg(leg) for leg in legs],
+        "exit_dte": int(rule.get("exit_dte", 0)),
+        "take_profit": float(rule["take_profit"]) if rule.get("take_profit") is not None else None,
+        "stop_loss": float(rule["stop_loss"]) if rule.get("stop_loss") is not None else None,
+    }
+    if parsed["exit_dte"] < 0:
+        raise ValueError(f"exit_dte no puede ser negativo (recibido: {parsed['exit_dte']}).")
+    for name in ("take_profit", "stop_loss"):
+        if parsed[name] is not None and parsed[name] <= 0:
+            raise ValueError(f"{name} debe ser positivo (fracción de la prima de entrada, recibido: {parsed[name]}).")
+    if rule.get("name") is not None:
+        parsed["name"] = str(rule["name"])
+    return parsed
+
+
+def _select(legs: List[Dict[str, Any]], chain: Dict[str, np.ndarray], today: int) -> Optional[np.ndarray]:
+    """
+    Índices de la cadena del día para cada pata de la regla (None si alguna no tiene candidato).
+
+    Por pata: el vencimiento con DTE más cercano al pedido y, dentro de él, el
+    strike con delta (o K/S) más cercana al objetivo. Las deltas de toda la
+    cadena se calculan en un solo batch.
+    """
+    dte = chain["expiration"] - today
+    t = np.maximum(dte, 0) / 365.0
+    usable = (dte > 0) & np.isfinite(chain["iv"]) & (chain["iv"] > 0)
+    is_call = chain["is_call"].astype(bool)
+    delta = None
+    if any("delta" in leg for leg in legs):
+        delta = compute_greeks_vec(chain["spot"], chain["strike"], t, chain["rate"], chain["iv"],
+                                   is_call, chain["dividend_yield"])["delta"]
+
+    picks = np.empty(len(legs), dtype=np.intp)
+    for i, leg in enumerate(legs):
+        candidates = usable & (is_call == (leg["option_type"] == "call"))
+        if not candidates.any():
+            return None
+        gaps = np.abs(dte[candidates] - leg["dte"])
+        nearest = dte[candidates][gaps == gaps.min()].max()
+        rows = np.flatnonzero(candidates & (dte == nearest))
+        if "delta" in leg:
+            target = leg["delta"] if leg["option_type"] == "call" else -leg["delta"]
+            distance = np.abs(delta[rows] - target)
+        else:
+            distance = np.abs(chain["strike"][rows] / chain["spot"][rows] - leg["moneyness"])
+        picks[i] = rows[np.argmin(distance)]
+    return picks
+
+
+def _mark(position: Dict[str, Any], chain: Dict[str, np.ndarray], today: int) -> np.ndarray:
+    """
+    Precio por acción de cada contrato de la posición con la cadena del día.
+
+    Black-Scholes con la IV registrada del contrato; intrínseco si ya venció.
+    Si el contrato no figura en el día, se conserva la última marca. Los
+    contratos se buscan todos juntos en la cadena ordenada y las patas se
+    valúan en una sola llamada a `bs_price_vec`.
+    """
+    prices = position["prices"].copy()
+    strike, is_call, expiration = position["strike"], position["is_call"], position["expiration"]
+
+    expired = expiration <= today
+    spot = float(np.median(chain["spot"]))
+    prices[expired] = np.where(is_call, np.maximum(spot - strike, 0.0), np.maximum(strike - spot, 0.0))[expired]
+    if not len(chain["contract"]):
+        return prices
+
+    order = np.argsort(chain["contract"], kind="stable")
+    sorted_contracts = chain["contract"][order]
+    at = np.minimum(np.searchsorted(sorted_contracts, position["contracts"]), len(order) - 1)
+    rows = order[at]
+    live = ~expired & (sorted_contracts[at] == position["contracts"]) & np.isfinite(chain["iv"][rows])
+    if live.any():
+        j = rows[live]
+        prices[live] = bs_price_vec(chain["spot"][j], strike[live], (expiration[live] - today) / 365.0,
+                                    chain["rate"][j], chain["iv"][j], is_call[live], chain["dividend_yield"][j])
+    return prices
+
+
+def _statistics(trades: List[BacktestTrade], pnl: np.ndarray) -> Dict[str, Any]:
+    """Estadísticas de la regla a partir de las operaciones y del P&L acumulado diario."""
+    results = np.array([trade.pnl for trade in trades])
+    drawdown = float((np.maximum.accumulate(pnl) - pnl).max()) if pnl.size else 0.0
+    changes = np.diff(pnl, prepend=0.0)
+    sharpe = None
+    if changes.size > 1 and changes.std(ddof=1) > 0:
+        sharpe = round(float(changes.mean() / changes.std(ddof=1) * np.sqrt(252)), 4)
+    return {
+        "total_pnl": round(float(pnl[-1]) if pnl.size else 0.0, 2),
+        "trade_count": len(trades),
+        "win_rate": round(float((results > 0).mean()), 4) if results.size else None,
+        "average_pnl": round(float(results.mean()), 2) if results.size else None,
+        "max_drawdown": round(drawdown, 2),
+        "sharpe": sharpe,
+    }
+
+
+def run_rule(root: str, underlying: str, rule: Dict[str, Any], start: Optional[date] = None,
+             end: Optional[date] = None) -> BacktestResult:
+    """
+    Corre una regla (ya validada con `_parse_rule`) día por día sobre las cadenas registradas.
+
+    Una posición a la vez: se abre en el primer día con contratos para todas
+    las patas y se cierra al llegar a `exit_dte` (del vencimiento más cercano),
+    al vencer, o por take profit / stop loss (fracción de la prima de
+    entrada). Al cerrar se puede abrir la siguiente el mismo día (rolleo).
+    """
+    dates, path, trades = [], [], []
+    realized = 0.0
+    position = None
+
+    def close(day: date, prices: np.ndarray, reason: str) -> float:
+        exit_value = float(position["weight"] @ prices)
+        pnl = (exit_value - position["entry_value"]) * CONTRACT_MULTIPLIER
+        trades.append(BacktestTrade(
+            entry_date=position["entry_date"],
+            exit_date=day.isoformat(),
+            contracts=[c.decode() for c in position["contracts"]],
+            entry_value=round(position["entry_value"], 4),
+            exit_value=round(exit_value, 4),
+            pnl=round(pnl, 2),
+            exit_reason=reason,
+        ))
+        return pnl
+
+    for day, chain in iter_daily_chains(root, underlying, start, end):
+        today = (day - _EPOCH).days
+        unrealized = 0.0
+        if position is not None:
+            prices = _mark(position, chain, today)
+            position["prices"] = prices
+            gain = float(position["weight"] @ prices) - position["entry_value"]
+            premium = abs(position["entry_value"])
+            days_left = int(position["expiration"].min()) - today
+            reason = None
+            if days_left <= 0:
+                reason = "expiration"
+            elif days_left <= rule["exit_dte"]:
+                reason = "dte"
+            elif rule["take_profit"] is not None and gain >= rule["take_profit"] * premium:
+                reason = "take_profit"
+            elif rule["stop_loss"] is not None and gain <= -rule["stop_loss"] * premium:
+                reason = "stop_loss"
+            if reason is not None:
+                realized += close(day, prices, reason)
+                position = None
+            else:
+                unrealized = gain * CONTRACT_MULTIPLIER
+
+        if position is None and len(chain["contract"]):
+            picks = _select(rule["legs"], chain, today)
+            if picks is not None:
+                position = {
+                    "entry_date": day.isoformat(),
+                    "contracts": chain["contract"][picks],
+                    "strike": chain["strike"][picks].astype(float),
+                    "is_call": chain["is_call"][picks].astype(bool),
+                    "expiration": chain["expiration"][picks].astype(int),
+                    "weight": np.array([leg["quantity"] * (1 if leg["side"] == "long" else -1) for leg in rule["legs"]],
+                                       dtype=float),
+                    "prices": np.zeros(len(picks)),
+                }
+                position["prices"] = _mark(position, chain, today)
+                position["entry_value"] = float(position["weight"] @ position["prices"])
+
+        dates.append(day.isoformat())
+        path.append(realized + unrealized)
+
+    if position is not None:
+        realized += close(date.fromisoformat(dates[-1]), position["prices"], "end")
+        path[-1] = realized
+
+    pnl = np.array(path)
+    return BacktestResult(strategy=rule, trades=trades, dates=dates, pnl=[round(v, 2) for v in path],
+                          **_statistics(trades, pnl))
+
+
+def backtest_workers() -> int:
+    """Procesos para correr reglas en paralelo (`BACKTEST_WORKERS`, default: núcleos disponibles)."""
+    return int(os.getenv("BACKTEST_WORKERS", str(os.cpu_count() or 1)))
+
+
+def backtest_strategy(
+    underlying: str,
+    strategies: List[Dict[str, Any]],
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> BacktestReport:
+    """
+    Backtest de reglas de opciones sobre las cadenas registradas en el store de IV
+    (ej: "vender puts de 30 delta a 45 DTE y cerrar a 21 DTE").
+
+    Recorre los días registrados de a uno (cierre de cada vencimiento), elige
+    los contratos de cada pata por DTE y delta o moneyness, y valúa la
+    posición con Black-Scholes sobre la IV, el spot, la tasa y los dividendos
+    registrados. Las reglas se reparten entre procesos.
+
+    Args:
+        underlying (str): Ticker del activo subyacente
+        strategies (List[dict]): Reglas a evaluar; cada una con:
+            - legs: patas con side ("long"/"short"), option_type ("call"/"put"),
+              dte (días al vencimiento al abrir), delta (ej: 0.30) o
+              moneyness (K/S, default 1.0) y quantity (default 1)
+            - exit_dte (int): Cerrar al quedar esos días al vencimiento (default 0)
+            - take_profit / stop_loss (float, opcionales): Fracción de la prima de entrada
+            - name (str, opcional)
+        start (str, opcional): Primera fecha "YYYY-MM-DD"
+        end (str, opcional): Última fecha "YYYY-MM-DD"
+        workers (int, opcional): Procesos en paralelo (default: `BACKTEST_WORKERS`)
+
+    Returns:
+        BacktestReport: Un BacktestResult por regla, en el orden pedido
+
+    Raises:
+        ValueError: Si el store no está configurado (`IV_STORE_DIR`) o una regla es inválida
+    """
+    root = iv_store_dir()
+    if root is None:
+        raise ValueError("El backtest usa las cadenas registradas: configurar IV_STORE_DIR.")
+    if not strategies:
+        raise ValueError("Se requiere al menos una regla.")
+    rules = [_parse_rule(rule) for rule in strategies]
+    start_day = date.fromisoformat(start) if start else None
+    end_day = date.fromisoformat(end) if end else None
+
+    workers = min(workers or backtest_workers(), len(rules))
+    args = [(root, underlying, rule, start_day, end_day) for rule in rules]
+    if workers <= 1:
+        results = [run_rule(*a) for a in args]
+    else:
+        # Procesos "spawn": el servidor tiene hilos vivos y fork no es seguro
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(run_rule, *zip(*args)))
+
+    return BacktestReport(underlying=underlying, start=start, end=end, results=results)
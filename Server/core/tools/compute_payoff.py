@@ -1,11 +1,13 @@
 from Server.model.options import OptionPayoff, OptionGreeks
-import yfinance as yf
 from Server.utils.bs import implied_volatility, compute_greeks
-from Server.utils.get_spot import get_spot_price
+from Server.utils.market_data import get_spot, get_chain_frames
 from Server.utils.risk_free import get_risk_free_rate
+from Server.utils.pnl_surface import compute_pnl_surface
+from Server.utils.tracing import span
+from Server.utils.strike_index import find_contract
 from datetime import date
 import numpy as np
-from typing import Optional
+from typing import List, Optional
 
 def compute_option_payoff(
     side: str,
@@ -15,59 +17,64 @@ def compute_option_payoff(
     expiration: str,
     spot_min:Optional[float] = None,
     spot_max:Optional[float] = None,
+    include_surface: bool = False,
+    surface_spot_points: int = 200,
+    surface_date_points: int = 30,
+    vol_shifts: Optional[List[float]] = None,
 ) -> OptionPayoff:
-    ''''''
-    spot = get_spot_price(underlying)
-    
-    ticker = yf.Ticker(underlying)
-    
+    '''
+    Calcula el perfil de payoff y P&L de una posición en una opción.
 
-    chain = ticker.option_chain(expiration)
-    
-    options = chain.calls if option_type.lower() == "call" else chain.puts
-    row = options[options['strike'] == Strike]
-    
-    if row.empty:
-        available_strikes = list(options['strike'].unique())
-        raise ValueError(
-            f"No existe una opción {option_type} con strike {Strike} para {underlying}. "
-            f"Strikes disponibles: {available_strikes}"
-        )
-    
+    Con `include_surface=True` agrega la superficie de P&L mark-to-model
+    (vol_shift × fecha de valuación × spot) entre hoy y el vencimiento, con
+    `surface_spot_points` precios, `surface_date_points` fechas y los
+    desplazamientos de volatilidad de `vol_shifts`.
+    '''
+    with span("spot"):
+        spot = get_spot(underlying)
+
+    with span("chain"):
+        calls_df, puts_df = get_chain_frames(underlying, expiration)
     
-    row = row.iloc[0]    
+    options = calls_df if option_type.lower() == "call" else puts_df
+    # Búsqueda binaria sobre el índice de strikes de la cadena cacheada
+    row = find_contract(underlying, expiration, option_type.lower(), Strike, options)
     premium = np.round(float(row['lastPrice']), 3)
     
       
     #parametros bs
     
-    r = get_risk_free_rate(expiration)
+    with span("risk_free_curve"):
+        r = get_risk_free_rate(expiration)
 
-    t = (date.fromisoformat(expiration) - date.today()).days / 252.0
+    days_to_expiry = (date.fromisoformat(expiration) - date.today()).days
+    t = days_to_expiry / 252.0
     
-    sigma = implied_volatility(
-        S=spot,
-        K=Strike,
-        t=t,
-        r=r,
-        Price=premium,
-        option_type=option_type,
-    )
+    with span("iv_solve"):
+        sigma = implied_volatility(
+            S=spot,
+            K=Strike,
+            t=t,
+            r=r,
+            Price=premium,
+            option_type=option_type,
+        )
     if sigma is None or sigma <= 0:
         iv_yf = row.get("impliedVolatility")
         if iv_yf is None or iv_yf <= 0:
             raise ValueError("No se pudo obtener una volatilidad implícita válida.")
         sigma = iv_yf
 
-    greeks_long: OptionGreeks = compute_greeks(
-        S=spot,
-        K=Strike,
-        t=t,
-        r=r,
-        sigma=sigma,
-        option_type=option_type,
-        contract_symbol=row["contractSymbol"],
-    )
+    with span("greeks"):
+        greeks_long: OptionGreeks = compute_greeks(
+            S=spot,
+            K=Strike,
+            t=t,
+            r=r,
+            sigma=sigma,
+            option_type=option_type,
+            contract_symbol=row["contractSymbol"],
+        )
     
     factor = 1 if side == "long" else -1
     
@@ -104,6 +111,23 @@ def compute_option_payoff(
     payoff = np.round((payoff * 100), 3).tolist()
     profit = np.round((profit * 100), 3).tolist()
 
+    pnl_surface = None
+    if include_surface:
+        with span("pnl_surface"):
+            pnl_surface = compute_pnl_surface(
+                spot_range=np.linspace(spot_min, spot_max, num=surface_spot_points),
+                days_to_expiry=np.array([days_to_expiry]),
+                K=np.array([Strike]),
+                r=np.array([r]),
+                sigma=np.array([sigma]),
+                is_call=np.array([option_type == "call"]),
+                weight=np.array([factor]),
+                premium=np.array([premium]),
+                num_dates=surface_date_points,
+                vol_shifts=vol_shifts,
+                year_basis=252.0,
+            )
+
     return OptionPayoff(
         underlying=underlying,
         expiration=expiration,
@@ -116,4 +140,5 @@ def compute_option_payoff(
         payoffs=payoff,
         profits=profit,
         greeks=greeks_position,
+        pnl_surface=pnl_surface,
     )
\ No newline at end of file
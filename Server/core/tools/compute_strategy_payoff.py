@@ -0,0 +1,320 @@
+from Server.model.options import StrategyPayoff, StrategyLeg, OptionGreeks, PositionGreeks
+from Server.utils.bs import implied_volatility_vec, compute_greeks_vec, bs_price_vec
+from Server.utils.market_data import get_spot, get_chain_frames, chain_version
+from Server.utils.forward import carry, get_implied_forward
+from Server.utils.strike_index import find_contract
+from Server.utils.risk_free import get_risk_free_curve, interpolate_risk_free_rate
+from Server.utils.pnl_surface import compute_pnl_surface
+from dataclasses import dataclass
+from datetime import date
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+CONTRACT_MULTIPLIER = 100
+
+
+def _parse_leg(leg: Dict[str, Any]) -> Dict[str, Any]:
+    """Valida y normaliza la definición de una pata de la estrategia."""
+    try:
+        side = str(leg["side"]).lower()
+        option_type = str(leg["option_type"]).lower()
+        strike = float(leg["strike"])
+        expiration = str(leg["expiration"])
+    except KeyError as e:
+        raise ValueError(f"Falta el campo {e} en la pata {leg}. Campos requeridos: side, option_type, strike, expiration.")
+
+    quantity = int(leg.get("quantity", 1))
+
+    if side not in ("long", "short"):
+        raise ValueError(f"side debe ser 'long' o 'short' (recibido: {leg['side']}).")
+    if option_type not in ("call", "put"):
+        raise ValueError(f"option_type debe ser 'call' o 'put' (recibido: {leg['option_type']}).")
+    if quantity <= 0:
+        raise ValueError(f"quantity debe ser un entero positivo (recibido: {quantity}).")
+
+    return {
+        "side": side,
+        "option_type": option_type,
+        "strike": strike,
+        "expiration": expiration,
+        "quantity": quantity,
+    }
+
+
+def _breakevens(spot_range: np.ndarray, profit: np.ndarray) -> List[float]:
+    """Precios donde el P&L cruza cero, interpolados linealmente sobre la grilla."""
+    sign = np.sign(profit)
+    idx = np.flatnonzero(sign[:-1] * sign[1:] < 0)
+    x0, x1 = spot_range[idx], spot_range[idx + 1]
+    y0, y1 = profit[idx], profit[idx + 1]
+    crossings = x0 - y0 * (x1 - x0) / (y1 - y0)
+    exact = spot_range[profit == 0]
+    return sorted(np.round(np.concatenate([crossings, exact]), 3).tolist())
+
+
+@dataclass
+class ResolvedLegs:
+    """Patas de una estrategia con sus cotizaciones y parámetros Black-Scholes (un elemento por pata)."""
+    parsed: List[Dict[str, Any]]
+    spot: float
+    as_of: date
+    horizon: str
+    symbols: List[str]
+    K: np.ndarray
+    days: np.ndarray
+    t: np.ndarray
+    r: np.ndarray
+    q: np.ndarray
+    price: np.ndarray
+    sigma: np.ndarray
+    is_call: np.ndarray
+    weight: np.ndarray
+
+    @property
+    def net_premium(self) -> float:
+        """Prima neta por acción (positiva = débito, negativa = crédito)."""
+        return float(np.sum(self.weight * self.price))
+
+
+def resolve_strategy_legs(underlying: str, legs: List[Dict[str, Any]]) -> ResolvedLegs:
+    """
+    Busca la cotización de cada pata y resuelve todas las volatilidades implícitas en un batch.
+
+    Cada vencimiento se descarga una sola vez aunque varias patas lo compartan.
+
+    Raises:
+        ValueError: Si alguna pata es inválida, su strike no existe o no se puede
+            obtener una volatilidad implícita válida.
+    """
+    if not legs:
+        raise ValueError("La estrategia debe tener al menos una pata.")
+
+    parsed = [_parse_leg(leg) for leg in legs]
+
+    spot = get_spot(underlying)
+    curve = get_risk_free_curve()
+    as_of = date.today()
+
+    # Una sola descarga por vencimiento, compartida entre todas las patas
+    chains = {
+        expiration: get_chain_frames(underlying, expiration)
+        for expiration in sorted({leg["expiration"] for leg in parsed})
+    }
+
+    # Tasa y dividendos implícitos por paridad put-call de cada vencimiento
+    carries = {}
+    for expiration, (calls_df, puts_df) in chains.items():
+        t_exp = (date.fromisoformat(expiration) - as_of).days / 365.0
+        r_exp = interpolate_risk_free_rate(curve, t_exp)
+        fit = get_implied_forward(underlying, expiration, calls_df, puts_df, t_exp, r_exp,
+                                  chain_version(underlying, expiration, calls_df))
+        carries[expiration] = carry(fit, spot, t_exp, r_exp)
+
+    n_legs = len(parsed)
+    K = np.empty(n_legs)
+    days = np.empty(n_legs)
+    t = np.empty(n_legs)
+    r = np.empty(n_legs)
+    q = np.empty(n_legs)
+    price = np.empty(n_legs)
+    iv_yf = np.empty(n_legs)
+    is_call = np.empty(n_legs, dtype=bool)
+    weight = np.empty(n_legs)
+    symbols: List[str] = []
+
+    for i, leg in enumerate(parsed):
+        calls_df, puts_df = chains[leg["expiration"]]
+        options = calls_df if leg["option_type"] == "call" else puts_df
+        row = find_contract(underlying, leg["expiration"], leg["option_type"], leg["strike"], options)
+
+        days_to_expiry = (date.fromisoformat(leg["expiration"]) - as_of).days
+        if days_to_expiry <= 0:
+            raise ValueError(f"La fecha de vencimiento {leg['expiration']} debe ser posterior a hoy.")
+
+        # Precio de referencia: mid si se puede, sino last
+        bid, ask = float(row["bid"]), float(row["ask"])
+        price[i] = (bid + ask) / 2 if bid > 0 and ask > 0 else float(row["lastPrice"])
+
+        K[i] = leg["strike"]
+        days[i] = days_to_expiry
+        t[i] = days_to_expiry / 365.0
+        r[i], q[i] = carries[leg["expiration"]]
+        iv_yf[i] = float(row.get("impliedVolatility", np.nan))
+        is_call[i] = leg["option_type"] == "call"
+        weight[i] = leg["quantity"] * (1 if leg["side"] == "long" else -1)
+        symbols.append(row["contractSymbol"])
+
+    # IV de todas las patas en un solo batch; fallback a la IV de yfinance
+    sigma = implied_volatility_vec(spot, K, t, r, price, is_call, q)
+    sigma = np.where(np.isfinite(sigma), sigma, iv_yf)
+    invalid = ~(sigma > 0)
+    if invalid.any():
+        bad = [f"{parsed[i]['option_type']} {parsed[i]['strike']} {parsed[i]['expiration']}" for i in np.flatnonzero(invalid)]
+        raise ValueError(f"No se pudo obtener una volatilidad implícita válida para: {bad}")
+
+    return ResolvedLegs(
+        parsed=parsed,
+        spot=spot,
+        as_of=as_of,
+        horizon=min(chains),
+        symbols=symbols,
+        K=K,
+        days=days,
+        t=t,
+        r=r,
+        q=q,
+        price=price,
+        sigma=sigma,
+        is_call=is_call,
+        weight=weight,
+    )
+
+
+def value_legs_at_horizon(resolved: ResolvedLegs, spot_prices: np.ndarray) -> np.ndarray:
+    """
+    Valor por acción de cada pata en el primer vencimiento, para cada precio del subyacente.
+
+    Las patas que vencen ese día valen su intrínseco; las posteriores se
+    valúan con Black-Scholes con su volatilidad implícita actual.
+
+    Returns:
+        Array de forma (patas, len(spot_prices)).
+    """
+    tau = (resolved.t - resolved.t.min())[:, None]
+    S = np.asarray(spot_prices, dtype=float)[None, :]
+    strikes = resolved.K[:, None]
+    calls = resolved.is_call[:, None]
+    intrinsic = np.where(calls, np.maximum(S - strikes, 0), np.maximum(strikes - S, 0))
+    if not (tau > 0).any():
+        return intrinsic
+    with np.errstate(divide="ignore", invalid="ignore"):
+        model_value = bs_price_vec(S, strikes, tau, resolved.r[:, None], resolved.sigma[:, None], calls,
+                                   resolved.q[:, None])
+    return np.where(tau > 0, model_value, intrinsic)
+
+
+def compute_option_strategy(
+    underlying: str,
+    legs: List[Dict[str, Any]],
+    spot_min: Optional[float] = None,
+    spot_max: Optional[float] = None,
+    num_points: int = 50,
+    include_surface: bool = False,
+    surface_spot_points: int = 200,
+    surface_date_points: int = 30,
+    vol_shifts: Optional[List[float]] = None,
+) -> StrategyPayoff:
+    """
+    Calcula el payoff, el P&L y las griegas agregadas de una estrategia de varias patas.
+
+    Cada vencimiento se descarga una sola vez, la volatilidad implícita de todas
+    las patas se resuelve en un único batch y la valuación sobre la grilla de
+    spot se hace como una operación (patas × spot) en NumPy.
+
+    La estrategia se valúa en el primer vencimiento de sus patas: las patas que
+    vencen ese día aportan su valor intrínseco y las que vencen después se
+    valúan con Black-Scholes con su volatilidad implícita actual (calendar/diagonal).
+
+    Args:
+        underlying (str): Ticker del activo subyacente (ej: "AAPL", "SPY")
+        legs (List[dict]): Patas de la estrategia. Cada pata contiene:
+            - side: "long" o "short"
+            - option_type: "call" o "put"
+            - strike: Precio de ejercicio
+            - expiration: Fecha de vencimiento "YYYY-MM-DD"
+            - quantity: Cantidad de contratos (opcional, por defecto 1)
+        spot_min (float, opcional): Precio mínimo de la grilla (por defecto spot*0.5)
+        spot_max (float, opcional): Precio máximo de la grilla (por defecto spot*1.5)
+        num_points (int): Cantidad de puntos de la grilla de spot
+        include_surface (bool): Si es True, agrega la superficie de P&L mark-to-model
+            (vol_shift × fecha × spot) entre hoy y el primer vencimiento
+        surface_spot_points (int): Cantidad de precios de la superficie
+        surface_date_points (int): Cantidad de fechas de valuación de la superficie
+        vol_shifts (List[float], opcional): Desplazamientos absolutos de volatilidad
+            de la superficie (ej: [-0.05, 0, 0.05]); por defecto sólo [0]
+
+    Returns:
+        StrategyPayoff: Payoff y P&L por contrato (x100) en cada precio de la grilla,
+        breakevens, prima neta (positiva = débito, negativa = crédito) y griegas de
+        la posición (suma de las griegas de cada pata por lado y cantidad).
+
+    Raises:
+        ValueError: Si alguna pata es inválida, su strike no existe o no se puede
+            obtener una volatilidad implícita válida.
+    """
+    resolved = resolve_strategy_legs(underlying, legs)
+    parsed, spot, as_of = resolved.parsed, resolved.spot, resolved.as_of
+    K, t, r, q, sigma = resolved.K, resolved.t, resolved.r, resolved.q, resolved.sigma
+    price, is_call, weight, symbols = resolved.price, resolved.is_call, resolved.weight, resolved.symbols
+
+    greeks = compute_greeks_vec(spot, K, t, r, sigma, is_call, q)
+    position_greeks = {name: float(np.sum(weight * values)) for name, values in greeks.items()}
+
+    # Grilla de spot y valuación (patas × spot) en el primer vencimiento
+    if spot_min is None:
+        spot_min = spot * 0.5
+    if spot_max is None:
+        spot_max = spot * 1.5
+    spot_range = np.linspace(spot_min, spot_max, num=num_points)
+
+    leg_values = value_legs_at_horizon(resolved, spot_range)
+
+    payoff = (weight[:, None] * leg_values).sum(axis=0) * CONTRACT_MULTIPLIER
+    net_premium = resolved.net_premium * CONTRACT_MULTIPLIER
+    profit = payoff - net_premium
+
+    pnl_surface = None
+    if include_surface:
+        pnl_surface = compute_pnl_surface(
+            spot_range=np.linspace(spot_min, spot_max, num=surface_spot_points),
+            days_to_expiry=resolved.days,
+            K=K,
+            r=r,
+            sigma=sigma,
+            is_call=is_call,
+            weight=weight,
+            premium=price,
+            num_dates=surface_date_points,
+            vol_shifts=vol_shifts,
+            as_of=as_of,
+            q=q,
+        )
+
+    strategy_legs = [
+        StrategyLeg(
+            side=leg["side"],
+            option_type=leg["option_type"],
+            strike=leg["strike"],
+            expiration=leg["expiration"],
+            quantity=leg["quantity"],
+            contractSymbol=symbols[i],
+            premium=round(float(price[i]), 3),
+            implied_volatility=round(float(sigma[i]), 5),
+            greeks=OptionGreeks(
+                contractSymbol=symbols[i],
+                strike=leg["strike"],
+                delta=round(float(weight[i] * greeks["delta"][i]), 5),
+                gamma=round(float(weight[i] * greeks["gamma"][i]), 5),
+                theta=round(float(weight[i] * greeks["theta"][i]), 5),
+                vega=round(float(weight[i] * greeks["vega"][i]), 5),
+                rho=round(float(weight[i] * greeks["rho"][i]), 5),
+            ),
+        )
+        for i, leg in enumerate(parsed)
+    ]
+
+    return StrategyPayoff(
+        underlying=underlying,
+        spot_current=spot,
+        valuation_date=resolved.horizon,
+        legs=strategy_legs,
+        net_premium=round(net_premium, 3),
+        spot_prices=np.round(spot_range, 3).tolist(),
+        payoffs=np.round(payoff, 3).tolist(),
+        profits=np.round(profit, 3).tolist(),
+        breakevens=_breakevens(spot_range, profit),
+        max_profit=round(float(profit.max()), 3),
+        max_loss=round(float(profit.min()), 3),
+        greeks=PositionGreeks(**{name: round(value, 5) for name, value in position_greeks.items()}),
+        pnl_surface=pnl_surface,
+    )
@@ -0,0 +1,144 @@
+from Server.model.options import ExpectedMove, PriceProbability
+from Server.utils.market_data import get_spot, get_expirations, get_chain_frames, chain_version
+from Server.utils.risk_free import get_risk_free_curve, interpolate_risk_free_rate
+from Server.utils.surface import atm_straddle, get_slice, interpolate_slices, probability_above
+from Server.utils.tracing import span
+from bisect import bisect_left
+from datetime import date
+import numpy as np
+from typing import List
+
+
+def _surface_at(underlying: str, target: str):
+    """
+    Slices que rodean a `target` y el plazo interpolado.
+
+    Sólo se descargan (o se leen de la caché) los uno o dos vencimientos
+    necesarios: el primero en o después de `target` y el anterior.
+
+    Returns:
+        (spot, t, forward, rate, total_variance, vencimientos usados, exacto)
+    """
+    as_of = date.today()
+    target_day = date.fromisoformat(target)
+    if target_day <= as_of:
+        raise ValueError(f"La fecha {target} debe ser posterior a hoy.")
+
+    with span("expirations"):
+        expirations = sorted(e for e in get_expirations(underlying) if date.fromisoformat(e) > as_of)
+    if not expirations or target > expirations[-1]:
+        raise ValueError(f"La fecha {target} es posterior al último vencimiento listado para {underlying}. "
+                         f"Vencimientos disponibles: {expirations}")
+    i = bisect_left(expirations, target)
+    exact = expirations[i] == target
+    used = [expirations[i]] if exact or i == 0 else [expirations[i - 1], expirations[i]]
+
+    with span("spot"):
+        S = get_spot(underlying)
+    with span("risk_free_curve"):
+        curve = get_risk_free_curve()
+    slices = []
+    with span("surface_slices", expirations=len(used)):
+        for expiration in used:
+            t_exp = (date.fromisoformat(expiration) - as_of).days / 365.0
+            calls_df, puts_df = get_chain_frames(underlying, expiration)
+            slices.append(get_slice(underlying, expiration, calls_df, puts_df, S, t_exp,
+                                    interpolate_risk_free_rate(curve, t_exp),
+                                    chain_version(underlying, expiration, calls_df)))
+
+    t = (target_day - as_of).days / 365.0
+    before, after = (slices[0], slices[1]) if len(slices) == 2 else (None, slices[0])
+    forward, rate, total_variance = interpolate_slices(before, after, S, t)
+    return S, t, forward, rate, total_variance, used, exact, after
+
+
+def get_expected_move(underlying: str, target_date: str) -> ExpectedMove:
+    """
+    Movimiento esperado del subyacente hasta una fecha (ej: un vencimiento o el día posterior a un balance).
+
+    En un vencimiento listado es el straddle de mercado en el strike más
+    cercano al forward; entre vencimientos, el straddle ATM-forward con la
+    varianza total interpolada (ver utils/surface.py).
+
+    Args:
+        underlying (str): Ticker del activo subyacente
+        target_date (str): Fecha "YYYY-MM-DD", posterior a hoy y no posterior al último vencimiento
+
+    Returns:
+        ExpectedMove: Straddle, movimiento esperado ($ y %), movimiento de 1 desvío y rango
+
+    Raises:
+        ValueError: Si la fecha está fuera del rango de vencimientos o el vencimiento no tiene IV válidas
+    """
+    S, t, forward, rate, total_variance, used, exact, listed = _surface_at(underlying, target_date)
+    w_atm = float(total_variance(np.array(0.0)))
+
+    if exact and listed.straddle is not None:
+        straddle, strike = listed.straddle, listed.straddle_strike
+    else:
+        straddle, strike = atm_straddle(forward, rate, t, w_atm), None
+
+    return ExpectedMove(
+        underlying=underlying,
+        date=target_date,
+        spot=round(float(S), 4),
+        days=int(round(t * 365)),
+        atm_iv=round(float(np.sqrt(w_atm / t)), 6),
+        straddle=round(float(straddle), 4),
+        straddle_strike=strike,
+        expected_move=round(float(straddle), 4),
+        expected_move_pct=round(float(straddle / S * 100), 4),
+        one_sigma_move=round(float(S * np.sqrt(w_atm)), 4),
+        lower=round(float(S - straddle), 4),
+        upper=round(float(S + straddle), 4),
+        expirations=used,
+        interpolated=not exact,
+    )
+
+
+def get_price_probability(underlying: str, target_date: str, levels: List[float]) -> PriceProbability:
+    """
+    Probabilidad risk-neutral de que el subyacente cierre por encima o por debajo de cada nivel en una fecha.
+
+    Usa la sonrisa del vencimiento (o la interpolada en varianza total entre
+    los dos que rodean la fecha), incluida su pendiente: equivale a la CDF de
+    la densidad implícita, sin construir la grilla de $0.01 de get_distribution.
+
+    Args:
+        underlying (str): Ticker del activo subyacente
+        target_date (str): Fecha "YYYY-MM-DD", posterior a hoy y no posterior al último vencimiento
+        levels (List[float]): Precios a evaluar
+
+    Returns:
+        PriceProbability: Probabilidades por nivel, con el forward y la IV de cada nivel
+
+    Raises:
+        ValueError: Si no hay niveles, alguno no es positivo o la fecha está fuera de rango
+    """
+    if not levels:
+        raise ValueError("Se requiere al menos un nivel de precio.")
+    K = np.asarray(levels, dtype=float)
+    if np.any(~(K > 0)):
+        raise ValueError(f"Los niveles deben ser precios positivos (recibido: {levels}).")
+
+    S, t, forward, rate, total_variance, used, exact, _ = _surface_at(underlying, target_date)
+    above, w = probability_above(K, forward, total_variance)
+
+    return PriceProbability(
+        underlying=underlying,
+        date=target_date,
+        spot=round(float(S), 4),
+        forward=round(float(forward), 4),
+        days=int(round(t * 365)),
+        levels=[
+            {
+                "level": float(level),
+                "probability_above": round(float(p), 6),
+                "probability_below": round(float(1 - p), 6),
+                "iv": round(float(np.sqrt(v / t)), 6),
+            }
+            for level, p, v in zip(K.tolist(), above.tolist(), w.tolist())
+        ],
+        expirations=used,
+        interpolated=not exact,
+    )
@@ -0,0 +1,154 @@
+from Server.model.options import GammaExposure
+from Server.utils.bs import bs_gamma_vec, bs_vanna_vec, compute_greeks_vec, implied_volatility_vec
+from Server.utils.forward import carry, get_implied_forward
+from Server.utils.market_data import get_spot, get_expirations, get_chain_frames, chain_version
+from Server.utils.quote_cleaning import clean_quotes
+from Server.utils.risk_free import get_risk_free_curve, interpolate_risk_free_rate
+from Server.utils.tracing import span
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import date
+import numpy as np
+import os
+from typing import List, Optional
+
+CONTRACT_MULTIPLIER = 100
+# Descargas de cadenas en paralelo (el límite real lo pone utils/upstream.py)
+GEX_FETCH_WORKERS = int(os.getenv("GEX_FETCH_WORKERS", "8"))
+
+
+def _fetch_chains(underlying: str, expirations: List[str]) -> list:
+    """Descarga las cadenas de todos los vencimientos en paralelo."""
+    def fetch(expiration: str):
+        return get_chain_frames(underlying, expiration)
+
+    # Cada tarea corre en una copia del contexto: las lecturas quedan anotadas
+    # en el snapshot del ETag y los spans en la traza del pedido
+    with ThreadPoolExecutor(max_workers=max(1, min(GEX_FETCH_WORKERS, len(expirations)))) as pool:
+        futures = [pool.submit(copy_context().run, fetch, expiration) for expiration in expirations]
+        return [future.result() for future in futures]
+
+
+def _zero_crossing(grid: np.ndarray, profile: np.ndarray, spot: float) -> Optional[float]:
+    """Nivel donde `profile` cambia de signo más cercano a `spot` (interpolación lineal)."""
+    sign = np.sign(profile)
+    idx = np.flatnonzero(sign[:-1] * sign[1:] < 0)
+    if idx.size == 0:
+        return None
+    x0, x1, y0, y1 = grid[idx], grid[idx + 1], profile[idx], profile[idx + 1]
+    crossings = x0 - y0 * (x1 - x0) / (y1 - y0)
+    return round(float(crossings[np.argmin(np.abs(crossings - spot))]), 4)
+
+
+def get_gamma_exposure(
+    underlying: str,
+    max_expirations: Optional[int] = None,
+    spot_range: float = 0.2,
+    grid_points: int = 101,
+) -> GammaExposure:
+    """
+    Calcula la exposición de los dealers a gamma (GEX), delta y vanna de todos los vencimientos.
+
+    Las cadenas se descargan en paralelo y todos los contratos con open interest
+    se procesan como un único conjunto vectorizado: IV (con la tasa y los
+    dividendos implícitos de cada vencimiento, ver utils/forward.py), griegas y
+    el perfil de gamma sobre una grilla de spot. El nivel de gamma cero es donde
+    ese perfil cambia de signo.
+
+    Args:
+        underlying (str): Ticker del activo subyacente (ej: "SPY")
+        max_expirations (int, opcional): Sólo los N vencimientos más cercanos
+            (por defecto, todos)
+        spot_range (float): Amplitud relativa de la grilla de spot (±20% por defecto)
+        grid_points (int): Cantidad de precios de la grilla
+
+    Returns:
+        GammaExposure: Exposiciones totales y por strike, open interest por strike,
+        perfil de gamma y nivel de gamma cero (None si no cambia de signo en la grilla).
+
+    Raises:
+        ValueError: Si no hay vencimientos futuros o ningún contrato con open interest.
+    """
+    with span("spot"):
+        spot = get_spot(underlying)
+    with span("expirations"):
+        as_of = date.today()
+        expirations = [e for e in get_expirations(underlying) if (date.fromisoformat(e) - as_of).days > 0]
+    if max_expirations is not None:
+        expirations = expirations[:max_expirations]
+    if not expirations:
+        raise ValueError(f"No hay vencimientos futuros disponibles para {underlying}.")
+
+    with span("risk_free_curve"):
+        curve = get_risk_free_curve()
+    with span("chains", expirations=len(expirations)):
+        chains = _fetch_chains(underlying, expirations)
+
+    # Todos los contratos de todos los vencimientos como arrays planos
+    columns = {name: [] for name in ("K", "t", "r", "q", "price", "iv_yf", "oi", "is_call")}
+    with span("implied_forward", expirations=len(expirations)):
+        for expiration, (calls_df, puts_df) in zip(expirations, chains):
+            t_exp = (date.fromisoformat(expiration) - as_of).days / 365.0
+            r_exp = interpolate_risk_free_rate(curve, t_exp)
+            fit = get_implied_forward(underlying, expiration, calls_df, puts_df, t_exp, r_exp,
+                                      chain_version(underlying, expiration, calls_df))
+            rate, q = carry(fit, spot, t_exp, r_exp)
+            for df, is_call in ((calls_df, True), (puts_df, False)):
+                n = len(df)
+                columns["K"].append(df["strike"].to_numpy(dtype=float))
+                columns["t"].append(np.full(n, t_exp))
+                columns["r"].append(np.full(n, rate))
+                columns["q"].append(np.full(n, q))
+                columns["price"].append(clean_quotes(df, spot, t_exp, rate, is_call, q).price)
+                columns["iv_yf"].append(df["impliedVolatility"].to_numpy(dtype=float))
+                columns["oi"].append(np.nan_to_num(df["openInterest"].to_numpy(dtype=float)))
+                columns["is_call"].append(np.full(n, is_call))
+    K, t, r, q, price, iv_yf, oi, is_call = (np.concatenate(columns[name]) for name in columns)
+
+    held = oi > 0
+    K, t, r, q, price, iv_yf, oi, is_call = (a[held] for a in (K, t, r, q, price, iv_yf, oi, is_call))
+    with span("iv_solve", contracts=len(K)):
+        sigma = implied_volatility_vec(spot, K, t, r, price, is_call, q)
+        sigma = np.where(np.isfinite(sigma), sigma, iv_yf)
+    usable = sigma > 0
+    K, t, r, q, oi, is_call, sigma = (a[usable] for a in (K, t, r, q, oi, is_call, sigma))
+    if K.size == 0:
+        raise ValueError(f"No hay contratos con open interest y volatilidad implícita válida para {underlying}.")
+
+    # Dealers comprados en calls y vendidos en puts
+    weight = np.where(is_call, 1.0, -1.0) * oi * CONTRACT_MULTIPLIER
+    with span("greeks", contracts=len(K)):
+        greeks = compute_greeks_vec(spot, K, t, r, sigma, is_call, q)
+        gamma = weight * greeks["gamma"] * spot ** 2 * 0.01
+        delta = weight * greeks["delta"] * spot
+        vanna = weight * bs_vanna_vec(spot, K, t, r, sigma, q) * spot * 0.01
+
+    with span("strike_profile"):
+        strikes, by_strike = np.unique(K, return_inverse=True)
+        per_strike = lambda values: np.bincount(by_strike, weights=values, minlength=strikes.size)
+        call_oi = per_strike(np.where(is_call, oi, 0.0))
+        put_oi = per_strike(np.where(is_call, 0.0, oi))
+
+    # Perfil de gamma: gamma reevaluada en cada spot de la grilla (grilla × contratos)
+    grid = spot * np.linspace(1.0 - spot_range, 1.0 + spot_range, grid_points)
+    with span("gamma_profile", points=grid_points, contracts=len(K)):
+        profile = bs_gamma_vec(grid[:, None], K, t, r, sigma, q) @ weight * grid ** 2 * 0.01
+
+    return GammaExposure(
+        underlying=underlying,
+        spot=round(float(spot), 4),
+        expirations=expirations,
+        contracts=int(K.size),
+        total_gamma=round(float(gamma.sum()), 2),
+        total_delta=round(float(delta.sum()), 2),
+        total_vanna=round(float(vanna.sum()), 2),
+        zero_gamma_level=_zero_crossing(grid, profile, spot),
+        strikes=strikes.tolist(),
+        gamma_by_strike=np.round(per_strike(gamma), 2).tolist(),
+        delta_by_strike=np.round(per_strike(delta), 2).tolist(),
+        vanna_by_strike=np.round(per_strike(vanna), 2).tolist(),
+        call_open_interest=call_oi.astype(int).tolist(),
+        put_open_interest=put_oi.astype(int).tolist(),
+        spot_grid=np.round(grid, 4).tolist(),
+        gamma_profile=np.round(profile, 2).tolist(),
+    )
@@ -1,7 +1,7 @@
 from typing import List
 from datetime import date
-import yfinance as yf
 from Server.model.options import GetOptionExpirations
+from Server.utils.market_data import get_expirations
 
 def get_option_expiration(underlying: str) -> GetOptionExpirations:
     '''
@@ -12,9 +12,7 @@ def get_option_expiration(underlying: str) -> GetOptionExpirations:
     :rtype: List[date]
     '''
     
-    t = yf.Ticker(underlying)
-    
-    Expirations: List[str] = list(t.options)
+    Expirations: List[str] = list(get_expirations(underlying))
     
     return GetOptionExpirations(
         underlying=underlying,
@@ -5,11 +5,12 @@ Retrieves historical price data for an underlying asset using yfinance.
 Provides OHLCV (Open, High, Low, Close, Volume) data for charting and analysis.
 """
 
-import yfinance as yf
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from typing import List
 
+from Server.utils.market_data import get_price_history, get_ticker_info
+
 @dataclass
 class HistoricalPrice:
     """Historical price data point"""
@@ -53,11 +54,9 @@ def get_historical_prices(
     Raises:
         ValueError: If ticker is invalid or data cannot be fetched
     """
-    ticker = yf.Ticker(underlying)
-
     # Get ticker info
     try:
-        info = ticker.info
+        info = get_ticker_info(underlying)
         long_name = info.get('longName', underlying)
         currency = info.get('currency', 'USD')
         current_price = info.get('currentPrice') or info.get('regularMarketPrice') or 0.0
@@ -67,7 +66,7 @@ def get_historical_prices(
         current_price = 0.0
 
     # Get historical data
-    hist = ticker.history(period=period, interval=interval)
+    hist = get_price_history(underlying, period, interval)
 
     if hist.empty:
         raise ValueError(f"No historical data available for {underlying}")
@@ -1,123 +1,162 @@
-import yfinance as yf
 from datetime import datetime
-from Server.utils.bs import implied_volatility, bs_price_sigma
+from Server.utils.bs import implied_volatility_vec, bs_price_vec
 import numpy as np
-from Server.utils.get_spot import get_spot_price
+from Server.utils.market_data import get_spot, get_expirations, get_chain_frames, chain_version
+from Server.utils.forward import carry, get_implied_forward
 from Server.utils.risk_free import get_risk_free_rate
+from Server.utils.quote_cleaning import clean_quotes
 from scipy.ndimage import gaussian_filter1d
 from scipy.interpolate import interp1d
 from Server.model.options import ImpliedDistribution
-def get_implied_distribution(underlying: str, expiration: str, min_moneyness: float = 0.7, max_moneyness: float = 1.3) -> ImpliedDistribution:
-    '''ImpliedDistribution:
+from Server.utils.tracing import span
+from Server.utils.prefetch import get_precomputed
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class ImpliedDensity:
+    '''Densidad risk-neutral implícita en la grilla de strikes de $0.01.'''
+    expiration: datetime
+    spot: float
+    r: float
+    q: float
+    dte: int
+    t: float
+    valid_strikes: List[float]
+    Ks_range: np.ndarray
+    pdf: np.ndarray
+    cum_prob: np.ndarray
+
+
+def compute_implied_density(underlying: str, expiration: str, min_moneyness: float = 0.7, max_moneyness: float = 1.3) -> ImpliedDensity:
+    '''
+    Construye la densidad risk-neutral (Breeden-Litzenberger) normalizada y su CDF.
+
+    Es el paso compartido por `get_implied_distribution` y por las herramientas
+    que muestrean precios terminales a partir de la distribución implícita.
     '''
-    ticker = yf.Ticker(underlying)
+    precomputed = get_precomputed("implied_density", (underlying, expiration, min_moneyness, max_moneyness))
+    if precomputed is not None:
+        return precomputed
+
+    with span("expirations"):
+        expirations = get_expirations(underlying)
     
-    if expiration not in ticker.options:
-        raise ValueError(f"Fecha {expiration} no encontrada para {underlying}. Fechas disponibles: {ticker.options}")
+    if expiration not in expirations:
+        raise ValueError(f"Fecha {expiration} no encontrada para {underlying}. Fechas disponibles: {expirations}")
     
-    r = get_risk_free_rate(expiration)
-    spot = get_spot_price(underlying)
+    with span("risk_free_curve"):
+        r = get_risk_free_rate(expiration)
+    with span("spot"):
+        spot = get_spot(underlying)
 
     expiration =  datetime.fromisoformat(expiration)
     dte = (expiration - datetime.today()).days
     t = dte / 252
     
     #Obtener cadena de opciones
-    chain = ticker.option_chain(expiration.strftime("%Y-%m-%d"))
-    calls_df = chain.calls
-    
+    # La cadena cacheada se comparte: copiar antes de agregar columnas
+    with span("chain"):
+        calls_df, puts_df = get_chain_frames(underlying, expiration.strftime("%Y-%m-%d"))
+    calls_df = calls_df.copy()
+
+    # Tasa y dividendos implícitos por paridad put-call: la media de la
+    # densidad es el forward del mercado y no el de un subyacente sin dividendos
+    with span("implied_forward"):
+        fit = get_implied_forward(underlying, expiration.strftime("%Y-%m-%d"), calls_df, puts_df, t, r,
+                                  chain_version(underlying, expiration.strftime("%Y-%m-%d"), puts_df))
+        r, q = carry(fit, spot, t, r)
     
-    valid_quotes = (calls_df["bid"] > 0) & (calls_df["ask"] > 0)
-    mid_from_quotes = (calls_df["bid"] + calls_df["ask"]) / 2
 
-    # Fallback: usar lastPrice cuando no hay cotización bid/ask decente
-    calls_df["Mid"] = np.where(
-    valid_quotes,
-    mid_from_quotes,
-    calls_df.get("lastPrice", np.nan)  # yfinance suele tener lastPrice
-    )
+    # Precios limpios (utils/quote_cleaning.py): mid o last reciente, dentro de
+    # las cotas de no arbitraje y convexos en el strike, con peso por liquidez
+    with span("quote_cleaning"):
+        clean = clean_quotes(calls_df, spot, t, r, True, q)
+    calls_df["Mid"] = clean.price
+    calls_df["weight"] = clean.weight
     
     #filtrar x moneyness
 
     calls_df['moneyness'] = calls_df['strike'] / spot
     calls_df = calls_df[(calls_df['moneyness'] >= min_moneyness) & (calls_df['moneyness'] <= max_moneyness)]
     
-    iv_calls = []
-    valid_strikes = []
-    
-    for _, row in calls_df.iterrows():
-        K = float(row["strike"])
-        price_mid = float(row["Mid"])
+    with span("iv_solve", contracts=len(calls_df)):
+        all_strikes = calls_df["strike"].to_numpy(dtype=float)
+        all_iv = implied_volatility_vec(spot, all_strikes, t, r, calls_df["Mid"].to_numpy(dtype=float), True, q)
+        solved = np.isfinite(all_iv) & (calls_df["weight"].to_numpy() > 0)
 
-        if np.isnan(price_mid) or price_mid <= 0:
-            continue
-
-        try:
-            sigma = implied_volatility(
-                S=spot,
-                K=K,
-                t=t,
-                r=r,
-                Price=price_mid,
-                option_type="call",
-            )
-        except Exception as e:
-            continue
-
-        if sigma is None or np.isnan(sigma) or sigma <= 0:
-            continue
-
-        iv_calls.append({"strike": K, "implied_volatility": sigma})
-        valid_strikes.append(K)
-    
-    if len(iv_calls) < 3:
+    if solved.sum() < 3:
         raise ValueError("No se encontraron opciones call dentro del rango de moneyness especificado.")
-    
-    strikes = np.array([x["strike"] for x in iv_calls], dtype=float)
-    iv  = np.array([x["implied_volatility"] for x in iv_calls], dtype=float)
+
+    strikes = all_strikes[solved]
+    iv = all_iv[solved]
+    weight = calls_df["weight"].to_numpy()[solved]
+    valid_strikes = strikes.tolist()
 
     
-    #suavizar IV
-    
-    iv = gaussian_filter1d(iv, sigma=2)
+    with span("iv_interpolation"):
+        #suavizar IV: promedio gaussiano pesado por liquidez (las cotizaciones
+        #ya son convexas, alcanza con un kernel más angosto)
+        iv = gaussian_filter1d(iv * weight, sigma=1) / gaussian_filter1d(weight, sigma=1)
     
-    #Crear rango de strikes interpolados
-    Ks_range = np.arange(
-        start = strikes.min(),
-        stop = strikes.max(),
-        step = 0.01
-    )
+        #Crear rango de strikes interpolados
+        Ks_range = np.arange(
+            start = strikes.min(),
+            stop = strikes.max(),
+            step = 0.01
+        )
     
-    #Interpolar IV en el nuevo rango de strikes
-    f = interp1d(x = strikes, y=iv, kind='cubic', fill_value='extrapolate')
+        #Interpolar IV en el nuevo rango de strikes
+        f = interp1d(x = strikes, y=iv, kind='cubic', fill_value='extrapolate')
     
-    iv_interp = f(Ks_range)
+        iv_interp = f(Ks_range)
     
     #Calcular precios de opciones call con IV interpolada
     
-    calls_p = np.array([
-        bs_price_sigma(
-            S=spot,
-            K=K,
-            t=t,
-            r=r,
-            option_type='call',
-            sigma=sigma
-        ) for K, sigma in zip(Ks_range, iv_interp)
-    ])
+    with span("price_grid", points=len(Ks_range)):
+        calls_p = bs_price_vec(spot, Ks_range, t, r, iv_interp, True, q)
     
     #Calcular PDF usando Breeden-Litzenberger
-    first_deriv = np.gradient(calls_p, Ks_range, edge_order=0)
-    second_deriv = np.gradient(first_deriv, Ks_range, edge_order=0)
+    with span("density"):
+        first_deriv = np.gradient(calls_p, Ks_range, edge_order=0)
+        second_deriv = np.gradient(first_deriv, Ks_range, edge_order=0)
     
-    pdf = np.exp(r * t) * second_deriv
-    pdf = gaussian_filter1d(pdf, sigma=2)
-    pdf = np.maximum(pdf, 0)
+        pdf = np.exp(r * t) * second_deriv
+        pdf = gaussian_filter1d(pdf, sigma=2)
+        pdf = np.maximum(pdf, 0)
     
-    #Normalizar PDF
+        #Normalizar PDF
      
-    total_prob = np.trapz(pdf, Ks_range)
-    pdf /= total_prob
+        total_prob = np.trapz(pdf, Ks_range)
+        pdf /= total_prob
+
+        dx = Ks_range[1] - Ks_range[0]
+
+        cum_prob = np.cumsum(pdf) * dx
+
+    return ImpliedDensity(
+        expiration=expiration,
+        spot=spot,
+        r=r,
+        q=q,
+        dte=dte,
+        t=t,
+        valid_strikes=valid_strikes,
+        Ks_range=Ks_range,
+        pdf=pdf,
+        cum_prob=cum_prob,
+    )
+
+
+def get_implied_distribution(underlying: str, expiration: str, min_moneyness: float = 0.7, max_moneyness: float = 1.3) -> ImpliedDistribution:
+    '''ImpliedDistribution:
+    '''
+    density = compute_implied_density(underlying, expiration, min_moneyness, max_moneyness)
+    expiration = density.expiration
+    spot, r, dte = density.spot, density.r, density.dte
+    valid_strikes = density.valid_strikes
+    Ks_range, pdf, cum_prob = density.Ks_range, density.pdf, density.cum_prob
     
     #Probabilidad de estar debajo/encima del spot
     
@@ -141,10 +180,6 @@ def get_implied_distribution(underlying: str, expiration: str, min_moneyness: fl
     kurtosis = mu4 / std**4
 
     
-    dx = Ks_range[1] - Ks_range[0]
-    
-    cum_prob = np.cumsum(pdf) * dx
-    
     def quantile(q: float) -> float:
         ind = np.searchsorted(cum_prob, q)
         if ind <= 0:
@@ -1,10 +1,11 @@
-import yfinance as yf
-from Server.model.options import Option_Chain, OptionQuote
-from Server.utils.get_spot import get_spot_price
+from Server.model.options import Option_Chain
+from Server.utils.market_data import get_spot, get_expirations, get_chain_frames, get_ticker_info
 from datetime import date
-from ...utils.option_quote import row_to_option_quote
-from typing import List
-def get_option_chain(underlying: str, expiration: str) -> Option_Chain:
+from typing import Optional, Union
+from ...model.options import ChainDelta
+from ...utils.option_quote import frame_to_option_columns
+from ...utils.snapshots import with_snapshot
+def get_option_chain(underlying: str, expiration: str, since: Optional[str] = None) -> Union[Option_Chain, ChainDelta]:
     """
     Obtiene la cadena completa de opciones (calls y puts) para un activo subyacente y fecha de vencimiento.
     
@@ -15,6 +16,8 @@ def get_option_chain(underlying: str, expiration: str) -> Option_Chain:
     Args:
         underlying (str): Ticker del activo subyacente (ej: "AAPL", "TSLA", "SPY")
         expiration (str): Fecha de vencimiento en formato "YYYY-MM-DD"
+        since (str, opcional): `snapshot_token` de una respuesta anterior; si se
+            indica, sólo se devuelven los contratos que cambiaron desde entonces
     
     Returns:
         Option_Chain: Objeto que contiene:
@@ -24,8 +27,10 @@ def get_option_chain(underlying: str, expiration: str) -> Option_Chain:
             - expiration: Fecha de vencimiento solicitada
             - as_of: Fecha de valoración (hoy)
             - spot: Precio spot actual del subyacente
-            - calls: Lista de OptionQuote con todas las opciones call
-            - puts: Lista de OptionQuote con todas las opciones put
+            - calls: OptionColumns (vistas OptionQuote) con todas las opciones call
+            - puts: OptionColumns (vistas OptionQuote) con todas las opciones put
+            - snapshot_token: Token de este resultado, para pedidos con `since`
+        ChainDelta: Si `since` es un snapshot reciente (ver utils/snapshots.py)
     
     Raises:
         ValueError: Si la fecha de vencimiento no está disponible para el subyacente
@@ -35,34 +40,26 @@ def get_option_chain(underlying: str, expiration: str) -> Option_Chain:
         >>> print(f"Calls: {len(chain.calls)}, Puts: {len(chain.puts)}")
         >>> print(f"Spot: ${chain.spot}")
     """
-    t = yf.Ticker(underlying)
-    spot = get_spot_price(underlying)
+    spot = get_spot(underlying)
     
     valuation_Date = date.today()
     
-    raw_exp = t.options
+    raw_exp = get_expirations(underlying)
     
     if expiration in raw_exp:
         exp_str = expiration
     else:
         raise ValueError(f"Fecha de expiración {expiration} no encontrada para el subyacente {underlying}. Fechas de expiración disponibles: {raw_exp}")
     
-    currency = t.info['financialCurrency']
-    long_name = t.info['longName']
+    info = get_ticker_info(underlying)
+    currency = info['financialCurrency']
+    long_name = info['longName']
     
-    calls: List[OptionQuote] = []
-    puts: List[OptionQuote] = []
+    calls_df, puts_df = get_chain_frames(underlying, exp_str)
+    calls = frame_to_option_columns(calls_df)
+    puts = frame_to_option_columns(puts_df)
     
-    
-    for _, row in t.option_chain(exp_str).calls.iterrows():
-        call_quote = row_to_option_quote(row)
-        calls.append(call_quote)
-    
-    for _, row in t.option_chain(exp_str).puts.iterrows():
-        put_quote = row_to_option_quote(row)
-        puts.append(put_quote)
-    
-    return Option_Chain(
+    chain = Option_Chain(
         underlying=underlying,
         long_name=long_name,
         currency=currency,
@@ -70,4 +67,5 @@ def get_option_chain(underlying: str, expiration: str) -> Option_Chain:
         as_of=valuation_Date,
         spot=spot,
         calls=calls,
-        puts=puts)
\ No newline at end of file
+        puts=puts)
+    return with_snapshot("get_chain", chain, since)
\ No newline at end of file
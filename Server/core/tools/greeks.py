@@ -1,123 +1,146 @@
-from ...model.options import Greeks, OptionGreeks
-from ...utils.get_spot import get_spot_price
+from typing import Optional, Union
+from ...model.options import ChainDelta, Greeks, OptionGreeks, OptionColumns
+from ...utils.market_data import get_spot, get_expirations, get_chain_frames, chain_version
 from ...utils.risk_free import get_risk_free_rate
 from datetime import date
-import yfinance as yf
-from ...utils.bs import     compute_greeks, implied_volatility
+import numpy as np
+from ...utils.american import american_greeks_vec, american_implied_volatility_vec
+from ...utils.bs import compute_greeks_vec, implied_volatility_vec
+from ...utils.tracing import span
+from ...utils.prefetch import get_precomputed
+from ...utils.snapshots import with_snapshot
+from ...utils.forward import carry, get_implied_forward
+from ...utils.iv_store import record_greeks
+from ...utils.quote_cleaning import clean_quotes
 
-def compute_greeks_chain(underlying: str, expiration: str) -> Greeks:
+# "european": Black-Scholes (utils/bs.py); "american": árbol binomial (utils/american.py)
+PRICING_MODELS = ("european", "american")
+
+
+def compute_greeks_chain(underlying: str, expiration: str, since: Optional[str] = None,
+                         model: str = "european") -> Union[Greeks, ChainDelta]:
     """
     Calcula las griegas (Delta, Gamma, Theta, Vega, Rho) para todas las opciones
-    de un activo subyacente en una fecha de vencimiento específica utilizando el modelo Black-Scholes.
+    de un activo subyacente en una fecha de vencimiento específica utilizando el modelo Black-Scholes
+    o, con `model="american"`, un árbol binomial con ejercicio anticipado.
+    La tasa y el rendimiento por dividendos salen de la paridad put-call del
+    propio vencimiento (ver utils/forward.py).
 
     Args:
         underlying (str): Ticker del activo subyacente (ej: "AAPL", "TSLA", "SPY")
         expiration (str): Fecha de vencimiento en formato "YYYY-MM-DD"
+        since (str, opcional): `snapshot_token` de una respuesta anterior; si se
+            indica, sólo se devuelven los contratos que cambiaron desde entonces
+        model (str): "european" (default) o "american"
 
     Returns:
         Greeks: Objeto que contiene las griegas calculadas para cada opción
+        ChainDelta: Si `since` es un snapshot reciente (ver utils/snapshots.py)
+
+    Raises:
+        ValueError: Si el vencimiento no está disponible o el modelo no existe
     """
+    if model not in PRICING_MODELS:
+        raise ValueError(f"Modelo de valuación {model} no soportado. Modelos disponibles: {PRICING_MODELS}")
+
+    # Tickers vigilados: resultado precalculado por el prefetch (utils/prefetch.py)
+    greeks = get_precomputed("compute_greeks", (underlying, expiration)) if model == "european" else None
+    if greeks is None:
+        greeks = _compute_greeks(underlying, expiration, model)
+    return with_snapshot("compute_greeks" if model == "european" else f"compute_greeks:{model}", greeks, since)
+
+
+def _compute_greeks(underlying: str, expiration: str, model: str = "european") -> Greeks:
+    """Descarga la cadena y calcula las griegas de todos sus contratos."""
+
+    with span("spot"):
+        S = get_spot(underlying)
+    with span("expirations"):
+        expirations = get_expirations(underlying)
     
-    S = get_spot_price(underlying)
-    ticker = yf.Ticker(underlying)
-    
-    if expiration not in ticker.options:
-        raise ValueError(f"La fecha de vencimiento {expiration} no está disponible, para el subyacente {underlying}. Las fechas disponibles son: {ticker.options}")
+    if expiration not in expirations:
+        raise ValueError(f"La fecha de vencimiento {expiration} no está disponible, para el subyacente {underlying}. Las fechas disponibles son: {expirations}")
    
-    r = get_risk_free_rate(expiration)
+    with span("risk_free_curve"):
+        r = get_risk_free_rate(expiration)
     as_of = date.today()
     
     t = (date.fromisoformat(expiration) - as_of).days / 365.0
     
     
-    chain = ticker.option_chain(expiration)
-    
-    calls_df = chain.calls
-    puts_df = chain.puts
-    
-    calls: list[OptionGreeks] = []
-    puts: list[OptionGreeks] = []
-    
-    for _, row in calls_df.iterrows():
-        K = row["strike"]
-        bid = row["bid"]
-        ask = row["ask"]
-        last = row["lastPrice"]
-
-    # 1) Precio de referencia: mid si se puede, sino last
-        price = None
-        if bid is not None and ask is not None and bid > 0 and ask > 0:
-            price = (bid + ask) / 2
-        elif last is not None and last > 0:
-            price = last
-
-
-    # 2) Intentamos calcular IV con BS
-        sigma = implied_volatility(
-            S=S,
-            K=K,
-            t=t,
-            r=r,
-            Price=price,
-            option_type="call",
+    with span("chain"):
+        calls_df, puts_df = get_chain_frames(underlying, expiration)
+
+    # Tasa y dividendos implícitos por paridad put-call (utils/forward.py)
+    with span("implied_forward"):
+        fit = get_implied_forward(underlying, expiration, calls_df, puts_df, t, r,
+                                  chain_version(underlying, expiration, calls_df))
+        r, q = carry(fit, S, t, r)
+
+    greeks = Greeks(
+        underlying=underlying,
+        expiration=expiration,
+        calls=greeks_from_frame(calls_df, S=S, t=t, r=r, option_type="call", model=model, q=q),
+        puts=greeks_from_frame(puts_df, S=S, t=t, r=r, option_type="put", model=model, q=q),
     )
 
+    # Historial de IV (utils/iv_store.py, sólo con IV_STORE_DIR configurado)
+    if model == "european":
+        with span("iv_store"):
+            record_greeks(greeks, atm_strike=fit.forward if fit is not None else S,
+                          spot=S, rate=r, dividend_yield=q)
+    return greeks
+
+
+def greeks_from_frame(options_df, S: float, t: float, r: float, option_type: str,
+                      model: str = "european", q: float = 0.0) -> OptionColumns:
+    """
+    Calcula IV y griegas de todos los contratos de un lado de la cadena a la vez.
+
+    Args:
+        options_df: DataFrame de yfinance (calls o puts)
+        S (float): Precio spot
+        t (float): Tiempo al vencimiento en años
+        r (float): Tasa libre de riesgo
+        option_type (str): "call" o "put"
+        model (str): "european" (Black-Scholes) o "american" (árbol binomial)
+        q (float): Rendimiento por dividendos continuo
+
+    Returns:
+        OptionColumns con filas OptionGreeks y la IV usada como columna extra
+    """
+    is_call = option_type == "call"
+    K = options_df["strike"].to_numpy(dtype=float)
+
+    # 1) Precio de referencia limpio (utils/quote_cleaning.py): mid, o last si
+    #    no está viejo, sin precios fuera de cotas ni que rompan la convexidad
+    with span("quote_cleaning", side=option_type):
+        price = clean_quotes(options_df, S, t, r, is_call, q).price
+
+    # 2) IV con el modelo elegido para toda la cadena en un solo batch
+    with span("iv_solve", side=option_type, contracts=len(K), model=model):
+        if model == "american":
+            sigma = american_implied_volatility_vec(S, K, t, r, price, is_call, q)
+        else:
+            sigma = implied_volatility_vec(S, K, t, r, price, is_call, q)
+
     # 3) Si el solver no converge, fallback a la IV de yfinance de ESA fila
-        if sigma is None or sigma <= 0:
-            iv_yf = row.get("impliedVolatility")
-        
-            sigma = iv_yf
-        
-        calls.append(
-            compute_greeks(
-                S=S,
-                K=K,
-                t=t,
-                r=r,
-                sigma=sigma,
-                option_type="call",
-                contract_symbol=row["contractSymbol"],
-            )
-        )
-        
-    for _, row in puts_df.iterrows():
-        K = row['strike']
-        bid = row["bid"]
-        ask = row["ask"]
-        last = row["lastPrice"]
-
-        if bid and ask and bid > 0 and ask > 0:
-            price = (bid + ask) / 2
+    iv_yf = options_df["impliedVolatility"].to_numpy(dtype=float)
+    sigma = np.where(np.isfinite(sigma), sigma, iv_yf)
+
+    with span("greeks", side=option_type, model=model):
+        if model == "american":
+            greeks = american_greeks_vec(S, K, t, r, sigma, is_call, q)
         else:
-            price = last
-        sigma = implied_volatility(
-        S=S,
-        K=K,
-        t=t,
-        r=r,
-        Price=price,
-        option_type="put",
+            greeks = compute_greeks_vec(S, K, t, r, sigma, is_call, q)
+
+    nd = 5
+    return OptionColumns(
+        {
+            "contractSymbol": options_df["contractSymbol"].to_numpy(dtype=object),
+            "strike": K,
+            **{name: np.round(values, nd) for name, values in greeks.items()},
+            "impliedVolatility": sigma,
+        },
+        OptionGreeks,
     )
-        
-        if sigma is None or sigma <= 0:
-            sigma = row["impliedVolatility"]
-
-        
-        puts.append(
-            compute_greeks(
-                S=S,
-                K=K,
-                t=t,
-                r=r,
-                sigma=sigma,
-                option_type="put",
-                contract_symbol=row["contractSymbol"],
-            )
-        )
-        
-    return Greeks(
-        underlying=underlying,
-        expiration=expiration,
-        calls=calls,
-        puts=puts,
-    )
\ No newline at end of file
@@ -0,0 +1,72 @@
+from Server.model.options import IVHistory
+from Server.utils.iv_store import expiration_date, iv_store_dir, read
+from datetime import date, datetime, timezone
+import numpy as np
+from typing import Optional
+
+
+def _nullable(values: np.ndarray, nd: int = 5) -> list:
+    """Floats redondeados, con None en lugar de NaN."""
+    return [None if not np.isfinite(v) else round(float(v), nd) for v in values]
+
+
+def get_iv_history(
+    underlying: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    expiration: Optional[str] = None,
+    contract: Optional[str] = None,
+) -> IVHistory:
+    """
+    Devuelve la serie de IV registrada para un subyacente, sin recalcular nada.
+
+    Sin `contract` devuelve el resumen por vencimiento (IV ATM y de 25 delta);
+    con `contract`, la IV de ese contrato en cada registro.
+
+    Args:
+        underlying (str): Ticker del activo subyacente
+        start (str, opcional): Primera fecha "YYYY-MM-DD" (inclusive)
+        end (str, opcional): Última fecha "YYYY-MM-DD" (inclusive)
+        expiration (str, opcional): Sólo ese vencimiento
+        contract (str, opcional): `contractSymbol` de un contrato
+
+    Returns:
+        IVHistory: Columnas de la serie en orden cronológico
+
+    Raises:
+        ValueError: Si el store no está configurado (`IV_STORE_DIR`) o una fecha es inválida
+    """
+    root = iv_store_dir()
+    if root is None:
+        raise ValueError("El historial de IV está desactivado: configurar IV_STORE_DIR.")
+    start_day = date.fromisoformat(start) if start else None
+    end_day = date.fromisoformat(end) if end else None
+
+    table = "contracts" if contract else "summary"
+    data = read(root, underlying, table, start_day, end_day)
+
+    keep = np.ones(len(data["timestamp"]), dtype=bool)
+    if expiration:
+        keep &= data["expiration"] == (date.fromisoformat(expiration) - date(1970, 1, 1)).days
+    if contract:
+        keep &= data["contract"] == contract.encode()
+    data = {name: np.asarray(values)[keep] for name, values in data.items()}
+
+    order = np.argsort(data["timestamp"], kind="stable")
+    data = {name: values[order] for name, values in data.items()}
+
+    columns = {
+        "timestamp": [datetime.fromtimestamp(ms / 1000, timezone.utc).isoformat() for ms in data["timestamp"].tolist()],
+        "expiration": expiration_date(data["expiration"]),
+    }
+    if table == "summary":
+        columns.update({name: _nullable(data[name]) for name in ("atm_iv", "put25_iv", "call25_iv")})
+    else:
+        columns.update({
+            "contract": [c.decode() for c in data["contract"].tolist()],
+            "strike": data["strike"].tolist(),
+            "option_type": ["call" if c else "put" for c in data["is_call"].tolist()],
+            "iv": _nullable(data["iv"]),
+        })
+
+    return IVHistory(underlying=underlying, table=table, rows=int(keep.sum()), columns=columns)
@@ -0,0 +1,137 @@
+from Server.model.options import IVRank, IVScreen
+from Server.utils.iv_store import (DAILY_TENOR_DAYS, daily_index, expiration_date, iv_store_dir,
+                                   latest_by_expiration, read)
+from datetime import date, datetime, timedelta, timezone
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Optional
+
+_EPOCH = date(1970, 1, 1)
+
+
+def _nullable(value: float, nd: int = 5) -> Optional[float]:
+    return round(float(value), nd) if np.isfinite(value) else None
+
+
+def _window_matrix(series: List[np.ndarray], lookback: int) -> np.ndarray:
+    """Últimas `lookback` observaciones de cada serie, alineadas a la derecha y con NaN de relleno."""
+    matrix = np.full((len(series), lookback), np.nan)
+    for i, values in enumerate(series):
+        tail = values[-lookback:]
+        if tail.size:
+            matrix[i, lookback - tail.size:] = tail
+    return matrix
+
+
+def _rank_percentile(windows: np.ndarray):
+    """
+    IV rank y percentil (0-100) del último valor de cada ventana (última columna).
+
+    rank = (actual - mínimo) / (máximo - mínimo); percentil = % de sesiones
+    anteriores de la ventana con IV menor a la actual.
+    """
+    current = windows[..., -1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        valid = np.isfinite(windows)
+        low = np.where(valid, windows, np.inf).min(axis=-1)
+        high = np.where(valid, windows, -np.inf).max(axis=-1)
+        rank = np.where(high > low, (current - low) / (high - low) * 100.0, np.nan)
+        prior = windows[..., :-1]
+        below = (prior < current[..., None]).sum(axis=-1)
+        percentile = below / np.isfinite(prior).sum(axis=-1) * 100.0
+    ok = np.isfinite(current) & (valid.sum(axis=-1) >= 2)
+    return (np.where(ok, rank, np.nan), np.where(ok, percentile, np.nan),
+            np.where(ok, low, np.nan), np.where(ok, high, np.nan))
+
+
+def _term_structure(root: str, underlying: str, day: date) -> List[dict]:
+    """Último registro de cada vencimiento vigente del día `day`."""
+    close = latest_by_expiration(read(root, underlying, "summary", day, day))
+    as_of = (day - _EPOCH).days
+    live = close["expiration"] >= as_of
+    close = {name: values[live] for name, values in close.items()}
+    risk_reversal = close["call25_iv"].astype(float) - close["put25_iv"].astype(float)
+    return [
+        {
+            "expiration": expiration,
+            "days": int(days),
+            "atm_iv": _nullable(atm),
+            "risk_reversal_25": _nullable(rr),
+        }
+        for expiration, days, atm, rr in zip(expiration_date(close["expiration"]),
+                                             (close["expiration"] - as_of).tolist(),
+                                             close["atm_iv"].tolist(), risk_reversal.tolist())
+    ]
+
+
+def screen_iv_rank(underlyings: List[str], lookback_days: int = 252,
+                   include_history: bool = False) -> IVScreen:
+    """
+    IV rank, percentil de IV, estructura temporal y risk reversal de 25 delta
+    de una lista de subyacentes, leídos del store de IV (utils/iv_store.py).
+
+    No descarga cadenas: usa el índice diario de IV ATM a plazo constante
+    (`DAILY_TENOR_DAYS`) y el último registro de cada vencimiento. Los
+    tickers sin historial van a `missing`.
+
+    Args:
+        underlyings (List[str]): Tickers a evaluar
+        lookback_days (int): Sesiones registradas de la ventana (252 ≈ un año)
+        include_history (bool): Agregar la serie diaria con el IV rank móvil
+
+    Returns:
+        IVScreen: Una fila IVRank por ticker con historial, en el orden pedido
+
+    Raises:
+        ValueError: Si el store no está configurado (`IV_STORE_DIR`) o la ventana es menor a 2
+    """
+    root = iv_store_dir()
+    if root is None:
+        raise ValueError("El historial de IV está desactivado: configurar IV_STORE_DIR.")
+    if lookback_days < 2:
+        raise ValueError(f"lookback_days debe ser al menos 2 (recibido {lookback_days}).")
+
+    today = datetime.now(timezone.utc).date()
+    tickers, indexes, missing = [], [], []
+    for underlying in dict.fromkeys(u.upper() for u in underlyings):
+        index = daily_index(root, underlying, today)
+        if len(index["date"]) == 0:
+            missing.append(underlying)
+            continue
+        tickers.append(underlying)
+        indexes.append(index)
+
+    # Una fila por ticker con su ventana: rank y percentil de todos a la vez
+    windows = _window_matrix([index["atm_iv"].astype(float) for index in indexes], lookback_days)
+    rank, percentile, low, high = _rank_percentile(windows)
+
+    results = []
+    for i, (underlying, index) in enumerate(zip(tickers, indexes)):
+        as_of = _EPOCH + timedelta(days=int(index["date"][-1]))
+        history = None
+        if include_history:
+            # Ventanas móviles: una fila por sesión con las `lookback_days` sesiones hasta esa fecha
+            atm = index["atm_iv"].astype(float)
+            padded = np.concatenate([np.full(lookback_days - 1, np.nan), atm])
+            rolling_rank, _, _, _ = _rank_percentile(sliding_window_view(padded, lookback_days))
+            history = {
+                "date": expiration_date(index["date"]),
+                "atm_iv": [_nullable(v) for v in atm],
+                "iv_rank": [_nullable(v, 2) for v in rolling_rank],
+                "risk_reversal_25": [_nullable(v) for v in index["risk_reversal_25"].astype(float)],
+            }
+        results.append(IVRank(
+            underlying=underlying,
+            as_of=as_of.isoformat(),
+            observations=int(np.isfinite(windows[i]).sum()),
+            atm_iv=_nullable(windows[i, -1]),
+            iv_rank=_nullable(rank[i], 2),
+            iv_percentile=_nullable(percentile[i], 2),
+            iv_low=_nullable(low[i]),
+            iv_high=_nullable(high[i]),
+            risk_reversal_25=_nullable(float(index["risk_reversal_25"][-1])),
+            term_structure=_term_structure(root, underlying, as_of),
+            history=history,
+        ))
+
+    return IVScreen(lookback_days=lookback_days, tenor_days=DAILY_TENOR_DAYS, results=results, missing=missing)
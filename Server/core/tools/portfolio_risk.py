@@ -0,0 +1,124 @@
+from Server.model.options import PortfolioRisk, PositionGreeks, UnderlyingRisk
+from Server.core.tools.compute_strategy_payoff import resolve_strategy_legs
+from Server.utils.bs import bs_price_vec, compute_greeks_vec
+from Server.utils.tracing import span
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+CONTRACT_MULTIPLIER = 100
+DEFAULT_SPOT_SHOCKS = (-0.20, -0.10, -0.05, 0.0, 0.05, 0.10, 0.20)
+DEFAULT_VOL_SHOCKS = (-0.10, -0.05, 0.0, 0.05, 0.10)
+GREEK_NAMES = ("delta", "gamma", "theta", "vega", "rho")
+
+
+def _position_greeks(values: Dict[str, float], nd: int) -> PositionGreeks:
+    return PositionGreeks(**{name: round(float(values[name]), nd) for name in GREEK_NAMES})
+
+
+def compute_portfolio_risk(
+    positions: List[Dict[str, Any]],
+    spot_shocks: Optional[List[float]] = None,
+    vol_shocks: Optional[List[float]] = None,
+) -> PortfolioRisk:
+    """
+    Calcula el riesgo agregado de un libro de posiciones en opciones.
+
+    Las posiciones se agrupan por subyacente: cada cadena (underlying,
+    vencimiento) se descarga una sola vez y la IV de todos los contratos de un
+    subyacente se resuelve en un batch (ver `resolve_strategy_legs`). Las
+    griegas y la matriz de escenarios se calculan para todos los contratos del
+    libro en una única operación vectorizada.
+
+    Args:
+        positions (List[dict]): Posiciones. Cada una contiene `underlying` y los
+            campos de una pata de `compute_strategy_payoff`: side, option_type,
+            strike, expiration y quantity (opcional, por defecto 1)
+        spot_shocks (List[float], opcional): Shocks relativos de spot aplicados a
+            todos los subyacentes (ej: [-0.1, 0, 0.1]); por defecto ±5%, ±10%, ±20%
+        vol_shocks (List[float], opcional): Shocks absolutos de volatilidad
+            implícita (ej: [-0.05, 0, 0.05]); por defecto ±5 y ±10 puntos
+
+    Returns:
+        PortfolioRisk: Griegas netas y en dólares por subyacente, griegas en
+        dólares del libro, valor de mercado y P&L por contrato (x100) de cada
+        escenario spot × volatilidad.
+
+    Raises:
+        ValueError: Si el libro está vacío, a una posición le falta el
+            subyacente o alguna pata es inválida.
+    """
+    if not positions:
+        raise ValueError("El portafolio debe tener al menos una posición.")
+
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for position in positions:
+        if "underlying" not in position:
+            raise ValueError(f"Falta el campo 'underlying' en la posición {position}.")
+        leg = {key: value for key, value in position.items() if key != "underlying"}
+        groups.setdefault(str(position["underlying"]), []).append(leg)
+
+    with span("resolve", underlyings=len(groups), positions=len(positions)):
+        resolved = {underlying: resolve_strategy_legs(underlying, legs) for underlying, legs in groups.items()}
+
+    # Todos los contratos del libro como arrays planos
+    names = list(resolved)
+    sizes = [len(resolved[name].K) for name in names]
+    group = np.repeat(np.arange(len(names)), sizes)
+    spots = np.array([resolved[name].spot for name in names])
+    S = spots[group]
+    K, t, r, q, sigma, is_call, weight, price = (
+        np.concatenate([getattr(resolved[name], field) for name in names])
+        for field in ("K", "t", "r", "q", "sigma", "is_call", "weight", "price")
+    )
+
+    with span("greeks", contracts=len(K)):
+        greeks = compute_greeks_vec(S, K, t, r, sigma, is_call, q)
+        per_share = {name: weight * greeks[name] for name in GREEK_NAMES}
+        dollars = {
+            "delta": per_share["delta"] * S * CONTRACT_MULTIPLIER,
+            "gamma": per_share["gamma"] * S ** 2 * 0.01 * CONTRACT_MULTIPLIER,
+            "theta": per_share["theta"] * CONTRACT_MULTIPLIER,
+            "vega": per_share["vega"] * 0.01 * CONTRACT_MULTIPLIER,
+            "rho": per_share["rho"] * 0.01 * CONTRACT_MULTIPLIER,
+        }
+        value = weight * price * CONTRACT_MULTIPLIER
+
+    # Escenarios: ejes (contratos, vol_shocks, spot_shocks), revaluación instantánea
+    spot_axis = np.asarray(DEFAULT_SPOT_SHOCKS if spot_shocks is None else spot_shocks, dtype=float)
+    vol_axis = np.asarray(DEFAULT_VOL_SHOCKS if vol_shocks is None else vol_shocks, dtype=float)
+    with span("scenarios", contracts=len(K), scenarios=spot_axis.size * vol_axis.size):
+        col = lambda a: a[:, None, None]
+        shocked = bs_price_vec(
+            col(S) * (1.0 + spot_axis[None, None, :]), col(K), col(t), col(r),
+            np.maximum(col(sigma) + vol_axis[None, :, None], 1e-4), col(is_call), col(q),
+        )
+        base = bs_price_vec(S, K, t, r, sigma, is_call, q)
+        scenario_pnl = np.tensordot(weight, shocked - col(base), axes=(0, 0)) * CONTRACT_MULTIPLIER
+
+    # Agregados por subyacente con bincount (una pasada por griega)
+    by_group = lambda values: np.bincount(group, weights=values, minlength=len(names))
+    share_totals = {name: by_group(values) for name, values in per_share.items()}
+    dollar_totals = {name: by_group(values) for name, values in dollars.items()}
+    value_totals = by_group(value)
+
+    underlyings = [
+        UnderlyingRisk(
+            underlying=name,
+            spot=float(spots[i]),
+            positions=sizes[i],
+            market_value=round(float(value_totals[i]), 2),
+            greeks=_position_greeks({g: share_totals[g][i] for g in GREEK_NAMES}, 5),
+            dollar_greeks=_position_greeks({g: dollar_totals[g][i] for g in GREEK_NAMES}, 2),
+        )
+        for i, name in enumerate(names)
+    ]
+
+    return PortfolioRisk(
+        positions=len(K),
+        underlyings=underlyings,
+        market_value=round(float(value.sum()), 2),
+        dollar_greeks=_position_greeks({g: dollar_totals[g].sum() for g in GREEK_NAMES}, 2),
+        spot_shocks=spot_axis.tolist(),
+        vol_shocks=vol_axis.tolist(),
+        scenario_pnl=np.round(scenario_pnl, 2).tolist(),
+    )
@@ -0,0 +1,249 @@
+from Server.model.options import PositionPnLDistribution
+from Server.core.tools.compute_strategy_payoff import ResolvedLegs, resolve_strategy_legs, value_legs_at_horizon
+from Server.core.tools.get_implied_distribution import compute_implied_density
+from Server.utils.bs import implied_volatility_vec
+from Server.utils.market_data import get_chain_frames
+import numpy as np
+from scipy.special import ndtr, ndtri
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CONTRACT_MULTIPLIER = 100
+MODELS = ("implied", "gbm", "jump")
+PNL_QUANTILES = (0.01, 0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95, 0.99)
+MAX_PATHS = 20_000_000
+# Bins del histograma del P&L (cantidad y suma por bin: 1 MB fijo, sin importar n_paths)
+PNL_BINS = 1 << 16
+# Caminos mínimos del primer batch, que fija el rango del histograma
+_RANGE_PILOT_PATHS = 65_536
+
+
+def _chain_volatility(underlying: str, resolved: ResolvedLegs, strike: float) -> float:
+    """IV de la opción OTM (put debajo del spot, call encima) más cercana a `strike` en el primer vencimiento."""
+    calls_df, puts_df = get_chain_frames(underlying, resolved.horizon)
+    is_call = strike >= resolved.spot
+    options_df = calls_df if is_call else puts_df
+    row = options_df.iloc[int(np.argmin(np.abs(options_df["strike"].to_numpy() - strike)))]
+
+    bid, ask = float(row["bid"]), float(row["ask"])
+    price = (bid + ask) / 2 if bid > 0 and ask > 0 else float(row["lastPrice"])
+    t = resolved.t.min()
+    r = float(resolved.r[np.argmin(resolved.t)])
+    q = float(resolved.q[np.argmin(resolved.t)])
+
+    sigma = float(implied_volatility_vec(resolved.spot, float(row["strike"]), t, r, price, is_call, q))
+    if not np.isfinite(sigma):
+        sigma = float(row.get("impliedVolatility", np.nan))
+    if not sigma > 0:
+        raise ValueError("No se pudo obtener la volatilidad implícita para simular; indicar `volatility`.")
+    return sigma
+
+
+def _terminal_price_sampler(
+    model: str,
+    underlying: str,
+    resolved: ResolvedLegs,
+    rng: np.random.Generator,
+    volatility: Optional[float],
+    jump_intensity: float,
+    jump_mean: float,
+    jump_std: float,
+    min_moneyness: float,
+    max_moneyness: float,
+) -> Tuple[Callable[[int], np.ndarray], Optional[float]]:
+    """
+    Devuelve una función que genera `size` precios del subyacente en el horizonte.
+
+    Returns:
+        (sampler, probabilidad de las colas lognormales del modelo "implied" o None)
+    """
+    S = resolved.spot
+    T = float(resolved.t.min())
+    r = float(resolved.r[np.argmin(resolved.t)])
+    q = float(resolved.q[np.argmin(resolved.t)])
+
+    if model == "implied":
+        density = compute_implied_density(underlying, resolved.horizon, min_moneyness, max_moneyness)
+        cdf = density.cum_prob / density.cum_prob[-1]
+        K_low, K_high = float(density.Ks_range[0]), float(density.Ks_range[-1])
+
+        # La densidad sólo cubre la banda de moneyness: fuera de ella, colas
+        # lognormales con la IV de la opción OTM más cercana a cada borde
+        forward = S * np.exp((r - q) * T)
+        sigma_low = volatility if volatility is not None else _chain_volatility(underlying, resolved, K_low)
+        sigma_high = volatility if volatility is not None else _chain_volatility(underlying, resolved, K_high)
+        p_low = float(ndtr((np.log(K_low / forward) + 0.5 * sigma_low ** 2 * T) / (sigma_low * np.sqrt(T))))
+        p_high = float(ndtr(-(np.log(K_high / forward) + 0.5 * sigma_high ** 2 * T) / (sigma_high * np.sqrt(T))))
+
+        def lognormal(u: np.ndarray, sigma: float) -> np.ndarray:
+            return forward * np.exp(-0.5 * sigma ** 2 * T + sigma * np.sqrt(T) * ndtri(u))
+
+        def sample(size: int) -> np.ndarray:
+            u = rng.random(size)
+            # Transformada inversa: colas lognormales y, en la banda, la CDF de Breeden-Litzenberger
+            prices = np.interp((u - p_low) / (1 - p_low - p_high), cdf, density.Ks_range)
+            low, high = u < p_low, u > 1 - p_high
+            prices[low] = lognormal(u[low], sigma_low)
+            prices[high] = lognormal(u[high], sigma_high)
+            return prices
+
+        return sample, p_low + p_high
+
+    sigma = volatility if volatility is not None else _chain_volatility(underlying, resolved, S)
+
+    if model == "gbm":
+        drift = (r - q - 0.5 * sigma ** 2) * T
+        return lambda size: S * np.exp(drift + sigma * np.sqrt(T) * rng.standard_normal(size)), None
+
+    # Merton jump-diffusion: saltos lognormales con intensidad `jump_intensity` por año
+    k = np.exp(jump_mean + 0.5 * jump_std ** 2) - 1
+    drift = (r - q - 0.5 * sigma ** 2 - jump_intensity * k) * T
+
+    def sample(size: int) -> np.ndarray:
+        n_jumps = rng.poisson(jump_intensity * T, size)
+        jumps = n_jumps * jump_mean + np.sqrt(n_jumps) * jump_std * rng.standard_normal(size)
+        return S * np.exp(drift + sigma * np.sqrt(T) * rng.standard_normal(size) + jumps)
+
+    return sample, None
+
+
+def _histogram_tail(counts: np.ndarray, sums: np.ndarray, probabilities) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cuantiles y expected shortfall (promedio del peor `p` de los caminos) del histograma del P&L.
+
+    El cuantil es el promedio de su bin: exacto en las masas puntuales del
+    payoff (pérdida o ganancia máxima) y con error menor al ancho del bin en
+    el resto. El shortfall suma los bins enteros de la cola y la fracción
+    necesaria del bin del cuantil.
+    """
+    cumulative = np.cumsum(counts)
+    n = cumulative[-1]
+    target = np.asarray(probabilities) * n
+    bins = np.searchsorted(cumulative, target, side="left")
+    quantiles = sums[bins] / counts[bins]
+
+    tail_sums = np.concatenate([[0.0], np.cumsum(sums)])[bins]
+    tail_counts = cumulative[bins] - counts[bins]
+    shortfall = (tail_sums + (target - tail_counts) * quantiles) / target
+    return quantiles, shortfall
+
+
+def simulate_strategy_pnl(
+    underlying: str,
+    legs: List[Dict[str, Any]],
+    model: str = "implied",
+    n_paths: int = 1_000_000,
+    batch_size: int = 200_000,
+    seed: Optional[int] = None,
+    volatility: Optional[float] = None,
+    jump_intensity: float = 1.0,
+    jump_mean: float = -0.05,
+    jump_std: float = 0.10,
+    min_moneyness: float = 0.7,
+    max_moneyness: float = 1.3,
+) -> PositionPnLDistribution:
+    """
+    Distribución Monte Carlo del P&L de una posición en el primer vencimiento de sus patas.
+
+    Los precios terminales se muestrean de la distribución implícita del mercado
+    (CDF de Breeden-Litzenberger de `get_implied_distribution` dentro de la
+    banda de moneyness, con colas lognormales fuera de ella) o de un modelo
+    GBM / Merton jump-diffusion. El payoff de la posición se evalúa por batches
+    de `batch_size` caminos que se acumulan en un histograma de `PNL_BINS`
+    bins (cantidad y suma por bin), del que salen VaR, shortfall y cuantiles:
+    la memoria queda acotada a un bloque (patas × batch_size) más el
+    histograma, sin importar `n_paths`.
+
+    Args:
+        underlying (str): Ticker del activo subyacente
+        legs (List[dict]): Patas de la posición (mismo formato que `compute_option_strategy`)
+        model (str): "implied" (densidad implícita), "gbm" o "jump"
+        n_paths (int): Cantidad de caminos simulados
+        batch_size (int): Caminos evaluados por batch
+        seed (int, opcional): Semilla para reproducibilidad
+        volatility (float, opcional): Volatilidad para "gbm"/"jump" (por defecto la IV ATM) y para
+            las colas de "implied" (por defecto la IV OTM más cercana a cada borde de la banda)
+        jump_intensity (float): Saltos esperados por año (modelo "jump")
+        jump_mean (float): Media del log-salto (modelo "jump")
+        jump_std (float): Desvío del log-salto (modelo "jump")
+        min_moneyness (float): Moneyness mínimo de la densidad implícita
+        max_moneyness (float): Moneyness máximo de la densidad implícita
+
+    Returns:
+        PositionPnLDistribution: P&L esperado, desvío, probabilidad de ganancia,
+        VaR y expected shortfall (promedio del P&L en la cola de pérdidas),
+        cuantiles del P&L, todo por contrato (x100), y la probabilidad asignada
+        a las colas fuera de la banda (modelo "implied").
+
+    Raises:
+        ValueError: Si el modelo o los parámetros de simulación son inválidos.
+    """
+    model = model.lower()
+    if model not in MODELS:
+        raise ValueError(f"model debe ser uno de {MODELS} (recibido: {model}).")
+    if not 0 < n_paths <= MAX_PATHS:
+        raise ValueError(f"n_paths debe estar entre 1 y {MAX_PATHS}.")
+    if batch_size <= 0:
+        raise ValueError("batch_size debe ser positivo.")
+
+    resolved = resolve_strategy_legs(underlying, legs)
+    rng = np.random.default_rng(seed)
+    sample, tail_probability = _terminal_price_sampler(
+        model, underlying, resolved, rng, volatility,
+        jump_intensity, jump_mean, jump_std, min_moneyness, max_moneyness,
+    )
+
+    cost = resolved.net_premium
+    counts = np.zeros(PNL_BINS, dtype=np.int64)
+    sums = np.zeros(PNL_BINS)
+    low = width = None
+    pnl_sum = 0.0
+    pnl_sq_sum = 0.0
+    terminal_sum = 0.0
+    profitable = 0
+
+    start = 0
+    while start < n_paths:
+        size = min(batch_size if low is not None else max(batch_size, _RANGE_PILOT_PATHS), n_paths - start)
+        terminal = sample(size)
+        batch = (resolved.weight @ value_legs_at_horizon(resolved, terminal) - cost) * CONTRACT_MULTIPLIER
+
+        if low is None:
+            # El primer batch fija el rango (con un margen); lo que cae afuera va a los bins extremos
+            span = max(float(batch.max() - batch.min()), 1.0)
+            low, width = float(batch.min()) - span / 2, 2 * span / PNL_BINS
+        bins = np.clip(np.floor((batch - low) / width), 0, PNL_BINS - 1).astype(np.intp)
+        counts += np.bincount(bins, minlength=PNL_BINS)
+        sums += np.bincount(bins, weights=batch, minlength=PNL_BINS)
+
+        pnl_sum += float(batch.sum())
+        pnl_sq_sum += float(np.dot(batch, batch))
+        terminal_sum += float(terminal.sum())
+        profitable += int(np.count_nonzero(batch > 0))
+        start += size
+
+    mean = pnl_sum / n_paths
+    std = np.sqrt(max(pnl_sq_sum / n_paths - mean ** 2, 0.0))
+    # PNL_QUANTILES empieza en 0.01 y 0.05: VaR y shortfall 95%/99%
+    quantiles, shortfall = _histogram_tail(counts, sums, PNL_QUANTILES)
+    q05, es_95, es_99 = quantiles[1], shortfall[1], shortfall[0]
+
+    return PositionPnLDistribution(
+        underlying=underlying,
+        model=model,
+        valuation_date=resolved.horizon,
+        n_paths=n_paths,
+        spot=resolved.spot,
+        net_premium=round(cost * CONTRACT_MULTIPLIER, 3),
+        expected_pnl=round(mean, 3),
+        std_pnl=round(float(std), 3),
+        probability_of_profit=round(profitable / n_paths, 6),
+        VaR_95=round(float(q05), 3),
+        expected_shortfall_95=round(float(es_95), 3),
+        expected_shortfall_99=round(float(es_99), 3),
+        expected_terminal_price=round(terminal_sum / n_paths, 4),
+        pnl_quantiles=[
+            {"quantile": q, "pnl": round(float(v), 3)}
+            for q, v in zip(PNL_QUANTILES, quantiles)
+        ],
+        tail_probability=None if tail_probability is None else round(tail_probability, 6),
+    )
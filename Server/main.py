@@ -5,29 +5,66 @@ Provides Model Context Protocol (MCP) access to comprehensive options analysis t
 including option chains, Greeks calculation, implied distributions, payoff profiles,
 and historical price data.
 
-This server exposes 6 tools for options analysis:
+This server exposes 15 tools for options analysis:
 - get_expirations: Get available expiration dates for options
 - get_chain: Retrieve complete option chain data (calls and puts)
 - compute_greeks: Calculate Black-Scholes Greeks for all options
 - get_distribution: Extract risk-neutral probability distribution (Breeden-Litzenberger)
 - compute_payoff_profile: Generate payoff and profit/loss diagrams
+- compute_strategy_payoff: Payoff, P&L and position Greeks for multi-leg strategies
+- simulate_strategy_pnl: Monte Carlo P&L distribution (POP, expected shortfall) of a position
+- compute_portfolio_risk: Net and dollar Greeks plus spot x vol scenario P&L for a book of positions
+- get_gamma_exposure: Dealer gamma/delta/vanna exposure and zero-gamma level across all expirations
+- get_iv_history: Recorded intraday implied-volatility time series (ATM, 25-delta, per contract)
+- screen_iv_rank: IV rank/percentile, term structure and 25-delta risk reversal for many tickers
+- backtest_strategy: Backtest option-selling/buying rules over recorded chain snapshots
+- get_expected_move: Expected move (straddle) into any date, interpolated between expirations
+- get_price_probability: Probability of closing above/below price levels on any date
 - get_historical_prices_tool: Get historical OHLCV price data for charting
 """
 
 from mcp.server.fastmcp import FastMCP
-from typing import Optional
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
 
+import importlib
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-# Import underlying tool functions
-from Server.core.tools.get_expiration import get_option_expiration
-from Server.core.tools.get_option_chain import get_option_chain
-from Server.core.tools.greeks import compute_greeks_chain
-from Server.core.tools.get_implied_distribution import get_implied_distribution
-from Server.core.tools.compute_payoff import compute_option_payoff
-from Server.core.tools.get_historical_prices import get_historical_prices
+from Server.utils.profiling import profile_call
+from Server.utils.tracing import start_trace
+
+# Tool implementations are imported inside each tool function: yfinance,
+# pandas and SciPy are only loaded by the first call that needs them, so
+# the MCP handshake is not delayed by dependencies a session may never use.
+TOOL_MODULES = (
+    "Server.core.tools.get_expiration",
+    "Server.core.tools.get_option_chain",
+    "Server.core.tools.greeks",
+    "Server.core.tools.get_implied_distribution",
+    "Server.core.tools.compute_payoff",
+    "Server.core.tools.compute_strategy_payoff",
+    "Server.core.tools.simulate_pnl",
+    "Server.core.tools.portfolio_risk",
+    "Server.core.tools.gamma_exposure",
+    "Server.core.tools.iv_history",
+    "Server.core.tools.iv_rank",
+    "Server.core.tools.backtest",
+    "Server.core.tools.expected_move",
+    "Server.core.tools.get_historical_prices",
+)
+
+
+
+def _profiled(tool: str, func: Any, **kwargs: Any) -> Any:
+    """Call a tool implementation, saving a replayable profile if it is slow.
+
+    Profiling is opt-in through SLOW_CALL_PROFILE_MS (see Server/utils/profiling.py).
+    """
+    with profile_call(tool, func, kwargs):
+        return func(**kwargs)
+
 
 # Initialize MCP server with JSON response mode
 mcp = FastMCP(name="options-analysis-server", json_response=True)
@@ -57,12 +94,14 @@ def get_expirations(underlying: str) -> dict:
             "count": 28
         }
     """
-    result = get_option_expiration(underlying)
+    from Server.core.tools.get_expiration import get_option_expiration
+
+    result = _profiled("get_expirations", get_option_expiration, underlying=underlying)
     return vars(result)
 
 
 @mcp.tool()
-def get_chain(underlying: str, expiration: str) -> dict:
+def get_chain(underlying: str, expiration: str, since: Optional[str] = None) -> dict:
     """Get complete option chain (calls and puts) for a specific expiration.
 
     Retrieves all available call and put options for a given underlying asset and
@@ -71,6 +110,8 @@ def get_chain(underlying: str, expiration: str) -> dict:
     Args:
         underlying: Stock ticker symbol (e.g., "AAPL", "SPY", "TSLA")
         expiration: Expiration date in "YYYY-MM-DD" format
+        since: snapshot_token from a previous response; when it is still in the
+            server's recent snapshots, only the changed contracts are returned
 
     Returns:
         Dictionary containing:
@@ -82,6 +123,11 @@ def get_chain(underlying: str, expiration: str) -> dict:
             - spot (float): Current spot price of the underlying
             - calls (List[dict]): List of call options with full quote data
             - puts (List[dict]): List of put options with full quote data
+            - snapshot_token (str): Token to pass as `since` on the next call
+
+        With a known `since`, a delta instead: underlying, expiration, since,
+        snapshot_token, fields (changed scalars) and calls/puts as
+        {"added": [...], "changed": [...], "removed": [contractSymbol, ...]}.
 
     Each option in calls/puts contains:
         - contractSymbol: Option contract identifier
@@ -108,7 +154,12 @@ def get_chain(underlying: str, expiration: str) -> dict:
             "puts": [...]
         }
     """
-    chain = get_option_chain(underlying, expiration)
+    from Server.core.tools.get_option_chain import get_option_chain
+    from Server.model.options import ChainDelta
+
+    chain = _profiled("get_chain", get_option_chain, underlying=underlying, expiration=expiration, since=since)
+    if isinstance(chain, ChainDelta):
+        return asdict(chain)
     return {
         "underlying": chain.underlying,
         "long_name": chain.long_name,
@@ -116,13 +167,15 @@ def get_chain(underlying: str, expiration: str) -> dict:
         "expiration": chain.expiration,
         "as_of": chain.as_of,
         "spot": chain.spot,
-        "calls": [vars(c) for c in chain.calls],
-        "puts": [vars(p) for p in chain.puts],
+        "calls": chain.calls.to_records(),
+        "puts": chain.puts.to_records(),
+        "snapshot_token": chain.snapshot_token,
     }
 
 
 @mcp.tool()
-def compute_greeks(underlying: str, expiration: str) -> dict:
+def compute_greeks(underlying: str, expiration: str, since: Optional[str] = None,
+                   model: str = "european", debug_timings: bool = False) -> dict:
     """Calculate Black-Scholes Greeks (delta, gamma, theta, vega, rho) for all options.
 
     Computes Delta, Gamma, Theta, Vega, and Rho for every call and put option
@@ -132,6 +185,11 @@ def compute_greeks(underlying: str, expiration: str) -> dict:
     Args:
         underlying: Stock ticker symbol (e.g., "AAPL", "SPY", "TSLA")
         expiration: Expiration date in "YYYY-MM-DD" format
+        since: snapshot_token from a previous response; only the changed
+            contracts are returned (same delta format as get_chain)
+        model: "european" (Black-Scholes, default) or "american" (binomial
+            lattice with early exercise; better IV for deep ITM puts)
+        debug_timings: Also return per-phase timings (spot, chain, IV solve, Greeks)
 
     Returns:
         Dictionary containing:
@@ -139,6 +197,8 @@ def compute_greeks(underlying: str, expiration: str) -> dict:
             - expiration (str): Expiration date
             - calls (List[dict]): Greeks for each call option
             - puts (List[dict]): Greeks for each put option
+            - snapshot_token (str): Token to pass as `since` on the next call
+            - debug_timings (List[dict]): Phase spans, only when requested
 
     Each option's Greeks dict contains:
         - contractSymbol (str): Option contract identifier
@@ -163,13 +223,25 @@ def compute_greeks(underlying: str, expiration: str) -> dict:
             "puts": [...]
         }
     """
-    greeks = compute_greeks_chain(underlying, expiration)
-    return {
-        "underlying": greeks.underlying,
-        "expiration": greeks.expiration,
-        "calls": [vars(g) for g in greeks.calls],
-        "puts": [vars(g) for g in greeks.puts],
-    }
+    from Server.core.tools.greeks import compute_greeks_chain
+    from Server.model.options import ChainDelta
+
+    with start_trace("compute_greeks") as trace:
+        greeks = _profiled("compute_greeks", compute_greeks_chain, underlying=underlying, expiration=expiration,
+                           since=since, model=model)
+    if isinstance(greeks, ChainDelta):
+        result = asdict(greeks)
+    else:
+        result = {
+            "underlying": greeks.underlying,
+            "expiration": greeks.expiration,
+            "calls": greeks.calls.to_records(),
+            "puts": greeks.puts.to_records(),
+            "snapshot_token": greeks.snapshot_token,
+        }
+    if debug_timings:
+        result["debug_timings"] = trace.to_timings()
+    return result
 
 
 @mcp.tool()
@@ -177,7 +249,8 @@ def get_distribution(
     underlying: str,
     expiration: str,
     min_moneyness: float = 0.7,
-    max_moneyness: float = 1.3
+    max_moneyness: float = 1.3,
+    debug_timings: bool = False
 ) -> dict:
     """Extract risk-neutral probability distribution from option prices using Breeden-Litzenberger.
 
@@ -200,6 +273,7 @@ def get_distribution(
         expiration: Expiration date in "YYYY-MM-DD" format
         min_moneyness: Minimum strike/spot ratio (default: 0.7 for 30% OTM puts)
         max_moneyness: Maximum strike/spot ratio (default: 1.3 for 30% OTM calls)
+        debug_timings: Also return per-phase timings (chain, IV solve, price grid, density)
 
     Returns:
         Dictionary containing complete distribution analysis:
@@ -255,8 +329,20 @@ def get_distribution(
             ]
         }
     """
-    result = get_implied_distribution(underlying, expiration, min_moneyness, max_moneyness)
-    return vars(result)
+    from Server.core.tools.get_implied_distribution import get_implied_distribution
+
+    with start_trace("get_distribution") as trace:
+        result = _profiled(
+            "get_distribution", get_implied_distribution,
+            underlying=underlying,
+            expiration=expiration,
+            min_moneyness=min_moneyness,
+            max_moneyness=max_moneyness
+        )
+    result = vars(result)
+    if debug_timings:
+        result["debug_timings"] = trace.to_timings()
+    return result
 
 
 @mcp.tool()
@@ -267,7 +353,12 @@ def compute_payoff_profile(
     strike: float,
     expiration: str,
     spot_min: Optional[float] = None,
-    spot_max: Optional[float] = None
+    spot_max: Optional[float] = None,
+    include_surface: bool = False,
+    surface_spot_points: int = 200,
+    surface_date_points: int = 30,
+    vol_shifts: Optional[List[float]] = None,
+    debug_timings: bool = False
 ) -> dict:
     """Calculate complete payoff and profit/loss profile for an option position.
 
@@ -293,6 +384,13 @@ def compute_payoff_profile(
         expiration: Expiration date in "YYYY-MM-DD" format
         spot_min: Minimum spot price for payoff range (default: spot * 0.5)
         spot_max: Maximum spot price for payoff range (default: spot * 1.5)
+        include_surface: Also return the mark-to-model P&L surface between today
+                         and expiration (default: False)
+        surface_spot_points: Number of spot prices in the surface (default: 200)
+        surface_date_points: Number of valuation dates in the surface (default: 30)
+        vol_shifts: Absolute implied volatility shifts for the surface,
+                    e.g. [-0.05, 0, 0.05] (default: [0])
+        debug_timings: Also return per-phase timings (spot, chain, IV, Greeks, surface)
 
     Returns:
         Dictionary containing:
@@ -308,6 +406,9 @@ def compute_payoff_profile(
             - profits (List[float]): Net P&L including premium for each spot (x100)
             - greeks (dict): Position Greeks adjusted for long/short side
                 - contractSymbol, strike, delta, gamma, theta, vega, rho
+            - pnl_surface (dict | None): Only when include_surface is True
+                - spot_prices, days_forward, valuation_dates, vol_shifts
+                - pnl: P&L x100 indexed as pnl[vol_shift][date][spot]
 
     Raises:
         ValueError: If strike price doesn't exist in the option chain
@@ -333,16 +434,24 @@ def compute_payoff_profile(
             }
         }
     """
-    payoff = compute_option_payoff(
-        side=side,
-        option_type=option_type,
-        underlying=underlying,
-        Strike=strike,  # Parameter mapping: strike -> Strike
-        expiration=expiration,
-        spot_min=spot_min,
-        spot_max=spot_max
-    )
-    return {
+    from Server.core.tools.compute_payoff import compute_option_payoff
+
+    with start_trace("compute_payoff_profile") as trace:
+        payoff = _profiled(
+            "compute_payoff_profile", compute_option_payoff,
+            side=side,
+            option_type=option_type,
+            underlying=underlying,
+            Strike=strike,  # Parameter mapping: strike -> Strike
+            expiration=expiration,
+            spot_min=spot_min,
+            spot_max=spot_max,
+            include_surface=include_surface,
+            surface_spot_points=surface_spot_points,
+            surface_date_points=surface_date_points,
+            vol_shifts=vol_shifts
+        )
+    result = {
         "underlying": payoff.underlying,
         "expiration": payoff.expiration,
         "strike": payoff.strike,
@@ -353,8 +462,575 @@ def compute_payoff_profile(
         "spot_prices": payoff.spot_prices,
         "payoffs": payoff.payoffs,
         "profits": payoff.profits,
-        "greeks": vars(payoff.greeks),
+        "greeks": asdict(payoff.greeks),
+        "pnl_surface": asdict(payoff.pnl_surface) if payoff.pnl_surface else None,
     }
+    if debug_timings:
+        result["debug_timings"] = trace.to_timings()
+    return result
+
+
+@mcp.tool()
+def compute_strategy_payoff(
+    underlying: str,
+    legs: List[Dict[str, Any]],
+    spot_min: Optional[float] = None,
+    spot_max: Optional[float] = None,
+    num_points: int = 50,
+    include_surface: bool = False,
+    surface_spot_points: int = 200,
+    surface_date_points: int = 30,
+    vol_shifts: Optional[List[float]] = None
+) -> dict:
+    """Calculate payoff, P&L and position Greeks for a multi-leg option strategy.
+
+    Evaluates spreads, straddles, condors, butterflies, calendars, etc. in a single
+    call. Each expiration chain is downloaded once, all legs' implied volatilities
+    are solved in one batch and the payoff is evaluated as a (legs x spot grid)
+    array operation.
+
+    The strategy is valued at the earliest leg expiration: legs expiring then
+    contribute intrinsic value, later legs are repriced with Black-Scholes using
+    their current implied volatility.
+
+    Args:
+        underlying: Stock ticker symbol (e.g., "AAPL", "SPY")
+        legs: List of legs. Each leg is a dict with:
+            - side (str): "long" or "short"
+            - option_type (str): "call" or "put"
+            - strike (float): Strike price
+            - expiration (str): Expiration date in "YYYY-MM-DD" format
+            - quantity (int, optional): Number of contracts (default: 1)
+        spot_min: Minimum spot price for payoff range (default: spot * 0.5)
+        spot_max: Maximum spot price for payoff range (default: spot * 1.5)
+        num_points: Number of spot prices in the grid (default: 50)
+        include_surface: Also return the mark-to-model P&L surface between today
+                         and the first expiration (default: False)
+        surface_spot_points: Number of spot prices in the surface (default: 200)
+        surface_date_points: Number of valuation dates in the surface (default: 30)
+        vol_shifts: Absolute implied volatility shifts for the surface,
+                    e.g. [-0.05, 0, 0.05] (default: [0])
+
+    Returns:
+        Dictionary containing:
+            - underlying (str): Ticker symbol
+            - spot_current (float): Current spot price
+            - valuation_date (str): Date at which the payoff is evaluated
+            - legs (List[dict]): Per-leg premium, implied volatility and side-adjusted Greeks
+            - net_premium (float): Net premium x100 (positive = debit, negative = credit)
+            - spot_prices (List[float]): Simulated spot prices
+            - payoffs (List[float]): Strategy value at valuation date for each spot (x100)
+            - profits (List[float]): Net P&L including premiums for each spot (x100)
+            - breakevens (List[float]): Spot prices where P&L crosses zero
+            - max_profit (float): Maximum P&L on the grid
+            - max_loss (float): Minimum P&L on the grid
+            - greeks (dict): Aggregate position Greeks (delta, gamma, theta, vega, rho)
+            - pnl_surface (dict | None): Only when include_surface is True,
+              P&L x100 indexed as pnl[vol_shift][date][spot]
+
+    Raises:
+        ValueError: If a leg is malformed, its strike doesn't exist or its IV cannot be calculated
+
+    Example:
+        >>> compute_strategy_payoff("SPY", [
+        ...     {"side": "long", "option_type": "put", "strike": 560, "expiration": "2025-03-21"},
+        ...     {"side": "short", "option_type": "put", "strike": 580, "expiration": "2025-03-21"},
+        ...     {"side": "short", "option_type": "call", "strike": 620, "expiration": "2025-03-21"},
+        ...     {"side": "long", "option_type": "call", "strike": 640, "expiration": "2025-03-21"},
+        ... ])
+        {
+            "underlying": "SPY",
+            "net_premium": -612.0,
+            "breakevens": [573.88, 626.12],
+            "max_profit": 612.0,
+            "max_loss": -1388.0,
+            "greeks": {"delta": -0.0123, "gamma": -0.0021, ...},
+            ...
+        }
+    """
+    from Server.core.tools.compute_strategy_payoff import compute_option_strategy
+
+    result = _profiled(
+        "compute_strategy_payoff", compute_option_strategy,
+        underlying=underlying,
+        legs=legs,
+        spot_min=spot_min,
+        spot_max=spot_max,
+        num_points=num_points,
+        include_surface=include_surface,
+        surface_spot_points=surface_spot_points,
+        surface_date_points=surface_date_points,
+        vol_shifts=vol_shifts
+    )
+    return asdict(result)
+
+
+@mcp.tool()
+def simulate_strategy_pnl(
+    underlying: str,
+    legs: List[Dict[str, Any]],
+    model: str = "implied",
+    n_paths: int = 1_000_000,
+    batch_size: int = 200_000,
+    seed: Optional[int] = None,
+    volatility: Optional[float] = None,
+    jump_intensity: float = 1.0,
+    jump_mean: float = -0.05,
+    jump_std: float = 0.10,
+    min_moneyness: float = 0.7,
+    max_moneyness: float = 1.3
+) -> dict:
+    """Simulate the P&L distribution of an option position with Monte Carlo.
+
+    Samples terminal prices at the position's first expiration and evaluates the
+    position payoff in vectorized batches accumulated into a fixed-size P&L
+    histogram (memory does not grow with n_paths). Gives probability of profit,
+    expected P&L and tail risk under the market-implied distribution instead of
+    just the intrinsic payoff curve.
+
+    Models:
+        - "implied": Inverse-CDF sampling from the Breeden-Litzenberger density
+          (same density as get_distribution), with lognormal tails outside the
+          moneyness band
+        - "gbm": Geometric Brownian motion with ATM implied volatility
+        - "jump": Merton jump-diffusion (lognormal jumps)
+
+    Args:
+        underlying: Stock ticker symbol (e.g., "AAPL", "SPY")
+        legs: Position legs, same format as compute_strategy_payoff
+              ({side, option_type, strike, expiration, quantity})
+        model: "implied" (default), "gbm" or "jump"
+        n_paths: Number of simulated paths (default: 1,000,000)
+        batch_size: Paths evaluated per batch (default: 200,000)
+        seed: Random seed for reproducible results
+        volatility: Volatility for "gbm"/"jump" (default: ATM implied volatility) and for
+                    the "implied" tails (default: OTM implied volatility at each band edge)
+        jump_intensity: Expected jumps per year for "jump" (default: 1.0)
+        jump_mean: Mean log-jump size for "jump" (default: -0.05)
+        jump_std: Log-jump standard deviation for "jump" (default: 0.10)
+        min_moneyness: Minimum strike/spot ratio for the implied density (default: 0.7)
+        max_moneyness: Maximum strike/spot ratio for the implied density (default: 1.3)
+
+    Returns:
+        Dictionary containing (all P&L values per contract, x100):
+            - underlying, model, valuation_date, n_paths, spot
+            - net_premium (float): Positive = debit, negative = credit
+            - expected_pnl (float): Mean P&L across paths
+            - std_pnl (float): Standard deviation of P&L
+            - probability_of_profit (float): Fraction of paths with P&L > 0
+            - VaR_95 (float): 5th percentile of P&L
+            - expected_shortfall_95 / expected_shortfall_99 (float): Mean P&L in the worst 5% / 1%
+            - expected_terminal_price (float): Mean simulated price at valuation date
+            - pnl_quantiles (List[dict]): {"quantile": q, "pnl": value}
+            - tail_probability (float): Probability sampled from the lognormal tails
+              outside the moneyness band ("implied" only, otherwise None)
+
+    Raises:
+        ValueError: If the model or simulation parameters are invalid, or a leg is invalid
+
+    Example:
+        >>> simulate_strategy_pnl("SPY", [
+        ...     {"side": "short", "option_type": "put", "strike": 580, "expiration": "2025-03-21"}
+        ... ], model="implied", n_paths=2_000_000)
+        {
+            "probability_of_profit": 0.8123,
+            "expected_pnl": 41.2,
+            "expected_shortfall_95": -1523.4,
+            ...
+        }
+    """
+    from Server.core.tools.simulate_pnl import simulate_strategy_pnl as simulate_position_pnl
+
+    result = _profiled(
+        "simulate_strategy_pnl", simulate_position_pnl,
+        underlying=underlying,
+        legs=legs,
+        model=model,
+        n_paths=n_paths,
+        batch_size=batch_size,
+        seed=seed,
+        volatility=volatility,
+        jump_intensity=jump_intensity,
+        jump_mean=jump_mean,
+        jump_std=jump_std,
+        min_moneyness=min_moneyness,
+        max_moneyness=max_moneyness
+    )
+    return asdict(result)
+
+
+@mcp.tool()
+def compute_portfolio_risk(
+    positions: List[Dict[str, Any]],
+    spot_shocks: Optional[List[float]] = None,
+    vol_shocks: Optional[List[float]] = None
+) -> dict:
+    """Aggregate the risk of a book of option positions across underlyings.
+
+    Positions are grouped by underlying: each (underlying, expiration) chain is
+    downloaded once, implied volatilities are solved in one batch per underlying,
+    and the Greeks and scenario grid are computed for every contract in a single
+    vectorized pass. Use this instead of one compute_payoff_profile call per
+    position.
+
+    Args:
+        positions: List of positions. Each is a dict with:
+            - underlying (str): Stock ticker symbol
+            - side (str): "long" or "short"
+            - option_type (str): "call" or "put"
+            - strike (float): Strike price
+            - expiration (str): Expiration date in "YYYY-MM-DD" format
+            - quantity (int, optional): Number of contracts (default: 1)
+        spot_shocks: Relative spot shocks applied to every underlying,
+                     e.g. [-0.1, 0, 0.1] (default: ±5%, ±10%, ±20% and 0)
+        vol_shocks: Absolute implied volatility shocks, e.g. [-0.05, 0, 0.05]
+                    (default: ±5 and ±10 vol points and 0)
+
+    Returns:
+        Dictionary containing:
+            - positions (int): Number of contracts priced
+            - underlyings (List[dict]): Per underlying: spot, positions, market_value,
+              greeks (net per-share, side-adjusted) and dollar_greeks
+            - market_value (float): Mark-to-market value of the book (x100)
+            - dollar_greeks (dict): Book totals (per-share Greeks are not additive
+              across underlyings): delta ($ share-equivalent), gamma ($ delta change
+              per 1% move), theta ($/day), vega ($ per vol point), rho ($ per rate point)
+            - spot_shocks, vol_shocks (List[float]): Scenario axes
+            - scenario_pnl (List[List[float]]): Instant P&L (x100) indexed as
+              scenario_pnl[vol_shock][spot_shock]
+
+    Raises:
+        ValueError: If the book is empty or a position is malformed, its strike
+                    doesn't exist or its IV cannot be calculated
+
+    Example:
+        >>> compute_portfolio_risk([
+        ...     {"underlying": "SPY", "side": "short", "option_type": "put", "strike": 580, "expiration": "2025-03-21"},
+        ...     {"underlying": "AAPL", "side": "long", "option_type": "call", "strike": 230, "expiration": "2025-03-21", "quantity": 5},
+        ... ])
+        {
+            "positions": 2,
+            "dollar_greeks": {"delta": 84512.3, "gamma": 1875.4, ...},
+            "scenario_pnl": [[...], ...],
+            ...
+        }
+    """
+    from Server.core.tools.portfolio_risk import compute_portfolio_risk as compute_book_risk
+
+    result = _profiled(
+        "compute_portfolio_risk", compute_book_risk,
+        positions=positions,
+        spot_shocks=spot_shocks,
+        vol_shocks=vol_shocks
+    )
+    return asdict(result)
+
+
+@mcp.tool()
+def get_gamma_exposure(
+    underlying: str,
+    max_expirations: Optional[int] = None,
+    spot_range: float = 0.2,
+    grid_points: int = 101
+) -> dict:
+    """Dealer gamma exposure (GEX), delta and vanna exposure across all expirations.
+
+    Downloads every expiration concurrently and processes all contracts with open
+    interest as one vectorized set: implied volatilities (with each expiration's
+    implied rate and dividend yield), Greeks and the gamma profile across a spot
+    grid. Assumes dealers are long calls and short puts.
+
+    Args:
+        underlying: Stock ticker symbol (e.g., "SPY", "QQQ")
+        max_expirations: Only the N nearest expirations (default: all)
+        spot_range: Relative half-width of the spot grid (default: 0.2 = ±20%)
+        grid_points: Number of spot prices in the grid (default: 101)
+
+    Returns:
+        Dictionary containing:
+            - underlying, spot, expirations, contracts
+            - total_gamma (float): $ gamma per 1% move of the underlying
+            - total_delta (float): $ share-equivalent delta
+            - total_vanna (float): $ delta change per vol point
+            - zero_gamma_level (float | None): Spot where total gamma changes sign
+            - strikes (List[float]): Strikes across all expirations
+            - gamma_by_strike / delta_by_strike / vanna_by_strike (List[float])
+            - call_open_interest / put_open_interest (List[int]): Per strike
+            - spot_grid / gamma_profile (List[float]): Total gamma at each grid spot
+
+    Raises:
+        ValueError: If there are no future expirations or no contracts with open interest
+
+    Example:
+        >>> get_gamma_exposure("SPY")
+        {
+            "spot": 585.2,
+            "total_gamma": 2.1e9,
+            "zero_gamma_level": 571.4,
+            ...
+        }
+    """
+    from Server.core.tools.gamma_exposure import get_gamma_exposure as compute_gamma_exposure
+
+    result = _profiled(
+        "get_gamma_exposure", compute_gamma_exposure,
+        underlying=underlying,
+        max_expirations=max_expirations,
+        spot_range=spot_range,
+        grid_points=grid_points
+    )
+    return asdict(result)
+
+
+@mcp.tool()
+def get_iv_history(
+    underlying: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    expiration: Optional[str] = None,
+    contract: Optional[str] = None
+) -> dict:
+    """Return the recorded implied-volatility time series of an underlying.
+
+    Every compute_greeks calculation appends per-contract IVs and a per-expiration
+    summary (ATM and 25-delta IVs) to a local columnar store when IV_STORE_DIR is
+    set. This tool slices that history without recomputing anything, as input for
+    IV rank, IV percentile or skew trend analysis.
+
+    Args:
+        underlying: Stock ticker symbol (e.g., "SPY")
+        start: First date "YYYY-MM-DD" (inclusive, default: all history)
+        end: Last date "YYYY-MM-DD" (inclusive)
+        expiration: Only this expiration date "YYYY-MM-DD"
+        contract: contractSymbol of a single contract; returns its IV series
+                  instead of the per-expiration summary
+
+    Returns:
+        Dictionary containing:
+            - underlying (str), table ("summary" or "contracts"), rows (int)
+            - columns (dict): Parallel lists in chronological order
+                - timestamp (ISO, UTC) and expiration always
+                - summary: atm_iv, put25_iv, call25_iv
+                - contracts: contract, strike, option_type, iv
+              Missing IVs are null.
+
+    Raises:
+        ValueError: If IV_STORE_DIR is not configured or a date is invalid
+
+    Example:
+        >>> get_iv_history("SPY", start="2025-01-06", expiration="2025-03-21")
+        {
+            "table": "summary",
+            "rows": 312,
+            "columns": {"timestamp": [...], "atm_iv": [0.142, 0.141, ...], ...}
+        }
+    """
+    from Server.core.tools.iv_history import get_iv_history as read_iv_history
+
+    result = _profiled(
+        "get_iv_history", read_iv_history,
+        underlying=underlying,
+        start=start,
+        end=end,
+        expiration=expiration,
+        contract=contract
+    )
+    return asdict(result)
+
+
+@mcp.tool()
+def screen_iv_rank(
+    underlyings: List[str],
+    lookback_days: int = 252,
+    include_history: bool = False
+) -> dict:
+    """Screen tickers by IV rank, IV percentile, term structure and skew from stored history.
+
+    Reads the local IV store (see get_iv_history) instead of fetching chains, so
+    hundreds of tickers return in well under a second. A daily index keeps one
+    constant-maturity (30-day by default) ATM IV and 25-delta risk reversal per
+    session; completed days are indexed once and the current day is computed
+    from its latest records.
+
+    Args:
+        underlyings: Stock ticker symbols (e.g., ["SPY", "QQQ", "AAPL"])
+        lookback_days: Recorded sessions in the ranking window (default: 252, ~1 year)
+        include_history: Add the daily ATM IV, rolling IV rank and risk-reversal series
+
+    Returns:
+        Dictionary containing:
+            - lookback_days (int), tenor_days (int): Window and constant maturity used
+            - results (list): One entry per ticker with history, in request order:
+                - underlying, as_of (last recorded date), observations
+                - atm_iv, iv_low, iv_high: Current, min and max constant-maturity ATM IV
+                - iv_rank (0-100): (current - low) / (high - low)
+                - iv_percentile (0-100): % of prior sessions with a lower ATM IV
+                - risk_reversal_25: 25-delta call IV minus put IV
+                - term_structure: [{expiration, days, atm_iv, risk_reversal_25}]
+                - history: {date, atm_iv, iv_rank, risk_reversal_25} or null
+            - missing (list): Tickers without recorded history
+
+    Raises:
+        ValueError: If IV_STORE_DIR is not configured or lookback_days < 2
+
+    Example:
+        >>> screen_iv_rank(["SPY", "QQQ"], lookback_days=252)
+        {
+            "results": [{"underlying": "SPY", "atm_iv": 0.142, "iv_rank": 18.4, "iv_percentile": 22.1, ...}],
+            "missing": []
+        }
+    """
+    from Server.core.tools.iv_rank import screen_iv_rank as run_screen
+
+    result = _profiled(
+        "screen_iv_rank", run_screen,
+        underlyings=underlyings,
+        lookback_days=lookback_days,
+        include_history=include_history
+    )
+    return asdict(result)
+
+
+@mcp.tool()
+def backtest_strategy(
+    underlying: str,
+    strategies: List[Dict[str, Any]],
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    workers: Optional[int] = None
+) -> dict:
+    """Backtest option rules such as "sell 30-delta puts at 45 DTE, close at 21 DTE".
+
+    Steps through the chains recorded in the IV store (IV_STORE_DIR) one day at a
+    time, using the last record of each expiration. Each leg is opened on the
+    expiration closest to its target DTE and the strike closest to its target
+    delta (or K/S moneyness); positions are marked with Black-Scholes on the
+    recorded IV, spot, rate and dividend yield. One position per rule at a time;
+    a closed position is rolled into a new one on the same day. Rules run in
+    parallel processes.
+
+    Args:
+        underlying: Stock ticker symbol (e.g., "SPY")
+        strategies: Rules (parameter sets) to evaluate, each with:
+            - legs: [{side: "long"|"short", option_type: "call"|"put", dte: int,
+                      delta: float (e.g. 0.30) or moneyness: float (K/S, default 1.0),
+                      quantity: int (default 1)}]
+            - exit_dte: Close when the nearest leg has this many days left (default 0)
+            - take_profit, stop_loss: Optional fractions of the entry premium
+            - name: Optional label
+        start: First snapshot date "YYYY-MM-DD" (default: all history)
+        end: Last snapshot date "YYYY-MM-DD"
+        workers: Parallel processes (default: BACKTEST_WORKERS or CPU count)
+
+    Returns:
+        Dictionary containing:
+            - underlying, start, end
+            - results (list): One entry per rule, in request order:
+                - strategy: The normalized rule
+                - trades: [{entry_date, exit_date, contracts, entry_value, exit_value,
+                            pnl, exit_reason}] (values per share, pnl per position x100)
+                - dates, pnl: Cumulative realized + unrealized P&L per snapshot date
+                - total_pnl, trade_count, win_rate, average_pnl, max_drawdown, sharpe
+
+    Raises:
+        ValueError: If IV_STORE_DIR is not configured or a rule is invalid
+
+    Example:
+        >>> backtest_strategy("SPY", [{"legs": [{"side": "short", "option_type": "put",
+        ...                                       "dte": 45, "delta": 0.30}], "exit_dte": 21}])
+        {
+            "results": [{"trade_count": 14, "win_rate": 0.79, "total_pnl": 1843.0, ...}]
+        }
+    """
+    from Server.core.tools.backtest import backtest_strategy as run_backtest
+
+    result = _profiled(
+        "backtest_strategy", run_backtest,
+        underlying=underlying,
+        strategies=strategies,
+        start=start,
+        end=end,
+        workers=workers
+    )
+    return asdict(result)
+
+
+@mcp.tool()
+def get_expected_move(underlying: str, target_date: str) -> dict:
+    """Get the expected move of an underlying into a date (e.g. Friday or the day after earnings).
+
+    On a listed expiration this is the market straddle at the strike closest to the
+    put-call-parity forward. Between expirations the ATM total variance is
+    interpolated linearly in time and priced as an ATM-forward straddle. Each
+    expiration's fit is cached per chain snapshot, so repeated lookups take well
+    under a millisecond.
+
+    Args:
+        underlying: Stock ticker symbol (e.g., "SPY", "AAPL")
+        target_date: Date "YYYY-MM-DD", after today and not after the last expiration
+
+    Returns:
+        Dictionary containing:
+            - underlying, date, spot, days
+            - atm_iv (float): ATM implied volatility at the date
+            - straddle, straddle_strike (null when interpolated)
+            - expected_move ($), expected_move_pct (%), one_sigma_move ($, spot * iv * sqrt(t))
+            - lower, upper: spot -/+ expected_move
+            - expirations (list): Expirations used; interpolated (bool)
+
+    Raises:
+        ValueError: If the date is outside the listed expirations
+
+    Example:
+        >>> get_expected_move("AAPL", "2025-01-31")
+        {"expected_move": 9.85, "expected_move_pct": 4.21, "lower": 224.1, "upper": 243.8, ...}
+    """
+    from Server.core.tools.expected_move import get_expected_move as compute_expected_move
+
+    result = _profiled(
+        "get_expected_move", compute_expected_move,
+        underlying=underlying,
+        target_date=target_date
+    )
+    return asdict(result)
+
+
+@mcp.tool()
+def get_price_probability(underlying: str, target_date: str, levels: List[float]) -> dict:
+    """Get the risk-neutral probability that an underlying closes above/below price levels on a date.
+
+    Uses the cached per-expiration smile (total variance vs log-moneyness, from
+    cleaned OTM quotes), interpolated in total variance for dates between
+    expirations. The probability includes the smile slope, so it matches the CDF of
+    the implied density without building get_distribution's $0.01 grid.
+
+    Args:
+        underlying: Stock ticker symbol (e.g., "SPY")
+        target_date: Date "YYYY-MM-DD", after today and not after the last expiration
+        levels: Price levels to evaluate (e.g., [580, 600, 620])
+
+    Returns:
+        Dictionary containing:
+            - underlying, date, spot, forward, days
+            - levels (list): [{level, probability_above, probability_below, iv}]
+            - expirations (list): Expirations used; interpolated (bool)
+
+    Raises:
+        ValueError: If levels is empty or not positive, or the date is out of range
+
+    Example:
+        >>> get_price_probability("SPY", "2025-01-17", [600])
+        {"levels": [{"level": 600, "probability_above": 0.4123, "probability_below": 0.5877, ...}], ...}
+    """
+    from Server.core.tools.expected_move import get_price_probability as compute_probability
+
+    result = _profiled(
+        "get_price_probability", compute_probability,
+        underlying=underlying,
+        target_date=target_date,
+        levels=levels
+    )
+    return asdict(result)
 
 
 @mcp.tool()
@@ -416,7 +1092,12 @@ def get_historical_prices_tool(
             ]
         }
     """
-    result = get_historical_prices(underlying, period, interval)
+    from Server.core.tools.get_historical_prices import get_historical_prices
+
+    result = _profiled(
+        "get_historical_prices_tool", get_historical_prices,
+        underlying=underlying, period=period, interval=interval
+    )
     return {
         "underlying": result.underlying,
         "long_name": result.long_name,
@@ -434,13 +1115,22 @@ def main() -> None:
     Run the MCP options analysis server.
 
     Starts the FastMCP server using stdio transport for MCP protocol communication.
-    The server exposes 6 tools for comprehensive options analysis:
+    The server exposes 15 tools for comprehensive options analysis:
 
     - get_expirations: List available expiration dates
     - get_chain: Retrieve option chain data
     - compute_greeks: Calculate Black-Scholes Greeks
     - get_distribution: Extract implied probability distribution (Breeden-Litzenberger)
     - compute_payoff_profile: Generate payoff and profit diagrams
+    - compute_strategy_payoff: Multi-leg strategy payoff and position Greeks
+    - simulate_strategy_pnl: Monte Carlo P&L distribution of a position
+    - compute_portfolio_risk: Aggregate Greeks and scenario P&L of a book
+    - get_gamma_exposure: Dealer gamma exposure (GEX) across all expirations
+    - get_iv_history: Recorded implied-volatility time series
+    - screen_iv_rank: IV rank and term-structure screen from stored history
+    - backtest_strategy: Rule backtests over recorded chain snapshots
+    - get_expected_move: Expected move into any date
+    - get_price_probability: Probability of closing above/below price levels
     - get_historical_prices_tool: Get historical OHLCV price data
 
     The server runs indefinitely and communicates via standard input/output
@@ -450,6 +1140,8 @@ def main() -> None:
     """
     # Test mode to verify imports work
     if len(sys.argv) > 1 and sys.argv[1] == "--test":
+        for module in TOOL_MODULES:
+            importlib.import_module(module)
         print("[OK] MCP Server Test Mode")
         print("=" * 50)
         print("\n[OK] All imports successful!")
@@ -460,12 +1152,24 @@ def main() -> None:
         print("  4. get_distribution - Extract implied distribution (PRIMARY)")
         print("  5. compute_payoff_profile - Generate payoff diagrams")
         print("  6. get_historical_prices_tool - Get historical price data")
+        print("  7. compute_strategy_payoff - Multi-leg strategy payoff diagrams")
+        print("  8. simulate_strategy_pnl - Monte Carlo P&L distribution of a position")
+        print("  9. compute_portfolio_risk - Aggregate Greeks and scenario P&L of a book")
+        print("  10. get_gamma_exposure - Dealer gamma exposure (GEX) across expirations")
+        print("  11. get_iv_history - Recorded implied-volatility time series")
+        print("  12. screen_iv_rank - IV rank and term-structure screen from stored history")
+        print("  13. backtest_strategy - Rule backtests over recorded chain snapshots")
+        print("  14. get_expected_move - Expected move into any date")
+        print("  15. get_price_probability - Probability of closing above/below price levels")
         print("\n[OK] Server is ready to run!")
         print("\nTo start the MCP server, run without --test flag")
         print("The server will wait for MCP commands via stdin/stdout")
         return
 
-    # Normal mode: run MCP server
+    # Normal mode: warm up PREFETCH_WATCHLIST tickers in the background, then run MCP server
+    from Server.utils.prefetch import start_prefetch_from_env
+
+    start_prefetch_from_env()
     mcp.run()
 
 
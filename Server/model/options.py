@@ -1,5 +1,7 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+import numpy as np
 
 @dataclass
 class GetOptionExpirations:
@@ -7,7 +9,7 @@ class GetOptionExpirations:
     expirations: List[str]
     count: int
     
-@dataclass    
+@dataclass(slots=True)
 class OptionQuote:
     contractSymbol: str
     lastTradeDate: str
@@ -20,6 +22,57 @@ class OptionQuote:
     openInterest: int
     intheMoney: bool
 
+
+def _scalar(value: Any) -> Any:
+    """Convierte escalares NumPy a tipos nativos de Python."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class OptionColumns:
+    """
+    Contratos de un lado de la cadena (calls o puts) guardados por columnas NumPy.
+
+    En lugar de un objeto Python por contrato, cada campo (strike, bid, ask,
+    lastPrice, volume, openInterest, impliedVolatility, griegas...) es un array.
+    Las filas se materializan bajo demanda como vistas `row_type` (dataclasses
+    con slots) y la exportación a JSON sale directo de los arrays.
+
+    Puede contener columnas extra que no forman parte de `row_type`
+    (por ejemplo la IV); quedan disponibles en `columns` y `to_dict()`.
+    """
+
+    __slots__ = ("columns", "row_type", "_fields")
+
+    def __init__(self, columns: Dict[str, np.ndarray], row_type: Type):
+        self.columns = columns
+        self.row_type = row_type
+        self._fields = tuple(f.name for f in fields(row_type))
+
+    def __len__(self) -> int:
+        return len(self.columns["strike"])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return OptionColumns({k: v[index] for k, v in self.columns.items()}, self.row_type)
+        return self.row_type(*(_scalar(self.columns[name][index]) for name in self._fields))
+
+    def __iter__(self) -> Iterator[Any]:
+        return (self[i] for i in range(len(self)))
+
+    def view(self, row_type: Type) -> "OptionColumns":
+        """Las mismas columnas vistas como otro tipo de fila (sin copiar los arrays)."""
+        return OptionColumns(self.columns, row_type)
+
+    def to_records(self) -> List[dict]:
+        """Lista de diccionarios (un contrato por elemento) con los campos de `row_type`."""
+        values = [self.columns[name].tolist() for name in self._fields]
+        return [dict(zip(self._fields, row)) for row in zip(*values)]
+
+    def to_dict(self) -> Dict[str, list]:
+        """Exportación columnar: nombre de columna -> lista de valores."""
+        return {name: column.tolist() for name, column in self.columns.items()}
+
+
 @dataclass
 class Option_Chain:
     underlying: str
@@ -28,10 +81,11 @@ class Option_Chain:
     expiration: str
     as_of: str
     spot : float
-    calls: List[OptionQuote]
-    puts: List[OptionQuote]
+    calls: OptionColumns
+    puts: OptionColumns
+    snapshot_token: Optional[str] = None
    
-@dataclass
+@dataclass(slots=True)
 class OptionGreeks:
     contractSymbol: str
     strike: float
@@ -44,9 +98,44 @@ class OptionGreeks:
 class Greeks:
     underlying: str
     expiration: str    
-    calls: List[OptionGreeks]
-    puts: List[OptionGreeks]
-    
+    calls: OptionColumns
+    puts: OptionColumns
+    snapshot_token: Optional[str] = None
+
+
+@dataclass
+class ChainDelta:
+    """
+    Cambios de una cadena o de sus griegas desde el snapshot `since`.
+
+    `fields` tiene los campos escalares que cambiaron; `calls` y `puts`, las
+    filas agregadas y modificadas (completas) y los `contractSymbol`
+    eliminados. `snapshot_token` identifica el resultado actual.
+    """
+    underlying: str
+    expiration: str
+    since: str
+    snapshot_token: str
+    fields: Dict[str, Any]
+    calls: Dict[str, list]
+    puts: Dict[str, list]
+
+
+@dataclass
+class ImpliedForward:
+    """
+    Forward y factor de descuento implícitos por paridad put-call en un vencimiento.
+
+    `rate` es la tasa continua equivalente a `discount_factor`; si
+    `fitted_discount` es False el descuento es el de la curva de FRED y sólo
+    se ajustó el forward. `pairs` es la cantidad de strikes usados.
+    """
+    forward: float
+    discount_factor: float
+    rate: float
+    pairs: int
+    fitted_discount: bool
+
 @dataclass
 class ImpliedDistribution:
     expiration: str
@@ -70,6 +159,15 @@ class ImpliedDistribution:
     distribution_summary: List[dict]
         
         
+@dataclass
+class PnLSurface:
+    spot_prices: List[float]
+    days_forward: List[float]
+    valuation_dates: List[str]
+    vol_shifts: List[float]
+    pnl: List[List[List[float]]]
+
+
 @dataclass
 class OptionPayoff:
     underlying: str
@@ -83,6 +181,250 @@ class OptionPayoff:
     payoffs: List[float]
     profits: List[float]
     greeks: OptionGreeks
-         
-         
-       
\ No newline at end of file
+    pnl_surface: Optional[PnLSurface] = None
+
+
+@dataclass
+class PositionGreeks:
+    delta: float
+    gamma: float
+    theta: float
+    vega: float
+    rho: float
+
+
+@dataclass
+class UnderlyingRisk:
+    underlying: str
+    spot: float
+    positions: int
+    market_value: float
+    greeks: PositionGreeks
+    dollar_greeks: PositionGreeks
+
+
+@dataclass
+class PortfolioRisk:
+    """
+    Riesgo agregado de un libro de posiciones.
+
+    Las griegas por acción (como `StrategyPayoff.greeks`) sólo tienen sentido
+    dentro de un subyacente y quedan en `UnderlyingRisk.greeks`; a nivel libro
+    se informan `dollar_greeks`, sumables entre subyacentes: delta en
+    exposición equivalente en acciones, gamma como cambio de la delta en
+    dólares por un movimiento del 1%, theta por día, vega por punto de
+    volatilidad y rho por punto de tasa. `scenario_pnl[v][s]` es el P&L
+    instantáneo (x100) con el shock de volatilidad v y el de spot s.
+    """
+    positions: int
+    underlyings: List[UnderlyingRisk]
+    market_value: float
+    dollar_greeks: PositionGreeks
+    spot_shocks: List[float]
+    vol_shocks: List[float]
+    scenario_pnl: List[List[float]]
+
+
+@dataclass
+class GammaExposure:
+    """
+    Exposición de los dealers a gamma, delta y vanna ponderada por open interest.
+
+    Convención: los dealers están comprados en calls y vendidos en puts (las
+    puts restan). Gamma en $ por un movimiento del 1% del subyacente, delta en
+    $ equivalentes en acciones y vanna en $ de delta por punto de volatilidad.
+    `strikes` y las listas `*_by_strike` son columnas paralelas (todos los
+    vencimientos sumados); `gamma_profile` es la gamma total sobre `spot_grid`.
+    """
+    underlying: str
+    spot: float
+    expirations: List[str]
+    contracts: int
+    total_gamma: float
+    total_delta: float
+    total_vanna: float
+    zero_gamma_level: Optional[float]
+    strikes: List[float]
+    gamma_by_strike: List[float]
+    delta_by_strike: List[float]
+    vanna_by_strike: List[float]
+    call_open_interest: List[int]
+    put_open_interest: List[int]
+    spot_grid: List[float]
+    gamma_profile: List[float]
+
+
+@dataclass
+class IVHistory:
+    """
+    Serie de IV guardada en el store (utils/iv_store.py).
+
+    `columns` son columnas paralelas con `rows` filas: `timestamp` (ISO, UTC)
+    y `expiration` siempre; `atm_iv`, `put25_iv` y `call25_iv` en la tabla
+    "summary"; `contract`, `strike`, `option_type` e `iv` en "contracts".
+    Las IV no disponibles son None.
+    """
+    underlying: str
+    table: str
+    rows: int
+    columns: Dict[str, list]
+
+
+@dataclass
+class IVRank:
+    """
+    IV rank y estructura temporal de un subyacente, desde el store de IV.
+
+    `atm_iv` y `risk_reversal_25` son a plazo constante (`tenor_days`) del
+    último día registrado (`as_of`); `iv_rank` e `iv_percentile` (0-100)
+    comparan `atm_iv` con las `observations` sesiones de la ventana.
+    `term_structure` es el último registro de cada vencimiento vigente
+    (expiration, days, atm_iv, risk_reversal_25). `history`, si se pidió,
+    son columnas diarias (date, atm_iv, iv_rank, risk_reversal_25).
+    """
+    underlying: str
+    as_of: str
+    observations: int
+    atm_iv: Optional[float]
+    iv_rank: Optional[float]
+    iv_percentile: Optional[float]
+    iv_low: Optional[float]
+    iv_high: Optional[float]
+    risk_reversal_25: Optional[float]
+    term_structure: List[Dict[str, Any]]
+    history: Optional[Dict[str, list]] = None
+
+
+@dataclass
+class IVScreen:
+    """Resultado de `screen_iv_rank`: filas en el orden pedido y tickers sin historial."""
+    lookback_days: int
+    tenor_days: int
+    results: List[IVRank]
+    missing: List[str]
+
+
+@dataclass
+class BacktestTrade:
+    """
+    Una posición del backtest. `entry_value` y `exit_value` son el valor neto
+    por acción (positivo si se pagó prima); `pnl` es por la posición (x100).
+    """
+    entry_date: str
+    exit_date: str
+    contracts: List[str]
+    entry_value: float
+    exit_value: float
+    pnl: float
+    exit_reason: str
+
+
+@dataclass
+class BacktestResult:
+    """Resultado de una regla: operaciones, P&L acumulado por fecha y estadísticas."""
+    strategy: Dict[str, Any]
+    trades: List[BacktestTrade]
+    dates: List[str]
+    pnl: List[float]
+    total_pnl: float
+    trade_count: int
+    win_rate: Optional[float]
+    average_pnl: Optional[float]
+    max_drawdown: float
+    sharpe: Optional[float]
+
+
+@dataclass
+class BacktestReport:
+    """Resultado de `backtest_strategy`: un BacktestResult por regla, en el orden pedido."""
+    underlying: str
+    start: Optional[str]
+    end: Optional[str]
+    results: List[BacktestResult]
+
+
+@dataclass
+class ExpectedMove:
+    """
+    Movimiento esperado hasta `date`. `straddle_strike` es el strike del
+    straddle de mercado (None si la fecha cae entre vencimientos y el
+    straddle sale de la varianza total interpolada). `lower` y `upper` son
+    spot ± `expected_move`.
+    """
+    underlying: str
+    date: str
+    spot: float
+    days: int
+    atm_iv: float
+    straddle: float
+    straddle_strike: Optional[float]
+    expected_move: float
+    expected_move_pct: float
+    one_sigma_move: float
+    lower: float
+    upper: float
+    expirations: List[str]
+    interpolated: bool
+
+
+@dataclass
+class PriceProbability:
+    """Probabilidades risk-neutral por nivel: {level, probability_above, probability_below, iv}."""
+    underlying: str
+    date: str
+    spot: float
+    forward: float
+    days: int
+    levels: List[Dict[str, float]]
+    expirations: List[str]
+    interpolated: bool
+
+
+@dataclass
+class StrategyLeg:
+    side: str
+    option_type: str
+    strike: float
+    expiration: str
+    quantity: int
+    contractSymbol: str
+    premium: float
+    implied_volatility: float
+    greeks: OptionGreeks
+
+
+@dataclass
+class StrategyPayoff:
+    underlying: str
+    spot_current: float
+    valuation_date: str
+    legs: List[StrategyLeg]
+    net_premium: float
+    spot_prices: List[float]
+    payoffs: List[float]
+    profits: List[float]
+    breakevens: List[float]
+    max_profit: float
+    max_loss: float
+    greeks: PositionGreeks
+    pnl_surface: Optional[PnLSurface] = None
+
+
+@dataclass
+class PositionPnLDistribution:
+    underlying: str
+    model: str
+    valuation_date: str
+    n_paths: int
+    spot: float
+    net_premium: float
+    expected_pnl: float
+    std_pnl: float
+    probability_of_profit: float
+    VaR_95: float
+    expected_shortfall_95: float
+    expected_shortfall_99: float
+    expected_terminal_price: float
+    pnl_quantiles: List[dict]
+    tail_probability: Optional[float] = None
+
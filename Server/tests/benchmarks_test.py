@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import json
+from types import SimpleNamespace
+
+from Server.benchmarks import hot_paths_bench as bench
+from Server.utils import market_data, profiling
+
+
+def _small_run(**kwargs):
+    return bench.run_benchmarks(strikes=[60], expirations=[2], history_rows=[10], surfaces=[(20, 5)],
+                                repeat=1, **kwargs)
+
+
+def test_suite_runs_offline_and_is_json_serializable():
+    document = _small_run()
+
+    names = {r["name"] for r in document["results"]}
+    assert {"iv_solve", "greeks", "implied_density", "serialize_json", "payoff_grid", "history"} <= names
+    greeks = next(r for r in document["results"] if r["name"] == "greeks")
+    assert greeks["params"] == {"source": "synthetic", "strikes": 60, "expirations": 2}
+    assert greeks["median_ms"] > 0 and greeks["repeat"] == 1
+    assert document["meta"]["numpy"]
+    json.loads(json.dumps(document))
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": [
+        {"name": "greeks", "params": {"strikes": 50}, "median_ms": 10.0},
+        {"name": "iv_solve", "params": {"strikes": 50}, "median_ms": 10.0},
+    ]}
+    current = {"results": [
+        {"name": "greeks", "params": {"strikes": 50}, "median_ms": 11.0},
+        {"name": "iv_solve", "params": {"strikes": 50}, "median_ms": 15.0},
+        {"name": "history", "params": {"rows": 10}, "median_ms": 1.0},
+    ]}
+    rows = bench.compare(baseline, current, threshold=1.2)
+    assert [(r["case"], r["regression"]) for r in rows] == [
+        ("greeks[strikes=50]", False), ("iv_solve[strikes=50]", True),
+    ]
+
+
+def test_recorded_profile_chains(tmp_path, monkeypatch):
+    expiration = bench.synthetic_market(10, 1)[("expirations", (bench.UNDERLYING,))][0]
+    calls, puts = bench.synthetic_chain(expiration, 30)
+
+    class FakeTicker:
+        def __init__(self, underlying):
+            self.options = (expiration,)
+
+        def option_chain(self, expiration):
+            return SimpleNamespace(calls=calls, puts=puts)
+
+    monkeypatch.setenv("SLOW_CALL_PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("SLOW_CALL_PROFILE_MS", "0")
+    monkeypatch.setattr(market_data.yf, "Ticker", FakeTicker)
+    market_data._chain_cache.clear()
+    with profiling.profile_call("get_chain", market_data.get_chain_frames, {}):
+        market_data.get_chain_frames("REC", expiration)
+    market_data._chain_cache.clear()
+    market_data._expirations_cache.clear()
+
+    [path] = profiling.list_profiles()
+    document = _small_run(recorded=path, only=["greeks", "payoff_grid"])
+    greeks = next(r for r in document["results"] if r["name"] == "greeks")
+    assert greeks["params"]["source"].startswith("recorded:")
+    assert greeks["params"]["strikes"] == 30
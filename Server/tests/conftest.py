@@ -0,0 +1,75 @@
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# Add the root directory to the path
+root_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
+from Server.benchmarks.synthetic import make_chain_frames
+
+
+@pytest.fixture
+def synthetic_chain():
+    return make_chain_frames
+
+
+@pytest.fixture(autouse=True)
+def fresh_upstreams():
+    """Cada test arranca con límites y circuit breakers nuevos (los fallos simulados no se arrastran)."""
+    from Server.utils.upstream import reset_upstreams
+
+    reset_upstreams()
+    yield
+    reset_upstreams()
+
+
+@pytest.fixture
+def offline_market_for(monkeypatch):
+    """
+    Reemplaza las descargas de mercado de los módulos dados por cadenas sintéticas.
+
+    `offline_market_for(*modules, spots=..., sigma=..., ...)` parchea en cada
+    módulo las funciones de market_data que importa (`get_spot`,
+    `get_chain_frames`, `get_risk_free_curve` y, si se pasan `expirations`,
+    `get_expirations`) y devuelve la lista de descargas `(underlying, expiration)`.
+
+    Args:
+        spots: Spot único o uno por subyacente
+        sigma: Volatilidad única o una por vencimiento
+        strikes: Strikes fijos o función del spot (por defecto los de `make_chain_frames`)
+        on_chain: Ajuste opcional `(calls_df, puts_df)` de cada cadena descargada
+    """
+    def install(*modules, spots=100.0, sigma=0.25, rate=0.04, strikes=None, expirations=None, on_chain=None):
+        downloads = []
+
+        def spot_of(underlying):
+            return spots[underlying] if isinstance(spots, dict) else spots
+
+        def fake_chain(underlying, expiration):
+            downloads.append((underlying, expiration))
+            spot = spot_of(underlying)
+            t = (date.fromisoformat(expiration) - date.today()).days / 365.0
+            frames = make_chain_frames(underlying, expiration, spot=spot, t=t, r=rate,
+                                       sigma=sigma[expiration] if isinstance(sigma, dict) else sigma,
+                                       strikes=strikes(spot) if callable(strikes) else strikes)
+            if on_chain is not None:
+                on_chain(*frames)
+            return frames
+
+        fakes = {
+            "get_spot": spot_of,
+            "get_chain_frames": fake_chain,
+            "get_risk_free_curve": lambda: ([0.1, 30.0], [rate, rate]),
+        }
+        if expirations is not None:
+            fakes["get_expirations"] = lambda underlying: tuple(expirations)
+        for module in modules:
+            for name, fake in fakes.items():
+                if hasattr(module, name):
+                    monkeypatch.setattr(module, name, fake)
+        return downloads
+
+    return install
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Presupuesto de arranque de main.py y api_server.py.
+
+Cada test importa el módulo en un proceso nuevo con `-X importtime` y falla
+si se cargan dependencias pesadas antes de la primera llamada a una tool o
+si el import supera el presupuesto (ms, configurable con STARTUP_BUDGET_MS).
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+
+# Dependencias que sólo deben cargarse al ejecutar una tool
+# (dotenv no figura: lo carga el propio SDK de MCP)
+HEAVY_MODULES = ("yfinance", "pandas", "scipy", "requests", "pyarrow")
+
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+
+
+def _import_times(module: str) -> dict:
+    """Tiempo acumulado (µs) por módulo importado, medido en un intérprete nuevo."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ["Server.main", "Server.api_server"])
+def test_startup_does_not_load_heavy_dependencies(module):
+    loaded = _import_times(module)
+
+    heavy = sorted(name for name in loaded if name.split(".")[0] in HEAVY_MODULES)
+    assert not heavy, f"{module} importa dependencias pesadas al arrancar: {heavy[:10]}"
+
+
+@pytest.mark.parametrize("module", ["Server.main", "Server.api_server"])
+def test_startup_time_within_budget(module):
+    # Mejor de tres corridas: la primera puede incluir la compilación a .pyc
+    elapsed_ms = min(_import_times(module)[module] for _ in range(3)) / 1000
+
+    assert elapsed_ms < STARTUP_BUDGET_MS, (
+        f"import {module} tardó {elapsed_ms:.0f} ms (presupuesto {STARTUP_BUDGET_MS:.0f} ms)"
+    )
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from Server.core.tools.backtest import backtest_strategy
+from Server.utils import iv_store
+from Server.utils.bs import bs_price_vec
+
+EPOCH = date(1970, 1, 1)
+START = date(2024, 1, 1)
+STRIKES = np.arange(50.0, 151.0, 5.0)
+
+
+def _spot(day: date) -> float:
+    return 100.0 + 0.1 * (day - START).days
+
+
+def _record_day(root, day, sigma=0.25):
+    """Cadena registrada al cierre: vencimientos semanales hasta 120 días, strikes 50-150."""
+    today = (day - EPOCH).days
+    first_friday = START + timedelta(days=(4 - START.weekday()) % 7)
+    expirations = [e for e in (first_friday + timedelta(weeks=w) for w in range(80)) if 0 < (e - day).days <= 120]
+    stamp = int(datetime(day.year, day.month, day.day, 20, tzinfo=timezone.utc).timestamp() * 1000)
+    for expiration in expirations:
+        n = 2 * STRIKES.size
+        symbols = [f"TEST{expiration:%y%m%d}{side}{int(k * 1000):08d}" for side in "CP" for k in STRIKES]
+        iv_store.append(root, "TEST", "contracts", {
+            "timestamp": np.full(n, stamp),
+            "expiration": np.full(n, (expiration - EPOCH).days),
+            "contract": np.array(symbols, dtype="S24"),
+            "strike": np.tile(STRIKES, 2),
+            "is_call": np.repeat([1, 0], STRIKES.size),
+            "iv": np.full(n, sigma),
+        }, day)
+        iv_store.append(root, "TEST", "market", {
+            "timestamp": np.array([stamp]),
+            "expiration": np.array([(expiration - EPOCH).days]),
+            "spot": np.array([_spot(day)]),
+            "rate": np.array([0.04]),
+            "dividend_yield": np.array([0.0]),
+        }, day)
+    return today
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    monkeypatch.setenv("IV_STORE_DIR", str(tmp_path))
+    for offset in range(90):
+        _record_day(tmp_path, START + timedelta(days=offset))
+    return tmp_path
+
+
+SHORT_PUT = {"name": "short put", "legs": [{"side": "short", "option_type": "put", "dte": 45, "delta": 0.30}],
+             "exit_dte": 21}
+
+
+def test_short_put_rolls_at_exit_dte(store):
+    report = backtest_strategy("TEST", [SHORT_PUT], workers=1)
+    result = report.results[0]
+
+    assert len(result.dates) == 90 and result.dates[0] == START.isoformat()
+    first = result.trades[0]
+    assert first.entry_date == START.isoformat() and first.exit_reason == "dte"
+    assert all(trade.exit_reason in ("dte", "end") for trade in result.trades)
+
+    # Contrato elegido: put del vencimiento más cercano a 45 días, el de delta más cercana a -0.30
+    expiration = datetime.strptime(first.contracts[0][4:10], "%y%m%d").date()
+    strike = int(first.contracts[0][-8:]) / 1000
+    assert abs((expiration - START).days - 45) <= 3
+    assert 85.0 <= strike <= 95.0
+
+    # Valor de entrada y salida: Black-Scholes con la IV y el spot registrados
+    exit_day = date.fromisoformat(first.exit_date)
+    assert (expiration - exit_day).days <= 21
+    entry = -float(bs_price_vec(100.0, strike, (expiration - START).days / 365, 0.04, 0.25, False))
+    exit_value = -float(bs_price_vec(_spot(exit_day), strike, (expiration - exit_day).days / 365, 0.04, 0.25, False))
+    assert first.entry_value == pytest.approx(entry, abs=1e-4)
+    assert first.pnl == pytest.approx((exit_value - entry) * 100, abs=0.01)
+
+    # Spot en alza: los puts vendidos ganan y el P&L acumulado cierra con las operaciones
+    assert result.total_pnl == pytest.approx(sum(t.pnl for t in result.trades), abs=0.05)
+    assert result.win_rate == 1.0 and result.total_pnl > 0
+
+
+def test_parameter_sets_run_in_parallel(store):
+    rules = [SHORT_PUT,
+             {"legs": [{"side": "long", "option_type": "call", "dte": 30, "moneyness": 0.8}], "take_profit": 0.05}]
+    serial = backtest_strategy("TEST", rules, start="2024-01-15", workers=1)
+    parallel = backtest_strategy("TEST", rules, start="2024-01-15", workers=2)
+
+    assert serial == parallel
+    assert serial.results[1].trades[0].exit_reason == "take_profit"
+    assert serial.results[0].dates[0] == "2024-01-15"
+
+
+def test_invalid_rules(store):
+    with pytest.raises(ValueError, match="delta o por moneyness"):
+        backtest_strategy("TEST", [{"legs": [{"side": "short", "option_type": "put", "dte": 45,
+                                              "delta": 0.3, "moneyness": 0.9}]}])
+    with pytest.raises(ValueError, match="dte"):
+        backtest_strategy("TEST", [{"legs": [{"side": "short", "option_type": "put"}]}])
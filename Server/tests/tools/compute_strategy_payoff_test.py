@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import pytest
+from datetime import date, timedelta
+import numpy as np
+
+from Server.core.tools import compute_strategy_payoff as strategy_module
+from Server.core.tools.compute_strategy_payoff import compute_option_strategy
+from Server.model.options import StrategyPayoff
+
+SPOT = 100.0
+EXPIRATION = (date.today() + timedelta(days=73)).isoformat()
+LATER_EXPIRATION = (date.today() + timedelta(days=146)).isoformat()
+
+
+@pytest.fixture
+def offline_market(offline_market_for):
+    """Reemplaza las descargas de mercado por cadenas sintéticas."""
+    return offline_market_for(strategy_module, spots=SPOT)
+
+
+def test_iron_condor_downloads_chain_once(offline_market):
+    legs = [
+        {"side": "long", "option_type": "put", "strike": 80, "expiration": EXPIRATION},
+        {"side": "short", "option_type": "put", "strike": 90, "expiration": EXPIRATION},
+        {"side": "short", "option_type": "call", "strike": 110, "expiration": EXPIRATION},
+        {"side": "long", "option_type": "call", "strike": 120, "expiration": EXPIRATION},
+    ]
+    result = compute_option_strategy("TEST", legs, spot_min=60, spot_max=140, num_points=161)
+
+    assert isinstance(result, StrategyPayoff)
+    assert offline_market == [("TEST", EXPIRATION)]
+
+    # Crédito neto y payoff acotado por el ancho de las alas
+    assert result.net_premium < 0
+    assert max(result.profits) == pytest.approx(-result.net_premium, abs=1e-6)
+    assert min(result.profits) == pytest.approx(-1000 - result.net_premium, abs=1e-6)
+    assert len(result.breakevens) == 2
+    assert 80 < result.breakevens[0] < 90 < 110 < result.breakevens[1] < 120
+
+    # IV recuperada en batch y griegas de posición = suma de las patas
+    assert all(leg.implied_volatility == pytest.approx(0.25, abs=5e-3) for leg in result.legs)
+    assert result.greeks.delta == pytest.approx(sum(leg.greeks.delta for leg in result.legs), abs=1e-4)
+    assert result.greeks.gamma < 0
+
+
+def test_single_leg_matches_intrinsic_profile(offline_market):
+    legs = [{"side": "long", "option_type": "call", "strike": 100, "expiration": EXPIRATION, "quantity": 2}]
+    result = compute_option_strategy("TEST", legs)
+
+    spots = np.array(result.spot_prices)
+    expected = 2 * 100 * np.maximum(spots - 100, 0)
+    assert np.allclose(result.payoffs, expected, atol=0.5)
+    assert np.allclose(result.profits, expected - result.net_premium, atol=0.5)
+    assert 0 < result.greeks.delta < 2
+
+
+def test_calendar_values_back_leg_with_black_scholes(offline_market):
+    legs = [
+        {"side": "short", "option_type": "call", "strike": 100, "expiration": EXPIRATION},
+        {"side": "long", "option_type": "call", "strike": 100, "expiration": LATER_EXPIRATION},
+    ]
+    result = compute_option_strategy("TEST", legs, spot_min=80, spot_max=120, num_points=41)
+
+    assert sorted(e for _, e in offline_market) == [EXPIRATION, LATER_EXPIRATION]
+    assert result.valuation_date == EXPIRATION
+    # El calendar gana más cerca del strike que en los extremos
+    profits = np.array(result.profits)
+    assert profits[20] > profits[0] and profits[20] > profits[-1]
+
+
+def test_invalid_leg_strike(offline_market):
+    legs = [{"side": "long", "option_type": "call", "strike": 101.5, "expiration": EXPIRATION}]
+    with pytest.raises(ValueError, match="No existe una opci"):
+        compute_option_strategy("TEST", legs)
+
+
+def test_invalid_leg_side(offline_market):
+    legs = [{"side": "buy", "option_type": "call", "strike": 100, "expiration": EXPIRATION}]
+    with pytest.raises(ValueError, match="side"):
+        compute_option_strategy("TEST", legs)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from scipy.stats import norm
+
+from Server.core.tools import expected_move as em_module
+from Server.core.tools.expected_move import get_expected_move, get_price_probability
+from Server.utils.bs import bs_price_vec
+
+SPOT, RATE = 100.0, 0.04
+SIGMAS = {30: 0.20, 90: 0.30}
+EXPIRATIONS = {(date.today() + timedelta(days=d)).isoformat(): sigma for d, sigma in SIGMAS.items()}
+
+
+@pytest.fixture
+def offline_market(offline_market_for):
+    """Dos vencimientos con sonrisa plana: IV 20% a 30 días y 30% a 90 días."""
+    return offline_market_for(em_module, spots=SPOT, sigma=EXPIRATIONS, rate=RATE,
+                              strikes=np.arange(60.0, 141.0, 2.5), expirations=EXPIRATIONS)
+
+
+def _day(days: int) -> str:
+    return (date.today() + timedelta(days=days)).isoformat()
+
+
+def test_expected_move_on_listed_expiration_is_the_market_straddle(offline_market):
+    move = get_expected_move("TEST", _day(30))
+
+    assert not move.interpolated and move.expirations == [_day(30)]
+    strike = move.straddle_strike
+    t = 30 / 365
+    fair = bs_price_vec(SPOT, strike, t, RATE, 0.2, True) + bs_price_vec(SPOT, strike, t, RATE, 0.2, False)
+    assert move.straddle == pytest.approx(float(fair), abs=0.02)
+    assert move.atm_iv == pytest.approx(0.2, abs=2e-3)
+    assert move.one_sigma_move == pytest.approx(SPOT * 0.2 * np.sqrt(t), rel=1e-2)
+    assert move.lower == pytest.approx(SPOT - move.expected_move)
+
+
+def test_dates_between_expirations_interpolate_total_variance(offline_market):
+    move = get_expected_move("TEST", _day(60))
+
+    # w(60) = w(30) + (w(90) - w(30)) / 2
+    w = 0.2 ** 2 * 30 / 365 + (0.3 ** 2 * 90 / 365 - 0.2 ** 2 * 30 / 365) / 2
+    assert move.interpolated and move.expirations == [_day(30), _day(90)]
+    assert move.atm_iv == pytest.approx(np.sqrt(w / (60 / 365)), abs=2e-3)
+    assert move.straddle_strike is None
+
+    # Antes del primer vencimiento: misma IV que el primero
+    assert get_expected_move("TEST", _day(10)).atm_iv == pytest.approx(0.2, abs=2e-3)
+
+
+def test_probabilities_match_the_lognormal_with_a_flat_smile(offline_market):
+    levels = [90.0, 100.0, 110.0]
+    result = get_price_probability("TEST", _day(60), levels)
+
+    t = 60 / 365
+    sigma = np.array([level["iv"] for level in result.levels])
+    d2 = (np.log(result.forward / np.array(levels)) - 0.5 * sigma ** 2 * t) / (sigma * np.sqrt(t))
+    above = np.array([level["probability_above"] for level in result.levels])
+    assert np.allclose(above, norm.cdf(d2), atol=5e-3)
+    assert np.all(np.diff(above) < 0)
+    assert result.levels[1]["probability_below"] == pytest.approx(1 - above[1])
+
+
+def test_dates_outside_the_listed_range(offline_market):
+    with pytest.raises(ValueError, match="último vencimiento"):
+        get_expected_move("TEST", _day(120))
+    with pytest.raises(ValueError, match="posterior a hoy"):
+        get_price_probability("TEST", date.today().isoformat(), [100.0])
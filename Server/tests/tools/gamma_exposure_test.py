@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from Server.core.tools import gamma_exposure as gex_module
+from Server.core.tools.gamma_exposure import get_gamma_exposure
+from Server.model.options import GammaExposure
+from Server.utils.bs import compute_greeks_vec
+
+SPOT = 100.0
+EXPIRATIONS = tuple((date.today() + timedelta(days=d)).isoformat() for d in (-1, 7, 30, 90))
+
+
+@pytest.fixture
+def offline_market(offline_market_for):
+    """Cadenas sintéticas: open interest de calls por encima del spot y de puts por debajo."""
+    def concentrate_open_interest(calls_df, puts_df):
+        calls_df["openInterest"] = np.where(calls_df["strike"] >= 105, 5000, 100)
+        puts_df["openInterest"] = np.where(puts_df["strike"] <= 95, 5000, 100)
+
+    return offline_market_for(gex_module, spots=SPOT, strikes=np.arange(70.0, 131.0, 5.0),
+                              expirations=EXPIRATIONS, on_chain=concentrate_open_interest)
+
+
+def test_exposure_across_expirations(offline_market):
+    result = get_gamma_exposure("TEST")
+
+    assert isinstance(result, GammaExposure)
+    assert sorted(e for _, e in offline_market) == sorted(EXPIRATIONS[1:])          # vencidas afuera, una descarga c/u
+    assert result.expirations == list(EXPIRATIONS[1:])
+    assert result.contracts == 3 * 2 * 13
+    assert result.call_open_interest[result.strikes.index(110.0)] == 3 * 5000
+
+    # Total = suma por strike; calls suman gamma, puts restan
+    assert result.total_gamma == pytest.approx(sum(result.gamma_by_strike), abs=1.0)
+    assert result.gamma_by_strike[result.strikes.index(110.0)] > 0 > result.gamma_by_strike[result.strikes.index(90.0)]
+
+    # GEX de un strike a mano: calls con OI 5000 y puts con OI 100 en los tres vencimientos
+    t = np.array([7, 30, 90]) / 365.0
+    gamma = compute_greeks_vec(SPOT, 110.0, t, 0.04, 0.25, True)["gamma"]
+    expected = np.sum(gamma * (5000 - 100)) * 100 * SPOT ** 2 * 0.01
+    assert result.gamma_by_strike[result.strikes.index(110.0)] == pytest.approx(expected, rel=0.02)
+
+    # El perfil cambia de signo en el nivel de gamma cero
+    assert result.zero_gamma_level is not None
+    profile = np.interp(result.zero_gamma_level, result.spot_grid, result.gamma_profile)
+    assert abs(profile) < 0.05 * np.max(np.abs(result.gamma_profile))
+    assert result.gamma_profile[len(result.spot_grid) // 2] == pytest.approx(result.total_gamma, rel=1e-3)
+
+
+def test_limits_expirations(offline_market, monkeypatch):
+    assert get_gamma_exposure("TEST", max_expirations=1).expirations == [EXPIRATIONS[1]]
+
+    monkeypatch.setattr(gex_module, "get_expirations", lambda underlying: EXPIRATIONS[:1])
+    with pytest.raises(ValueError, match="vencimientos futuros"):
+        get_gamma_exposure("TEST")
@@ -1,7 +1,6 @@
 import sys
 from pathlib import Path
 import json
-from dataclasses import asdict
 
 # Add the parent directory to the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
@@ -10,8 +9,8 @@ from Server.core.tools.get_option_chain import get_option_chain
 
 result = get_option_chain("AAPL", "2025-12-26")
 
-# Convert dataclasses (recursively) to dict
-data = asdict(result)
+# Convert to dict (calls/puts are columnar: export rows directly from the arrays)
+data = {**vars(result), "calls": result.calls.to_records(), "puts": result.puts.to_records()}
 
 # Save as JSON
 with open("option_chain.json", "w") as f:
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import json
+import numpy as np
+import pytest
+
+from Server.core.tools.greeks import greeks_from_frame
+from Server.model.options import OptionColumns, OptionGreeks, OptionQuote
+from Server.utils.bs import compute_greeks
+from Server.utils.option_quote import frame_to_option_columns, row_to_option_quote
+
+
+def test_greeks_from_frame_matches_scalar_engine(synthetic_chain):
+    calls_df, puts_df = synthetic_chain(spot=100.0, t=0.25, r=0.04, sigma=0.3)
+
+    for df, option_type in ((calls_df, "call"), (puts_df, "put")):
+        columns = greeks_from_frame(df, S=100.0, t=0.25, r=0.04, option_type=option_type)
+
+        assert isinstance(columns, OptionColumns)
+        assert len(columns) == len(df)
+        for i in (0, len(df) // 2, len(df) - 1):
+            row = columns[i]
+            expected = compute_greeks(100.0, row.strike, 0.25, 0.04, columns.columns["impliedVolatility"][i], option_type)
+            assert isinstance(row, OptionGreeks)
+            assert row.contractSymbol == df["contractSymbol"].iloc[i]
+            for name in ("delta", "gamma", "theta", "vega", "rho"):
+                assert getattr(row, name) == pytest.approx(getattr(expected, name), abs=2e-5)
+
+        # La IV recuperada es la de la cadena sintética (cerca del dinero, donde
+        # el redondeo de precios a centavos no domina)
+        near = np.abs(columns.columns["strike"] - 100.0) <= 15.0
+        assert np.allclose(columns.columns["impliedVolatility"][near], 0.3, atol=5e-3)
+
+
+def test_greeks_fall_back_to_yfinance_iv(synthetic_chain):
+    calls_df, _ = synthetic_chain()
+    calls_df = calls_df.copy()
+    calls_df.loc[0, ["bid", "ask", "lastPrice"]] = 0.0
+
+    columns = greeks_from_frame(calls_df, S=100.0, t=0.25, r=0.04, option_type="call")
+    assert columns.columns["impliedVolatility"][0] == calls_df["impliedVolatility"].iloc[0]
+
+
+def test_option_columns_views_and_export(synthetic_chain):
+    calls_df, _ = synthetic_chain()
+    columns = frame_to_option_columns(calls_df)
+
+    # Las vistas por fila coinciden con la conversión fila a fila original
+    for i in (0, 7, len(calls_df) - 1):
+        assert columns[i] == row_to_option_quote(calls_df.iloc[i])
+    assert isinstance(columns[3], OptionQuote)
+    assert not hasattr(columns[3], "__dict__")
+
+    # Slices comparten los arrays y siguen siendo columnares
+    head = columns[:5]
+    assert isinstance(head, OptionColumns) and len(head) == 5
+    assert [q.strike for q in head] == calls_df["strike"].iloc[:5].tolist()
+
+    records = columns.to_records()
+    assert records[2] == {
+        "contractSymbol": calls_df["contractSymbol"].iloc[2],
+        "lastTradeDate": "2024-01-02 15:30",
+        "strike": calls_df["strike"].iloc[2],
+        "lastPrice": calls_df["lastPrice"].iloc[2],
+        "bid": calls_df["bid"].iloc[2],
+        "ask": calls_df["ask"].iloc[2],
+        "mid": (calls_df["bid"].iloc[2] + calls_df["ask"].iloc[2]) / 2,
+        "volume": calls_df["volume"].iloc[2],
+        "openInterest": calls_df["openInterest"].iloc[2],
+        "intheMoney": bool(calls_df["inTheMoney"].iloc[2]),
+    }
+    json.dumps(records)
+    assert set(columns.to_dict()) >= {"strike", "bid", "ask", "impliedVolatility"}
+
+
+def test_american_model_removes_early_exercise_bias_from_iv(synthetic_chain):
+    from Server.utils.american import american_price_vec
+
+    _, puts_df = synthetic_chain(spot=100.0, t=0.5, r=0.05, sigma=0.3)
+    puts_df = puts_df.copy()
+    fair = american_price_vec(100.0, puts_df["strike"].to_numpy(), 0.5, 0.05, 0.3, False)
+    puts_df["bid"], puts_df["ask"] = fair - 0.005, fair + 0.005
+    puts_df["impliedVolatility"] = np.nan           # el fallback no debe usarse
+
+    european = greeks_from_frame(puts_df, S=100.0, t=0.5, r=0.05, option_type="put")
+    american = greeks_from_frame(puts_df, S=100.0, t=0.5, r=0.05, option_type="put", model="american")
+
+    # Black-Scholes atribuye la prima de ejercicio anticipado a la volatilidad
+    # (sólo donde queda valor temporal: en el intrínseco la IV no está definida)
+    strikes = puts_df["strike"].to_numpy()
+    deep_itm = (strikes >= 115.0) & (fair - (strikes - 100.0) > 0.05)
+    assert np.all(european.columns["impliedVolatility"][deep_itm] > 0.32)
+    assert np.allclose(american.columns["impliedVolatility"][deep_itm], 0.3, atol=0.01)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from Server.core.tools.iv_rank import screen_iv_rank
+from Server.utils import iv_store
+
+EPOCH = date(1970, 1, 1)
+
+
+def _record_day(root, underlying, day, atm, skew=0.02):
+    """Resumen de cierre de un día con vencimientos a 10 y 50 días (10:00 y 16:00 UTC)."""
+    expirations = np.array([(day - EPOCH).days + 10, (day - EPOCH).days + 50])
+    for hour, level in ((10, atm - 0.05), (16, atm)):
+        stamp = int(datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc).timestamp() * 1000)
+        iv_store.append(root, underlying, "summary", {
+            "timestamp": np.full(2, stamp),
+            "expiration": expirations,
+            "atm_iv": np.full(2, level),
+            "put25_iv": np.full(2, level + skew),
+            "call25_iv": np.full(2, level - skew),
+        }, day)
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    monkeypatch.setenv("IV_STORE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_rank_percentile_and_daily_index(store):
+    today = datetime.now(timezone.utc).date()
+    levels = [0.20, 0.30, 0.25, 0.40, 0.22, 0.35]
+    for back, atm in zip(range(len(levels) - 1, -1, -1), levels):
+        _record_day(store, "AAA", today - timedelta(days=back), atm)
+    _record_day(store, "BBB", today - timedelta(days=1), 0.5)
+
+    screen = screen_iv_rank(["aaa", "BBB", "ZZZ"], lookback_days=5, include_history=True)
+    assert [row.underlying for row in screen.results] == ["AAA", "BBB"]
+    assert screen.missing == ["ZZZ"]
+
+    aaa = screen.results[0]
+    assert aaa.as_of == today.isoformat() and aaa.observations == 5
+    # Ventana [0.30, 0.25, 0.40, 0.22, 0.35]: cierre del día, no el registro de las 10:00
+    assert aaa.atm_iv == pytest.approx(0.35)
+    assert aaa.iv_rank == pytest.approx((0.35 - 0.22) / (0.40 - 0.22) * 100, abs=0.01)
+    assert aaa.iv_percentile == pytest.approx(75.0)
+    assert aaa.risk_reversal_25 == pytest.approx(-0.04)
+    assert [point["days"] for point in aaa.term_structure] == [10, 50]
+    assert aaa.history["iv_rank"][0] is None and aaa.history["iv_rank"][-1] == aaa.iv_rank
+
+    # Una sola sesión: sin rank
+    assert screen.results[1].iv_rank is None and screen.results[1].atm_iv == pytest.approx(0.5)
+
+    # Los días completos quedan en el índice; el día en curso no
+    index = iv_store._read_partition(str(store / "AAA" / "_daily"), "_daily")
+    assert len(index["date"]) == len(levels) - 1
+    assert screen_iv_rank(["AAA"], lookback_days=5).results[0].iv_rank == aaa.iv_rank
+
+
+def test_constant_maturity_interpolates_total_variance():
+    dte, iv = np.array([10.0, 50.0]), np.array([0.2, 0.3])
+    expected = np.sqrt((0.04 * 10 + (0.09 * 50 - 0.04 * 10) * 0.5) / 30)
+    assert iv_store.constant_maturity(dte, iv, 30) == pytest.approx(expected)
+    assert iv_store.constant_maturity(dte, iv, 5) == 0.2
+    assert np.isnan(iv_store.constant_maturity(dte, np.array([np.nan, np.nan]), 30))
+
+
+def test_screen_requires_store(monkeypatch):
+    monkeypatch.delenv("IV_STORE_DIR", raising=False)
+    with pytest.raises(ValueError, match="IV_STORE_DIR"):
+        screen_iv_rank(["SPY"])
+
+
+def test_concurrent_screens_index_each_day_once(store):
+    import threading
+
+    today = datetime.now(timezone.utc).date()
+    for back in range(1, 11):
+        _record_day(store, "AAA", today - timedelta(days=back), 0.2 + back / 100)
+
+    barrier = threading.Barrier(8)
+
+    def screen():
+        barrier.wait()
+        iv_store.daily_index(str(store), "AAA", today)
+
+    threads = [threading.Thread(target=screen) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    index = iv_store._read_partition(str(store / "AAA" / "_daily"), "_daily")
+    assert len(index["date"]) == 10 and len(np.unique(index["date"])) == 10
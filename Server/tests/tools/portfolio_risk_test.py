@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from dataclasses import asdict
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from Server.core.tools import compute_strategy_payoff as strategy_module
+from Server.core.tools.compute_strategy_payoff import compute_option_strategy
+from Server.core.tools.portfolio_risk import compute_portfolio_risk
+from Server.model.options import PortfolioRisk
+
+EXPIRATION = (date.today() + timedelta(days=73)).isoformat()
+LATER_EXPIRATION = (date.today() + timedelta(days=146)).isoformat()
+SPOTS = {"AAA": 100.0, "BBB": 250.0}
+
+
+@pytest.fixture
+def offline_market(offline_market_for):
+    """Cadenas sintéticas de dos subyacentes; registra cada descarga."""
+    return offline_market_for(strategy_module, spots=SPOTS, strikes=lambda spot: np.arange(0.5, 1.51, 0.05) * spot)
+
+
+def _book():
+    book = []
+    for i in range(30):
+        underlying = "AAA" if i % 3 else "BBB"
+        spot = SPOTS[underlying]
+        book.append({
+            "underlying": underlying,
+            "side": "long" if i % 2 else "short",
+            "option_type": "call" if i % 4 < 2 else "put",
+            "strike": round(spot * (0.8 + 0.05 * (i % 9)), 6),
+            "expiration": EXPIRATION if i % 5 else LATER_EXPIRATION,
+            "quantity": 1 + i % 3,
+        })
+    return book
+
+
+def test_book_downloads_each_chain_once_and_matches_strategies(offline_market):
+    book = _book()
+    risk = compute_portfolio_risk(book)
+
+    assert isinstance(risk, PortfolioRisk) and risk.positions == len(book)
+    assert sorted(offline_market) == sorted({(p["underlying"], p["expiration"]) for p in book})
+
+    # Por subyacente, las mismas griegas que la estrategia equivalente
+    offline_market.clear()
+    for row in risk.underlyings:
+        legs = [{k: v for k, v in p.items() if k != "underlying"} for p in book if p["underlying"] == row.underlying]
+        strategy = compute_option_strategy(row.underlying, legs)
+        assert row.positions == len(legs)
+        for name in ("delta", "gamma", "theta", "vega", "rho"):
+            assert getattr(row.greeks, name) == pytest.approx(getattr(strategy.greeks, name), abs=1e-4)
+        assert row.dollar_greeks.delta == pytest.approx(strategy.greeks.delta * row.spot * 100, rel=1e-4)
+
+    # A nivel libro sólo griegas en dólares: las griegas por acción no se suman entre subyacentes
+    assert "greeks" not in asdict(risk)
+    for name in ("delta", "gamma", "theta", "vega", "rho"):
+        total = sum(getattr(u.dollar_greeks, name) for u in risk.underlyings)
+        assert getattr(risk.dollar_greeks, name) == pytest.approx(total, abs=0.05)
+
+
+def test_scenario_matrix_for_a_long_call(offline_market):
+    risk = compute_portfolio_risk(
+        [{"underlying": "AAA", "side": "long", "option_type": "call", "strike": 100.0, "expiration": EXPIRATION}],
+        spot_shocks=[-0.1, 0.0, 0.1], vol_shocks=[-0.05, 0.0, 0.05],
+    )
+    pnl = np.array(risk.scenario_pnl)
+    assert pnl.shape == (3, 3) and pnl[1, 1] == 0.0
+    assert np.all(np.diff(pnl, axis=1) > 0) and np.all(np.diff(pnl, axis=0) > 0)
+    # Un shock chico de volatilidad ≈ dollar vega por punto
+    assert pnl[2, 1] / 5 == pytest.approx(risk.dollar_greeks.vega, rel=0.05)
+
+
+def test_position_without_underlying():
+    with pytest.raises(ValueError, match="underlying"):
+        compute_portfolio_risk([{"side": "long", "option_type": "call", "strike": 100, "expiration": EXPIRATION}])
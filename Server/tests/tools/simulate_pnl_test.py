@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import pytest
+import tracemalloc
+from datetime import date, timedelta
+from types import SimpleNamespace
+import numpy as np
+from scipy.stats import lognorm, norm
+
+from Server.core.tools import compute_strategy_payoff as strategy_module
+from Server.core.tools import simulate_pnl as simulate_module
+from Server.core.tools.simulate_pnl import simulate_strategy_pnl
+from Server.utils.bs import bs_price_sigma
+
+SPOT, R, SIGMA = 100.0, 0.04, 0.25
+EXPIRATION = (date.today() + timedelta(days=73)).isoformat()
+T = 73 / 365.0
+
+
+@pytest.fixture
+def offline_market(offline_market_for, monkeypatch):
+    def fake_density(underlying, expiration, min_moneyness, max_moneyness):
+        # Densidad lognormal risk-neutral en la grilla de $0.01 de la banda de moneyness
+        Ks = np.arange(SPOT * min_moneyness, SPOT * max_moneyness, 0.01)
+        scale = SPOT * np.exp((R - 0.5 * SIGMA ** 2) * T)
+        pdf = lognorm.pdf(Ks, s=SIGMA * np.sqrt(T), scale=scale)
+        return SimpleNamespace(Ks_range=Ks, pdf=pdf, cum_prob=np.cumsum(pdf) * 0.01)
+
+    offline_market_for(strategy_module, simulate_module, spots=SPOT, sigma=SIGMA, rate=R)
+    monkeypatch.setattr(simulate_module, "compute_implied_density", fake_density)
+
+
+LONG_CALL = [{"side": "long", "option_type": "call", "strike": 100, "expiration": EXPIRATION}]
+SHORT_PUT = [{"side": "short", "option_type": "put", "strike": 90, "expiration": EXPIRATION}]
+
+
+@pytest.mark.parametrize("model", ["implied", "gbm"])
+def test_expected_pnl_matches_risk_neutral_price(offline_market, model):
+    result = simulate_strategy_pnl("TEST", LONG_CALL, model=model, n_paths=400_000, batch_size=64_000, seed=7)
+
+    fair = bs_price_sigma(SPOT, 100, T, R, "call", SIGMA)
+    expected = 100 * (fair * np.exp(R * T) - result.net_premium / 100)
+    stderr = result.std_pnl / np.sqrt(result.n_paths)
+
+    assert result.net_premium > 0  # débito
+    assert result.expected_pnl == pytest.approx(expected, abs=max(4 * stderr, 3.0))
+    assert result.expected_terminal_price == pytest.approx(SPOT * np.exp(R * T), rel=5e-3)
+    # La pérdida máxima de un long call es la prima pagada
+    assert result.pnl_quantiles[0]["pnl"] == pytest.approx(-result.net_premium, abs=1e-2)
+
+
+def test_short_put_pop_and_tail(offline_market):
+    result = simulate_strategy_pnl("TEST", SHORT_PUT, model="gbm", n_paths=300_001, batch_size=50_000, seed=1)
+
+    # Se gana si el subyacente cierra por encima de strike - prima
+    breakeven = 90 + result.net_premium / 100
+    d2 = (np.log(SPOT / breakeven) + (R - 0.5 * SIGMA ** 2) * T) / (SIGMA * np.sqrt(T))
+    assert result.probability_of_profit == pytest.approx(norm.cdf(d2), abs=5e-3)
+
+    assert result.expected_shortfall_99 <= result.expected_shortfall_95 <= result.VaR_95 < 0
+    quantiles = [q["pnl"] for q in result.pnl_quantiles]
+    assert quantiles == sorted(quantiles)
+    assert max(quantiles) <= -result.net_premium + 1e-2
+
+
+def test_jump_model_fattens_left_tail(offline_market):
+    gbm = simulate_strategy_pnl("TEST", SHORT_PUT, model="gbm", n_paths=200_000, seed=3)
+    jump = simulate_strategy_pnl("TEST", SHORT_PUT, model="jump", n_paths=200_000, seed=3,
+                                 jump_intensity=3.0, jump_mean=-0.10, jump_std=0.05)
+    assert jump.expected_shortfall_99 < gbm.expected_shortfall_99
+
+
+def test_invalid_model(offline_market):
+    with pytest.raises(ValueError, match="model"):
+        simulate_strategy_pnl("TEST", LONG_CALL, model="heston")
+
+
+def test_var_and_shortfall_match_the_lognormal_tail(offline_market):
+    result = simulate_strategy_pnl("TEST", SHORT_PUT, model="gbm", n_paths=1_000_000, seed=5)
+
+    # P&L exacto en los cuantiles del precio terminal lognormal
+    u = (np.arange(50_000) + 0.5) / 1_000_000
+    terminal = SPOT * np.exp((R - 0.5 * SIGMA ** 2) * T + SIGMA * np.sqrt(T) * norm.ppf(u))
+    pnl = -100 * np.maximum(90 - terminal, 0) - result.net_premium
+    assert result.VaR_95 == pytest.approx(pnl[-1], abs=5.0)
+    assert result.expected_shortfall_95 == pytest.approx(pnl.mean(), abs=5.0)
+    assert result.expected_shortfall_99 == pytest.approx(pnl[:10_000].mean(), abs=10.0)
+    assert result.tail_probability is None
+
+
+def test_memory_does_not_grow_with_paths(offline_market):
+    tracemalloc.start()
+    try:
+        simulate_strategy_pnl("TEST", SHORT_PUT, model="gbm", n_paths=4_000_000, batch_size=50_000, seed=2)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Un float32 por camino serían 16 MB
+    assert peak < 8 * 2 ** 20
+
+
+def test_implied_model_extends_tails_beyond_the_band(offline_market):
+    # Banda desde 0.95: sin colas, la pérdida del short put de 90 quedaría en cero
+    implied = simulate_strategy_pnl("TEST", SHORT_PUT, model="implied", n_paths=1_000_000, seed=4,
+                                    min_moneyness=0.95)
+    gbm = simulate_strategy_pnl("TEST", SHORT_PUT, model="gbm", n_paths=1_000_000, seed=4)
+
+    d_low = (np.log(95 / SPOT) - (R - 0.5 * SIGMA ** 2) * T) / (SIGMA * np.sqrt(T))
+    d_high = (np.log(130 / SPOT) - (R - 0.5 * SIGMA ** 2) * T) / (SIGMA * np.sqrt(T))
+    assert implied.tail_probability == pytest.approx(norm.cdf(d_low) + norm.sf(d_high), abs=5e-3)
+    assert implied.expected_shortfall_99 == pytest.approx(gbm.expected_shortfall_99, rel=0.05)
+    assert implied.VaR_95 == pytest.approx(gbm.VaR_95, rel=0.05)
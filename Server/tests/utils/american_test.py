@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from Server.utils.american import american_greeks_vec, american_implied_volatility_vec, american_price_vec
+from Server.utils.bs import bs_price_vec, compute_greeks_vec
+
+K = np.linspace(60.0, 140.0, 41)
+
+
+def test_reference_put_and_early_exercise_premium():
+    # Put americana de referencia (S=K=100, t=1, r=5%, sigma=20%): 6.09
+    assert american_price_vec(100.0, 100.0, 1.0, 0.05, 0.2, False, steps=500) == pytest.approx(6.09, abs=5e-3)
+
+    puts = american_price_vec(100.0, K, 0.5, 0.04, 0.25, False)
+    assert np.all(puts >= np.maximum(K - 100.0, 0.0) - 1e-12)             # nunca por debajo del intrínseco
+    assert np.all(puts >= bs_price_vec(100.0, K, 0.5, 0.04, 0.25, False) - 2e-2)
+
+    # Sin dividendos la call americana vale lo mismo que la europea
+    calls = american_price_vec(100.0, K, 0.5, 0.04, 0.25, True)
+    assert np.allclose(calls, bs_price_vec(100.0, K, 0.5, 0.04, 0.25, True), atol=3e-2)
+
+
+def test_iv_roundtrip_including_deep_itm_puts():
+    for is_call in (True, False):
+        price = american_price_vec(100.0, K, 0.5, 0.04, 0.3, is_call)
+        sigma = american_implied_volatility_vec(100.0, K, 0.5, 0.04, price, is_call)
+        near = np.abs(K - 100.0) <= 25.0
+        assert np.allclose(sigma[near], 0.3, atol=2e-3)
+
+    # Una put muy ITM cotizada por encima de su valor europeo máximo: la IV
+    # europea no existe, la americana sí
+    price = american_price_vec(100.0, 130.0, 0.5, 0.04, 0.35, False)
+    assert price > 130.0 * np.exp(-0.04 * 0.5) - 100.0
+    assert american_implied_volatility_vec(100.0, 130.0, 0.5, 0.04, price, False) == pytest.approx(0.35, abs=5e-3)
+
+    # Por debajo del intrínseco no hay solución
+    assert np.isnan(american_implied_volatility_vec(100.0, 130.0, 0.5, 0.04, 29.0, False))
+
+
+def test_greeks_match_black_scholes_for_calls():
+    american = american_greeks_vec(100.0, K, 0.5, 0.04, 0.25, True, steps=200)
+    european = compute_greeks_vec(100.0, K, 0.5, 0.04, 0.25, True)
+    tolerances = {"delta": 5e-3, "gamma": 1e-3, "theta": 1e-3, "vega": 1.0, "rho": 0.2}
+    for name, tol in tolerances.items():
+        assert np.allclose(american[name], european[name], atol=tol), name
+
+    puts = american_greeks_vec(100.0, K, 0.5, 0.04, 0.25, False)
+    assert np.all((puts["delta"] >= -1.0 - 1e-9) & (puts["delta"] <= 0.0))
+    assert puts["delta"][0] > -0.01 and puts["delta"][-1] == pytest.approx(-1.0, abs=1e-6)  # ejercida
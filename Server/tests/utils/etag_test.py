@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from Server.utils import market_data
+from Server.utils.etag import compute_etag, etag_matches, market_snapshot, note_market_read
+from Server.utils.serialization import choose_encoding
+
+
+def test_etag_changes_with_the_market_snapshot_only():
+    with market_snapshot() as reads:
+        note_market_read("spot", ("SPY",), 7)
+    etag = compute_etag("get_chain", {"underlying": "SPY"}, "json", reads)
+    assert etag == compute_etag("get_chain", {"underlying": "SPY"}, "json", {("spot", ("SPY",)): 7})
+    assert etag != compute_etag("get_chain", {"underlying": "SPY"}, "json", {("spot", ("SPY",)): 8})
+    assert etag != compute_etag("get_chain", {"underlying": "SPY"}, "arrow", reads)
+
+    assert etag_matches(f'W/{etag}, "otro"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag) and not etag_matches('"otro"', etag)
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("identity", None),
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+])
+def test_choose_encoding_without_brotli(monkeypatch, accept_encoding, expected):
+    from Server.utils import serialization
+
+    monkeypatch.setattr(serialization, "brotli_available", lambda: False)
+    assert choose_encoding(accept_encoding) == expected
+
+
+@pytest.fixture
+def spot_tool(monkeypatch):
+    """Tool cacheable de prueba que lee el spot de market_data."""
+    import api_server
+
+    serialized = []
+    real_convert = api_server.convert_to_dict
+
+    def convert(result):
+        serialized.append(result)
+        return real_convert(result)
+
+    def tool(underlying, strikes: int = 2):
+        spot = market_data.get_spot(underlying)
+        return {"underlying": underlying, "rows": [{"strike": spot + i, "label": "x" * 40} for i in range(strikes)]}
+
+    market_data._spot_cache.clear()
+    monkeypatch.setattr(market_data, "get_spot_price", lambda underlying: 100.0)
+    monkeypatch.setitem(api_server.TOOL_MAP, "get_expirations", tool)
+    monkeypatch.setattr(api_server, "convert_to_dict", convert)
+    yield serialized
+    market_data._spot_cache.clear()
+
+
+def test_unchanged_result_returns_304_without_serializing(spot_tool):
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    client = TestClient(api_server.app)
+    url = "/api/mcp/call-tool/get_expirations?underlying=SPY&strikes=3"
+    first = client.get(url)
+    assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+    assert len(first.json()["data"]["rows"]) == 3           # `strikes` llegó como int
+    etag = first.headers["etag"]
+
+    # POST con los mismos argumentos: mismo ETag
+    posted = client.post("/api/mcp/call-tool", headers={"If-None-Match": etag},
+                         json={"tool": "get_expirations", "arguments": {"underlying": "SPY", "strikes": 3}})
+    assert posted.status_code == 304
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert len(spot_tool) == 1
+
+    # Spot descargado de nuevo: ETag nuevo y respuesta completa
+    market_data._spot_cache.set("SPY", 101.0)
+    refreshed = client.get(url, headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200 and refreshed.headers["etag"] != etag
+    assert refreshed.json()["data"]["rows"][0]["strike"] == 101.0
+
+
+def test_value_reloaded_while_read_gets_no_etag(spot_tool, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    cache = market_data._spot_cache
+    real_get_or_set = cache.get_or_set
+
+    def reloaded_after_read(key, loader, serve_stale=False):
+        value = real_get_or_set(key, loader, serve_stale)
+        cache.set(key, value + 1.0)          # el prefetch recarga antes de anotar la versión
+        return value
+
+    monkeypatch.setattr(cache, "get_or_set", reloaded_after_read)
+    with market_snapshot() as reads:
+        assert market_data.get_spot("SPY") == 100.0
+    assert reads == {("spot", ("SPY",)): None}
+    assert compute_etag("get_chain", {"underlying": "SPY"}, "json", reads) is None
+
+    response = TestClient(api_server.app).get("/api/mcp/call-tool/get_expirations?underlying=SPY",
+                                              headers={"If-None-Match": "*"})
+    assert response.status_code == 200 and "etag" not in response.headers
+
+
+def test_large_responses_are_compressed(spot_tool):
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    client = TestClient(api_server.app)
+    response = client.get("/api/mcp/call-tool/get_expirations?underlying=SPY&strikes=200",
+                          headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert len(response.json()["data"]["rows"]) == 200
+
+    small = client.get("/api/mcp/call-tool/get_expirations?underlying=SPY&strikes=1",
+                       headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_get_is_limited_to_cacheable_tools():
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    response = TestClient(api_server.app).get("/api/mcp/call-tool/simulate_strategy_pnl?underlying=SPY")
+    assert response.status_code == 405
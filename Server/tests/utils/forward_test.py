@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from Server.core.tools.greeks import greeks_from_frame
+from Server.utils.bs import bs_price_vec
+from Server.utils.forward import carry, fit_forward
+
+
+@pytest.fixture
+def dividend_chain(synthetic_chain):
+    """Cadena sintética de un subyacente que paga dividendos (q continuo)."""
+    def make(t=0.5, r=0.04, q=0.03, sigma=0.25, strikes=None):
+        frames = synthetic_chain(t=t, r=r, sigma=sigma, strikes=strikes)
+        for df, is_call in zip(frames, (True, False)):
+            fair = bs_price_vec(100.0, df["strike"].to_numpy(), t, r, sigma, is_call, q)
+            df["bid"], df["ask"] = np.round(fair * 0.99, 2), np.round(fair * 1.01, 2)
+        return frames
+    return make
+
+
+def test_parity_regression_recovers_forward_and_discount(dividend_chain):
+    calls_df, puts_df = dividend_chain(t=0.5, r=0.04, q=0.03)
+    fit = fit_forward(calls_df, puts_df, t=0.5, r=0.045)
+
+    assert fit.fitted_discount
+    assert fit.forward == pytest.approx(100.0 * np.exp((0.04 - 0.03) * 0.5), abs=0.02)
+    assert fit.rate == pytest.approx(0.04, abs=1e-3)
+    rate, q = carry(fit, 100.0, 0.5, 0.045)
+    assert rate == fit.rate and q == pytest.approx(0.03, abs=1e-3)
+
+
+def test_few_pairs_keep_the_fred_discount(dividend_chain):
+    calls_df, puts_df = dividend_chain(strikes=[95.0, 100.0, 105.0])
+    fit = fit_forward(calls_df, puts_df, t=0.5, r=0.045)
+    assert not fit.fitted_discount and fit.rate == 0.045
+    assert fit.discount_factor == pytest.approx(np.exp(-0.045 * 0.5))
+
+    assert carry(None, 100.0, 0.5, 0.045) == (0.045, 0.0)
+    calls_df["bid"] = 0.0
+    assert fit_forward(calls_df, puts_df, t=0.5, r=0.045) is None
+
+
+def test_dividend_yield_removes_call_put_iv_gap(dividend_chain):
+    calls_df, puts_df = dividend_chain(t=0.5, r=0.04, q=0.03, sigma=0.25)
+    near = np.abs(calls_df["strike"].to_numpy() - 100.0) <= 15.0
+
+    def ivs(r, q):
+        return [greeks_from_frame(df, S=100.0, t=0.5, r=r, option_type=side, q=q).columns["impliedVolatility"][near]
+                for df, side in ((calls_df, "call"), (puts_df, "put"))]
+
+    # Sin dividendos las calls quedan baratas y las puts caras
+    calls_iv, puts_iv = ivs(0.04, 0.0)
+    assert np.all(puts_iv - calls_iv > 0.01)
+
+    rate, q = carry(fit_forward(calls_df, puts_df, 0.5, 0.04), 100.0, 0.5, 0.04)
+    calls_iv, puts_iv = ivs(rate, q)
+    assert np.allclose(calls_iv, 0.25, atol=3e-3) and np.allclose(puts_iv, 0.25, atol=3e-3)
+
+
+def test_merton_greeks_match_finite_differences():
+    from Server.utils.bs import compute_greeks_vec
+
+    K, t, r, q, sigma = np.array([80.0, 100.0, 120.0]), 0.5, 0.04, 0.03, 0.25
+    for is_call in (True, False):
+        greeks = compute_greeks_vec(100.0, K, t, r, sigma, is_call, q)
+        price = lambda S=100.0, t=t: bs_price_vec(S, K, t, r, sigma, is_call, q)
+        h = 1e-3
+        assert np.allclose(greeks["delta"], (price(100 + h) - price(100 - h)) / (2 * h), atol=1e-6)
+        assert np.allclose(greeks["gamma"], (price(100 + h) - 2 * price() + price(100 - h)) / h ** 2, atol=1e-4)
+        assert np.allclose(greeks["theta"], -(price(t=t + h) - price(t=t - h)) / (2 * h) / 365.0, atol=1e-6)
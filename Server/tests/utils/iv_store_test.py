@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from Server.core.tools.iv_history import get_iv_history
+from Server.utils import iv_store
+
+EXPIRATION = (date.today() + timedelta(days=120)).isoformat()
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path, synthetic_chain):
+    """Store en un directorio temporal y compute_greeks sobre una cadena sintética."""
+    from Server.core.tools import greeks as greeks_module
+
+    monkeypatch.setenv("IV_STORE_DIR", str(tmp_path))
+    monkeypatch.setenv("IV_STORE_MIN_INTERVAL_SECONDS", "0")
+    iv_store.clear_throttle()
+    t = (date.fromisoformat(EXPIRATION) - date.today()).days / 365.0
+    monkeypatch.setattr(greeks_module, "get_spot", lambda underlying: 100.0)
+    monkeypatch.setattr(greeks_module, "get_expirations", lambda underlying: (EXPIRATION,))
+    monkeypatch.setattr(greeks_module, "get_chain_frames",
+                        lambda underlying, expiration: synthetic_chain(expiration=EXPIRATION, t=t, sigma=0.25))
+    monkeypatch.setattr(greeks_module, "get_risk_free_rate", lambda expiration: 0.04)
+    yield tmp_path, lambda: greeks_module._compute_greeks("TEST", EXPIRATION)
+    iv_store.clear_throttle()
+
+
+def test_greeks_are_recorded_and_queried(store):
+    root, compute = store
+    greeks = compute()
+    compute()
+
+    partition = root / "TEST" / datetime.now(timezone.utc).date().isoformat()
+    assert sorted(os.listdir(partition)) == ["contracts", "market", "summary"]
+    assert os.path.getsize(partition / "contracts" / "iv.bin") == 2 * (len(greeks.calls) + len(greeks.puts)) * 4
+
+    summary = get_iv_history("TEST")
+    assert summary.table == "summary" and summary.rows == 2
+    assert summary.columns["expiration"] == [EXPIRATION, EXPIRATION]
+    for name in ("atm_iv", "put25_iv", "call25_iv"):
+        assert summary.columns[name][0] == pytest.approx(0.25, abs=5e-3)
+
+    symbol = greeks.calls.columns["contractSymbol"][10]
+    series = get_iv_history("TEST", contract=symbol)
+    assert series.rows == 2 and series.columns["contract"] == [symbol, symbol]
+    assert series.columns["option_type"] == ["call", "call"]
+    assert series.columns["iv"][0] == pytest.approx(float(greeks.calls.columns["impliedVolatility"][10]), abs=1e-5)
+
+    tomorrow = (date.today() + timedelta(days=2)).isoformat()
+    assert get_iv_history("TEST", start=tomorrow).rows == 0
+    assert get_iv_history("TEST", expiration="2031-01-17").rows == 0
+
+
+def test_throttle_and_partial_rows(store, monkeypatch):
+    root, compute = store
+    monkeypatch.setenv("IV_STORE_MIN_INTERVAL_SECONDS", "3600")
+    compute()
+    compute()
+    assert get_iv_history("TEST").rows == 1
+
+    # Escritura cortada a mitad de fila: la fila incompleta no se lee
+    summary = root / "TEST" / datetime.now(timezone.utc).date().isoformat() / "summary"
+    with open(summary / "timestamp.bin", "ab") as f:
+        f.write(np.array([0], dtype="<i8").tobytes())
+    assert get_iv_history("TEST").rows == 1
+
+
+def test_disabled_store(monkeypatch):
+    monkeypatch.delenv("IV_STORE_DIR", raising=False)
+    with pytest.raises(ValueError, match="IV_STORE_DIR"):
+        get_iv_history("TEST")
+
+
+def test_append_after_a_torn_row_keeps_rows_aligned(tmp_path):
+    day = date(2025, 1, 10)
+    row = lambda ts, iv: {"timestamp": [ts], "expiration": [20100], "atm_iv": [iv], "put25_iv": [iv], "call25_iv": [iv]}
+    iv_store.append(str(tmp_path), "TEST", "summary", row(1, 0.1), day)
+
+    # Escritura cortada: sólo dos columnas de la fila 2
+    path = tmp_path / "TEST" / day.isoformat() / "summary"
+    for name, dtype in (("timestamp", "<i8"), ("expiration", "<i4")):
+        with open(path / f"{name}.bin", "ab") as f:
+            f.write(np.array([2], dtype=dtype).tobytes())
+
+    iv_store.append(str(tmp_path), "TEST", "summary", row(3, 0.3), day)
+    data = iv_store.read(str(tmp_path), "TEST", "summary")
+    assert data["timestamp"].tolist() == [1, 3]
+    assert np.allclose(data["atm_iv"], [0.1, 0.3])
+
+
+def _append_rows(root: str, worker: int, batches: int) -> None:
+    for i in range(batches):
+        ts = worker * 1000 + i
+        iv_store.append(root, "TEST", "summary", {
+            "timestamp": np.full(50, ts), "expiration": np.full(50, ts),
+            "atm_iv": np.full(50, ts), "put25_iv": np.full(50, ts), "call25_iv": np.full(50, ts),
+        }, date(2025, 1, 10))
+
+
+def test_concurrent_processes_do_not_interleave_columns(tmp_path):
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_append_rows, args=(str(tmp_path), w, 100)) for w in (1, 2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+
+    data = iv_store.read(str(tmp_path), "TEST", "summary")
+    assert len(data["timestamp"]) == 2 * 100 * 50
+    for name in ("expiration", "atm_iv", "put25_iv", "call25_iv"):
+        assert np.array_equal(data[name].astype(np.int64), data["timestamp"])
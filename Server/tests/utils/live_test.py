@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import math
+import threading
+import time
+
+from Server.utils.diff import apply_diff, diff_result, is_empty
+from Server.utils.live import LiveHub, Subscriber
+
+
+def _row(symbol, strike, price):
+    return {"contractSymbol": symbol, "strike": strike, "lastPrice": price, "impliedVolatility": math.nan}
+
+
+def test_diff_reports_only_changed_contracts_and_roundtrips():
+    old = {"spot": 100.0, "calls": [_row("C90", 90, 11.0), _row("C100", 100, 4.0)], "puts": [_row("P90", 90, 1.0)]}
+    new = {"spot": 101.0, "calls": [_row("C100", 100, 4.5), _row("C110", 110, 1.2)], "puts": [_row("P90", 90, 1.0)]}
+
+    diff = diff_result(old, new)
+    assert diff["fields"] == {"spot": 101.0}
+    assert [r["contractSymbol"] for r in diff["calls"]["added"]] == ["C110"]
+    assert [r["contractSymbol"] for r in diff["calls"]["changed"]] == ["C100"]
+    assert diff["calls"]["removed"] == ["C90"]
+    assert diff["puts"] == {"added": [], "changed": [], "removed": []}   # NaN == NaN
+
+    assert apply_diff(old, diff) == new
+    assert is_empty(diff_result(new, new))
+
+
+def _frames():
+    return [
+        {"spot": 100.0, "calls": [_row("C100", 100, 4.0)], "puts": []},
+        {"spot": 100.0, "calls": [_row("C100", 100, 4.0)], "puts": []},   # sin cambios
+        {"spot": 100.5, "calls": [_row("C100", 100, 4.4)], "puts": []},
+    ]
+
+
+def test_hub_computes_once_per_tick_for_all_subscribers():
+    frames, computed = _frames(), []
+
+    def compute(topic):
+        computed.append(topic)
+        return frames[min(len(computed), len(frames)) - 1]
+
+    async def scenario():
+        hub = LiveHub(compute, interval=3600)
+        topic = ("get_chain", "SPY", "2025-01-17")
+        a, b = Subscriber(), Subscriber()
+        await hub.subscribe(topic, a)
+        await hub.subscribe(topic, b)
+        assert len(computed) == 1
+
+        await hub.tick()          # sin cambios: no se envía nada
+        await hub.tick()
+        assert len(computed) == 3
+
+        messages = {}
+        for name, sub in (("a", a), ("b", b)):
+            messages[name] = [json.loads(sub.queue.get_nowait()) for _ in range(sub.queue.qsize())]
+        hub.drop(a)
+        hub.drop(b)
+        assert hub.topics() == {}
+        hub._task.cancel()
+        return messages
+
+    messages = asyncio.run(scenario())
+    assert [m["type"] for m in messages["a"]] == ["snapshot", "update"]
+    assert [m["type"] for m in messages["b"]] == ["snapshot", "update"]
+    update = messages["b"][1]
+    assert update["seq"] == 1 and update["fields"] == {"spot": 100.5}
+    assert update["calls"]["changed"][0]["lastPrice"] == 4.4
+    assert update["calls"]["changed"][0]["impliedVolatility"] is None     # NaN -> null
+
+
+def test_slow_subscriber_is_resynced_with_a_snapshot():
+    sub = Subscriber(maxsize=2)
+    for i in range(3):
+        sub.offer(f"update-{i}", lambda: "snapshot")
+    assert sub.queue.qsize() == 1 and sub.queue.get_nowait() == "snapshot"
+
+
+def test_websocket_pushes_snapshot_then_updates(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    frames, calls = _frames(), []
+
+    def greeks(underlying, expiration):
+        calls.append((underlying, expiration))
+        return frames[min(len(calls), len(frames)) - 1]
+
+    monkeypatch.setitem(api_server.TOOL_MAP, "compute_greeks", greeks)
+    monkeypatch.setattr(api_server.live_hub, "interval", 0.01)
+
+    with TestClient(api_server.app).websocket_connect("/api/live") as ws:
+        ws.send_text(json.dumps({"action": "subscribe", "tool": "get_distribution",
+                                 "underlying": "SPY", "expiration": "2025-01-17"}))
+        assert ws.receive_json()["type"] == "error"
+
+        ws.send_text(json.dumps({"action": "subscribe", "tool": "compute_greeks",
+                                 "underlying": "spy", "expiration": "2025-01-17"}))
+        snapshot = ws.receive_json()
+        assert snapshot["type"] == "snapshot" and snapshot["data"]["spot"] == 100.0
+        assert snapshot["topic"] == {"tool": "compute_greeks", "underlying": "SPY", "expiration": "2025-01-17"}
+
+        update = ws.receive_json()
+        assert update["type"] == "update" and update["fields"] == {"spot": 100.5}
+        ws.send_text(json.dumps({"action": "unsubscribe", "tool": "compute_greeks",
+                                 "underlying": "SPY", "expiration": "2025-01-17"}))
+    assert calls[0] == ("SPY", "2025-01-17")
+    assert api_server.live_hub.topics() == {}
+
+
+def test_subscriber_joining_during_a_tick_gets_the_snapshot_first():
+    frames, computed = _frames()[::2], []
+    started = None
+
+    def compute(topic):
+        computed.append(topic)
+        if len(computed) == 2:
+            started.set()
+            time.sleep(0.2)       # refresco en curso mientras se suma el segundo suscriptor
+        return frames[len(computed) - 1]
+
+    async def scenario():
+        nonlocal started
+        started = threading.Event()
+        hub = LiveHub(compute, interval=3600)
+        topic = ("get_chain", "SPY", "2025-01-17")
+        a, late = Subscriber(), Subscriber()
+        await hub.subscribe(topic, a)
+
+        tick = asyncio.create_task(hub.tick())
+        await asyncio.to_thread(started.wait, 5)
+        await hub.subscribe(topic, late)
+        await tick
+        hub._task.cancel()
+        return [json.loads(late.queue.get_nowait()) for _ in range(late.queue.qsize())]
+
+    messages = asyncio.run(scenario())
+    assert [m["type"] for m in messages] == ["snapshot"]
+    assert messages[0]["data"]["spot"] == 100.5
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+from types import SimpleNamespace
+
+import pytest
+
+from Server.utils import market_data
+from Server.utils.cache import TTLCache, named_caches
+from Server.utils.metrics import (
+    TOOL_ERRORS,
+    TOOL_IN_FLIGHT,
+    TOOL_LATENCY,
+    TOOL_REQUESTS,
+    UPSTREAM_ERRORS,
+    UPSTREAM_LATENCY,
+    UPSTREAM_REQUESTS,
+    Histogram,
+    render_metrics,
+    track_tool,
+    track_upstream,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_duration_seconds", "Test.", ("tool",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 2.0):
+        histogram.observe(value, tool="x")
+
+    lines = histogram.render()
+    assert 'options_api_test_duration_seconds_bucket{tool="x",le="0.1"} 1' in lines
+    assert 'options_api_test_duration_seconds_bucket{tool="x",le="1"} 2' in lines
+    assert 'options_api_test_duration_seconds_bucket{tool="x",le="+Inf"} 3' in lines
+    assert 'options_api_test_duration_seconds_count{tool="x"} 3' in lines
+    assert 'options_api_test_duration_seconds_sum{tool="x"} 2.55' in lines
+
+
+def test_track_tool_counts_requests_errors_and_in_flight():
+    before = TOOL_REQUESTS.value(tool="metrics_test")
+
+    with track_tool("metrics_test"):
+        assert TOOL_IN_FLIGHT.value(tool="metrics_test") == 1
+    with pytest.raises(ValueError):
+        with track_tool("metrics_test"):
+            raise ValueError("boom")
+
+    assert TOOL_REQUESTS.value(tool="metrics_test") == before + 2
+    assert TOOL_ERRORS.value(tool="metrics_test", error="ValueError") >= 1
+    assert TOOL_IN_FLIGHT.value(tool="metrics_test") == 0
+    assert TOOL_LATENCY.count(tool="metrics_test") == before + 2
+
+
+def test_cache_hit_ratio_is_exported():
+    cache = TTLCache(60, name="metrics_test_cache")
+    cache.get_or_set("k", lambda: 1)
+    cache.get_or_set("k", lambda: 2)
+    cache.get_or_set("k", lambda: 3)
+
+    assert named_caches()["metrics_test_cache"] is cache
+    assert (cache.hits, cache.misses) == (2, 1)
+    text = render_metrics()
+    assert 'options_api_cache_hits_total{cache="metrics_test_cache"} 2' in text
+    assert 'options_api_cache_hit_ratio{cache="metrics_test_cache"} 0.6666666666666666' in text
+
+
+def test_market_data_records_upstream_calls(monkeypatch, synthetic_chain):
+    calls_df, puts_df = synthetic_chain()
+
+    class FakeTicker:
+        def __init__(self, underlying):
+            self.options = ("2030-01-18",)
+
+        def option_chain(self, expiration):
+            return SimpleNamespace(calls=calls_df, puts=puts_df)
+
+    monkeypatch.setattr(market_data.yf, "Ticker", FakeTicker)
+    market_data._chain_cache.clear()
+    market_data._expirations_cache.clear()
+    before = UPSTREAM_REQUESTS.value(source="yfinance_chain")
+
+    for _ in range(3):
+        assert market_data.get_chain_frames("TEST", "2030-01-18")[0] is calls_df
+
+    assert UPSTREAM_REQUESTS.value(source="yfinance_chain") == before + 1
+    assert UPSTREAM_LATENCY.count(source="yfinance_chain") >= 1
+    assert 'options_api_cache_hits_total{cache="chain"}' in render_metrics()
+
+
+def test_track_upstream_counts_failures():
+    before = UPSTREAM_ERRORS.value(source="metrics_test")
+    with pytest.raises(ConnectionError):
+        with track_upstream("metrics_test"):
+            raise ConnectionError("timeout")
+    assert UPSTREAM_ERRORS.value(source="metrics_test") == before + 1
+
+
+def test_metrics_endpoint(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    monkeypatch.setitem(api_server.TOOL_MAP, "get_expirations", lambda **kwargs: {"count": 0})
+    client = TestClient(api_server.app)
+    client.post("/api/mcp/call-tool", json={"tool": "get_expirations", "arguments": {"underlying": "TEST"}})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'options_api_tool_requests_total{tool="get_expirations"}' in response.text
+    assert 'options_api_tool_duration_seconds_bucket{tool="get_expirations",le="+Inf"}' in response.text
@@ -0,0 +1,64 @@
+import time
+
+import numpy as np
+import pytest
+
+from Server.utils.bs import bs_price_vec
+from Server.utils.pnl_surface import compute_pnl_surface
+
+# Iron condor: long put 80, short put 90, short call 110, long call 120
+K = np.array([80.0, 90.0, 110.0, 120.0])
+IS_CALL = np.array([False, False, True, True])
+WEIGHT = np.array([1.0, -1.0, -1.0, 1.0])
+DAYS = np.array([45, 45, 45, 45])
+SIGMA = np.full(4, 0.25)
+R = np.full(4, 0.04)
+PREMIUM = bs_price_vec(100.0, K, DAYS / 365.0, R, SIGMA, IS_CALL)
+
+
+def _surface(**kwargs):
+    params = dict(
+        spot_range=np.linspace(60, 140, 200),
+        days_to_expiry=DAYS,
+        K=K,
+        r=R,
+        sigma=SIGMA,
+        is_call=IS_CALL,
+        weight=WEIGHT,
+        premium=PREMIUM,
+    )
+    params.update(kwargs)
+    return compute_pnl_surface(**params)
+
+
+def test_surface_shape_and_boundaries():
+    surface = _surface(num_dates=30, vol_shifts=[-0.05, -0.02, 0.0, 0.02, 0.05])
+    pnl = np.array(surface.pnl)
+
+    assert pnl.shape == (5, 30, 200)
+    assert surface.days_forward[0] == 0 and surface.days_forward[-1] == 45
+
+    # Hoy, sin shift de vol, el P&L en el spot actual es ~0 (sólo redondeo de la grilla)
+    spots = np.array(surface.spot_prices)
+    today = np.interp(100.0, spots, pnl[2, 0])
+    assert today == pytest.approx(0.0, abs=5.0)
+
+    # En el vencimiento el P&L es el intrínseco y no depende de la vol
+    intrinsic = np.where(IS_CALL[:, None], np.maximum(spots - K[:, None], 0), np.maximum(K[:, None] - spots, 0))
+    expected = (WEIGHT @ intrinsic - WEIGHT @ PREMIUM) * 100
+    for v in range(5):
+        assert np.allclose(pnl[v, -1], expected, atol=0.1)
+
+    # Short vega: más volatilidad empeora el P&L en el centro antes del vencimiento
+    center = np.argmin(np.abs(spots - 100))
+    assert pnl[0, 10, center] > pnl[2, 10, center] > pnl[4, 10, center]
+
+
+def test_surface_200x30x5_prices_under_100ms():
+    vol_shifts = [-0.1, -0.05, 0.0, 0.05, 0.1]
+    _surface(num_dates=30, vol_shifts=vol_shifts)  # calentamiento
+
+    start = time.perf_counter()
+    _surface(num_dates=30, vol_shifts=vol_shifts)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.1
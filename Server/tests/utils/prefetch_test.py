@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from Server.utils import market_data, prefetch, risk_free
+from Server.utils.prefetch import MARKET_TZ, PrefetchScheduler, market_open, next_delay
+
+
+def _ny(*args):
+    return datetime(*args, tzinfo=MARKET_TZ)
+
+
+def test_market_hours():
+    assert market_open(_ny(2024, 3, 4, 10, 0))          # lunes
+    assert not market_open(_ny(2024, 3, 4, 9, 29))
+    assert not market_open(_ny(2024, 3, 4, 16, 0))
+    assert not market_open(_ny(2024, 3, 9, 12, 0))      # sábado
+
+
+def test_next_delay_is_short_when_open_and_stops_at_the_opening():
+    assert next_delay(60, 1800, _ny(2024, 3, 4, 11, 0)) == 60
+    assert next_delay(60, 1800, _ny(2024, 3, 4, 20, 0)) == 1800
+    assert next_delay(60, 1800, _ny(2024, 3, 4, 9, 29, 50)) == 10
+    # Viernes después del cierre: la apertura es el lunes
+    assert next_delay(60, 10**6, _ny(2024, 3, 8, 16, 30)) == (2 * 24 + 17) * 3600
+
+
+@pytest.fixture
+def fake_market(monkeypatch, synthetic_chain):
+    expiration = (date.today() + timedelta(days=30)).isoformat()
+    calls, puts = synthetic_chain(expiration=expiration, t=30 / 365, strikes=range(60, 141, 2))
+    downloads = []
+
+    class FakeTicker:
+        def __init__(self, underlying):
+            self.options = (expiration,)
+            self.info = {"longName": "Test Corp"}
+            downloads.append("ticker")
+
+        def option_chain(self, expiration):
+            downloads.append("chain")
+            return SimpleNamespace(calls=calls, puts=puts)
+
+    monkeypatch.setattr(market_data.yf, "Ticker", FakeTicker)
+    monkeypatch.setattr(market_data, "get_spot_price", lambda underlying: 100.0)
+    monkeypatch.setattr(risk_free, "get_risk_free_curve", lambda: ([0.1, 1.0], [0.04, 0.04]))
+    caches = (market_data._spot_cache, market_data._expirations_cache, market_data._info_cache,
+              market_data._chain_cache, prefetch._precomputed)
+    for cache in caches:
+        cache.clear()
+    yield expiration, downloads
+    for cache in caches:
+        cache.clear()
+
+
+def test_watched_requests_are_served_from_hot_caches(fake_market):
+    from Server.core.tools.get_implied_distribution import compute_implied_density
+    from Server.core.tools.greeks import compute_greeks_chain
+
+    expiration, downloads = fake_market
+    scheduler = PrefetchScheduler(["TEST"], max_expirations=2)
+    assert scheduler.run_once(ttl_seconds=120) == {"TEST": None}
+    assert "chain" in downloads
+
+    downloads.clear()
+    greeks = compute_greeks_chain("TEST", expiration)
+    assert greeks.calls is prefetch._precomputed.get(("compute_greeks", ("TEST", expiration))).calls
+    density = compute_implied_density("TEST", expiration, 0.7, 1.3)
+    assert density is prefetch._precomputed.get(("implied_density", ("TEST", expiration, 0.7, 1.3)))
+    assert market_data.get_chain_frames("TEST", expiration)[0]["strike"].iloc[0] == 60.0
+    assert downloads == []
+
+    # Otro ticker no vigilado se calcula a pedido
+    assert prefetch.get_precomputed("compute_greeks", ("OTHER", expiration)) is None
+
+
+def test_failing_ticker_does_not_stop_the_cycle(fake_market, monkeypatch):
+    def broken(underlying):
+        if underlying == "BAD":
+            raise ConnectionError("yahoo caído")
+        return 100.0
+
+    monkeypatch.setattr(market_data, "get_spot_price", broken)
+    errors = PrefetchScheduler(["BAD", "TEST"]).run_once(ttl_seconds=120)
+    assert errors["BAD"].startswith("ConnectionError") and errors["TEST"] is None
+    assert prefetch.PREFETCH_ERRORS.value(underlying="BAD") >= 1
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import time
+
+import pytest
+
+from Server.utils import market_data, profiling
+
+
+class FakeTicker:
+    def __init__(self, underlying):
+        self.options = ("2030-01-18", "2030-02-15", f"2031-01-17-{underlying}")
+
+    def option_chain(self, expiration):
+        raise AssertionError("no debería pedirse la cadena")
+
+
+def slow_tool(underlying: str, delay: float = 0.03) -> dict:
+    expirations = market_data.get_expirations(underlying)
+    deadline = time.perf_counter() + delay
+    while time.perf_counter() < deadline:  # trabajo de CPU para que el muestreador lo vea
+        sum(i * i for i in range(1000))
+    return {"underlying": underlying, "count": len(expirations)}
+
+
+@pytest.fixture
+def profile_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("SLOW_CALL_PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("SLOW_CALL_PROFILE_MS", "10")
+    monkeypatch.setattr(market_data.yf, "Ticker", FakeTicker)
+    market_data._expirations_cache.clear()
+    yield tmp_path
+    market_data._expirations_cache.clear()
+
+
+def _call(tool, **kwargs):
+    with profiling.profile_call(tool, slow_tool, kwargs):
+        return slow_tool(**kwargs)
+
+
+def test_disabled_without_threshold(tmp_path, monkeypatch):
+    monkeypatch.setenv("SLOW_CALL_PROFILE_DIR", str(tmp_path))
+    monkeypatch.delenv("SLOW_CALL_PROFILE_MS", raising=False)
+    monkeypatch.setattr(market_data.yf, "Ticker", FakeTicker)
+
+    _call("slow_tool", underlying="OFF")
+    assert profiling.list_profiles() == []
+
+
+def test_fast_calls_are_not_saved(profile_env, monkeypatch):
+    monkeypatch.setenv("SLOW_CALL_PROFILE_MS", "10000")
+    _call("slow_tool", underlying="FAST", delay=0)
+    assert profiling.list_profiles() == []
+
+
+def test_save_failure_is_logged_and_tool_still_returns(profile_env, monkeypatch, caplog):
+    def broken_save(*args, **kwargs):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(profiling, "save_profile", broken_save)
+    with caplog.at_level("WARNING", logger="Server.utils.profiling"):
+        assert _call("slow_tool", underlying="FULL")["underlying"] == "FULL"
+    assert "No se pudo guardar el perfil de slow_tool: disco lleno" in caplog.text
+
+
+def test_slow_call_records_stacks_and_market_data(profile_env):
+    _call("slow_tool", underlying="TEST")
+
+    [path] = profiling.list_profiles()
+    record = profiling.load_profile(path)
+    assert record["tool"] == "slow_tool"
+    assert record["function"].endswith(":slow_tool")
+    assert record["arguments"] == {"underlying": "TEST"}
+    assert record["duration_ms"] >= 10 and record["error"] is None
+    assert record["samples"] > 0
+    assert any("slow_tool" in item["stack"] for item in record["stacks"])
+
+    [item] = record["market_data"]
+    assert (item["kind"], item["key"]) == ("expirations", ["TEST"])
+    assert os.path.exists(profile_env / "snapshots" / f"{item['snapshot_id']}.pkl")
+
+
+def test_replay_uses_recorded_data(profile_env, monkeypatch):
+    _call("slow_tool", underlying="TEST")
+    [path] = profiling.list_profiles()
+
+    def offline(underlying):
+        raise AssertionError("el replay no debe descargar datos")
+
+    monkeypatch.setattr(market_data.yf, "Ticker", offline)
+    market_data._expirations_cache.clear()
+    assert profiling.replay_profile(path) == {"underlying": "TEST", "count": 3}
+
+    # Datos que no están en el perfil no se descargan
+    record = profiling.load_profile(path)
+    with profiling.replay_market_data(record, str(profile_env)):
+        with pytest.raises(LookupError):
+            market_data.get_expirations("OTHER")
+
+
+def test_rotation_keeps_newest_and_drops_orphan_snapshots(profile_env, monkeypatch):
+    monkeypatch.setenv("SLOW_CALL_PROFILE_KEEP", "2")
+    for underlying in ("AAA", "AAA", "BBB"):
+        _call("slow_tool", underlying=underlying)
+
+    profiles = profiling.list_profiles()
+    assert len(profiles) == 2
+    underlyings = [profiling.load_profile(p)["arguments"]["underlying"] for p in profiles]
+    assert underlyings == ["AAA", "BBB"]
+
+    # El perfil de AAA que queda sigue usando el snapshot compartido con el borrado
+    assert len(os.listdir(profile_env / "snapshots")) == 2
+
+
+def test_call_tool_saves_profile(profile_env, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    monkeypatch.setitem(api_server.TOOL_MAP, "get_expirations", slow_tool)
+    client = TestClient(api_server.app)
+    response = client.post("/api/mcp/call-tool",
+                           json={"tool": "get_expirations", "arguments": {"underlying": "API"}})
+    assert response.json()["data"] == {"underlying": "API", "count": 3}
+
+    [path] = profiling.list_profiles()
+    with open(path, encoding="utf-8") as f:
+        record = json.load(f)
+    assert record["tool"] == "get_expirations"
+    assert record["arguments"] == {"underlying": "API"}
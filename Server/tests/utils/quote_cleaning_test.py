@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from Server.utils.quote_cleaning import (FLAG_DROPPED, FLAG_REPAIRED, FLAG_STALE, FLAG_WIDE_SPREAD,
+                                         clean_quotes)
+
+
+def test_clean_chain_keeps_every_quote(synthetic_chain):
+    calls_df, puts_df = synthetic_chain()
+    for df, is_call in ((calls_df, True), (puts_df, False)):
+        clean = clean_quotes(df, 100.0, 0.25, 0.04, is_call)
+        quoted = (df["bid"] > 0).to_numpy()
+        assert not np.any(clean.flags & FLAG_DROPPED)
+        assert np.allclose(clean.price[quoted], ((df["bid"] + df["ask"]) / 2)[quoted], atol=0.01)
+        assert clean.weight.max() == 1.0 and np.all(clean.weight[clean.valid] > 0)
+
+
+def test_butterfly_violations_are_repaired_or_dropped(synthetic_chain):
+    calls_df, _ = synthetic_chain()
+    calls_df = calls_df.copy()
+    strikes = calls_df["strike"].to_numpy()
+    rich, cheap, inside = (np.flatnonzero(strikes == k)[0] for k in (90.0, 115.0, 105.0))
+    calls_df.loc[rich, ["bid", "ask"]] = [14.0, 14.2]       # muy por encima de la cuerda
+    calls_df.loc[cheap, ["bid", "ask"]] = [0.2, 0.25]       # muy por debajo
+    calls_df.loc[inside, ["bid", "ask"]] = [3.6, 3.9]       # la cuerda cae dentro de su bid-ask
+
+    clean = clean_quotes(calls_df, 100.0, 0.25, 0.04, True)
+
+    assert clean.flags[rich] & FLAG_DROPPED and clean.flags[cheap] & FLAG_DROPPED
+    assert clean.flags[inside] & FLAG_REPAIRED and 3.6 <= clean.price[inside] <= 3.9
+    assert clean.weight[rich] == clean.weight[cheap] == 0.0
+
+    # La curva que queda es decreciente y convexa
+    k, p = strikes[clean.valid], clean.price[clean.valid]
+    slopes = np.diff(p) / np.diff(k)
+    assert np.all(slopes <= 1e-9) and np.all(np.diff(slopes) >= -0.01)
+
+
+def test_stale_last_prices_and_wide_spreads(synthetic_chain):
+    _, puts_df = synthetic_chain()
+    puts_df = puts_df.copy()
+    puts_df.loc[3, ["bid", "ask", "lastPrice"]] = [0.0, 0.0, 0.05]
+    puts_df.loc[3, "lastTradeDate"] = pd.Timestamp("2023-12-20 15:30", tz="UTC")
+    puts_df.loc[15, ["bid", "ask"]] = [10.0, 20.0]
+
+    clean = clean_quotes(puts_df, 100.0, 0.25, 0.04, False)
+
+    assert clean.flags[3] & FLAG_STALE and np.isnan(clean.price[3])
+    assert clean.flags[15] & FLAG_WIDE_SPREAD
+    assert clean.weight[15] < clean.weight[14] and clean.weight[15] < clean.weight[16]
+
+
+def test_prices_outside_arbitrage_bounds(synthetic_chain):
+    calls_df, _ = synthetic_chain()
+    calls_df = calls_df.copy()
+    calls_df.loc[0, ["bid", "ask"]] = [40.0, 41.0]           # debajo del intrínseco descontado (~50.5)
+    clean = clean_quotes(calls_df, 100.0, 0.25, 0.04, True)
+    assert clean.flags[0] & FLAG_DROPPED and np.isnan(clean.price[0])
+    assert clean.price[1] == pytest.approx(100.0 - 55.0 * np.exp(-0.04 * 0.25), abs=0.02)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import json
+
+import numpy as np
+import pytest
+
+from Server.model.options import Option_Chain
+from Server.utils.option_quote import frame_to_option_columns
+from Server.utils.pnl_surface import compute_pnl_surface
+from Server.utils.serialization import (
+    ARROW_STREAM_MEDIA_TYPE,
+    convert_to_dict,
+    encode_arrow,
+    split_tables,
+    wants_arrow,
+)
+
+
+def _chain(synthetic_chain):
+    calls_df, puts_df = synthetic_chain()
+    return Option_Chain(
+        underlying="TEST", long_name="Test Corp", currency="USD", expiration="2030-01-18",
+        as_of="2024-01-02", spot=100.0,
+        calls=frame_to_option_columns(calls_df), puts=frame_to_option_columns(puts_df),
+    )
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, False),
+    ("*/*", False),
+    ("application/json", False),
+    (ARROW_STREAM_MEDIA_TYPE, True),
+    (f"{ARROW_STREAM_MEDIA_TYPE}, application/json;q=0.5", True),
+    (f"application/json, {ARROW_STREAM_MEDIA_TYPE};q=0.5", False),
+    (f"{ARROW_STREAM_MEDIA_TYPE};q=0", False),
+])
+def test_wants_arrow(accept, expected):
+    assert wants_arrow(accept) is expected
+
+
+def test_split_tables_separates_columns_from_metadata(synthetic_chain):
+    chain = _chain(synthetic_chain)
+    tables, meta = split_tables(chain)
+
+    assert list(tables) == ["calls", "puts"]
+    assert tables["calls"] is chain.calls.columns
+    assert meta == {k: v for k, v in convert_to_dict(chain).items() if k not in ("calls", "puts")}
+
+
+def test_arrow_stream_roundtrip(synthetic_chain):
+    pa = pytest.importorskip("pyarrow")
+    chain = _chain(synthetic_chain)
+
+    table = pa.ipc.open_stream(encode_arrow(chain)).read_all()
+    metadata = table.schema.metadata
+
+    assert json.loads(metadata[b"tables"]) == ["calls", "puts"]
+    assert json.loads(metadata[b"meta"])["spot"] == 100.0
+    assert table.num_rows == len(chain.calls) + len(chain.puts)
+
+    is_call = np.asarray(table.column("table").to_pylist()) == "calls"
+    calls = table.filter(pa.array(is_call))
+    assert calls.column("strike").to_pylist() == chain.calls.columns["strike"].tolist()
+    assert calls.column("contractSymbol").to_pylist() == chain.calls.columns["contractSymbol"].tolist()
+
+
+def test_arrow_surface_keeps_grid_shape():
+    pa = pytest.importorskip("pyarrow")
+    surface = compute_pnl_surface(
+        spot_range=np.linspace(80.0, 120.0, 25), days_to_expiry=np.array([30.0]),
+        K=np.array([100.0]), r=np.array([0.04]), sigma=np.array([0.25]),
+        is_call=np.array([True]), weight=np.array([1.0]), premium=np.array([3.0]),
+        num_dates=5, vol_shifts=[-0.05, 0.0, 0.05],
+    )
+
+    table = pa.ipc.open_stream(encode_arrow(surface)).read_all()
+    meta = json.loads(table.schema.metadata[b"meta"])
+
+    assert meta["pnl_surface"]["spot_prices"] == surface.spot_prices
+    assert table.num_rows == 3 * 5
+    pnl = np.asarray(table.column("pnl").to_pylist()).reshape(3, 5, 25)
+    np.testing.assert_array_equal(pnl, np.asarray(surface.pnl))
+
+
+def test_call_tool_negotiates_format(monkeypatch, synthetic_chain):
+    pytest.importorskip("pyarrow")
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    chain = _chain(synthetic_chain)
+    monkeypatch.setitem(api_server.TOOL_MAP, "get_chain", lambda **kwargs: chain)
+    client = TestClient(api_server.app)
+    body = {"tool": "get_chain", "arguments": {"underlying": "TEST", "expiration": "2030-01-18"}}
+
+    default = client.post("/api/mcp/call-tool", json=body)
+    assert default.headers["content-type"] == "application/json"
+    assert default.json()["data"]["calls"] == chain.calls.to_records()
+
+    arrow = client.post("/api/mcp/call-tool", json=body, headers={"Accept": ARROW_STREAM_MEDIA_TYPE})
+    assert arrow.headers["content-type"] == ARROW_STREAM_MEDIA_TYPE
+    assert "Accept" in arrow.headers["vary"]
+    assert arrow.content == encode_arrow(chain)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from datetime import date
+
+import pytest
+
+from Server.model.options import ChainDelta, Greeks
+from Server.utils import snapshots
+from Server.utils.snapshots import SnapshotStore
+
+
+@pytest.fixture
+def fake_greeks(monkeypatch, synthetic_chain):
+    """compute_greeks_chain sobre una cadena sintética que el test puede modificar."""
+    from Server.core.tools import greeks as greeks_module
+
+    calls_df, puts_df = synthetic_chain(t=(date(2030, 1, 18) - date.today()).days / 365.0)
+    frames = {"calls": calls_df, "puts": puts_df}
+    monkeypatch.setattr(greeks_module, "get_spot", lambda underlying: 100.0)
+    monkeypatch.setattr(greeks_module, "get_expirations", lambda underlying: ("2030-01-18",))
+    monkeypatch.setattr(greeks_module, "get_chain_frames",
+                        lambda underlying, expiration: (frames["calls"], frames["puts"]))
+    monkeypatch.setattr(greeks_module, "get_risk_free_rate", lambda expiration: 0.04)
+    snapshots._store.clear()
+    yield lambda since=None: greeks_module.compute_greeks_chain("TEST", "2030-01-18", since=since), frames
+    snapshots._store.clear()
+
+
+def test_since_returns_only_changed_contracts(fake_greeks):
+    compute, frames = fake_greeks
+    full = compute()
+    assert isinstance(full, Greeks) and full.snapshot_token
+
+    # Sin cambios: mismo token y delta vacío
+    same = compute(since=full.snapshot_token)
+    assert isinstance(same, ChainDelta) and same.snapshot_token == full.snapshot_token
+    assert same.calls == {"added": [], "changed": [], "removed": []}
+
+    calls = frames["calls"].copy()
+    # Strike lejos del dinero: no entra en el ajuste del forward (utils/forward.py),
+    # que cambiaría las griegas de toda la cadena
+    moved = calls["contractSymbol"].iloc[3]
+    calls.loc[calls.index[3], ["bid", "ask"]] = calls.loc[calls.index[3], ["bid", "ask"]] * 1.2
+    gone = calls["contractSymbol"].iloc[-1]
+    frames["calls"] = calls.iloc[:-1]
+
+    delta = compute(since=full.snapshot_token)
+    assert delta.since == full.snapshot_token and delta.snapshot_token != full.snapshot_token
+    assert [row["contractSymbol"] for row in delta.calls["changed"]] == [moved]
+    assert delta.calls["removed"] == [gone] and delta.calls["added"] == []
+    assert delta.puts == {"added": [], "changed": [], "removed": []}
+
+
+def test_unknown_token_returns_the_full_result(fake_greeks):
+    compute, _ = fake_greeks
+    result = compute(since="no-existe")
+    assert isinstance(result, Greeks) and len(result.calls) > 0
+
+
+def test_store_is_bounded_per_key_and_in_keys():
+    store = SnapshotStore(ring_size=2, max_keys=2)
+    tokens = [store.record(("get_chain", "A", "2030-01-18"), Greeks("A", "2030-01-18", i, i)) for i in range(3)]
+    assert store.get(("get_chain", "A", "2030-01-18"), tokens[0]) is None
+    assert store.get(("get_chain", "A", "2030-01-18"), tokens[2]).calls == 2
+
+    store.record(("get_chain", "B", "2030-01-18"), Greeks("B", "2030-01-18", 0, 0))
+    store.record(("get_chain", "C", "2030-01-18"), Greeks("C", "2030-01-18", 0, 0))
+    assert store.get(("get_chain", "A", "2030-01-18"), tokens[2]) is None
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from Server.utils import market_data
+from Server.utils import strike_index
+from Server.utils.strike_index import StrikeIndex, find_contract, get_strike_index
+
+
+def test_locate_with_tolerance_on_unsorted_strikes():
+    index = StrikeIndex([105.0, 95.0, 100.0, 97.5, 110.0])
+    assert index.locate(100.0) == 2
+    assert index.locate(97.5 + 1e-9) == 3              # sin igualdad exacta de floats
+    assert index.locate(110.0000001) == 4
+    assert index.locate(101.0) is None
+    assert index.nearest(101.0, count=3) == [97.5, 100.0, 105.0]
+    assert index.nearest(1000.0, count=2) == [105.0, 110.0]
+
+
+def test_find_contract_suggests_nearest_strikes(synthetic_chain):
+    calls_df, _ = synthetic_chain()
+    row = find_contract("TEST", "2030-01-18", "call", 100.0 + 1e-7, calls_df)
+    assert row["strike"] == 100.0
+
+    with pytest.raises(ValueError, match=r"No existe una opción call con strike 101.5 .*\[90.0, 95.0, 100.0, 105.0, 110.0\]"):
+        find_contract("TEST", "2030-01-18", "call", 101.5, calls_df)
+
+
+def test_index_is_cached_per_chain_snapshot(synthetic_chain):
+    calls_df, puts_df = synthetic_chain()
+    market_data._chain_cache.set(("TEST", "2030-01-18"), (calls_df, puts_df))
+    try:
+        first = get_strike_index("TEST", "2030-01-18", "call", calls_df)
+        assert get_strike_index("TEST", "2030-01-18", "call", calls_df) is first
+        assert get_strike_index("TEST", "2030-01-18", "put", puts_df) is not first
+
+        # Cadena descargada de nuevo: índice nuevo
+        market_data._chain_cache.set(("TEST", "2030-01-18"), (calls_df, puts_df))
+        assert get_strike_index("TEST", "2030-01-18", "call", calls_df) is not first
+    finally:
+        market_data._chain_cache.clear()
+
+
+def test_refreshed_chain_does_not_reuse_an_index_of_another_snapshot(synthetic_chain):
+    old_calls, old_puts = synthetic_chain()
+    new_calls, new_puts = synthetic_chain(strikes=[100.0, 95.0, 105.0, 90.0, 110.0])
+    key = ("TEST", "2030-01-18")
+    market_data._chain_cache.set(key, (old_calls, old_puts))
+    try:
+        # Frames leídos antes de que el prefetch recargue la cadena
+        market_data._chain_cache.set(key, (new_calls, new_puts))
+        assert market_data.chain_version("TEST", "2030-01-18", old_calls) is None
+        assert find_contract("TEST", "2030-01-18", "call", 100.0, old_calls)["strike"] == 100.0
+        assert find_contract("TEST", "2030-01-18", "call", 100.0, new_calls)["strike"] == 100.0
+
+        # Índice del snapshot viejo guardado bajo la versión nueva: se detecta y se reconstruye
+        version = market_data.chain_version("TEST", "2030-01-18", new_calls)
+        strike_index._index_cache.set(("TEST", "2030-01-18", "call", version),
+                                      StrikeIndex(old_calls["strike"].to_numpy(dtype=float)))
+        for strike in (90.0, 95.0, 100.0, 105.0, 110.0):
+            assert find_contract("TEST", "2030-01-18", "call", strike, new_calls)["strike"] == strike
+    finally:
+        market_data._chain_cache.clear()
+        strike_index._index_cache.clear()
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+import pytest
+
+from Server.utils.tracing import current_trace, span, start_trace
+
+
+def test_span_is_noop_without_trace():
+    assert current_trace() is None
+    with span("orphan") as s:
+        assert s is None
+
+
+def test_nested_spans_and_timings():
+    with start_trace("tool", underlying="TEST") as trace:
+        with span("chain"):
+            with span("upstream:yfinance_chain"):
+                time.sleep(0.002)
+        with span("iv_solve", contracts=10):
+            pass
+
+    timings = trace.to_timings()
+    assert [(t["name"], t["depth"]) for t in timings] == [
+        ("tool", 0), ("chain", 1), ("upstream:yfinance_chain", 2), ("iv_solve", 1),
+    ]
+    assert timings[0]["underlying"] == "TEST"
+    assert timings[3]["contracts"] == 10
+    assert timings[1]["duration_ms"] >= timings[2]["duration_ms"] >= 2.0
+    assert timings[0]["duration_ms"] >= timings[1]["duration_ms"] + timings[3]["duration_ms"]
+    assert current_trace() is None
+
+    header = trace.server_timing()
+    assert header.startswith("tool;dur=")
+    assert "chain;dur=" in header and "iv_solve;dur=" in header
+    assert "upstream" not in header
+
+
+def test_trace_file_is_chrome_trace_format(tmp_path, monkeypatch):
+    path = tmp_path / "trace.json"
+    monkeypatch.setenv("TRACE_FILE", str(path))
+
+    for name in ("first", "second"):
+        with start_trace(name):
+            with span("phase"):
+                pass
+
+    # El ']' final es opcional en el formato; se agrega para parsear con json
+    text = path.read_text(encoding="utf-8").rstrip().rstrip(",") + "]"
+    events = json.loads(text)
+    assert [e["name"] for e in events] == ["first", "phase", "second", "phase"]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+    assert events[1]["ts"] >= events[0]["ts"]
+
+
+def test_pool_workers_nest_under_their_parent_span():
+    barrier = threading.Barrier(4)
+
+    def work(i):
+        with span("fetch", item=i):
+            barrier.wait(timeout=5)             # los cuatro spans abiertos a la vez
+            with span("upstream"):
+                pass
+        return threading.get_ident()
+
+    with start_trace("tool") as trace:
+        with span("chains"):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                futures = [pool.submit(copy_context().run, work, i) for i in range(4)]
+                workers = {future.result() for future in futures}
+        with span("serialize"):
+            pass
+
+    depths = {(t["name"], t["depth"]) for t in trace.to_timings()}
+    assert depths == {("tool", 0), ("chains", 1), ("fetch", 2), ("upstream", 3), ("serialize", 1)}
+    assert trace.server_timing().count(";dur=") == 3
+
+    tids = {e["name"]: set() for e in trace.chrome_events()}
+    for event in trace.chrome_events():
+        tids[event["name"]].add(event["tid"])
+    assert tids["fetch"] == tids["upstream"] == workers
+    assert tids["tool"] == tids["chains"] == {threading.get_ident()}
+
+
+def test_greeks_chain_records_phases(monkeypatch, synthetic_chain):
+    from Server.core.tools import greeks as greeks_module
+
+    calls_df, puts_df = synthetic_chain()
+    monkeypatch.setattr(greeks_module, "get_spot", lambda underlying: 100.0)
+    monkeypatch.setattr(greeks_module, "get_expirations", lambda underlying: ("2030-01-18",))
+    monkeypatch.setattr(greeks_module, "get_chain_frames", lambda underlying, expiration: (calls_df, puts_df))
+    monkeypatch.setattr(greeks_module, "get_risk_free_rate", lambda expiration: 0.04)
+
+    with start_trace("compute_greeks") as trace:
+        greeks_module.compute_greeks_chain("TEST", "2030-01-18")
+
+    names = [t["name"] for t in trace.to_timings()]
+    assert names[:5] == ["compute_greeks", "spot", "expirations", "risk_free_curve", "chain"]
+    assert names.count("iv_solve") == 2 and names.count("greeks") == 2
+
+
+def test_call_tool_returns_debug_timings(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    def fake_tool(**kwargs):
+        with span("chain"):
+            return {"ok": True}
+
+    monkeypatch.setitem(api_server.TOOL_MAP, "get_expirations", fake_tool)
+    client = TestClient(api_server.app)
+    body = {"tool": "get_expirations", "arguments": {"underlying": "TEST"}}
+
+    plain = client.post("/api/mcp/call-tool", json=body)
+    assert plain.json()["timings"] is None
+    assert "server-timing" not in plain.headers
+
+    debug = client.post("/api/mcp/call-tool", json={**body, "debug_timings": True})
+    names = [t["name"] for t in debug.json()["timings"]]
+    assert names == ["get_expirations", "chain", "serialize"]
+    assert "chain;dur=" in debug.headers["server-timing"]
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import time
+
+import pytest
+
+from Server.utils import market_data, upstream
+from Server.utils.upstream import CircuitBreaker, TokenBucket, Upstream, UpstreamUnavailable
+
+
+def test_token_bucket_allows_burst_then_waits():
+    bucket = TokenBucket(rate=20, burst=2)
+    assert bucket.acquire(0) and bucket.acquire(0)
+    assert not bucket.acquire(0)
+
+    start = time.perf_counter()
+    assert bucket.acquire(1)
+    assert time.perf_counter() - start >= 0.03
+
+
+def test_circuit_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker(failures=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()           # pedido de prueba
+    assert not breaker.allow()       # sólo uno a la vez
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_data_errors_do_not_trip_the_breaker():
+    source = Upstream("test", rate=100, burst=100, concurrency=2, failures=1, reset_seconds=60, wait_seconds=1)
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            with source.guard():
+                raise ValueError("ticker inválido")
+    assert source.breaker.state == "closed"
+
+    with pytest.raises(ConnectionError):
+        with source.guard():
+            raise ConnectionError("timeout")
+    with pytest.raises(UpstreamUnavailable) as exc:
+        with source.guard():
+            pass
+    assert exc.value.reason == "circuit_open" and exc.value.retry_after > 0
+
+
+def test_burst_is_bounded_and_completes():
+    source = Upstream("burst", rate=200, burst=5, concurrency=3, failures=5, reset_seconds=60, wait_seconds=5)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def call():
+        with source.guard():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(30)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] <= 3 and active[0] == 0
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    monkeypatch.setenv("UPSTREAM_YFINANCE_FAILURES", "2")
+    monkeypatch.setenv("UPSTREAM_YFINANCE_RESET_SECONDS", "60")
+    upstream.reset_upstreams()
+    market_data._spot_cache.clear()
+    calls = []
+
+    def spot(underlying):
+        calls.append(underlying)
+        if underlying.startswith("DOWN"):
+            raise ConnectionError("yahoo no responde")
+        return 100.0
+
+    monkeypatch.setattr(market_data, "get_spot_price", spot)
+    yield calls
+    upstream.reset_upstreams()
+    market_data._spot_cache.clear()
+
+
+def test_stale_value_is_served_when_the_source_fails(yahoo, monkeypatch):
+    assert market_data.get_spot("SPY") == 100.0
+    market_data._spot_cache.set("SPY", 99.0, ttl_seconds=-1)   # vencido
+
+    monkeypatch.setattr(market_data, "get_spot_price", lambda underlying: 1 / 0)
+    stale_before = market_data._spot_cache.stale_served
+    assert market_data.get_spot("SPY") == 99.0
+    assert market_data._spot_cache.stale_served == stale_before + 1
+
+
+def test_open_circuit_fails_fast_without_calling_yahoo(yahoo):
+    for name in ("DOWN1", "DOWN2"):
+        with pytest.raises(ConnectionError):
+            market_data.get_spot(name)
+    with pytest.raises(UpstreamUnavailable):
+        market_data.get_spot("SPY")
+    assert yahoo == ["DOWN1", "DOWN2"]
+
+
+def test_undecodable_responses_trip_the_breaker():
+    requests = pytest.importorskip("requests")
+    source = Upstream("test", rate=100, burst=100, concurrency=2, failures=2, reset_seconds=60, wait_seconds=1)
+    for error in (json.JSONDecodeError("Expecting value", "<html>", 0),
+                  requests.exceptions.JSONDecodeError("Expecting value", "Too Many Requests", 0)):
+        with pytest.raises(UpstreamUnavailable) as exc:
+            with source.guard():
+                raise error
+        assert exc.value.reason == "bad_response"
+    assert source.breaker.state == "open" and exc.value.retry_after > 1
+
+
+def test_throttled_yahoo_response_returns_503(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    def throttled(**kwargs):
+        with upstream.upstream_call("yfinance_options"):
+            raise json.JSONDecodeError("Expecting value", "Too Many Requests", 0)
+
+    monkeypatch.setitem(api_server.TOOL_MAP, "get_expirations", throttled)
+    response = TestClient(api_server.app).post(
+        "/api/mcp/call-tool", json={"tool": "get_expirations", "arguments": {"underlying": "SPY"}})
+    assert response.status_code == 503 and "retry-after" in response.headers
+
+
+def test_call_tool_returns_503_with_retry_after(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    def unavailable(**kwargs):
+        raise UpstreamUnavailable("yfinance", "circuit_open", 12.4)
+
+    monkeypatch.setitem(api_server.TOOL_MAP, "get_expirations", unavailable)
+    response = TestClient(api_server.app).post(
+        "/api/mcp/call-tool", json={"tool": "get_expirations", "arguments": {"underlying": "SPY"}})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "12"
+
+
+def test_tool_calls_do_not_block_the_event_loop(monkeypatch):
+    import asyncio
+
+    import httpx
+
+    import api_server
+
+    def slow(**kwargs):
+        time.sleep(0.5)
+        return {"count": 0}
+
+    monkeypatch.setitem(api_server.TOOL_MAP, "get_expirations", slow)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=api_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            call = lambda: client.post("/api/mcp/call-tool",
+                                       json={"tool": "get_expirations", "arguments": {"underlying": "SPY"}})
+            start = time.perf_counter()
+            in_flight = asyncio.ensure_future(asyncio.gather(*(call() for _ in range(4))))
+            await asyncio.sleep(0.05)
+            metrics_start = time.perf_counter()
+            metrics = await client.get("/metrics")
+            metrics_elapsed = time.perf_counter() - metrics_start
+            responses = await in_flight
+            return responses, metrics, metrics_elapsed, time.perf_counter() - start
+
+    responses, metrics, metrics_elapsed, elapsed = asyncio.run(scenario())
+    assert all(response.status_code == 200 for response in responses)
+    assert metrics.status_code == 200 and metrics_elapsed < 0.3
+    # Las cuatro llamadas se superponen en lugar de correr en serie (2 s)
+    assert elapsed < 1.2
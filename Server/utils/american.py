@@ -0,0 +1,183 @@
+"""
+Valuación de opciones americanas con un árbol binomial (Cox-Ross-Rubinstein).
+
+Las opciones sobre acciones de EE.UU. que devuelve yfinance son americanas:
+con Black-Scholes las puts muy ITM suelen valer menos que su valor
+intrínseco y el solver de IV no converge. Este módulo es la alternativa
+`model="american"` de utils/bs.py:
+
+- `american_price_vec`: precio de todos los contratos de una cadena a la vez.
+  Todos comparten la misma grilla temporal (`steps` pasos hasta su
+  vencimiento); la inducción hacia atrás recorre los pasos una sola vez
+  operando sobre una matriz (contratos × nodos).
+- `american_implied_volatility_vec`: IV por Newton con bracket (el precio
+  americano es monótono en sigma) que arranca de la IV europea: la
+  pendiente es la vega Black-Scholes y, si el paso sale del bracket, se
+  biseca. Itera sólo sobre los contratos sin converger.
+- `american_greeks_vec`: delta, gamma y theta salen de los nodos del propio
+  árbol; vega y rho, de diferencias centradas.
+
+Las unidades coinciden con `compute_greeks_vec` (theta por día; vega y rho
+por unidad de volatilidad y de tasa). `q` es el rendimiento por dividendos
+continuo. La cantidad de pasos se configura con `AMERICAN_STEPS` (default 100).
+"""
+
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .bs import bs_vega_vec, implied_volatility_vec
+
+AMERICAN_STEPS = int(os.getenv("AMERICAN_STEPS", "100"))
+
+# Volatilidades extremas del bracket del solver de IV
+_SIGMA_LO, _SIGMA_HI = 1e-3, 5.0
+
+
+def _lattice(S, K, t, r, sigma, is_call, q, steps: int, keep_nodes: bool = False
+             ) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Inducción hacia atrás de un árbol CRR para cada contrato.
+
+    Returns:
+        (precio, valores del paso 1, valores del paso 2); los dos últimos
+        sólo con `keep_nodes=True` (para delta, gamma y theta).
+    """
+    S, K, t, r, sigma, q = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (S, K, t, r, sigma, q)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), S.shape)
+    S, K, t, r, sigma, q, is_call = (a.ravel()[:, None] for a in (S, K, t, r, sigma, q, is_call))
+    sign = np.where(is_call, 1.0, -1.0)
+
+    dt = t / steps
+    step_vol = sigma * np.sqrt(dt)
+    u = np.exp(step_vol)
+    disc = np.exp(-r * dt)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.clip((np.exp((r - q) * dt) - 1 / u) / (u - 1 / u), 0.0, 1.0)
+
+    j = np.arange(steps + 1, dtype=float)
+    nodes = S * np.exp(step_vol * (2 * j - steps))
+    values = np.maximum(sign * (nodes - K), 0.0)
+    up_p, down_p = disc * p, disc * (1 - p)
+    step1 = step2 = None
+    for i in range(steps - 1, -1, -1):
+        # Árbol recombinante: el nodo j del paso i es el nodo j del paso i+1 por u
+        nodes = nodes[:, :i + 1] * u
+        continuation = up_p * values[:, 1:i + 2] + down_p * values[:, :i + 1]
+        values = np.maximum(continuation, sign * (nodes - K))
+        if keep_nodes and i == 2:
+            step2 = values
+        elif keep_nodes and i == 1:
+            step1 = values
+    return values[:, 0], step1, step2
+
+
+def american_price_vec(S, K, t, r, sigma, is_call, q=0.0, steps: int = AMERICAN_STEPS) -> np.ndarray:
+    """Precio americano vectorizado (árbol CRR) para calls y puts."""
+    shape = np.broadcast_shapes(*(np.shape(a) for a in (S, K, t, r, sigma, is_call, q)))
+    price, _, _ = _lattice(S, K, t, r, sigma, is_call, q, steps)
+    return price.reshape(shape)
+
+
+def american_implied_volatility_vec(
+    S, K, t, r, price, is_call,
+    q=0.0,
+    sigma=0.3,
+    tol=1e-4,
+    max_iter=50,
+    steps: int = AMERICAN_STEPS,
+) -> np.ndarray:
+    """
+    Volatilidad implícita americana resolviendo todos los contratos a la vez.
+
+    `tol` es el error de precio aceptado; el default (1e-4) queda muy por
+    debajo del tick de cotización y del error de discretización del árbol.
+
+    Devuelve NaN donde el precio no está entre los precios del árbol con la
+    volatilidad mínima y máxima (por ejemplo, por debajo del valor
+    intrínseco), o si el precio es inválido.
+    """
+    S, K, t, r, price, q = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (S, K, t, r, price, q)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), S.shape)
+    S, K, t, r, price, q, is_call = (a.ravel() for a in (S, K, t, r, price, q, is_call))
+    result = np.full(S.shape, np.nan)
+
+    active = np.isfinite(price) & (price > 0) & (t > 0)
+    idx = np.flatnonzero(active)
+    if idx.size == 0:
+        return result.reshape(np.shape(price))
+
+    bounds = american_price_vec(
+        np.repeat(S[idx], 2), np.repeat(K[idx], 2), np.repeat(t[idx], 2), np.repeat(r[idx], 2),
+        np.tile([_SIGMA_LO, _SIGMA_HI], idx.size), np.repeat(is_call[idx], 2), np.repeat(q[idx], 2), steps,
+    ).reshape(-1, 2)
+    inside = (price[idx] >= bounds[:, 0] - tol) & (price[idx] <= bounds[:, 1])
+    idx = idx[inside]
+    lo = np.full(idx.size, _SIGMA_LO)
+    hi = np.full(idx.size, _SIGMA_HI)
+    # Punto de partida: la IV europea (casi igual salvo con ejercicio anticipado)
+    guess = implied_volatility_vec(S[idx], K[idx], t[idx], r[idx], price[idx], is_call[idx], q[idx], sigma=sigma)
+    sig = np.where(np.isfinite(guess) & (guess > lo) & (guess < hi), guess, float(sigma))
+    prev_error = np.full(idx.size, np.inf)
+
+    for _ in range(max_iter):
+        if idx.size == 0:
+            break
+        est = american_price_vec(S[idx], K[idx], t[idx], r[idx], sig, is_call[idx], q[idx], steps)
+        diff = price[idx] - est
+        converged = (np.abs(diff) < tol) | (hi - lo < tol)
+        result[idx[converged]] = sig[converged]
+
+        lo = np.where(diff > 0, sig, lo)
+        hi = np.where(diff > 0, hi, sig)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = sig + diff / bs_vega_vec(S[idx], K[idx], t[idx], r[idx], sig, q[idx])
+        # Se biseca si Newton sale del bracket o no redujo el error a la mitad
+        error = np.abs(diff)
+        use_newton = np.isfinite(newton) & (newton > lo) & (newton < hi) & (error < 0.5 * prev_error)
+        sig = np.where(use_newton, newton, 0.5 * (lo + hi))
+
+        keep = ~converged
+        idx, lo, hi, sig, prev_error = idx[keep], lo[keep], hi[keep], sig[keep], error[keep]
+
+    return result.reshape(np.shape(price))
+
+
+def american_greeks_vec(S, K, t, r, sigma, is_call, q=0.0, steps: int = AMERICAN_STEPS) -> Dict[str, np.ndarray]:
+    """
+    Griegas americanas vectorizadas.
+
+    Devuelve un diccionario de arrays con delta, gamma, theta (por día),
+    vega y rho, en las mismas unidades que `compute_greeks_vec`.
+    """
+    shape = np.broadcast_shapes(*(np.shape(a) for a in (S, K, t, r, sigma, is_call, q)))
+    S, K, t, r, sigma, q = (np.broadcast_to(np.asarray(a, dtype=float), shape).ravel() for a in (S, K, t, r, sigma, q))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), shape).ravel()
+
+    price, step1, step2 = _lattice(S, K, t, r, sigma, is_call, q, steps, keep_nodes=True)
+    dt = t / steps
+    u = np.exp(sigma * np.sqrt(dt))
+    up, down, up2, down2 = S * u, S / u, S * u * u, S / (u * u)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = (step1[:, 1] - step1[:, 0]) / (up - down)
+        gamma = ((step2[:, 2] - step2[:, 1]) / (up2 - S) - (step2[:, 1] - step2[:, 0]) / (S - down2)) \
+            / (0.5 * (up2 - down2))
+        theta = (step2[:, 1] - price) / (2 * dt) / 365.0
+
+    # Vega y rho por diferencias centradas: los cuatro árboles en una sola pasada
+    # (pasos grandes: el precio del árbol oscila con sigma a escala fina)
+    h_sigma, h_rate = 1e-2, 1e-3
+    n = S.size
+    bumped = _lattice(
+        np.tile(S, 4), np.tile(K, 4), np.tile(t, 4),
+        np.concatenate([r, r, r + h_rate, r - h_rate]),
+        np.concatenate([sigma + h_sigma, sigma - h_sigma, sigma, sigma]),
+        np.tile(is_call, 4), np.tile(q, 4), steps,
+    )[0]
+    vega = (bumped[:n] - bumped[n:2 * n]) / (2 * h_sigma)
+    rho = (bumped[2 * n:3 * n] - bumped[3 * n:]) / (2 * h_rate)
+
+    return {name: values.reshape(shape) for name, values in
+            (("delta", delta), ("gamma", gamma), ("theta", theta), ("vega", vega), ("rho", rho))}
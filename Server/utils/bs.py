@@ -1,5 +1,6 @@
 from math import log, sqrt, exp
-from scipy.stats import norm
+import numpy as np
+from scipy.special import ndtr
 from ..model.options import OptionGreeks
  
 def d1(S: float, K: float, t: float, r: float, sigma: float) -> float:
@@ -11,11 +12,11 @@ def _d2(S: float, K: float, t: float, r: float, sigma: float) -> float:
 
 def N_d1(d1: float) -> float:
     """Función de distribución acumulativa normal para d1."""
-    return norm.cdf(d1)
+    return ndtr(d1)
 
 def N_d2(d2: float) -> float:
     """Función de distribución acumulativa normal para d2."""
-    return norm.cdf(d2)
+    return ndtr(d2)
 
 def bs_price_sigma(S: float, K: float, t: float, r: float, option_type: str, sigma: float) -> float:
     
@@ -26,7 +27,7 @@ def bs_price_sigma(S: float, K: float, t: float, r: float, option_type: str, sig
     
 def black_scholes_vega(S,K,t,r,sigma) -> float:
     """Calcula la Vega de una opción utilizando el modelo Black-Scholes."""
-    return S * norm.pdf(d1(S, K, t, r, sigma)) * sqrt(t) 
+    return S * _norm_pdf(d1(S, K, t, r, sigma)) * sqrt(t) 
 
 def implied_volatility(
     S, K, t, r, Price, option_type,
@@ -62,7 +63,7 @@ def black_scholes_delta(S, K, t, r, sigma, option_type) -> float:
 def black_scholes_gamma(S, K, t, r, sigma) -> float:
     """Calcula la Gamma de una opción utilizando el modelo Black-Scholes."""
     d_1 = d1(S, K, t, r, sigma)
-    return norm.pdf(d_1) / (S * sigma * sqrt(t))
+    return _norm_pdf(d_1) / (S * sigma * sqrt(t))
 
 def black_scholes_theta(S: float, K: float, t: float, r: float, sigma: float, option_type: str) -> float:
     """Calcula la Theta de una opción (por día) utilizando el modelo Black-Scholes."""
@@ -73,7 +74,7 @@ def black_scholes_theta(S: float, K: float, t: float, r: float, sigma: float, op
     d_1 = d1(S, K, t, r, sigma)
     d_2 = _d2(S, K, t, r, sigma)
 
-    first_term = -(S * norm.pdf(d_1) * sigma) / (2 * sqrt(t))
+    first_term = -(S * _norm_pdf(d_1) * sigma) / (2 * sqrt(t))
 
     if opt == "call":
         theta = first_term - r * K * exp(-r * t) * N_d2(d_2)
@@ -123,4 +124,138 @@ def compute_greeks(
         vega=round(vega, nd),
         rho=round(rho, nd),
     )
-    
\ No newline at end of file
+
+
+# ---------------------------------------------------------------------------
+# Versión vectorizada (NumPy) del modelo Black-Scholes.
+#
+# Todas las funciones aceptan escalares o arrays que se puedan broadcastear
+# entre sí; `is_call` es un array booleano (True = call, False = put).
+# ---------------------------------------------------------------------------
+
+_SQRT_2PI = np.sqrt(2.0 * np.pi)
+
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def _d1_d2_vec(S, K, t, r, sigma, q=0.0):
+    S, K, t, r, sigma, q = (np.asarray(a, dtype=float) for a in (S, K, t, r, sigma, q))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_sqrt_t = sigma * np.sqrt(t)
+        d_1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * t) / vol_sqrt_t
+    return d_1, d_1 - vol_sqrt_t
+
+
+def bs_price_vec(S, K, t, r, sigma, is_call, q=0.0) -> np.ndarray:
+    """Precio Black-Scholes vectorizado para calls y puts (`q`: rendimiento por dividendos continuo)."""
+    d_1, d_2 = _d1_d2_vec(S, K, t, r, sigma, q)
+    S = np.asarray(S, dtype=float) * np.exp(-np.asarray(q) * np.asarray(t))
+    disc_K = np.asarray(K, dtype=float) * np.exp(-np.asarray(r) * np.asarray(t))
+    call = S * ndtr(d_1) - disc_K * ndtr(d_2)
+    put = disc_K * ndtr(-d_2) - S * ndtr(-d_1)
+    return np.where(is_call, call, put)
+
+
+def bs_vega_vec(S, K, t, r, sigma, q=0.0) -> np.ndarray:
+    """Vega Black-Scholes vectorizada (misma escala que `black_scholes_vega`)."""
+    d_1, _ = _d1_d2_vec(S, K, t, r, sigma, q)
+    return np.asarray(S, dtype=float) * np.exp(-np.asarray(q) * np.asarray(t)) * _norm_pdf(d_1) * np.sqrt(t)
+
+
+def bs_gamma_vec(S, K, t, r, sigma, q=0.0) -> np.ndarray:
+    """Gamma Black-Scholes vectorizada (sin calcular las demás griegas)."""
+    d_1, _ = _d1_d2_vec(S, K, t, r, sigma, q)
+    S, t, sigma = (np.asarray(a, dtype=float) for a in (S, t, sigma))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.exp(-np.asarray(q) * t) * _norm_pdf(d_1) / (S * sigma * np.sqrt(t))
+
+
+def bs_vanna_vec(S, K, t, r, sigma, q=0.0) -> np.ndarray:
+    """Vanna Black-Scholes vectorizada: d(delta)/d(sigma), igual para calls y puts."""
+    d_1, d_2 = _d1_d2_vec(S, K, t, r, sigma, q)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return -np.exp(-np.asarray(q) * np.asarray(t)) * _norm_pdf(d_1) * d_2 / np.asarray(sigma, dtype=float)
+
+
+def implied_volatility_vec(
+    S, K, t, r, price, is_call,
+    q=0.0,
+    sigma=0.2,
+    tol=1e-6,
+    max_iter=100,
+) -> np.ndarray:
+    """
+    Volatilidad implícita por Newton-Raphson resolviendo todos los contratos a la vez.
+
+    Replica la lógica de `implied_volatility`, pero itera sólo sobre los
+    contratos que todavía no convergieron. Devuelve NaN donde el solver no
+    converge (vega degenerada, precio inválido o sigma no positiva).
+    """
+    S, K, t, r, price, q = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (S, K, t, r, price, q)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), S.shape)
+
+    sig = np.full(S.shape, float(sigma))
+    result = np.full(S.shape, np.nan)
+    active = np.isfinite(price) & (price > 0) & (t > 0)
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        s_i = sig.flat[idx]
+        est = bs_price_vec(S.flat[idx], K.flat[idx], t.flat[idx], r.flat[idx], s_i, is_call.flat[idx], q.flat[idx])
+        vega = bs_vega_vec(S.flat[idx], K.flat[idx], t.flat[idx], r.flat[idx], s_i, q.flat[idx])
+        diff = price.flat[idx] - est
+
+        converged = np.abs(diff) < tol
+        result.flat[idx[converged]] = s_i[converged]
+
+        stalled = ~converged & ~(vega >= 1e-10)
+        new_sig = s_i + diff / np.where(stalled, 1.0, vega)
+        sig.flat[idx] = new_sig
+
+        done = converged | stalled | ~np.isfinite(new_sig)
+        active.flat[idx[done]] = False
+
+    result[result <= 0] = np.nan
+    return result
+
+
+def compute_greeks_vec(S, K, t, r, sigma, is_call, q=0.0) -> dict:
+    """
+    Griegas Black-Scholes vectorizadas.
+
+    Devuelve un diccionario de arrays con delta, gamma, theta (por día),
+    vega y rho, en las mismas unidades que `compute_greeks`. Con `q` (rendimiento
+    por dividendos continuo) son las griegas de Black-Scholes-Merton.
+    """
+    d_1, d_2 = _d1_d2_vec(S, K, t, r, sigma, q)
+    S, K, t, r, sigma, q = (np.asarray(a, dtype=float) for a in (S, K, t, r, sigma, q))
+    sqrt_t = np.sqrt(t)
+    pdf_d1 = _norm_pdf(d_1)
+    disc_K = K * np.exp(-r * t)
+    div_disc = np.exp(-q * t)
+    disc_S = S * div_disc
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = div_disc * pdf_d1 / (S * sigma * sqrt_t)
+        first_term = -(disc_S * pdf_d1 * sigma) / (2 * sqrt_t)
+
+    delta = div_disc * np.where(is_call, ndtr(d_1), ndtr(d_1) - 1)
+    theta = np.where(
+        is_call,
+        first_term - r * disc_K * ndtr(d_2) + q * disc_S * ndtr(d_1),
+        first_term + r * disc_K * ndtr(-d_2) - q * disc_S * ndtr(-d_1),
+    ) / 365.0
+    vega = disc_S * pdf_d1 * sqrt_t
+    rho = np.where(is_call, K * t * np.exp(-r * t) * ndtr(d_2), -K * t * np.exp(-r * t) * ndtr(-d_2))
+
+    return {
+        "delta": delta,
+        "gamma": gamma,
+        "theta": theta,
+        "vega": vega,
+        "rho": rho,
+    }
@@ -0,0 +1,131 @@
+import itertools
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Cachés con nombre, para exportar sus estadísticas (ver utils/metrics.py)
+_named_caches: "weakref.WeakValueDictionary[str, TTLCache]" = weakref.WeakValueDictionary()
+
+# Número de versión global: cada `set` de cualquier caché toma el siguiente
+_versions = itertools.count(1)
+
+
+class TTLCache:
+    """
+    Caché en memoria con expiración por tiempo (TTL) y desalojo LRU.
+
+    Es thread-safe: el servidor HTTP y el servidor MCP pueden consultarla
+    desde varios hilos a la vez.
+
+    Lleva la cuenta de aciertos (`hits`) y fallos (`misses`) de `get`; si se
+    le da un `name`, aparece en `named_caches()` y en las métricas.
+
+    `set` acepta un TTL propio por entrada (por ejemplo, para que el prefetch
+    deje valores vigentes hasta su próxima actualización). Las entradas
+    vencidas se conservan hasta que el LRU las desaloja, para poder servirlas
+    si la fuente falla (`get_or_set(..., serve_stale=True)`).
+
+    Cada entrada guarda un número de versión que cambia en cada `set`
+    (`version(key)`): permite saber si un valor se volvió a cargar sin
+    comparar su contenido (ver utils/etag.py).
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 256, name: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        # key -> (vencimiento en time.monotonic(), valor, versión)
+        self._data: "OrderedDict[Hashable, tuple[float, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if name is not None:
+            _named_caches[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Si hay un valor vigente para `key` (no cuenta como acierto ni fallo)."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and time.monotonic() <= entry[0]
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Devuelve el valor vigente para `key` o `default` si no existe o expiró."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or time.monotonic() > entry[0]:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Guarda `value` por `ttl_seconds` (por defecto, el TTL de la caché)."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value, next(_versions))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any], serve_stale: bool = False) -> Any:
+        """
+        Devuelve el valor cacheado o lo calcula con `loader` y lo guarda.
+
+        Con `serve_stale=True`, si `loader` falla y queda un valor vencido
+        para `key`, devuelve ese valor en lugar de propagar el error.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            try:
+                value = loader()
+            except Exception:
+                if not serve_stale:
+                    raise
+                with self._lock:
+                    entry = self._data.get(key)
+                    if entry is None:
+                        raise
+                    self.stale_served += 1
+                    return entry[1]
+            self.set(key, value)
+        return value
+
+    def version(self, key: Hashable) -> Optional[int]:
+        """Versión del valor guardado para `key` (vigente o vencido), o None si no hay."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry[2] if entry is not None else None
+
+    def version_of(self, key: Hashable, value: Any) -> Optional[int]:
+        """
+        Versión de `key` si el valor guardado es `value` (el mismo objeto), o None.
+
+        Sirve para anotar la versión de un valor ya leído: si se volvió a
+        cargar entre la lectura y esta llamada, la versión nueva no lo describe.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            return entry[2] if entry is not None and entry[1] is value else None
+
+    def peek(self, key: Hashable) -> Optional[Tuple[Any, int]]:
+        """(valor, versión) guardados para `key` en una sola lectura, sin contar acierto ni fallo."""
+        with self._lock:
+            entry = self._data.get(key)
+            return (entry[1], entry[2]) if entry is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+def named_caches() -> Dict[str, TTLCache]:
+    """Cachés registradas con nombre (nombre -> caché)."""
+    return dict(_named_caches)
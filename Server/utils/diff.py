@@ -0,0 +1,85 @@
+"""
+Diferencias por contrato entre dos resultados de cadena o griegas.
+
+Trabaja sobre resultados ya convertidos a JSON (`convert_to_dict`): campos
+escalares (spot, as_of...) más las tablas `calls` y `puts`, con un contrato
+por fila identificado por `contractSymbol`.
+
+    diff = diff_result(anterior, actual)
+    # {"fields": {"spot": 101.2},
+    #  "calls": {"added": [...], "changed": [...], "removed": ["SPY250117C00500000"]},
+    #  "puts":  {...}}
+    apply_diff(anterior, diff) == actual
+
+Las filas agregadas o modificadas viajan completas; las eliminadas sólo por
+su `contractSymbol`.
+"""
+
+import math
+from typing import Any, Dict, List
+
+TABLES = ("calls", "puts")
+ROW_KEY = "contractSymbol"
+
+
+def _same(a: Any, b: Any) -> bool:
+    """Igualdad que considera iguales a dos NaN."""
+    if a == b:
+        return True
+    return isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b)
+
+
+def _same_row(a: dict, b: dict) -> bool:
+    return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+
+
+def diff_rows(old: List[dict], new: List[dict], key: str = ROW_KEY) -> Dict[str, list]:
+    """Filas agregadas, modificadas (completas) y claves eliminadas de `old` a `new`."""
+    old_by_key = {row[key]: row for row in old}
+    new_keys = set()
+    added, changed = [], []
+    for row in new:
+        new_keys.add(row[key])
+        previous = old_by_key.get(row[key])
+        if previous is None:
+            added.append(row)
+        elif not _same_row(previous, row):
+            changed.append(row)
+    removed = [k for k in old_by_key if k not in new_keys]
+    return {"added": added, "changed": changed, "removed": removed}
+
+
+def diff_result(old: dict, new: dict) -> dict:
+    """Campos escalares nuevos o distintos y diferencias por tabla entre dos resultados."""
+    fields = {k: v for k, v in new.items() if k not in TABLES and not (k in old and _same(old[k], v))}
+    diff: Dict[str, Any] = {"fields": fields}
+    for table in TABLES:
+        if table in new:
+            diff[table] = diff_rows(old.get(table, []), new[table])
+    return diff
+
+
+def is_empty(diff: dict) -> bool:
+    """Si la diferencia no tiene cambios."""
+    return not diff["fields"] and not any(
+        diff[t]["added"] or diff[t]["changed"] or diff[t]["removed"] for t in TABLES if t in diff
+    )
+
+
+def apply_diff(result: dict, diff: dict, key: str = ROW_KEY) -> dict:
+    """
+    Aplica `diff` sobre `result` (sin modificarlo) y devuelve el resultado nuevo.
+
+    Las filas quedan ordenadas por strike, como las devuelven las tools.
+    """
+    updated = {**result, **diff["fields"]}
+    for table in TABLES:
+        if table not in diff:
+            continue
+        rows = {row[key]: row for row in result.get(table, [])}
+        for k in diff[table]["removed"]:
+            rows.pop(k, None)
+        for row in diff[table]["added"] + diff[table]["changed"]:
+            rows[row[key]] = row
+        updated[table] = sorted(rows.values(), key=lambda row: (row.get("strike", 0), row[key]))
+    return updated
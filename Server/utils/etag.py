@@ -0,0 +1,70 @@
+"""
+ETag de resultados de tools para pedidos condicionales (`If-None-Match`).
+
+El ETag combina la clave del pedido (tool, argumentos y formato de la
+respuesta) con el snapshot de mercado que usó el cálculo: la versión de
+cada dato de `market_data`, `risk_free` y del prefetch leído durante la
+llamada (ver `TTLCache.version`), más la fecha del día (los resultados
+dependen de `date.today()`).
+
+Mientras ningún dato se vuelva a descargar el ETag no cambia, y el
+servidor puede responder 304 sin serializar el resultado. Si la versión de
+algún dato leído no se conoce (se recargó mientras se leía), no hay ETag:
+un ETag que nombra un snapshot que el cuerpo no contiene fijaría datos
+viejos en el cliente con 304 equivocados.
+
+    with market_snapshot() as reads:
+        result = tool(**args)
+    etag = compute_etag(tool_name, args, "json", reads)
+    if etag is not None and etag_matches(request_if_none_match, etag):
+        ...  # 304
+"""
+
+import hashlib
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+from typing import Any, Dict, Hashable, Iterator, Optional, Tuple
+
+MarketReads = Dict[Tuple[str, Hashable], Optional[int]]
+
+_reads: ContextVar[Optional[MarketReads]] = ContextVar("market_reads", default=None)
+
+
+@contextmanager
+def market_snapshot() -> Iterator[MarketReads]:
+    """Registra las versiones de los datos de mercado leídos dentro del bloque."""
+    reads: MarketReads = {}
+    token = _reads.set(reads)
+    try:
+        yield reads
+    finally:
+        _reads.reset(token)
+
+
+def note_market_read(kind: str, key: Hashable, version: Optional[int]) -> None:
+    """Anota que se leyó `key` de tipo `kind` en la versión `version` (fuera de un snapshot no hace nada)."""
+    reads = _reads.get()
+    if reads is not None:
+        reads[(kind, key)] = version
+
+
+def compute_etag(tool: str, args: Dict[str, Any], variant: str, reads: MarketReads) -> Optional[str]:
+    """ETag fuerte (entre comillas) del pedido y el snapshot de mercado que usó, o None si no se conoce el snapshot."""
+    if any(version is None for version in reads.values()):
+        return None
+    payload = json.dumps(
+        [tool, args, variant, date.today().isoformat(), sorted((repr(k), v) for k, v in reads.items())],
+        sort_keys=True,
+        default=str,
+    )
+    return '"' + hashlib.sha256(payload.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Si el header `If-None-Match` incluye `etag` (comparación débil, como pide RFC 9110)."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
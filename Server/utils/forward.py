@@ -0,0 +1,122 @@
+"""
+Forward y rendimiento por dividendos implícitos en la cadena de opciones.
+
+Por paridad put-call, para cada strike con call y put cotizados:
+
+    C - P = D * F - D * K
+
+así que una regresión de C - P contra K en un vencimiento recupera el
+factor de descuento D (pendiente) y el forward F (ordenada / D). Con el
+forward, el precio Black-Scholes-Merton D * (F N(d1) - K N(d2)) ya no depende
+del spot: `carry(fit, S, t)` devuelve la tasa y el rendimiento por dividendos
+`q` que reproducen ese forward, para usarlos con `utils/bs.py` (o
+utils/american.py). El spot sólo fija cómo se reparte el forward entre spot y
+dividendos (y las griegas respecto del spot).
+
+La regresión es ponderada por el spread (1 / spread²) y se limita a los
+strikes dentro de `FORWARD_BAND` del strike donde C - P cambia de signo.
+El descuento ajustado sólo se usa con al menos `FORWARD_MIN_PAIRS` strikes
+y si su tasa no se aleja más de `FORWARD_MAX_RATE_GAP` de la de FRED (en
+vencimientos cortos la pendiente casi no informa la tasa); si no, se fija
+D con la tasa de FRED y se ajusta sólo el forward.
+
+Los ajustes se cachean por (underlying, expiration, versión de la cadena,
+t, r): una cadena nueva en `market_data` es un snapshot nuevo.
+"""
+
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ..model.options import ImpliedForward
+from .cache import TTLCache
+
+FORWARD_BAND = float(os.getenv("FORWARD_BAND", "0.2"))
+FORWARD_MIN_PAIRS = int(os.getenv("FORWARD_MIN_PAIRS", "5"))
+FORWARD_MAX_RATE_GAP = float(os.getenv("FORWARD_MAX_RATE_GAP", "0.02"))
+
+# Spread mínimo para los pesos (evita pesos infinitos con bid == ask)
+_MIN_SPREAD = 0.01
+
+_forward_cache = TTLCache(float(os.getenv("FORWARD_CACHE_TTL_SECONDS", "300")), maxsize=256, name="implied_forward")
+
+
+def _quotes(options_df) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(strikes, mid, spread) de los contratos con bid y ask válidos."""
+    K = options_df["strike"].to_numpy(dtype=float)
+    bid = options_df["bid"].to_numpy(dtype=float)
+    ask = options_df["ask"].to_numpy(dtype=float)
+    valid = (bid > 0) & (ask >= bid)
+    return K[valid], (bid[valid] + ask[valid]) / 2, ask[valid] - bid[valid]
+
+
+def fit_forward(calls_df, puts_df, t: float, r: float) -> Optional[ImpliedForward]:
+    """
+    Ajusta forward y descuento de un vencimiento por paridad put-call.
+
+    Args:
+        calls_df, puts_df: DataFrames de yfinance del vencimiento
+        t (float): Tiempo al vencimiento en años
+        r (float): Tasa de FRED para el vencimiento (descuento de respaldo)
+
+    Returns:
+        ImpliedForward, o None si no hay ningún strike con call y put cotizados.
+    """
+    if not t > 0:
+        return None
+    K_c, mid_c, spread_c = _quotes(calls_df)
+    K_p, mid_p, spread_p = _quotes(puts_df)
+    K, ic, ip = np.intersect1d(K_c, K_p, assume_unique=True, return_indices=True)
+    if K.size == 0:
+        return None
+
+    y = mid_c[ic] - mid_p[ip]
+    w = 1.0 / np.maximum(spread_c[ic] + spread_p[ip], _MIN_SPREAD) ** 2
+
+    # Strikes cerca del forward: lejos del dinero un lado es casi todo intrínseco
+    # y el otro cotiza en ticks mínimos
+    atm = K[np.argmin(np.abs(y))]
+    near = np.abs(K / atm - 1.0) <= FORWARD_BAND
+    K, y, w = K[near], y[near], w[near]
+
+    if K.size >= FORWARD_MIN_PAIRS:
+        # Mínimos cuadrados ponderados de y = a + b K: D = -b, F = a / D
+        sw = np.sqrt(w)
+        (a, b), *_ = np.linalg.lstsq(np.column_stack([sw, sw * K]), sw * y, rcond=None)
+        discount = -b
+        if discount > 0:
+            rate = -np.log(discount) / t
+            if abs(rate - r) <= FORWARD_MAX_RATE_GAP:
+                return ImpliedForward(float(a / discount), float(discount), float(rate), int(K.size), True)
+
+    discount = np.exp(-r * t)
+    forward = np.sum(w * (K + y / discount)) / np.sum(w)
+    return ImpliedForward(float(forward), float(discount), float(r), int(K.size), False)
+
+
+def get_implied_forward(underlying: str, expiration: str, calls_df, puts_df, t: float, r: float,
+                        chain_version: Optional[int] = None) -> Optional[ImpliedForward]:
+    """
+    `fit_forward` cacheado por snapshot de la cadena.
+
+    `chain_version` es la versión del snapshot de `market_data` al que
+    pertenecen los DataFrames (`chain_version(underlying, expiration,
+    calls_df)`); sin versión no se cachea.
+    """
+    if chain_version is None:
+        return fit_forward(calls_df, puts_df, t, r)
+    key = (underlying, expiration, chain_version, t, r)
+    return _forward_cache.get_or_set(key, lambda: fit_forward(calls_df, puts_df, t, r))
+
+
+def carry(fit: Optional[ImpliedForward], S: float, t: float, r: float) -> Tuple[float, float]:
+    """
+    Tasa y rendimiento por dividendos continuos que reproducen el forward `fit`.
+
+    Returns:
+        (rate, q); sin ajuste, (r, 0.0).
+    """
+    if fit is None or not (S > 0 and t > 0 and fit.forward > 0):
+        return r, 0.0
+    return fit.rate, float(fit.rate - np.log(fit.forward / S) / t)
@@ -0,0 +1,412 @@
+"""
+Historial intradiario de volatilidad implícita en archivos locales.
+
+Cada cálculo de griegas (`compute_greeks`) agrega al store la IV de cada
+contrato y un resumen por vencimiento (IV ATM y de 25 delta), con la hora
+del cálculo. Se activa con `IV_STORE_DIR`; sin esa variable no se escribe
+nada.
+
+Formato: una partición por ticker y fecha (UTC), con una tabla por tipo de
+registro y un archivo binario crudo por columna, sólo de agregado:
+
+    <IV_STORE_DIR>/SPY/2025-01-10/contracts/{timestamp,expiration,contract,strike,is_call,iv}.bin
+    <IV_STORE_DIR>/SPY/2025-01-10/summary/{timestamp,expiration,atm_iv,put25_iv,call25_iv}.bin
+    <IV_STORE_DIR>/SPY/2025-01-10/market/{timestamp,expiration,spot,rate,dividend_yield}.bin
+
+`market` guarda el spot y la tasa y los dividendos implícitos del cálculo:
+con la IV de cada contrato alcanza para revaluar la cadena registrada
+(`iter_daily_chains`, usado por el backtester).
+
+Los tipos de cada columna son fijos (`TABLES`), así que las lecturas abren
+cada archivo con `np.memmap` sin parsear ni cargar la partición entera.
+`timestamp` son milisegundos desde epoch y `expiration` días desde epoch.
+Si un proceso se corta a mitad de una escritura, las columnas de la fila
+incompleta quedan más largas: las lecturas las recortan a las filas
+completas y la escritura siguiente trunca todas las columnas a ese largo
+antes de agregar, así la fila cortada no se empareja con la próxima. Las
+escrituras toman un lock de archivo (`fcntl.flock` sobre `.lock` en la
+tabla), porque `api_server` y el servidor MCP pueden compartir el store.
+
+Para no llenar el disco con el canal en vivo o el prefetch, un mismo
+(ticker, vencimiento) se registra como máximo cada
+`IV_STORE_MIN_INTERVAL_SECONDS` segundos (por defecto 60).
+
+Índice diario (`<IV_STORE_DIR>/SPY/_daily/`): una fila por día con la IV ATM
+a plazo constante (`DAILY_TENOR_DAYS`, interpolada en varianza total entre
+vencimientos con el último registro de cada uno) y el risk reversal de 25
+delta (call - put) al mismo plazo. `daily_index` agrega al índice los días
+completos que falten y calcula el día en curso al vuelo, así que las
+consultas de IV rank leen un puñado de filas por ticker en lugar de todo el
+historial intradiario.
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+import time
+from datetime import date, datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .profiling import replay_active
+
+try:
+    import fcntl
+except ImportError:  # Windows: sólo el lock entre hilos
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+TABLES: Dict[str, Dict[str, str]] = {
+    "contracts": {
+        "timestamp": "<i8",
+        "expiration": "<i4",
+        "contract": "S24",
+        "strike": "<f8",
+        "is_call": "u1",
+        "iv": "<f4",
+    },
+    "summary": {
+        "timestamp": "<i8",
+        "expiration": "<i4",
+        "atm_iv": "<f4",
+        "put25_iv": "<f4",
+        "call25_iv": "<f4",
+    },
+    "market": {
+        "timestamp": "<i8",
+        "expiration": "<i4",
+        "spot": "<f8",
+        "rate": "<f8",
+        "dividend_yield": "<f8",
+    },
+    "_daily": {
+        "date": "<i4",
+        "atm_iv": "<f4",
+        "risk_reversal_25": "<f4",
+    },
+}
+
+DAILY_TENOR_DAYS = int(os.getenv("IV_DAILY_TENOR_DAYS", "30"))
+
+_EPOCH = date(1970, 1, 1)
+_write_lock = threading.Lock()
+_last_recorded: Dict[Tuple[str, str], float] = {}
+
+
+def iv_store_dir() -> Optional[str]:
+    """Directorio configurado en `IV_STORE_DIR` (None si el store está desactivado)."""
+    return os.getenv("IV_STORE_DIR") or None
+
+
+def _min_interval() -> float:
+    return float(os.getenv("IV_STORE_MIN_INTERVAL_SECONDS", "60"))
+
+
+def _partition(root: str, underlying: str, day: date, table: str) -> str:
+    # Las tablas con "_" (índices) no se particionan por fecha
+    if table.startswith("_"):
+        return os.path.join(root, underlying.upper(), table)
+    return os.path.join(root, underlying.upper(), day.isoformat(), table)
+
+
+@contextmanager
+def _locked(path: str):
+    """Lock exclusivo de la tabla en `path`, entre hilos y entre procesos."""
+    with _write_lock:
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, ".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _append_locked(path: str, table: str, columns: Dict[str, np.ndarray]) -> None:
+    """Agrega filas a la tabla en `path` (con el lock tomado)."""
+    dtypes = TABLES[table]
+    rows = {name: np.ascontiguousarray(columns[name], dtype=dtype) for name, dtype in dtypes.items()}
+    files = {name: os.path.join(path, f"{name}.bin") for name in dtypes}
+
+    # Una escritura cortada deja columnas más largas que otras: se descarta
+    # la fila incompleta antes de agregar
+    complete = min((os.path.getsize(f) if os.path.exists(f) else 0) // np.dtype(dtypes[name]).itemsize
+                   for name, f in files.items())
+    for name, f in files.items():
+        if os.path.exists(f) and os.path.getsize(f) != complete * np.dtype(dtypes[name]).itemsize:
+            os.truncate(f, complete * np.dtype(dtypes[name]).itemsize)
+
+    for name, values in rows.items():
+        with open(files[name], "ab") as f:
+            f.write(values.tobytes())
+
+
+def append(root: str, underlying: str, table: str, columns: Dict[str, np.ndarray], day: date) -> None:
+    """Agrega filas a la tabla `table` de la partición (underlying, day)."""
+    path = _partition(root, underlying, day, table)
+    with _locked(path):
+        _append_locked(path, table, columns)
+
+
+def _read_partition(path: str, table: str) -> Optional[Dict[str, np.ndarray]]:
+    """Columnas de una partición como memmaps (recortadas a las filas completas)."""
+    dtypes = TABLES[table]
+    files = {name: os.path.join(path, f"{name}.bin") for name in dtypes}
+    if not all(os.path.exists(f) for f in files.values()):
+        return None
+    rows = min(os.path.getsize(f) // np.dtype(dtypes[name]).itemsize for name, f in files.items())
+    if rows == 0:
+        return None
+    return {name: np.memmap(f, dtype=dtypes[name], mode="r", shape=(rows,)) for name, f in files.items()}
+
+
+def read(root: str, underlying: str, table: str, start: Optional[date] = None,
+         end: Optional[date] = None) -> Dict[str, np.ndarray]:
+    """
+    Filas de `table` de las particiones entre `start` y `end` (inclusive), en orden de fecha.
+
+    Returns:
+        Diccionario columna -> array (vacío si no hay datos).
+    """
+    base = os.path.join(root, underlying.upper())
+    days = sorted(d for d in os.listdir(base) if not d.startswith("_")) if os.path.isdir(base) else []
+    parts = []
+    for day in days:
+        if (start and day < start.isoformat()) or (end and day > end.isoformat()):
+            continue
+        columns = _read_partition(os.path.join(base, day, table), table)
+        if columns is not None:
+            parts.append(columns)
+    return {name: np.concatenate([p[name] for p in parts]) if parts else np.empty(0, dtype=dtype)
+            for name, dtype in TABLES[table].items()}
+
+
+def _iv_at(x: np.ndarray, iv: np.ndarray, target: float) -> float:
+    """IV interpolada en `target` (NaN si queda fuera del rango de `x`)."""
+    ok = np.isfinite(x) & np.isfinite(iv) & (iv > 0)
+    x, iv = x[ok], iv[ok]
+    if x.size < 2 or not (x.min() <= target <= x.max()):
+        return float("nan")
+    order = np.argsort(x)
+    return float(np.interp(target, x[order], iv[order]))
+
+
+def summarize(calls, puts, atm_strike: float) -> Tuple[float, float, float]:
+    """
+    (IV ATM, IV put 25 delta, IV call 25 delta) de un vencimiento.
+
+    La IV ATM interpola las opciones OTM (puts debajo de `atm_strike`, calls
+    encima) en `atm_strike`; las de 25 delta interpolan cada lado en su delta.
+    """
+    strikes = np.concatenate([puts.columns["strike"], calls.columns["strike"]])
+    ivs = np.concatenate([puts.columns["impliedVolatility"], calls.columns["impliedVolatility"]])
+    otm = np.concatenate([puts.columns["strike"] <= atm_strike, calls.columns["strike"] >= atm_strike])
+    atm_iv = _iv_at(strikes[otm], ivs[otm], atm_strike)
+    put25 = _iv_at(puts.columns["delta"], puts.columns["impliedVolatility"], -0.25)
+    call25 = _iv_at(calls.columns["delta"], calls.columns["impliedVolatility"], 0.25)
+    return atm_iv, put25, call25
+
+
+def record_greeks(greeks, atm_strike: float, spot: float, rate: float, dividend_yield: float = 0.0,
+                  now: Optional[datetime] = None) -> bool:
+    """
+    Registra las IV de un resultado `Greeks` (por contrato y el resumen del
+    vencimiento) y los parámetros de mercado con que se calcularon.
+
+    No hace nada si el store está desactivado, durante un replay o si el mismo
+    vencimiento se registró hace menos de `IV_STORE_MIN_INTERVAL_SECONDS`.
+    Los errores de escritura se registran en el log y no interrumpen la tool.
+
+    Returns:
+        True si se escribió.
+    """
+    root = iv_store_dir()
+    if root is None or replay_active():
+        return False
+    key = (greeks.underlying.upper(), greeks.expiration)
+    clock = time.monotonic()
+    with _write_lock:
+        if clock - _last_recorded.get(key, -np.inf) < _min_interval():
+            return False
+        _last_recorded[key] = clock
+
+    now = now or datetime.now(timezone.utc)
+    timestamp = int(now.timestamp() * 1000)
+    expiration = (date.fromisoformat(greeks.expiration) - _EPOCH).days
+    n_calls, n_puts = len(greeks.calls), len(greeks.puts)
+    n = n_calls + n_puts
+    contracts = {
+        "timestamp": np.full(n, timestamp),
+        "expiration": np.full(n, expiration),
+        "contract": np.concatenate([greeks.calls.columns["contractSymbol"],
+                                    greeks.puts.columns["contractSymbol"]]).astype("S24"),
+        "strike": np.concatenate([greeks.calls.columns["strike"], greeks.puts.columns["strike"]]),
+        "is_call": np.concatenate([np.ones(n_calls), np.zeros(n_puts)]),
+        "iv": np.concatenate([greeks.calls.columns["impliedVolatility"], greeks.puts.columns["impliedVolatility"]]),
+    }
+    atm_iv, put25, call25 = summarize(greeks.calls, greeks.puts, atm_strike)
+    summary = {
+        "timestamp": np.array([timestamp]),
+        "expiration": np.array([expiration]),
+        "atm_iv": np.array([atm_iv]),
+        "put25_iv": np.array([put25]),
+        "call25_iv": np.array([call25]),
+    }
+    market = {
+        "timestamp": np.array([timestamp]),
+        "expiration": np.array([expiration]),
+        "spot": np.array([spot]),
+        "rate": np.array([rate]),
+        "dividend_yield": np.array([dividend_yield]),
+    }
+    try:
+        day = now.astimezone(timezone.utc).date()
+        append(root, greeks.underlying, "contracts", contracts, day)
+        append(root, greeks.underlying, "summary", summary, day)
+        append(root, greeks.underlying, "market", market, day)
+    except OSError as e:
+        logger.warning("No se pudo escribir el historial de IV de %s: %s", greeks.underlying, e)
+        return False
+    return True
+
+
+def latest_by_expiration(summary: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Último registro de cada vencimiento de un conjunto de filas de `summary`, por vencimiento."""
+    if len(summary["timestamp"]) == 0:
+        return summary
+    order = np.lexsort((summary["timestamp"], summary["expiration"]))
+    expirations = np.asarray(summary["expiration"])[order]
+    last = np.append(expirations[1:] != expirations[:-1], True)
+    return {name: np.asarray(values)[order][last] for name, values in summary.items()}
+
+
+def constant_maturity(dte: np.ndarray, iv: np.ndarray, tenor: float = DAILY_TENOR_DAYS) -> float:
+    """IV a `tenor` días interpolando la varianza total (iv² · plazo); plana fuera del rango."""
+    ok = np.isfinite(iv) & (iv > 0) & (dte > 0)
+    dte, iv = np.asarray(dte, dtype=float)[ok], np.asarray(iv, dtype=float)[ok]
+    if dte.size == 0:
+        return float("nan")
+    order = np.argsort(dte)
+    dte, iv = dte[order], iv[order]
+    if tenor <= dte[0]:
+        return float(iv[0])
+    if tenor >= dte[-1]:
+        return float(iv[-1])
+    return float(np.sqrt(np.interp(tenor, dte, iv ** 2 * dte) / tenor))
+
+
+def _daily_row(summary: Dict[str, np.ndarray], day: date) -> Tuple[float, float]:
+    """(IV ATM, risk reversal 25 delta) a plazo constante con el cierre de `day`."""
+    close = latest_by_expiration(summary)
+    dte = close["expiration"].astype(float) - (day - _EPOCH).days
+    atm = constant_maturity(dte, close["atm_iv"])
+    rr = close["call25_iv"].astype(float) - close["put25_iv"].astype(float)
+    ok = np.isfinite(rr) & (dte > 0)
+    if not ok.any():
+        return atm, float("nan")
+    order = np.argsort(dte[ok])
+    return atm, float(np.interp(DAILY_TENOR_DAYS, dte[ok][order], rr[ok][order]))
+
+
+def daily_index(root: str, underlying: str, today: Optional[date] = None) -> Dict[str, np.ndarray]:
+    """
+    Serie diaria (date, atm_iv, risk_reversal_25) del subyacente.
+
+    Los días completos que todavía no están en el índice se calculan y se
+    agregan (una sola vez); el día en curso se calcula sin guardarlo.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    base = os.path.join(root, underlying.upper())
+    if not os.path.isdir(base):
+        return {name: np.empty(0, dtype=dtype) for name, dtype in TABLES["_daily"].items()}
+    days = sorted(d for d in os.listdir(base) if not d.startswith("_"))
+    path = _partition(root, underlying, today, "_daily")
+
+    def pending_days():
+        indexed = _read_partition(path, "_daily")
+        last_indexed = int(indexed["date"][-1]) if indexed is not None else -1
+        pending = [date.fromisoformat(d) for d in days if (date.fromisoformat(d) - _EPOCH).days > last_indexed]
+        return indexed, pending
+
+    indexed, pending = pending_days()
+    if any(d < today for d in pending):
+        # Leer, decidir y agregar bajo el lock del índice: otro screen (de
+        # este u otro proceso) puede haber indexado los mismos días
+        with _locked(path):
+            indexed, pending = pending_days()
+            complete = [d for d in pending if d < today]
+            if complete:
+                rows = [_daily_row(read(root, underlying, "summary", d, d), d) for d in complete]
+                _append_locked(path, "_daily", {
+                    "date": np.array([(d - _EPOCH).days for d in complete]),
+                    "atm_iv": np.array([row[0] for row in rows]),
+                    "risk_reversal_25": np.array([row[1] for row in rows]),
+                })
+                indexed, pending = pending_days()
+
+    columns = {name: np.asarray(indexed[name]) if indexed is not None else np.empty(0, dtype=dtype)
+               for name, dtype in TABLES["_daily"].items()}
+    if today in pending:
+        atm, rr = _daily_row(read(root, underlying, "summary", today, today), today)
+        columns = {
+            "date": np.append(columns["date"], (today - _EPOCH).days),
+            "atm_iv": np.append(columns["atm_iv"], atm),
+            "risk_reversal_25": np.append(columns["risk_reversal_25"], rr),
+        }
+    return columns
+
+
+def iter_daily_chains(root: str, underlying: str, start: Optional[date] = None,
+                      end: Optional[date] = None) -> Iterator[Tuple[date, Dict[str, np.ndarray]]]:
+    """
+    Recorre las cadenas registradas de a un día, en orden de fecha.
+
+    Por cada partición toma el último registro de cada vencimiento (el
+    cierre del día) y le agrega a cada contrato `spot`, `rate` y
+    `dividend_yield` de ese registro. Sólo hay una partición en memoria a la
+    vez; los días sin tabla `market` (anteriores a que existiera) se omiten.
+
+    Yields:
+        (fecha, columnas de `contracts` + spot, rate, dividend_yield)
+    """
+    base = os.path.join(root, underlying.upper())
+    days = sorted(d for d in os.listdir(base) if not d.startswith("_")) if os.path.isdir(base) else []
+    for name in days:
+        if (start and name < start.isoformat()) or (end and name > end.isoformat()):
+            continue
+        contracts = _read_partition(os.path.join(base, name, "contracts"), "contracts")
+        market = _read_partition(os.path.join(base, name, "market"), "market")
+        if contracts is None or market is None:
+            continue
+
+        # Cierre: filas del último timestamp de cada vencimiento
+        timestamps, expirations = np.asarray(contracts["timestamp"]), np.asarray(contracts["expiration"])
+        unique, inverse = np.unique(expirations, return_inverse=True)
+        last = np.full(unique.size, np.iinfo(np.int64).min)
+        np.maximum.at(last, inverse, timestamps)
+        rows = np.flatnonzero(timestamps == last[inverse])
+        chain = {column: np.asarray(values[rows]) for column, values in contracts.items()}
+
+        close = latest_by_expiration({column: np.asarray(values) for column, values in market.items()})
+        pos = np.clip(np.searchsorted(close["expiration"], chain["expiration"]), 0, max(close["expiration"].size - 1, 0))
+        matched = close["expiration"][pos] == chain["expiration"]
+        chain = {column: values[matched] for column, values in chain.items()}
+        for column in ("spot", "rate", "dividend_yield"):
+            chain[column] = close[column][pos[matched]]
+        yield date.fromisoformat(name), chain
+
+
+def expiration_date(days: np.ndarray) -> List[str]:
+    """Días desde epoch (columna `expiration`) a fechas ISO."""
+    return [str(np.datetime64("1970-01-01") + np.timedelta64(int(d), "D")) for d in days]
+
+
+def clear_throttle() -> None:
+    """Olvida los últimos registros (para tests)."""
+    with _write_lock:
+        _last_recorded.clear()
@@ -0,0 +1,182 @@
+"""
+Canal en vivo: suscripciones a cadenas y griegas con envío de diferencias.
+
+Cada tópico es (tool, underlying, expiration), con tool `get_chain` o
+`compute_greeks`. El hub calcula cada tópico una sola vez por ciclo
+(`LIVE_REFRESH_SECONDS`) sin importar cuántos clientes estén suscriptos,
+codifica el mensaje una vez y lo reparte a todos.
+
+Mensajes del servidor:
+- `snapshot`: resultado completo (al suscribirse o si el cliente se atrasó).
+- `update`: sólo los campos y contratos que cambiaron (ver utils/diff.py),
+  con `seq` creciente por tópico.
+- `error`: el cálculo del tópico falló (la suscripción sigue activa).
+
+Cada cliente tiene una cola acotada; si se llena (cliente lento), se
+descartan sus diferencias pendientes y recibe un `snapshot` nuevo.
+"""
+
+import asyncio
+import json
+import math
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from .diff import diff_result, is_empty
+from .metrics import LIVE_COMPUTES, LIVE_MESSAGES, LIVE_SUBSCRIPTIONS
+
+Topic = Tuple[str, str, str]  # (tool, underlying, expiration)
+
+LIVE_TOOLS = ("get_chain", "compute_greeks")
+
+
+def _finite(obj: Any) -> Any:
+    """NaN/inf -> None, para que el mensaje sea JSON válido en el navegador."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def encode_message(message: dict) -> str:
+    return json.dumps(_finite(message), default=str)
+
+
+def topic_dict(topic: Topic) -> Dict[str, str]:
+    tool, underlying, expiration = topic
+    return {"tool": tool, "underlying": underlying, "expiration": expiration}
+
+
+class Subscriber:
+    """Cola de mensajes (ya codificados) de una conexión."""
+
+    def __init__(self, maxsize: int = 32):
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize)
+
+    def offer(self, text: str, resync: Callable[[], str]) -> None:
+        """Encola `text`; si la cola está llena la reemplaza por un snapshot completo."""
+        try:
+            self.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(resync())
+
+    async def next(self) -> str:
+        return await self.queue.get()
+
+
+class _TopicState:
+    __slots__ = ("subscribers", "last", "seq", "lock")
+
+    def __init__(self):
+        self.subscribers: Set[Subscriber] = set()
+        self.last: Optional[dict] = None
+        self.seq = 0
+        self.lock = asyncio.Lock()
+
+
+class LiveHub:
+    """
+    Suscripciones por tópico y refresco periódico compartido.
+
+    `compute(topic)` devuelve el resultado de la tool ya convertido a JSON;
+    se ejecuta en un hilo aparte para no bloquear el event loop.
+    """
+
+    def __init__(self, compute: Callable[[Topic], dict], interval: float):
+        self.compute = compute
+        self.interval = interval
+        self._topics: Dict[Topic, _TopicState] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def topics(self) -> Dict[Topic, int]:
+        """Tópicos activos y su cantidad de suscriptores."""
+        return {topic: len(state.subscribers) for topic, state in self._topics.items()}
+
+    def _snapshot(self, topic: Topic, state: _TopicState) -> str:
+        LIVE_MESSAGES.inc(type="snapshot")
+        return encode_message({"type": "snapshot", "topic": topic_dict(topic), "seq": state.seq, "data": state.last})
+
+    async def subscribe(self, topic: Topic, subscriber: Subscriber) -> None:
+        """
+        Suscribe y envía el estado actual (calculándolo si el tópico es nuevo).
+
+        El suscriptor se agrega con el lock del tópico tomado, justo antes de
+        su snapshot: un refresco en curso no puede mandarle una diferencia
+        antes de que tenga la base sobre la que aplicarla.
+        """
+        while True:
+            state = self._topics.setdefault(topic, _TopicState())
+            async with state.lock:
+                if self._topics.get(topic) is not state:
+                    continue          # el tópico se quitó mientras se esperaba el lock
+                if subscriber not in state.subscribers:
+                    state.subscribers.add(subscriber)
+                    LIVE_SUBSCRIPTIONS.inc(tool=topic[0])
+                if state.last is None:
+                    await self._publish(topic, state)
+                else:
+                    subscriber.offer(self._snapshot(topic, state), lambda: self._snapshot(topic, state))
+            break
+        self._ensure_running()
+
+    def unsubscribe(self, topic: Topic, subscriber: Subscriber) -> None:
+        state = self._topics.get(topic)
+        if state is None or subscriber not in state.subscribers:
+            return
+        state.subscribers.discard(subscriber)
+        LIVE_SUBSCRIPTIONS.dec(tool=topic[0])
+        if not state.subscribers:
+            del self._topics[topic]
+
+    def drop(self, subscriber: Subscriber) -> None:
+        """Quita al suscriptor de todos sus tópicos (al cerrarse la conexión)."""
+        for topic in list(self._topics):
+            self.unsubscribe(topic, subscriber)
+
+    async def _publish(self, topic: Topic, state: _TopicState) -> None:
+        """Calcula el tópico y envía el snapshot (primera vez) o la diferencia. Requiere `state.lock`."""
+        try:
+            result = await asyncio.to_thread(self.compute, topic)
+        except Exception as e:
+            LIVE_MESSAGES.inc(type="error")
+            text = encode_message({"type": "error", "topic": topic_dict(topic), "error": str(e)})
+            for subscriber in list(state.subscribers):
+                subscriber.offer(text, lambda: text)
+            return
+        LIVE_COMPUTES.inc(tool=topic[0])
+
+        if state.last is None:
+            state.last = result
+            text = self._snapshot(topic, state)
+        else:
+            diff = diff_result(state.last, result)
+            state.last = result
+            if is_empty(diff):
+                return
+            state.seq += 1
+            LIVE_MESSAGES.inc(type="update")
+            text = encode_message({"type": "update", "topic": topic_dict(topic), "seq": state.seq, **diff})
+
+        for subscriber in list(state.subscribers):
+            subscriber.offer(text, lambda: self._snapshot(topic, state))
+
+    async def tick(self) -> None:
+        """Un ciclo de refresco: cada tópico se calcula una vez para todos sus suscriptores."""
+        for topic, state in list(self._topics.items()):
+            if state.subscribers:
+                async with state.lock:
+                    await self._publish(topic, state)
+
+    async def _run(self) -> None:
+        while self._topics:
+            await asyncio.sleep(self.interval)
+            await self.tick()
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
@@ -0,0 +1,166 @@
+"""
+Acceso compartido a datos de mercado de Yahoo Finance.
+
+Centraliza la descarga de spot, fechas de vencimiento, cadenas de opciones,
+datos del ticker e históricos con una caché de vida corta, para que una misma
+llamada (o varias llamadas seguidas) no vuelvan a descargar la misma cadena.
+
+Cada descarga pasa por el límite de tasa y el circuit breaker de Yahoo
+(utils/upstream.py); si Yahoo falla se sirve el último valor cacheado aunque
+esté vencido. Se mide por fuente (ver utils/metrics.py): yfinance_history,
+yfinance_options, yfinance_chain e yfinance_info, y se informa a
+utils/profiling.py para poder grabarla y reproducirla offline. Cada lectura
+anota la versión del dato en caché para el ETag de la respuesta
+(utils/etag.py).
+"""
+
+import os
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+from Server.utils.cache import TTLCache
+from Server.utils.etag import note_market_read
+from Server.utils.get_spot import get_spot_price
+from Server.utils.upstream import upstream_call
+from Server.utils.profiling import use_market_data
+
+CHAIN_TTL_SECONDS = float(os.getenv("OPTIONS_CHAIN_TTL_SECONDS", "30"))
+# Nombre, moneda, etc. casi no cambian: se pueden reutilizar mucho más tiempo.
+INFO_TTL_SECONDS = float(os.getenv("TICKER_INFO_TTL_SECONDS", "3600"))
+
+_spot_cache = TTLCache(CHAIN_TTL_SECONDS, maxsize=256, name="spot")
+_expirations_cache = TTLCache(CHAIN_TTL_SECONDS * 10, maxsize=256, name="expirations")
+_chain_cache = TTLCache(CHAIN_TTL_SECONDS, maxsize=128, name="chain")
+_info_cache = TTLCache(INFO_TTL_SECONDS, maxsize=256, name="ticker_info")
+_history_cache = TTLCache(CHAIN_TTL_SECONDS, maxsize=128, name="history")
+
+
+def _download_spot(underlying: str) -> float:
+    with upstream_call("yfinance_history"):
+        return get_spot_price(underlying)
+
+
+def _download_expirations(underlying: str) -> Tuple[str, ...]:
+    with upstream_call("yfinance_options"):
+        return tuple(yf.Ticker(underlying).options)
+
+
+def _download_ticker_info(underlying: str) -> dict:
+    with upstream_call("yfinance_info"):
+        return yf.Ticker(underlying).info
+
+
+def _download_chain(underlying: str, expiration: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    with upstream_call("yfinance_chain"):
+        chain = yf.Ticker(underlying).option_chain(expiration)
+    return chain.calls, chain.puts
+
+
+def _cached(kind: str, key: tuple, cache: TTLCache, cache_key: Hashable, loader: Callable[[], Any]) -> Any:
+    """
+    Lee `cache_key` de `cache` (o lo descarga) y anota su versión para el ETag.
+
+    La versión es la del valor devuelto: si otro hilo lo recargó en el medio
+    (o vino de un replay), se anota None y la respuesta no lleva ETag.
+    """
+    value = use_market_data(kind, key, lambda: cache.get_or_set(cache_key, loader, serve_stale=True))
+    note_market_read(kind, key, cache.version_of(cache_key, value))
+    return value
+
+
+def get_spot(underlying: str) -> float:
+    """Precio spot del subyacente (cacheado)."""
+    return _cached("spot", (underlying,), _spot_cache, underlying, lambda: _download_spot(underlying))
+
+
+def get_expirations(underlying: str) -> Tuple[str, ...]:
+    """Fechas de vencimiento disponibles para el subyacente (cacheadas)."""
+    return _cached("expirations", (underlying,), _expirations_cache, underlying,
+                   lambda: _download_expirations(underlying))
+
+
+def get_ticker_info(underlying: str) -> dict:
+    """Datos descriptivos del ticker (`Ticker.info` de yfinance), cacheados."""
+    return _cached("ticker_info", (underlying,), _info_cache, underlying, lambda: _download_ticker_info(underlying))
+
+
+def get_price_history(underlying: str, period: str, interval: str) -> pd.DataFrame:
+    """
+    Histórico OHLCV del subyacente (cacheado).
+
+    El DataFrame devuelto se comparte entre llamadas: no debe modificarse.
+    """
+    def _download() -> pd.DataFrame:
+        with upstream_call("yfinance_history"):
+            return yf.Ticker(underlying).history(period=period, interval=interval)
+
+    key = (underlying, period, interval)
+    return _cached("history", key, _history_cache, key, _download)
+
+
+def get_chain_frames(underlying: str, expiration: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Descarga (o reutiliza) la cadena de opciones de un vencimiento.
+
+    Los DataFrames devueltos se comparten entre llamadas: no deben modificarse
+    en el lugar (usar `.copy()` si hace falta agregar columnas).
+
+    Returns:
+        Tupla (calls, puts) tal como la devuelve yfinance.
+
+    Raises:
+        ValueError: Si la fecha de vencimiento no está disponible para el subyacente.
+    """
+    expirations = get_expirations(underlying)
+    if expiration not in expirations:
+        raise ValueError(
+            f"La fecha de vencimiento {expiration} no está disponible, para el subyacente {underlying}. "
+            f"Las fechas disponibles son: {expirations}"
+        )
+
+    key = (underlying, expiration)
+    return _cached("chain", key, _chain_cache, key, lambda: _download_chain(underlying, expiration))
+
+
+def chain_version(underlying: str, expiration: str, frame: Optional[pd.DataFrame] = None) -> Optional[int]:
+    """
+    Versión de la cadena cacheada del vencimiento (identifica el snapshot), o None.
+
+    Con `frame` (los calls o puts que devolvió `get_chain_frames`), la versión
+    sólo se devuelve si ese DataFrame es parte del snapshot cacheado: si la
+    cadena se volvió a descargar entre la lectura y esta llamada, la versión
+    nueva no describe a `frame` y se devuelve None (no cachear lo derivado).
+    """
+    entry = _chain_cache.peek((underlying, expiration))
+    if entry is None:
+        return None
+    (calls, puts), version = entry
+    if frame is not None and frame is not calls and frame is not puts:
+        return None
+    return version
+
+
+def warm_underlying(underlying: str, max_expirations: int, ttl_seconds: float) -> Tuple[str, ...]:
+    """
+    Vuelve a descargar spot, vencimientos y las cadenas de los `max_expirations`
+    vencimientos más cercanos, y los deja en caché por `ttl_seconds`.
+
+    `Ticker.info` sólo se descarga si no está en caché (cambia muy poco). Lo
+    usa el prefetch (utils/prefetch.py) para que los pedidos de tickers
+    vigilados encuentren la caché caliente.
+
+    Returns:
+        Vencimientos cuyas cadenas quedaron en caché.
+    """
+    _spot_cache.set(underlying, _download_spot(underlying), ttl_seconds)
+    expirations = _download_expirations(underlying)
+    _expirations_cache.set(underlying, expirations, max(ttl_seconds, _expirations_cache.ttl_seconds))
+    if underlying not in _info_cache:
+        _info_cache.set(underlying, _download_ticker_info(underlying))
+
+    warmed = expirations[:max_expirations]
+    for expiration in warmed:
+        _chain_cache.set((underlying, expiration), _download_chain(underlying, expiration), ttl_seconds)
+    return warmed
@@ -0,0 +1,243 @@
+"""
+Métricas en formato de texto de Prometheus.
+
+Registro mínimo en memoria (contadores, gauges e histogramas con labels),
+sin dependencias externas. `api_server.py` lo expone en `/metrics`.
+
+Métricas principales:
+- Tools: pedidos, errores, latencia e in-flight por tool (`track_tool`).
+- Upstream: pedidos, errores y latencia por fuente de datos (`track_upstream`):
+  yfinance_chain, yfinance_options, yfinance_history, yfinance_info, fred.
+- Prefetch: actualizaciones y errores por ticker vigilado y duración de cada
+  ciclo (ver utils/prefetch.py).
+- Canal en vivo: suscripciones, cálculos por tópico y mensajes enviados
+  (ver utils/live.py).
+- Proveedores: pedidos rechazados y estado del circuit breaker por
+  proveedor (ver utils/upstream.py).
+- Cachés: aciertos, fallos, ratio de aciertos y valores vencidos servidos
+  por caché con nombre (ver `TTLCache(name=...)`).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from .cache import named_caches
+from .tracing import span
+
+PREFIX = "options_api"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = f"{PREFIX}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Contador monótono."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    """Valor que puede subir y bajar."""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Histograma acumulativo con buckets fijos (en segundos)."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    counts[i] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels: str) -> int:
+        counts = self._counts.get(self._key(labels))
+        return counts[-1] if counts else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(c), self._sums[k]) for k, c in self._counts.items())
+        lines = []
+        for key, counts, total in items:
+            for upper, count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(upper),))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+TOOL_REQUESTS = Counter("tool_requests_total", "Llamadas a tools.", ("tool",))
+TOOL_ERRORS = Counter("tool_errors_total", "Llamadas a tools que terminaron con error.", ("tool", "error"))
+TOOL_LATENCY = Histogram("tool_duration_seconds", "Latencia de las tools en segundos.", ("tool",))
+TOOL_IN_FLIGHT = Gauge("tool_in_flight", "Llamadas a tools en curso.", ("tool",))
+
+UPSTREAM_REQUESTS = Counter("upstream_requests_total", "Pedidos a fuentes de datos externas.", ("source",))
+UPSTREAM_ERRORS = Counter("upstream_errors_total", "Pedidos a fuentes externas que fallaron.", ("source",))
+UPSTREAM_LATENCY = Histogram("upstream_duration_seconds", "Latencia de las fuentes externas en segundos.", ("source",))
+UPSTREAM_REJECTED = Counter("upstream_rejected_total",
+                            "Pedidos a proveedores rechazados (circuit_open, rate_limited, saturated).",
+                            ("upstream", "reason"))
+UPSTREAM_CIRCUIT_STATE = Gauge("upstream_circuit_state",
+                               "Estado del circuit breaker por proveedor (0 cerrado, 1 half-open, 2 abierto).",
+                               ("upstream",))
+
+PREFETCH_REFRESHES = Counter("prefetch_refreshes_total", "Actualizaciones de tickers vigilados.", ("underlying",))
+PREFETCH_ERRORS = Counter("prefetch_errors_total", "Actualizaciones de tickers vigilados que fallaron.", ("underlying",))
+PREFETCH_CYCLE = Histogram("prefetch_cycle_seconds", "Duración de cada ciclo de prefetch en segundos.")
+
+LIVE_SUBSCRIPTIONS = Gauge("live_subscriptions", "Suscripciones activas del canal en vivo.", ("tool",))
+LIVE_COMPUTES = Counter("live_computes_total", "Cálculos de tópicos del canal en vivo (uno por ciclo y tópico).", ("tool",))
+LIVE_MESSAGES = Counter("live_messages_total", "Mensajes del canal en vivo por tipo (se codifican una vez por tópico).",
+                        ("type",))
+
+METRICS = (TOOL_REQUESTS, TOOL_ERRORS, TOOL_LATENCY, TOOL_IN_FLIGHT,
+           UPSTREAM_REQUESTS, UPSTREAM_ERRORS, UPSTREAM_LATENCY, UPSTREAM_REJECTED, UPSTREAM_CIRCUIT_STATE,
+           PREFETCH_REFRESHES, PREFETCH_ERRORS, PREFETCH_CYCLE,
+           LIVE_SUBSCRIPTIONS, LIVE_COMPUTES, LIVE_MESSAGES)
+
+
+@contextmanager
+def track_tool(tool: str) -> Iterator[None]:
+    """Registra pedido, latencia, in-flight y (si falla) el tipo de error de una tool."""
+    TOOL_REQUESTS.inc(tool=tool)
+    TOOL_IN_FLIGHT.inc(tool=tool)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        TOOL_ERRORS.inc(tool=tool, error=type(e).__name__)
+        raise
+    finally:
+        TOOL_LATENCY.observe(time.perf_counter() - start, tool=tool)
+        TOOL_IN_FLIGHT.dec(tool=tool)
+
+
+@contextmanager
+def track_upstream(source: str) -> Iterator[None]:
+    """
+    Registra pedido, latencia y fallos de una llamada a una fuente externa.
+
+    Si hay una traza activa, la llamada también queda como span `upstream:<source>`.
+    """
+    UPSTREAM_REQUESTS.inc(source=source)
+    start = time.perf_counter()
+    try:
+        with span(f"upstream:{source}"):
+            yield
+    except Exception:
+        UPSTREAM_ERRORS.inc(source=source)
+        raise
+    finally:
+        UPSTREAM_LATENCY.observe(time.perf_counter() - start, source=source)
+
+
+def _cache_lines() -> List[str]:
+    caches = sorted(named_caches().items())
+    hits = [f"# HELP {PREFIX}_cache_hits_total Lecturas de caché con valor vigente.",
+            f"# TYPE {PREFIX}_cache_hits_total counter"]
+    misses = [f"# HELP {PREFIX}_cache_misses_total Lecturas de caché sin valor o vencidas.",
+              f"# TYPE {PREFIX}_cache_misses_total counter"]
+    ratio = [f"# HELP {PREFIX}_cache_hit_ratio Aciertos / lecturas de cada caché.",
+             f"# TYPE {PREFIX}_cache_hit_ratio gauge"]
+    size = [f"# HELP {PREFIX}_cache_entries Entradas guardadas en cada caché.",
+            f"# TYPE {PREFIX}_cache_entries gauge"]
+    stale = [f"# HELP {PREFIX}_cache_stale_served_total Valores vencidos servidos porque la fuente falló.",
+             f"# TYPE {PREFIX}_cache_stale_served_total counter"]
+    for name, cache in caches:
+        labels = _format_labels(("cache",), (name,))
+        lookups = cache.hits + cache.misses
+        hits.append(f"{PREFIX}_cache_hits_total{labels} {cache.hits}")
+        misses.append(f"{PREFIX}_cache_misses_total{labels} {cache.misses}")
+        ratio.append(f"{PREFIX}_cache_hit_ratio{labels} {_format_value(cache.hits / lookups if lookups else 0.0)}")
+        size.append(f"{PREFIX}_cache_entries{labels} {len(cache)}")
+        stale.append(f"{PREFIX}_cache_stale_served_total{labels} {cache.stale_served}")
+    return hits + misses + ratio + size + stale
+
+
+def render_metrics() -> str:
+    """Todas las métricas en formato de exposición de texto de Prometheus (0.0.4)."""
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(_cache_lines())
+    return "\n".join(lines) + "\n"
@@ -1,4 +1,4 @@
-from ..model.options import OptionQuote
+from ..model.options import OptionQuote, OptionColumns
 
 def row_to_option_quote(row) -> OptionQuote:
     """
@@ -26,5 +26,37 @@ def row_to_option_quote(row) -> OptionQuote:
     )
 
 
+def frame_to_option_columns(df) -> OptionColumns:
+    """
+    Convierte un DataFrame de yfinance (calls o puts) a columnas NumPy.
+
+    Versión vectorizada de `row_to_option_quote`: no crea un objeto por
+    contrato. Además de los campos de `OptionQuote` conserva la
+    `impliedVolatility` de yfinance como columna extra.
+
+    Args:
+        df: DataFrame de yfinance con las opciones de un lado de la cadena
 
+    Returns:
+        OptionColumns con filas de tipo OptionQuote
+    """
+    bid = df['bid'].to_numpy(dtype=float)
+    ask = df['ask'].to_numpy(dtype=float)
+
+    return OptionColumns(
+        {
+            'contractSymbol': df['contractSymbol'].to_numpy(dtype=object),
+            'lastTradeDate': df['lastTradeDate'].dt.strftime("%Y-%m-%d %H:%M").to_numpy(dtype=object),
+            'strike': df['strike'].to_numpy(dtype=float),
+            'lastPrice': df['lastPrice'].to_numpy(dtype=float),
+            'bid': bid,
+            'ask': ask,
+            'mid': (bid + ask) / 2,
+            'volume': df['volume'].to_numpy(),
+            'openInterest': df['openInterest'].to_numpy(),
+            'intheMoney': df['inTheMoney'].to_numpy(dtype=bool),
+            'impliedVolatility': df['impliedVolatility'].to_numpy(dtype=float),
+        },
+        OptionQuote,
+    )
 
@@ -0,0 +1,85 @@
+from datetime import date, timedelta
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .bs import bs_price_vec
+from ..model.options import PnLSurface
+
+CONTRACT_MULTIPLIER = 100
+
+
+def compute_pnl_surface(
+    spot_range: np.ndarray,
+    days_to_expiry: np.ndarray,
+    K: np.ndarray,
+    r: np.ndarray,
+    sigma: np.ndarray,
+    is_call: np.ndarray,
+    weight: np.ndarray,
+    premium: np.ndarray,
+    num_dates: int = 30,
+    vol_shifts: Optional[Sequence[float]] = None,
+    year_basis: float = 365.0,
+    as_of: Optional[date] = None,
+    q: Optional[np.ndarray] = None,
+) -> PnLSurface:
+    """
+    Superficie de P&L mark-to-model (vol_shift × fecha de valuación × spot) de una posición.
+
+    Revalúa todas las patas con Black-Scholes en una única operación
+    broadcasteada de forma (patas, vol_shifts, fechas, spots). Las fechas van
+    desde hoy hasta el primer vencimiento de la posición; en ese vencimiento
+    las patas que expiran aportan su valor intrínseco.
+
+    Args:
+        spot_range: Grilla de precios del subyacente.
+        days_to_expiry: Días hasta el vencimiento de cada pata.
+        K, r, sigma, is_call: Strike, tasa, volatilidad implícita y tipo de cada pata.
+        weight: Contratos con signo por pata (+ long, - short).
+        premium: Prima por acción pagada/recibida por cada pata.
+        num_dates: Cantidad de fechas de valuación entre hoy y el primer vencimiento.
+        vol_shifts: Desplazamientos absolutos de volatilidad (ej: [-0.05, 0, 0.05]).
+            Por defecto sólo [0.0].
+        year_basis: Días por año usados para convertir días en años.
+        as_of: Fecha de valuación inicial (por defecto hoy).
+        q: Rendimiento por dividendos continuo de cada pata (por defecto 0).
+
+    Returns:
+        PnLSurface con `pnl[v][d][s]` = P&L por contrato (x100) para el
+        vol_shift v, la fecha d y el spot s.
+    """
+    if as_of is None:
+        as_of = date.today()
+    shifts = np.asarray([0.0] if vol_shifts is None else vol_shifts, dtype=float)
+    spots = np.asarray(spot_range, dtype=float)
+    days = np.asarray(days_to_expiry, dtype=float)
+
+    horizon = days.min()
+    days_forward = np.linspace(0.0, horizon, num=num_dates)
+
+    # Ejes: (patas, vol_shifts, fechas, spots)
+    tau = ((days[:, None] - days_forward[None, :]) / year_basis)[:, None, :, None]
+    strikes = np.asarray(K, dtype=float)[:, None, None, None]
+    rates = np.asarray(r, dtype=float)[:, None, None, None]
+    dividends = np.zeros_like(rates) if q is None else np.asarray(q, dtype=float)[:, None, None, None]
+    calls = np.asarray(is_call, dtype=bool)[:, None, None, None]
+    vols = np.maximum(np.asarray(sigma, dtype=float)[:, None] + shifts[None, :], 1e-4)[:, :, None, None]
+    S = spots[None, None, None, :]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        model_value = bs_price_vec(S, strikes, np.maximum(tau, 0.0), rates, vols, calls, dividends)
+    intrinsic = np.where(calls, np.maximum(S - strikes, 0), np.maximum(strikes - S, 0))
+    leg_values = np.where(tau > 0, model_value, intrinsic)
+
+    w = np.asarray(weight, dtype=float)
+    cost = float(np.sum(w * np.asarray(premium, dtype=float)))
+    pnl = (np.tensordot(w, leg_values, axes=(0, 0)) - cost) * CONTRACT_MULTIPLIER
+
+    return PnLSurface(
+        spot_prices=np.round(spots, 3).tolist(),
+        days_forward=np.round(days_forward, 3).tolist(),
+        valuation_dates=[(as_of + timedelta(days=int(round(d)))).isoformat() for d in days_forward],
+        vol_shifts=shifts.tolist(),
+        pnl=np.round(pnl, 3).tolist(),
+    )
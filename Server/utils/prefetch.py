@@ -0,0 +1,180 @@
+"""
+Prefetch en segundo plano de los tickers vigilados.
+
+Con `PREFETCH_WATCHLIST=SPY,QQQ,AAPL` el servidor (HTTP o MCP) arranca un
+hilo que, para cada ticker, vuelve a descargar spot, vencimientos, datos del
+ticker, la curva de FRED y las cadenas de los vencimientos más cercanos, y
+precalcula las griegas (IV por strike) y la densidad implícita de cada uno.
+Los pedidos sobre esos tickers encuentran todo en caché.
+
+Variables de entorno:
+- `PREFETCH_WATCHLIST`: tickers separados por coma (vacío = desactivado).
+- `PREFETCH_EXPIRATIONS`: vencimientos más cercanos a precalcular (por defecto 3).
+- `PREFETCH_MARKET_SECONDS`: intervalo con el mercado abierto (por defecto 60).
+- `PREFETCH_CLOSED_SECONDS`: intervalo con el mercado cerrado (por defecto 1800).
+
+Horario de mercado: lunes a viernes de 9:30 a 16:00 (America/New_York), sin
+contemplar feriados. Con el mercado cerrado, el siguiente ciclo nunca se
+programa después de la apertura.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, time as dtime, timedelta
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+from .cache import TTLCache
+from .etag import note_market_read
+from .metrics import PREFETCH_CYCLE, PREFETCH_ERRORS, PREFETCH_REFRESHES
+from .profiling import replay_active
+
+logger = logging.getLogger(__name__)
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+
+# Parámetros por defecto de get_distribution, los que se precalculan
+DENSITY_MONEYNESS = (0.7, 1.3)
+
+_precomputed = TTLCache(ttl_seconds=60, maxsize=512, name="precomputed")
+_refreshing: ContextVar[bool] = ContextVar("prefetch_refreshing", default=False)
+
+
+def watchlist_from_env() -> List[str]:
+    return [t.strip().upper() for t in os.getenv("PREFETCH_WATCHLIST", "").split(",") if t.strip()]
+
+
+def market_open(now: Optional[datetime] = None) -> bool:
+    """Si el mercado de EE.UU. está abierto en `now` (por defecto, ahora)."""
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def seconds_until_open(now: Optional[datetime] = None) -> float:
+    """Segundos hasta la próxima apertura (0 si el mercado está abierto)."""
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    if market_open(now):
+        return 0.0
+    opening = now.replace(hour=MARKET_OPEN.hour, minute=MARKET_OPEN.minute, second=0, microsecond=0)
+    while opening <= now or opening.weekday() >= 5:
+        opening += timedelta(days=1)
+    return (opening - now).total_seconds()
+
+
+def next_delay(market_interval: float, closed_interval: float, now: Optional[datetime] = None) -> float:
+    """Espera hasta el próximo ciclo: corta con el mercado abierto, larga (hasta la apertura) si no."""
+    if market_open(now):
+        return market_interval
+    return max(min(closed_interval, seconds_until_open(now)), 1.0)
+
+
+def get_precomputed(tool: str, key: Hashable) -> Any:
+    """
+    Resultado precalculado por el prefetch para `tool` y `key` (o None).
+
+    Durante el propio prefetch y durante un replay de datos grabados siempre
+    devuelve None, para que se calcule con los datos vigentes.
+    """
+    if _refreshing.get() or replay_active():
+        return None
+    value = _precomputed.get((tool, key))
+    if value is not None:
+        note_market_read("precomputed", (tool, key), _precomputed.version_of((tool, key), value))
+    return value
+
+
+class PrefetchScheduler:
+    """Hilo que mantiene calientes las cachés de los tickers vigilados."""
+
+    def __init__(self, watchlist: Sequence[str], max_expirations: int = 3,
+                 market_interval: float = 60.0, closed_interval: float = 1800.0):
+        self.watchlist = list(watchlist)
+        self.max_expirations = max_expirations
+        self.market_interval = market_interval
+        self.closed_interval = closed_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self, underlying: str, ttl_seconds: float) -> None:
+        """Actualiza los datos de `underlying` y precalcula sus griegas y densidades."""
+        from Server.core.tools.get_implied_distribution import compute_implied_density
+        from Server.core.tools.greeks import compute_greeks_chain
+        from Server.utils.market_data import warm_underlying
+        from Server.utils.risk_free import get_risk_free_curve
+
+        token = _refreshing.set(True)
+        try:
+            expirations = warm_underlying(underlying, self.max_expirations, ttl_seconds)
+            get_risk_free_curve()
+            for expiration in expirations:
+                try:
+                    greeks = compute_greeks_chain(underlying, expiration)
+                    _precomputed.set(("compute_greeks", (underlying, expiration)), greeks, ttl_seconds)
+                    density = compute_implied_density(underlying, expiration, *DENSITY_MONEYNESS)
+                    _precomputed.set(("implied_density", (underlying, expiration, *DENSITY_MONEYNESS)),
+                                     density, ttl_seconds)
+                except ValueError as e:
+                    # Vencimientos del día o sin calls suficientes: se calculan a pedido
+                    logger.debug("Prefetch %s %s: %s", underlying, expiration, e)
+        finally:
+            _refreshing.reset(token)
+
+    def run_once(self, ttl_seconds: float) -> Dict[str, Optional[str]]:
+        """Un ciclo sobre toda la lista. Devuelve el error de cada ticker (None si anduvo)."""
+        start = time.perf_counter()
+        errors: Dict[str, Optional[str]] = {}
+        for underlying in self.watchlist:
+            try:
+                self.refresh(underlying, ttl_seconds)
+                PREFETCH_REFRESHES.inc(underlying=underlying)
+                errors[underlying] = None
+            except Exception as e:  # un ticker caído no frena al resto
+                PREFETCH_ERRORS.inc(underlying=underlying)
+                errors[underlying] = f"{type(e).__name__}: {e}"
+                logger.warning("Prefetch de %s falló: %s", underlying, e)
+        PREFETCH_CYCLE.observe(time.perf_counter() - start)
+        return errors
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            delay = next_delay(self.market_interval, self.closed_interval)
+            # Vigente hasta después del próximo ciclo, aunque éste tarde
+            self.run_once(ttl_seconds=2 * delay)
+            self._stop.wait(delay)
+
+    def start(self) -> "PrefetchScheduler":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_scheduler: Optional[PrefetchScheduler] = None
+
+
+def start_prefetch_from_env() -> Optional[PrefetchScheduler]:
+    """Arranca (una sola vez) el prefetch configurado por entorno; None si no hay watchlist."""
+    global _scheduler
+    watchlist = watchlist_from_env()
+    if not watchlist:
+        return None
+    if _scheduler is None:
+        _scheduler = PrefetchScheduler(
+            watchlist,
+            max_expirations=int(os.getenv("PREFETCH_EXPIRATIONS", "3")),
+            market_interval=float(os.getenv("PREFETCH_MARKET_SECONDS", "60")),
+            closed_interval=float(os.getenv("PREFETCH_CLOSED_SECONDS", "1800")),
+        )
+    logger.info("Prefetch activo para %s", ", ".join(watchlist))
+    return _scheduler.start()
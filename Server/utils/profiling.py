@@ -0,0 +1,360 @@
+"""
+Captura de llamadas lentas: perfil muestreado + datos de mercado para replay.
+
+Se activa con la variable de entorno `SLOW_CALL_PROFILE_MS` (umbral en ms).
+Mientras una tool corre, un hilo muestreador registra su pila cada
+`SLOW_CALL_SAMPLE_MS` ms (por defecto 5) y `market_data` / `risk_free`
+informan cada dato de mercado que la llamada usó. Si la llamada supera el
+umbral se guarda en `SLOW_CALL_PROFILE_DIR`:
+
+- `profile-<fecha>-<tool>-<id>.json`: tool, función, argumentos, duración,
+  pilas muestreadas (formato "folded": `a;b;c` -> cantidad de muestras) y los
+  IDs de los snapshots de mercado usados.
+- `snapshots/<id>.pkl`: cada dato de mercado, identificado por el hash de su
+  contenido (se comparte entre perfiles).
+
+Sólo se conservan los últimos `SLOW_CALL_PROFILE_KEEP` perfiles (por defecto
+50); los snapshots que ya no usa ningún perfil se borran.
+
+Replay offline (usa los snapshots en lugar de Yahoo/FRED):
+    python -m Server.utils.profiling list
+    python -m Server.utils.profiling replay <perfil.json>
+
+Nota: las tools calculan el plazo al vencimiento con la fecha de hoy, así que
+un replay en otro día reproduce los datos de mercado pero no ese plazo.
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 128
+
+_capture: ContextVar[Optional["_Capture"]] = ContextVar("slow_call_capture", default=None)
+_replay: ContextVar[Optional[Dict[Tuple[str, Tuple], Any]]] = ContextVar("market_data_replay", default=None)
+_write_lock = threading.Lock()
+
+
+def profile_threshold_ms() -> Optional[float]:
+    """Umbral configurado en `SLOW_CALL_PROFILE_MS` (None si la captura está desactivada)."""
+    value = os.getenv("SLOW_CALL_PROFILE_MS")
+    return float(value) if value else None
+
+
+def profile_dir() -> str:
+    return os.getenv("SLOW_CALL_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "options-slow-calls"))
+
+
+def _profile_keep() -> int:
+    return int(os.getenv("SLOW_CALL_PROFILE_KEEP", "50"))
+
+
+# --- Muestreo de pilas -------------------------------------------------------
+
+def _stack_key(frame) -> str:
+    """Pila de un frame en formato folded (raíz primero): `archivo:función:línea;...`."""
+    parts = []
+    while frame is not None and len(parts) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class _Sampler(threading.Thread):
+    """Hilo único que muestrea las pilas de los hilos con una captura activa."""
+
+    def __init__(self, interval: float):
+        super().__init__(name="slow-call-sampler", daemon=True)
+        self.interval = interval
+        self._targets: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def add(self, thread_id: int) -> Counter:
+        counts: Counter = Counter()
+        with self._lock:
+            self._targets[thread_id] = counts
+            self._wake.set()
+        return counts
+
+    def remove(self, thread_id: int) -> None:
+        with self._lock:
+            self._targets.pop(thread_id, None)
+            if not self._targets:
+                self._wake.clear()
+
+    def run(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                targets = list(self._targets.items())
+            frames = sys._current_frames()
+            for thread_id, counts in targets:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    counts[_stack_key(frame)] += 1
+
+
+_sampler: Optional[_Sampler] = None
+_sampler_lock = threading.Lock()
+
+
+def _get_sampler() -> _Sampler:
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = _Sampler(float(os.getenv("SLOW_CALL_SAMPLE_MS", "5")) / 1000)
+            _sampler.start()
+        return _sampler
+
+
+# --- Datos de mercado --------------------------------------------------------
+
+class _Capture:
+    """Datos de mercado usados por la llamada en curso."""
+
+    def __init__(self):
+        self.market_data: Dict[Tuple[str, Tuple], Any] = {}
+
+
+def use_market_data(kind: str, key: Tuple[Hashable, ...], loader: Callable[[], Any]) -> Any:
+    """
+    Punto único por el que las tools obtienen datos de mercado.
+
+    En un replay devuelve el snapshot grabado; si no, llama a `loader` y, si
+    hay una captura activa, registra el valor usado.
+    """
+    replay = _replay.get()
+    if replay is not None:
+        try:
+            return replay[(kind, tuple(key))]
+        except KeyError:
+            raise LookupError(f"El perfil no tiene datos grabados para {kind} {key}") from None
+    value = loader()
+    capture = _capture.get()
+    if capture is not None:
+        capture.market_data[(kind, tuple(key))] = value
+    return value
+
+
+def replay_active() -> bool:
+    """Si el contexto actual está sirviendo datos de mercado fijos (replay o benchmark)."""
+    return _replay.get() is not None
+
+
+def _snapshot_id(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def _write_snapshot(directory: str, value: Any) -> str:
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    snapshot_id = _snapshot_id(payload)
+    path = os.path.join(directory, "snapshots", f"{snapshot_id}.pkl")
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    return snapshot_id
+
+
+# --- Captura -----------------------------------------------------------------
+
+def _function_path(func: Callable) -> str:
+    return f"{func.__module__}:{func.__qualname__}"
+
+
+@contextmanager
+def profile_call(tool: str, func: Callable, arguments: Dict[str, Any]) -> Iterator[None]:
+    """
+    Perfila la llamada `func(**arguments)` si la captura está activada.
+
+    Si tarda más que `SLOW_CALL_PROFILE_MS` (o falla después de superarlo) se
+    guarda el perfil con sus datos de mercado. Sin la variable de entorno no
+    hace nada.
+    """
+    threshold_ms = profile_threshold_ms()
+    if threshold_ms is None or _capture.get() is not None or _replay.get() is not None:
+        yield
+        return
+
+    capture = _Capture()
+    token = _capture.set(capture)
+    sampler = _get_sampler()
+    thread_id = threading.get_ident()
+    counts = sampler.add(thread_id)
+    started_at = datetime.now()
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        sampler.remove(thread_id)
+        _capture.reset(token)
+        if duration_ms >= threshold_ms:
+            try:
+                save_profile(tool, func, arguments, capture, counts, started_at,
+                             duration_ms, threshold_ms, sampler.interval, error)
+            except Exception as e:  # perfilar nunca debe romper la tool
+                logger.warning("No se pudo guardar el perfil de %s: %s", tool, e)
+
+
+def save_profile(tool: str, func: Callable, arguments: Dict[str, Any], capture: _Capture,
+                 counts: Counter, started_at: datetime, duration_ms: float, threshold_ms: float,
+                 interval: float, error: Optional[str] = None) -> str:
+    """Escribe el perfil y sus snapshots, aplica la rotación y devuelve la ruta del perfil."""
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    profile_id = uuid.uuid4().hex[:8]
+
+    with _write_lock:
+        market_data = [
+            {"kind": kind, "key": list(key), "snapshot_id": _write_snapshot(directory, value)}
+            for (kind, key), value in capture.market_data.items()
+        ]
+        record = {
+            "id": profile_id,
+            "tool": tool,
+            "function": _function_path(func),
+            "arguments": arguments,
+            "started_at": started_at.isoformat(timespec="milliseconds"),
+            "duration_ms": round(duration_ms, 3),
+            "threshold_ms": threshold_ms,
+            "sample_interval_ms": interval * 1000,
+            "samples": sum(counts.values()),
+            "stacks": [{"stack": stack, "count": n} for stack, n in counts.most_common()],
+            "market_data": market_data,
+            "error": error,
+        }
+        name = f"profile-{started_at:%Y%m%dT%H%M%S.%f}-{tool}-{profile_id}.json"
+        path = os.path.join(directory, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, default=str, indent=1)
+        _rotate(directory, _profile_keep())
+    return path
+
+
+def list_profiles(directory: Optional[str] = None) -> List[str]:
+    """Perfiles guardados, del más viejo al más nuevo."""
+    directory = directory or profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(n for n in os.listdir(directory) if n.startswith("profile-") and n.endswith(".json"))
+    return [os.path.join(directory, n) for n in names]
+
+
+def _rotate(directory: str, keep: int) -> None:
+    """Borra los perfiles más viejos y los snapshots que ya no se usan."""
+    profiles = list_profiles(directory)
+    for path in profiles[:max(len(profiles) - keep, 0)]:
+        os.remove(path)
+
+    used = set()
+    for path in list_profiles(directory):
+        with open(path, encoding="utf-8") as f:
+            used.update(item["snapshot_id"] for item in json.load(f)["market_data"])
+    snapshots = os.path.join(directory, "snapshots")
+    if os.path.isdir(snapshots):
+        for name in os.listdir(snapshots):
+            if name.endswith(".pkl") and name[:-4] not in used:
+                os.remove(os.path.join(snapshots, name))
+
+
+# --- Replay ------------------------------------------------------------------
+
+def load_profile(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_market_data(record: Dict[str, Any], directory: Optional[str] = None) -> Dict[Tuple[str, Tuple], Any]:
+    """Datos de mercado grabados en un perfil, por (tipo, clave)."""
+    directory = directory or profile_dir()
+    data = {}
+    for item in record["market_data"]:
+        with open(os.path.join(directory, "snapshots", f"{item['snapshot_id']}.pkl"), "rb") as f:
+            data[(item["kind"], tuple(item["key"]))] = pickle.load(f)
+    return data
+
+
+@contextmanager
+def serve_market_data(data: Dict[Tuple[str, Tuple], Any]) -> Iterator[None]:
+    """
+    Sirve datos de mercado fijos en lugar de descargarlos.
+
+    Las claves son las de `use_market_data`, por ejemplo ("spot", ("SPY",)) o
+    ("chain", ("SPY", "2030-01-18")). Lo usan el replay y los benchmarks.
+    """
+    token = _replay.set(data)
+    try:
+        yield
+    finally:
+        _replay.reset(token)
+
+
+def replay_market_data(record: Dict[str, Any], directory: Optional[str] = None):
+    """Sirve los datos de mercado grabados en un perfil en lugar de descargarlos."""
+    return serve_market_data(load_market_data(record, directory))
+
+
+def replay_profile(path: str) -> Any:
+    """Vuelve a ejecutar la llamada de un perfil contra sus datos de mercado grabados."""
+    record = load_profile(path)
+    module_name, _, qualname = record["function"].partition(":")
+    func = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        func = getattr(func, attr)
+    with replay_market_data(record, os.path.dirname(os.path.abspath(path))):
+        return func(**record["arguments"])
+
+
+def _main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Perfiles de llamadas lentas")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Listar perfiles guardados")
+    replay = sub.add_parser("replay", help="Re-ejecutar un perfil con sus datos grabados")
+    replay.add_argument("path")
+    replay.add_argument("--top", type=int, default=10, help="Pilas más frecuentes a mostrar")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for path in list_profiles():
+            record = load_profile(path)
+            print(f"{record['started_at']}  {record['tool']:<28} {record['duration_ms']:>10.1f} ms  {path}")
+        return
+
+    record = load_profile(args.path)
+    print(f"{record['tool']} {record['arguments']} - grabado: {record['duration_ms']:.1f} ms")
+    for item in record["stacks"][:args.top]:
+        leaf = item["stack"].rsplit(";", 1)[-1]
+        print(f"  {item['count']:>6} muestras  {leaf}")
+    start = time.perf_counter()
+    replay_profile(args.path)
+    print(f"replay: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,172 @@
+"""
+Limpieza de cotizaciones de una cadena antes de resolver IV o densidades.
+
+Un lado de la cadena (calls o puts) pasa por:
+
+1. Precio de referencia: mid si hay bid y ask; si no, `lastPrice` sólo si
+   el último trade no está viejo (`QUOTE_STALE_HOURS` antes del trade más
+   reciente de la cadena, así funciona igual fuera de horario).
+2. Cotas de no arbitraje: un precio cuyo rango bid-ask queda entero fuera de
+   [intrínseco descontado, S·e^{-qt} (calls) / K (puts)] se descarta; si el
+   rango toca la cota, el precio se recorta a ella (reparado).
+3. Monotonía y convexidad en el strike: los precios deben formar una curva
+   convexa. Con dos puntos ancla (K=0 y un strike lejano, con el valor de
+   las cotas) la convexidad también impone la monotonía y las pendientes
+   máximas. En cada pasada se elige, con operaciones vectorizadas, el
+   contrato cuya eliminación más reduce los butterflies negativos (pesado
+   por liquidez): se repara a la cuerda de sus vecinos si eso cae dentro de
+   su bid-ask, o se descarta.
+4. Pesos por liquidez: log(1 + volumen + open interest) / spread,
+   normalizados a [0, 1]; cero para los descartados.
+
+Los spreads anchos (`QUOTE_MAX_RELATIVE_SPREAD` del mid) y los trades viejos
+quedan marcados en `flags`.
+"""
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+QUOTE_MAX_RELATIVE_SPREAD = float(os.getenv("QUOTE_MAX_RELATIVE_SPREAD", "0.5"))
+QUOTE_STALE_HOURS = float(os.getenv("QUOTE_STALE_HOURS", "24"))
+# Tolerancia de precio (un centavo: el redondeo de bid y ask a centavos)
+QUOTE_TOLERANCE = 0.01
+# Spread mínimo para los pesos (evita pesos infinitos con bid == ask)
+_MIN_SPREAD = 0.01
+
+FLAG_WIDE_SPREAD = 1
+FLAG_STALE = 2
+FLAG_REPAIRED = 4
+FLAG_DROPPED = 8
+
+
+@dataclass
+class CleanQuotes:
+    """Precios limpios de un lado de la cadena, alineados con las filas del DataFrame."""
+    price: np.ndarray       # NaN en los descartados o sin precio
+    weight: np.ndarray      # liquidez en [0, 1]
+    flags: np.ndarray       # combinación de FLAG_*
+
+    @property
+    def valid(self) -> np.ndarray:
+        return np.isfinite(self.price)
+
+
+def _trade_age_stale(options_df) -> np.ndarray:
+    """True en las filas cuyo último trade es `QUOTE_STALE_HOURS` anterior al más reciente."""
+    if "lastTradeDate" not in options_df:
+        return np.zeros(len(options_df), dtype=bool)
+    traded = options_df["lastTradeDate"].to_numpy(dtype="datetime64[ns]")
+    known = ~np.isnat(traded)
+    if not known.any():
+        return np.zeros(len(options_df), dtype=bool)
+    cutoff = traded[known].max() - np.timedelta64(int(QUOTE_STALE_HOURS * 3600), "s")
+    return known & (traded < cutoff)
+
+
+def _butterfly_excess(kl, pl, km, pm, kr, pr) -> np.ndarray:
+    """Cuánto supera `pm` a la cuerda entre sus vecinos, por encima de la tolerancia (0 si es convexo)."""
+    chord = pl + (pr - pl) * (km - kl) / (kr - kl)
+    return np.maximum(pm - chord - QUOTE_TOLERANCE, 0.0)
+
+
+def _removal_gain(k: np.ndarray, p: np.ndarray) -> np.ndarray:
+    """
+    Reducción del exceso total de butterflies al quitar cada punto (curva ordenada por strike).
+
+    Quitar el punto i elimina los butterflies centrados en i-1, i e i+1 y crea
+    los de i-1 (con i-2, i+1) y de i+1 (con i-1, i+2).
+    """
+    n = k.size
+    v = np.zeros(n)
+    v[1:-1] = _butterfly_excess(k[:-2], p[:-2], k[1:-1], p[1:-1], k[2:], p[2:])
+    before = v + np.r_[0.0, v[:-1]] + np.r_[v[1:], 0.0]
+    after = np.zeros(n)
+    after[2:n - 1] += _butterfly_excess(k[:n - 3], p[:n - 3], k[1:n - 2], p[1:n - 2], k[3:], p[3:])
+    after[1:n - 2] += _butterfly_excess(k[:n - 3], p[:n - 3], k[2:n - 1], p[2:n - 1], k[3:], p[3:])
+    return before - after
+
+
+def clean_quotes(options_df, S: float, t: float, r: float, is_call: bool, q: float = 0.0) -> CleanQuotes:
+    """
+    Limpia las cotizaciones de un lado de la cadena (ver docstring del módulo).
+
+    Args:
+        options_df: DataFrame de yfinance (calls o puts)
+        S (float): Precio spot
+        t (float): Tiempo al vencimiento en años
+        r (float): Tasa libre de riesgo
+        is_call (bool): True para calls
+        q (float): Rendimiento por dividendos continuo
+
+    Returns:
+        CleanQuotes con precio, peso de liquidez y flags por fila
+    """
+    K = options_df["strike"].to_numpy(dtype=float)
+    bid = options_df["bid"].to_numpy(dtype=float)
+    ask = options_df["ask"].to_numpy(dtype=float)
+    last = options_df["lastPrice"].to_numpy(dtype=float)
+    n = K.size
+    flags = np.zeros(n, dtype=np.uint8)
+
+    # 1) Precio de referencia
+    quoted = (bid > 0) & (ask >= bid)
+    mid = (bid + ask) / 2
+    stale = _trade_age_stale(options_df)
+    wide = quoted & (ask - bid > QUOTE_MAX_RELATIVE_SPREAD * mid)
+    flags[stale] |= FLAG_STALE
+    flags[wide] |= FLAG_WIDE_SPREAD
+    price = np.where(quoted, mid, np.where((last > 0) & ~stale, last, np.nan))
+    low_band = np.where(quoted, bid, price)
+    high_band = np.where(quoted, ask, price)
+
+    # 2) Cotas de no arbitraje
+    disc_S, disc_K = S * np.exp(-q * t), K * np.exp(-r * t)
+    lower = np.maximum(disc_S - disc_K, 0.0) if is_call else np.maximum(disc_K - disc_S, 0.0)
+    upper = np.full(n, disc_S) if is_call else K
+    with np.errstate(invalid="ignore"):
+        outside = (high_band < lower - QUOTE_TOLERANCE) | (low_band > upper + QUOTE_TOLERANCE)
+        clipped = ~outside & ((price < lower) | (price > upper))
+    price = np.where(outside, np.nan, np.clip(price, lower, upper))
+    flags[outside & np.isfinite(low_band)] |= FLAG_DROPPED
+    flags[clipped] |= FLAG_REPAIRED
+
+    # Pesos por liquidez (los contratos sin bid-ask cuentan con todo el precio como spread)
+    volume = np.nan_to_num(options_df["volume"].to_numpy(dtype=float)) if "volume" in options_df else 0.0
+    interest = np.nan_to_num(options_df["openInterest"].to_numpy(dtype=float)) if "openInterest" in options_df else 0.0
+    spread = np.where(quoted, ask - bid, price)
+    weight = np.log1p(volume + interest + 1.0) / np.maximum(np.nan_to_num(spread, nan=np.inf), _MIN_SPREAD)
+
+    # 3) Convexidad (y monotonía, vía los anclas) en el strike
+    order = np.argsort(K, kind="stable")
+    far = 10.0 * max(float(K.max(initial=0.0)), S)
+    anchors = ((0.0, disc_S), (far, 0.0)) if is_call else ((0.0, 0.0), (far, far * np.exp(-r * t) - disc_S))
+    repaired = np.zeros(n, dtype=bool)
+    for _ in range(n):
+        rows = order[np.isfinite(price[order])]
+        if rows.size < 2:
+            break
+        k = np.r_[anchors[0][0], K[rows], anchors[1][0]]
+        p = np.r_[anchors[0][1], price[rows], anchors[1][1]]
+        gain = _removal_gain(k, p)[1:-1]
+        if gain.max() <= 0:
+            break
+        # Entre los que mejoran la curva, el menos líquido relativo a lo que mejora
+        score = np.where(gain > 0, gain / (weight[rows] / weight[rows].max() + 0.05), -np.inf)
+        i = int(np.argmax(score))
+        row = rows[i]
+        target = p[i] + (p[i + 2] - p[i]) * (k[i + 1] - k[i]) / (k[i + 2] - k[i])
+        if not repaired[row] and low_band[row] - QUOTE_TOLERANCE <= target <= high_band[row] + QUOTE_TOLERANCE:
+            price[row] = target
+            repaired[row] = True
+            flags[row] |= FLAG_REPAIRED
+        else:
+            price[row] = np.nan
+            flags[row] |= FLAG_DROPPED
+
+    valid = np.isfinite(price)
+    weight = np.where(valid, weight, 0.0)
+    if weight.max(initial=0.0) > 0:
+        weight = weight / weight.max()
+    return CleanQuotes(price=price, weight=weight, flags=flags)
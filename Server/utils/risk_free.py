@@ -4,8 +4,13 @@ from datetime import date
 import os
 import requests
 
+from .upstream import UpstreamUnavailable, upstream_call
+from .etag import note_market_read
+from .profiling import use_market_data
+
 load_dotenv()
 key = os.getenv("FRED_API_KEY")
+FRED_TIMEOUT_SECONDS = float(os.getenv("FRED_TIMEOUT_SECONDS", "10"))
 
 FRED_SERIES: Dict[str, str] = {
     "1MO": "DGS1MO",
@@ -48,9 +53,10 @@ def _download_last_yield(series_id: str) -> float:
     }
 
     try:
-        r = requests.get(url, params=params)
-        r.raise_for_status()
-        data = r.json()
+        with upstream_call("fred"):
+            r = requests.get(url, params=params, timeout=FRED_TIMEOUT_SECONDS)
+            r.raise_for_status()
+            data = r.json()
         raw_value = data["observations"][0]["value"]
 
         # FRED a veces devuelve "."
@@ -59,45 +65,53 @@ def _download_last_yield(series_id: str) -> float:
 
         return float(raw_value) / 100
     
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise RuntimeError(f"Error al descargar datos de FRED ({series_id}): {e}")
 from datetime import date, datetime
+from typing import List, Tuple
 
-def get_risk_free_rate(expiration: str) -> float:
-    """
-    Obtiene la tasa libre de riesgo interpolada para una fecha de expiración determinada.
-    
-    :param expiration: Fecha de vencimiento en formato 'YYYY-MM-DD'.
-    :return: Tasa libre de riesgo anualizada (float).
+from .cache import TTLCache
+
+# FRED publica las series una vez por día: la curva se puede reutilizar un buen rato.
+_curve_cache = TTLCache(ttl_seconds=float(os.getenv("FRED_CURVE_TTL_SECONDS", "3600")), maxsize=1, name="fred_curve")
+
+
+def get_risk_free_curve() -> Tuple[List[float], List[float]]:
     """
+    Descarga (o reutiliza) la curva de tasas del Tesoro de FRED.
 
-    # 1) Parsear el string a date
-    try:
-        expiration_date = datetime.strptime(expiration, "%Y-%m-%d").date()
-    except ValueError:
-        raise ValueError("La fecha de vencimiento debe tener formato 'YYYY-MM-DD'.")
+    :return: Tupla (madurez en años, tasa anualizada), ordenada por madurez.
+    """
+    def _download() -> Tuple[List[float], List[float]]:
+        points_x = []
+        points_y = []
 
-    valuation_date = date.today()
+        for _, series_id in FRED_SERIES.items():
+            rate = _download_last_yield(series_id)
+            maturity = MATURITY_YEARS[series_id]
 
-    if expiration_date <= valuation_date:
-        raise ValueError("La fecha de vencimiento debe ser posterior a hoy.")
+            points_x.append(maturity)
+            points_y.append(rate)
 
-    years_to_expiration = (expiration_date - valuation_date).days / 365.0
+        # Ordenar por madurez
+        paired = sorted(zip(points_x, points_y))
+        return [p[0] for p in paired], [p[1] for p in paired]
 
-    points_x = []
-    points_y = []
+    curve = use_market_data("risk_free_curve", (),
+                            lambda: _curve_cache.get_or_set("curve", _download, serve_stale=True))
+    note_market_read("risk_free_curve", (), _curve_cache.version_of("curve", curve))
+    return curve
 
-    for _, series_id in FRED_SERIES.items():
-        rate = _download_last_yield(series_id)
-        maturity = MATURITY_YEARS[series_id]
 
-        points_x.append(maturity)
-        points_y.append(rate)
+def interpolate_risk_free_rate(curve: Tuple[List[float], List[float]], years_to_expiration: float) -> float:
+    """
+    Interpola linealmente la curva de tasas para un plazo dado (en años).
 
-    # Ordenar por madurez
-    paired = sorted(zip(points_x, points_y))
-    x_vals = [p[0] for p in paired]
-    y_vals = [p[1] for p in paired]
+    Fuera del rango de la curva se extrapola de forma constante.
+    """
+    x_vals, y_vals = curve
 
     # Fuera del rango: extrapolación constante
     if years_to_expiration <= x_vals[0]:
@@ -117,3 +131,27 @@ def get_risk_free_rate(expiration: str) -> float:
 
     # (Opcional) por si algo raro pasa:
     raise RuntimeError("No se pudo interpolar la tasa.")
+
+
+def get_risk_free_rate(expiration: str) -> float:
+    """
+    Obtiene la tasa libre de riesgo interpolada para una fecha de expiración determinada.
+    
+    :param expiration: Fecha de vencimiento en formato 'YYYY-MM-DD'.
+    :return: Tasa libre de riesgo anualizada (float).
+    """
+
+    # 1) Parsear el string a date
+    try:
+        expiration_date = datetime.strptime(expiration, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("La fecha de vencimiento debe tener formato 'YYYY-MM-DD'.")
+
+    valuation_date = date.today()
+
+    if expiration_date <= valuation_date:
+        raise ValueError("La fecha de vencimiento debe ser posterior a hoy.")
+
+    years_to_expiration = (expiration_date - valuation_date).days / 365.0
+
+    return interpolate_risk_free_rate(get_risk_free_curve(), years_to_expiration)
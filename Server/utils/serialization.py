@@ -0,0 +1,238 @@
+"""
+Serialización de resultados de tools para el puente HTTP.
+
+JSON sigue siendo el formato por defecto. Cuando el cliente lo pide vía
+`Accept`, las partes tabulares del resultado (cadenas columnares, listas de
+registros, superficies de P&L) se devuelven como un stream Arrow IPC.
+
+pyarrow es opcional: si no está instalado, el servidor responde en JSON.
+
+Las respuestas de más de `COMPRESS_MIN_BYTES` (default 1024) se comprimen
+con brotli o gzip según `Accept-Encoding`. brotli también es opcional: sin
+el paquete `brotli` se usa gzip.
+"""
+
+import gzip
+import importlib.util
+import json
+import os
+from dataclasses import fields, is_dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..model.options import OptionColumns, PnLSurface
+
+JSON_MEDIA_TYPE = "application/json"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Columna que identifica a qué tabla del resultado pertenece cada fila
+TABLE_COLUMN = "table"
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+
+
+def arrow_available() -> bool:
+    """Indica si pyarrow está instalado (sin importarlo)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def brotli_available() -> bool:
+    """Indica si el paquete brotli está instalado (sin importarlo)."""
+    return importlib.util.find_spec("brotli") is not None
+
+
+def convert_to_dict(obj):
+    """Convierte recursivamente resultados (dataclasses, cadenas columnares) a valores JSON."""
+    if isinstance(obj, OptionColumns):
+        return obj.to_records()
+    elif is_dataclass(obj):
+        return {f.name: convert_to_dict(getattr(obj, f.name)) for f in fields(obj)}
+    elif isinstance(obj, list):
+        return [convert_to_dict(item) for item in obj]
+    elif isinstance(obj, dict):
+        return {k: convert_to_dict(v) for k, v in obj.items()}
+    elif hasattr(obj, '__dict__'):
+        return {k: convert_to_dict(v) for k, v in vars(obj).items()}
+    else:
+        return obj
+
+
+def _parse_accept(accept: str) -> Dict[str, float]:
+    """Media types del header `Accept` con su calidad (q)."""
+    weights = {}
+    for part in accept.split(","):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        if not media_type:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[media_type.lower()] = q
+    return weights
+
+
+def wants_arrow(accept: Optional[str]) -> bool:
+    """
+    True si el cliente prefiere Arrow IPC sobre JSON.
+
+    Arrow sólo se usa cuando se pide explícitamente; `*/*` o la ausencia del
+    header mantienen JSON.
+    """
+    if not accept:
+        return False
+    weights = _parse_accept(accept)
+    arrow_q = weights.get(ARROW_STREAM_MEDIA_TYPE, 0.0)
+    json_q = max(weights.get(JSON_MEDIA_TYPE, 0.0), weights.get("*/*", 0.0))
+    return arrow_q > 0 and arrow_q >= json_q
+
+
+def _surface_columns(surface: PnLSurface) -> Dict[str, np.ndarray]:
+    """
+    Superficie (vol_shift × fecha × spot) con una fila por (vol_shift, fecha).
+
+    `pnl` es una matriz (filas × spots) que se codifica como lista de tamaño
+    fijo; el eje de spots viaja en los metadatos (`spot_prices`).
+    """
+    n_vols, n_dates = len(surface.vol_shifts), len(surface.days_forward)
+    vol = np.repeat(np.arange(n_vols), n_dates)
+    day = np.tile(np.arange(n_dates), n_vols)
+    return {
+        "vol_shift": np.asarray(surface.vol_shifts, dtype=float)[vol],
+        "days_forward": np.asarray(surface.days_forward, dtype=float)[day],
+        "valuation_date": np.asarray(surface.valuation_dates, dtype=object)[day],
+        "pnl": np.asarray(surface.pnl, dtype=float).reshape(n_vols * n_dates, len(surface.spot_prices)),
+    }
+
+
+def _records_columns(records: List[Any]) -> Dict[str, list]:
+    """Lista de registros (dataclasses o dicts) transpuesta a columnas."""
+    rows = [convert_to_dict(r) for r in records]
+    names = list(rows[0])
+    return {name: [row.get(name) for row in rows] for name in names}
+
+
+def split_tables(result: Any) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+    """
+    Separa un resultado en tablas columnares y metadatos escalares.
+
+    Son tablas los campos `OptionColumns`, `PnLSurface` y las listas de
+    registros (dataclasses o dicts). El resto (escalares, listas de escalares,
+    objetos anidados pequeños) va a los metadatos en formato JSON; para las
+    superficies, los metadatos guardan el eje de spots.
+
+    Returns:
+        (tablas, meta) donde tablas es nombre -> {columna: valores}.
+    """
+    if isinstance(result, PnLSurface):
+        return {"pnl_surface": _surface_columns(result)}, {"pnl_surface": {"spot_prices": result.spot_prices}}
+    if not is_dataclass(result):
+        return {}, convert_to_dict(result)
+
+    tables: Dict[str, Dict[str, Any]] = {}
+    meta: Dict[str, Any] = {}
+    for f in fields(result):
+        value = getattr(result, f.name)
+        if isinstance(value, OptionColumns):
+            tables[f.name] = value.columns
+        elif isinstance(value, PnLSurface):
+            tables[f.name] = _surface_columns(value)
+            meta[f.name] = {"spot_prices": value.spot_prices}
+        elif isinstance(value, list) and value and (is_dataclass(value[0]) or isinstance(value[0], dict)):
+            tables[f.name] = _records_columns(value)
+        else:
+            meta[f.name] = convert_to_dict(value)
+    return tables, meta
+
+
+def _to_arrow_array(pa, values):
+    """
+    Columna Arrow a partir de un array o lista.
+
+    Las matrices 2D se codifican como listas de tamaño fijo y las columnas de
+    texto con muchos valores repetidos como diccionario.
+    """
+    if isinstance(values, np.ndarray) and values.ndim == 2:
+        return pa.FixedSizeListArray.from_arrays(pa.array(values.ravel()), values.shape[1])
+    array = pa.array(values)
+    if pa.types.is_string(array.type) and len(array) > 1:
+        encoded = array.dictionary_encode()
+        if len(encoded.dictionary) * 2 <= len(array):
+            return encoded
+    return array
+
+
+def encode_arrow(result: Any) -> bytes:
+    """
+    Codifica un resultado como stream Arrow IPC.
+
+    Todas las tablas del resultado van en un mismo stream: la columna `table`
+    (diccionario) indica la tabla de origen de cada fila y las columnas que no
+    existen en una tabla quedan en null. Los metadatos escalares viajan como
+    JSON en los metadatos del schema (`meta`), junto con el orden de las
+    tablas (`tables`).
+
+    Raises:
+        RuntimeError: Si pyarrow no está instalado.
+    """
+    try:
+        import pyarrow as pa  # import diferido: sólo lo pagan las respuestas Arrow
+    except ImportError:
+        raise RuntimeError("pyarrow no está instalado: no se puede codificar en Arrow")
+
+    tables, meta = split_tables(result)
+    names = list(tables)
+    dictionary = pa.array(names, type=pa.string())
+
+    parts = []
+    for i, (name, columns) in enumerate(tables.items()):
+        n = len(next(iter(columns.values()))) if columns else 0
+        arrays = {TABLE_COLUMN: pa.DictionaryArray.from_arrays(pa.array(np.full(n, i, dtype=np.int8)), dictionary)}
+        for column, values in columns.items():
+            arrays[column] = _to_arrow_array(pa, values)
+        parts.append(pa.table(arrays))
+
+    if parts:
+        table = pa.concat_tables(parts, promote_options="default")
+    else:
+        table = pa.table({TABLE_COLUMN: pa.DictionaryArray.from_arrays(pa.array([], type=pa.int8()), dictionary)})
+
+    table = table.replace_schema_metadata({
+        "meta": json.dumps(meta),
+        "tables": json.dumps(names),
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Content-Encoding para la respuesta: "br", "gzip" o None (sin comprimir).
+
+    Se prefiere brotli (si está instalado) cuando el cliente acepta ambos.
+    """
+    if not accept_encoding:
+        return None
+    weights = _parse_accept(accept_encoding)
+    wildcard = weights.get("*", 0.0)
+    if weights.get("br", wildcard) > 0 and brotli_available():
+        return "br"
+    if weights.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Comprime `body` con `encoding` ("br" o "gzip"), con nivel medio: prima la latencia."""
+    if encoding == "br":
+        import brotli  # import diferido: paquete opcional
+
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=5)
@@ -0,0 +1,144 @@
+"""
+Snapshots recientes de cadenas y griegas para respuestas incrementales.
+
+`get_option_chain` y `compute_greeks_chain` devuelven un `snapshot_token`
+que identifica el resultado. Si el cliente lo manda de vuelta como `since`,
+la respuesta es un `ChainDelta` con sólo los contratos agregados,
+modificados y eliminados desde ese snapshot (ver utils/diff.py) y el token
+nuevo.
+
+Por cada (tool, underlying, expiration) se guardan los últimos
+`SNAPSHOT_RING_SIZE` resultados distintos (default 8), para como máximo
+`SNAPSHOT_MAX_KEYS` claves (default 256, se descarta la menos usada). Si el
+token ya no está (descartado o de otro proceso) se responde el resultado
+completo, como si no se hubiera mandado `since`.
+
+El token es un hash del contenido: dos resultados iguales tienen el mismo
+token, así que repetir un pedido sin cambios devuelve un delta vacío. Se
+calcula sobre los arrays de las columnas y los resultados se guardan tal
+cual; la conversión a registros sólo se paga al responder un delta.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict, deque
+from dataclasses import fields, replace
+from typing import Any, Deque, Optional, Tuple
+
+import numpy as np
+
+from ..model.options import ChainDelta, OptionColumns
+from .diff import TABLES, diff_result
+from .serialization import convert_to_dict
+
+SnapshotKey = Tuple[str, str, str]  # (tool, underlying, expiration)
+
+
+def snapshot_token(result: Any) -> str:
+    """Token del contenido de un resultado (dataclass con campos escalares y `OptionColumns`)."""
+    digest = hashlib.sha256()
+    for f in fields(result):
+        if f.name == "snapshot_token":
+            continue
+        value = getattr(result, f.name)
+        digest.update(f.name.encode())
+        if isinstance(value, OptionColumns):
+            for name, column in value.columns.items():
+                digest.update(name.encode())
+                if column.dtype == object:
+                    digest.update("\x1f".join(map(str, column)).encode())
+                else:
+                    digest.update(np.ascontiguousarray(column).tobytes())
+        else:
+            digest.update(repr(value).encode())
+    return digest.hexdigest()[:16]
+
+
+class SnapshotRing:
+    """Últimos `size` snapshots distintos de una clave, del más viejo al más nuevo."""
+
+    def __init__(self, size: int):
+        self._items: Deque[Tuple[str, Any]] = deque(maxlen=size)
+
+    def record(self, token: str, result: Any) -> None:
+        if self._items and self._items[-1][0] == token:
+            return
+        self._items.append((token, result))
+
+    def get(self, token: str) -> Optional[Any]:
+        for item_token, result in reversed(self._items):
+            if item_token == token:
+                return result
+        return None
+
+
+class SnapshotStore:
+    """Anillos de snapshots por (tool, underlying, expiration), con un máximo de claves."""
+
+    def __init__(self, ring_size: int, max_keys: int):
+        self.ring_size = ring_size
+        self.max_keys = max_keys
+        self._rings: "OrderedDict[SnapshotKey, SnapshotRing]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, key: SnapshotKey, result: Any) -> str:
+        """Guarda `result` y devuelve su token."""
+        token = snapshot_token(result)
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                ring = self._rings[key] = SnapshotRing(self.ring_size)
+                while len(self._rings) > self.max_keys:
+                    self._rings.popitem(last=False)
+            self._rings.move_to_end(key)
+            ring.record(token, result)
+        return token
+
+    def get(self, key: SnapshotKey, token: str) -> Optional[Any]:
+        with self._lock:
+            ring = self._rings.get(key)
+            return ring.get(token) if ring is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rings.clear()
+
+
+_store = SnapshotStore(
+    ring_size=int(os.getenv("SNAPSHOT_RING_SIZE", "8")),
+    max_keys=int(os.getenv("SNAPSHOT_MAX_KEYS", "256")),
+)
+
+
+def with_snapshot(tool: str, result: Any, since: Optional[str] = None) -> Any:
+    """
+    Registra el resultado de una tool de cadena y aplica `since`.
+
+    Args:
+        tool: "get_chain" o "compute_greeks"
+        result: Option_Chain o Greeks (con `underlying`, `expiration`, `calls`, `puts`)
+        since: Token de un snapshot anterior, o None
+
+    Returns:
+        Un `ChainDelta` si `since` es un snapshot conocido; si no, una copia
+        de `result` con `snapshot_token` completado.
+    """
+    key = (tool, result.underlying, result.expiration)
+    current = replace(result, snapshot_token=None)
+    token = _store.record(key, current)
+
+    previous = _store.get(key, since) if since else None
+    if previous is None:
+        return replace(result, snapshot_token=token)
+
+    diff = diff_result(convert_to_dict(previous), convert_to_dict(current))
+    empty = {"added": [], "changed": [], "removed": []}
+    return ChainDelta(
+        underlying=result.underlying,
+        expiration=result.expiration,
+        since=since,
+        snapshot_token=token,
+        fields=diff["fields"],
+        **{table: diff.get(table, empty) for table in TABLES},
+    )
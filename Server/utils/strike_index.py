@@ -0,0 +1,101 @@
+"""
+Índice de strikes de las cadenas cacheadas para buscar un contrato puntual.
+
+Las tools de un solo contrato (payoff, patas de estrategias) buscaban la
+fila con `options[options["strike"] == strike]`: un recorrido completo del
+DataFrame y una comparación exacta de floats. `StrikeIndex` guarda los
+strikes ordenados de un lado de la cadena y resuelve con búsqueda binaria
+(`np.searchsorted`) con tolerancia `STRIKE_TOLERANCE`; si el strike no
+existe sugiere los más cercanos.
+
+Los índices se cachean por (underlying, expiration, tipo, versión de la
+cadena en `market_data`), así que se construyen una vez por snapshot y las
+búsquedas siguientes sobre la caché caliente son O(log n). La versión se
+toma del snapshot al que pertenece el DataFrame recibido (no de la caché
+al momento de buscar), y `find_contract` verifica igual el strike de la
+fila encontrada: un índice de otro snapshot se descarta y se reconstruye:
+
+    row = find_contract(underlying, expiration, "call", 450.0, calls_df)
+"""
+
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from .cache import TTLCache
+from .market_data import chain_version
+
+STRIKE_TOLERANCE = float(os.getenv("STRIKE_TOLERANCE", "0.001"))
+# Cantidad de strikes sugeridos cuando el pedido no existe
+STRIKE_SUGGESTIONS = 5
+
+_index_cache = TTLCache(float(os.getenv("STRIKE_INDEX_TTL_SECONDS", "300")), maxsize=512, name="strike_index")
+
+
+class StrikeIndex:
+    """Strikes ordenados de un lado de la cadena y la posición de su fila en el DataFrame."""
+
+    __slots__ = ("strikes", "positions")
+
+    def __init__(self, strikes):
+        strikes = np.asarray(strikes, dtype=float)
+        self.positions = np.argsort(strikes, kind="stable")
+        self.strikes = strikes[self.positions]
+
+    def __len__(self) -> int:
+        return len(self.strikes)
+
+    def locate(self, strike: float, tolerance: float = STRIKE_TOLERANCE) -> Optional[int]:
+        """Posición (`iloc`) de la fila con `strike` (± `tolerance`), o None."""
+        i = int(np.searchsorted(self.strikes, strike))
+        best = None
+        for j in (i - 1, i):
+            if 0 <= j < len(self.strikes) and abs(self.strikes[j] - strike) <= tolerance:
+                if best is None or abs(self.strikes[j] - strike) < abs(self.strikes[best] - strike):
+                    best = j
+        return None if best is None else int(self.positions[best])
+
+    def nearest(self, strike: float, count: int = STRIKE_SUGGESTIONS) -> List[float]:
+        """Los `count` strikes más cercanos a `strike`, ordenados de menor a mayor."""
+        i = int(np.searchsorted(self.strikes, strike))
+        window = self.strikes[max(i - count, 0):i + count]
+        closest = window[np.argsort(np.abs(window - strike), kind="stable")[:count]]
+        return sorted(float(k) for k in closest)
+
+
+def get_strike_index(underlying: str, expiration: str, option_type: str, options_df) -> StrikeIndex:
+    """
+    Índice del lado `option_type` ("call" o "put") de la cadena `options_df`.
+
+    Se cachea por versión del snapshot de `market_data` al que pertenece
+    `options_df`; si no viene de la caché (o la cadena ya se recargó) se
+    construye en el momento.
+    """
+    version = chain_version(underlying, expiration, options_df)
+    if version is None:
+        return StrikeIndex(options_df["strike"].to_numpy(dtype=float))
+    key = (underlying, expiration, option_type, version)
+    return _index_cache.get_or_set(key, lambda: StrikeIndex(options_df["strike"].to_numpy(dtype=float)))
+
+
+def find_contract(underlying: str, expiration: str, option_type: str, strike: float, options_df):
+    """
+    Fila del contrato `option_type` con `strike` en `options_df`.
+
+    Raises:
+        ValueError: Si no existe, con los strikes más cercanos disponibles.
+    """
+    index = get_strike_index(underlying, expiration, option_type, options_df)
+    position = index.locate(strike)
+    if position is not None and not (position < len(options_df)
+                                     and abs(options_df["strike"].iloc[position] - strike) <= STRIKE_TOLERANCE):
+        # El índice no corresponde a `options_df` (otro snapshot): reconstruirlo
+        index = StrikeIndex(options_df["strike"].to_numpy(dtype=float))
+        position = index.locate(strike)
+    if position is None:
+        raise ValueError(
+            f"No existe una opción {option_type} con strike {strike} para {underlying} ({expiration}). "
+            f"Strikes más cercanos disponibles: {index.nearest(strike)}"
+        )
+    return options_df.iloc[position]
@@ -0,0 +1,159 @@
+"""
+Superficie de volatilidad liviana por vencimiento, para consultas puntuales.
+
+Cada vencimiento se reduce a un `SurfaceSlice`: forward y tasa implícitos
+(utils/forward.py), la sonrisa como varianza total w = σ²·t contra el
+log-moneyness k = ln(K/F) de las opciones OTM (cotizaciones limpias de
+utils/quote_cleaning.py, suavizadas con pesos de liquidez) y el straddle de
+mercado en el strike más cercano al forward. Los slices se cachean por
+snapshot de la cadena, como el forward.
+
+Para una fecha cualquiera, `interpolate_slices` interpola la varianza total
+linealmente en el tiempo a k fijo entre los dos vencimientos que la rodean
+(antes del primero, con w = 0 en t = 0; después del último, con la IV del
+último). Con eso, el precio de un call y la probabilidad risk-neutral de
+terminar por encima de un strike son fórmulas cerradas vectorizadas: la
+probabilidad es la digital -e^{rt}·∂C/∂K, que incluye la pendiente de la
+sonrisa y es 1 - CDF de la densidad implícita.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy.ndimage import gaussian_filter1d
+from scipy.special import ndtr
+
+from .bs import implied_volatility_vec
+from .cache import TTLCache
+from .forward import carry, fit_forward
+from .quote_cleaning import clean_quotes
+
+# Semiancho (en log-moneyness) de la diferencia central de la pendiente de la sonrisa
+_SLOPE_STEP = 0.01
+
+_slice_cache = TTLCache(float(os.getenv("SURFACE_CACHE_TTL_SECONDS", "300")), maxsize=256, name="surface_slices")
+
+
+@dataclass
+class SurfaceSlice:
+    """Sonrisa de un vencimiento en varianza total contra log-moneyness."""
+    expiration: str
+    t: float
+    forward: float
+    rate: float
+    k: np.ndarray
+    w: np.ndarray
+    atm_iv: float
+    straddle: Optional[float]
+    straddle_strike: Optional[float]
+
+    def total_variance(self, k: np.ndarray) -> np.ndarray:
+        """w(k) interpolada linealmente (plana fuera de las alas)."""
+        return np.interp(k, self.k, self.w)
+
+
+def fit_slice(expiration: str, calls_df, puts_df, S: float, t: float, r: float) -> SurfaceSlice:
+    """
+    Ajusta la sonrisa de un vencimiento con las opciones OTM (puts debajo del forward, calls encima).
+
+    Raises:
+        ValueError: Si quedan menos de 3 contratos con IV válida
+    """
+    fit = fit_forward(calls_df, puts_df, t, r)
+    rate, q = carry(fit, S, t, r)
+    forward = fit.forward if fit is not None else S * np.exp(rate * t)
+
+    strikes, ivs, weights, prices = [], [], [], {}
+    for df, is_call in ((calls_df, True), (puts_df, False)):
+        clean = clean_quotes(df, S, t, rate, is_call, q)
+        K = df["strike"].to_numpy(dtype=float)
+        prices[is_call] = dict(zip(K.tolist(), clean.price.tolist()))
+        otm = (K >= forward) if is_call else (K < forward)
+        iv = implied_volatility_vec(S, K[otm], t, rate, clean.price[otm], is_call, q)
+        strikes.append(K[otm])
+        ivs.append(iv)
+        weights.append(clean.weight[otm])
+    K, iv, weight = (np.concatenate(a) for a in (strikes, ivs, weights))
+    ok = np.isfinite(iv) & (iv > 0) & (weight > 0)
+    if ok.sum() < 3:
+        raise ValueError(f"No hay suficientes opciones con volatilidad implícita válida para el vencimiento {expiration}.")
+    order = np.argsort(K[ok])
+    K, iv, weight = K[ok][order], iv[ok][order], weight[ok][order]
+
+    w = gaussian_filter1d(iv ** 2 * t * weight, sigma=1) / gaussian_filter1d(weight, sigma=1)
+    k = np.log(K / forward)
+    atm_iv = float(np.sqrt(np.interp(0.0, k, w) / t))
+
+    # Straddle de mercado en el strike (con call y put) más cercano al forward
+    common = [s for s in prices[True] if s in prices[False]
+              and np.isfinite(prices[True][s]) and np.isfinite(prices[False][s])]
+    straddle = straddle_strike = None
+    if common:
+        straddle_strike = min(common, key=lambda s: abs(s - forward))
+        straddle = prices[True][straddle_strike] + prices[False][straddle_strike]
+
+    return SurfaceSlice(expiration=expiration, t=t, forward=float(forward), rate=float(rate), k=k, w=w,
+                        atm_iv=atm_iv, straddle=straddle, straddle_strike=straddle_strike)
+
+
+def get_slice(underlying: str, expiration: str, calls_df, puts_df, S: float, t: float, r: float,
+              chain_version: Optional[int] = None) -> SurfaceSlice:
+    """
+    `fit_slice` cacheado por snapshot de la cadena (sin versión no se cachea).
+
+    El slice no depende del spot: el forward lo fija la paridad put-call.
+    """
+    if chain_version is None:
+        return fit_slice(expiration, calls_df, puts_df, S, t, r)
+    key = (underlying, expiration, chain_version, t, r)
+    return _slice_cache.get_or_set(key, lambda: fit_slice(expiration, calls_df, puts_df, S, t, r))
+
+
+def interpolate_slices(before: Optional[SurfaceSlice], after: SurfaceSlice, S: float, t: float):
+    """
+    Forward, tasa y función w(k) en el plazo `t` (entre `before` y `after`).
+
+    Con `before=None` se interpola desde t = 0 (w = 0, forward = spot). Si
+    `t` supera a `after` se extrapola con la IV de `after`.
+
+    Returns:
+        (forward, rate, total_variance) con total_variance(k) -> w
+    """
+    if t >= after.t:
+        scale = t / after.t
+        return (float(S * (after.forward / S) ** scale), after.rate,
+                lambda k: after.total_variance(k) * scale)
+    if before is None:
+        weight = t / after.t
+        return (float(S * (after.forward / S) ** weight), after.rate,
+                lambda k: after.total_variance(k) * weight)
+    weight = (t - before.t) / (after.t - before.t)
+    forward = float(np.exp(np.log(before.forward) + weight * (np.log(after.forward) - np.log(before.forward))))
+    rate = before.rate + weight * (after.rate - before.rate)
+    return (forward, rate,
+            lambda k: before.total_variance(k) + weight * (after.total_variance(k) - before.total_variance(k)))
+
+
+def probability_above(strikes: np.ndarray, forward: float, total_variance) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Probabilidad risk-neutral de terminar por encima de cada strike, con la pendiente de la sonrisa.
+
+    P(S_T > K) = N(d2) - φ(d2) · (dw/dk) / (2√w), con w y dw/dk en k = ln(K/F).
+
+    Returns:
+        (probabilidades, varianza total en cada strike)
+    """
+    k = np.log(np.asarray(strikes, dtype=float) / forward)
+    w = total_variance(k)
+    slope = (total_variance(k + _SLOPE_STEP) - total_variance(k - _SLOPE_STEP)) / (2 * _SLOPE_STEP)
+    sqrt_w = np.sqrt(w)
+    d_2 = -k / sqrt_w - sqrt_w / 2
+    pdf_d2 = np.exp(-0.5 * d_2 ** 2) / np.sqrt(2 * np.pi)
+    return np.clip(ndtr(d_2) - pdf_d2 * slope / (2 * sqrt_w), 0.0, 1.0), w
+
+
+def atm_straddle(forward: float, rate: float, t: float, w: float) -> float:
+    """Straddle Black ATM-forward: 2·D·F·(2N(√w/2) - 1)."""
+    return float(2 * np.exp(-rate * t) * forward * (2 * ndtr(np.sqrt(w) / 2) - 1))
@@ -0,0 +1,173 @@
+"""
+Trazas livianas por pedido: spans con nombre para las fases de cada tool.
+
+Uso:
+    with start_trace("compute_greeks") as trace:
+        with span("spot"):
+            ...
+    trace.to_timings()   # lista de fases con duración en ms
+
+`span` no hace nada fuera de una traza activa, así que las tools pueden
+marcar sus fases sin costo cuando nadie las mide. El span abierto también
+vive en el contexto: una tarea que corre en otro hilo con `copy_context()`
+anida sus spans bajo el span que la lanzó y los registra con su propio hilo.
+Si la variable de entorno `TRACE_FILE` apunta a un archivo, cada traza se
+agrega ahí en el formato Trace Event de Chrome (abrir con chrome://tracing
+o https://ui.perfetto.dev).
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_file_lock = threading.Lock()
+
+
+class Span:
+    """Una fase medida dentro de una traza."""
+
+    __slots__ = ("name", "start", "end", "depth", "thread_id", "attrs")
+
+    def __init__(self, name: str, start: float, depth: int, attrs: Dict[str, Any]):
+        self.name = name
+        self.start = start
+        self.end = start
+        self.depth = depth
+        self.thread_id = threading.get_ident()
+        self.attrs = attrs
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Trace:
+    """
+    Spans registrados durante un pedido (el primero es la raíz).
+
+    La profundidad de cada span sale de su padre (el span abierto en el
+    contexto de quien lo abre), no de un contador compartido: los hilos de
+    un pool que corren con una copia del contexto no se pisan entre sí.
+    """
+
+    def __init__(self, name: str, attrs: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.wall_start = time.time()
+        self.thread_id = threading.get_ident()
+        self.spans: List[Span] = []
+        self.root = self._open(name, attrs or {}, None)
+
+    def _open(self, name: str, attrs: Dict[str, Any], parent: Optional[Span]) -> Span:
+        s = Span(name, time.perf_counter(), 0 if parent is None else parent.depth + 1, attrs)
+        self.spans.append(s)
+        return s
+
+    def _close(self, s: Span) -> None:
+        s.end = time.perf_counter()
+
+    def to_timings(self) -> List[Dict[str, Any]]:
+        """Fases en orden de inicio, con inicio relativo y duración en milisegundos."""
+        origin = self.root.start
+        return [
+            {
+                "name": s.name,
+                "start_ms": round((s.start - origin) * 1000, 3),
+                "duration_ms": round(s.duration * 1000, 3),
+                "depth": s.depth,
+                **s.attrs,
+            }
+            for s in self.spans
+        ]
+
+    def server_timing(self) -> str:
+        """Header `Server-Timing` con la raíz y las fases de primer nivel."""
+        parts = []
+        for s in self.spans:
+            if s.depth > 1:
+                continue
+            token = re.sub(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]", "_", s.name)
+            parts.append(f"{token};dur={s.duration * 1000:.3f}")
+        return ", ".join(parts)
+
+    def chrome_events(self) -> List[Dict[str, Any]]:
+        """Eventos 'X' (complete) del formato Trace Event de Chrome, en microsegundos."""
+        origin = self.root.start
+        base_us = self.wall_start * 1e6
+        return [
+            {
+                "name": s.name,
+                "cat": self.name,
+                "ph": "X",
+                "ts": round(base_us + (s.start - origin) * 1e6, 3),
+                "dur": round(s.duration * 1e6, 3),
+                "pid": os.getpid(),
+                "tid": s.thread_id,
+                "args": s.attrs,
+            }
+            for s in self.spans
+        ]
+
+
+def current_trace() -> Optional[Trace]:
+    """Traza activa en el contexto actual (o None)."""
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Mide una fase dentro de la traza activa; sin traza activa no hace nada."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    s = trace._open(name, attrs, _current_span.get())
+    token = _current_span.set(s)
+    try:
+        yield s
+    finally:
+        _current_span.reset(token)
+        trace._close(s)
+
+
+@contextmanager
+def start_trace(name: str, **attrs: Any) -> Iterator[Trace]:
+    """
+    Abre una traza para un pedido y la activa en el contexto actual.
+
+    Al cerrarse, si `TRACE_FILE` está definida, agrega sus eventos al archivo.
+    """
+    trace = Trace(name, attrs)
+    token = _current_trace.set(trace)
+    span_token = _current_span.set(trace.root)
+    try:
+        yield trace
+    finally:
+        trace._close(trace.root)
+        _current_span.reset(span_token)
+        _current_trace.reset(token)
+        path = os.getenv("TRACE_FILE")
+        if path:
+            write_chrome_trace(trace, path)
+
+
+def write_chrome_trace(trace: Trace, path: str) -> None:
+    """
+    Agrega los eventos de una traza a un archivo en formato JSON Array de Chrome.
+
+    El formato admite omitir el `]` final, lo que permite ir agregando
+    eventos sin reescribir el archivo.
+    """
+    lines = "".join(json.dumps(event, default=str) + ",\n" for event in trace.chrome_events())
+    with _file_lock:
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a", encoding="utf-8") as f:
+            if new_file:
+                f.write("[\n")
+            f.write(lines)
@@ -0,0 +1,235 @@
+"""
+Acceso controlado a las fuentes de datos externas (Yahoo Finance y FRED).
+
+Toda descarga pasa por `upstream_call(source)`, que agrupa las fuentes por
+proveedor (`yfinance_chain`, `yfinance_info`, ... -> `yfinance`; `fred`) y
+aplica, por proveedor:
+
+- Límite de tasa con token bucket: ráfagas de hasta `BURST` pedidos y
+  `RATE` pedidos por segundo sostenidos. Si no hay token, el pedido espera.
+- Concurrencia acotada: como máximo `CONCURRENCY` descargas a la vez.
+- Circuit breaker: tras `FAILURES` fallos seguidos el proveedor se considera
+  caído y los pedidos fallan en el acto (`UpstreamUnavailable`) durante
+  `RESET_SECONDS`; después se deja pasar un pedido de prueba. Los errores de
+  datos (`ValueError`, `LookupError`: ticker o vencimiento inválido) no
+  cuentan como fallos: el proveedor respondió. Una respuesta que no es JSON
+  (`JSONDecodeError`, lo que suele devolver Yahoo al limitar pedidos o con
+  una página de error) sí es un fallo, y se lanza como `UpstreamUnavailable`.
+
+Si la espera por un token o un lugar supera `WAIT_SECONDS`, también se
+lanza `UpstreamUnavailable`. Las cachés de `market_data` y `risk_free`
+responden entonces con el último valor conocido aunque esté vencido (ver
+`TTLCache.get_or_set(serve_stale=True)`).
+
+Configuración por entorno: `UPSTREAM_<PROVEEDOR>_<PARÁMETRO>`, por ejemplo
+`UPSTREAM_YFINANCE_RATE=5` o `UPSTREAM_FRED_CONCURRENCY=2`.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from .metrics import UPSTREAM_CIRCUIT_STATE, UPSTREAM_REJECTED, track_upstream
+
+DEFAULTS: Dict[str, Dict[str, float]] = {
+    "yfinance": {"RATE": 4.0, "BURST": 8, "CONCURRENCY": 4, "FAILURES": 5, "RESET_SECONDS": 30.0,
+                 "WAIT_SECONDS": 15.0},
+    # La curva son 11 series: una curva completa entra en una ráfaga
+    "fred": {"RATE": 2.0, "BURST": 12, "CONCURRENCY": 4, "FAILURES": 5, "RESET_SECONDS": 60.0,
+             "WAIT_SECONDS": 15.0},
+}
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class UpstreamUnavailable(RuntimeError):
+    """La fuente externa no está disponible (circuito abierto o saturada)."""
+
+    def __init__(self, provider: str, reason: str, retry_after: float):
+        super().__init__(f"{provider} no disponible ({reason}); reintentar en {retry_after:.0f} s")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket: `burst` tokens como máximo, repuestos a `rate` por segundo."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float) -> bool:
+        """Toma un token, esperando hasta `timeout` segundos. Devuelve False si no llegó."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de tres estados.
+
+    closed: pasan todos los pedidos; `failures` fallos seguidos lo abren.
+    open: se rechazan hasta que pasan `reset_seconds`.
+    half_open: pasa un único pedido de prueba; si anda se cierra, si falla se vuelve a abrir.
+    """
+
+    def __init__(self, failures: int, reset_seconds: float):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        return max(self.reset_seconds - (time.monotonic() - self._opened_at), 0.0)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and self.retry_after() <= 0:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Devuelve el turno de prueba de half_open sin registrar resultado."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self._consecutive = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive += 1
+            if self.state == HALF_OPEN or self._consecutive >= self.failures:
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class Upstream:
+    """Límite de tasa, concurrencia y circuit breaker de un proveedor."""
+
+    def __init__(self, name: str, rate: float, burst: float, concurrency: int,
+                 failures: int, reset_seconds: float, wait_seconds: float):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failures, reset_seconds)
+        self.wait_seconds = wait_seconds
+        self._slots = threading.BoundedSemaphore(concurrency)
+
+    def _reject(self, reason: str, retry_after: float) -> UpstreamUnavailable:
+        UPSTREAM_REJECTED.inc(upstream=self.name, reason=reason)
+        return UpstreamUnavailable(self.name, reason, retry_after)
+
+    def _publish_state(self) -> None:
+        UPSTREAM_CIRCUIT_STATE.set(_STATE_VALUES[self.breaker.state], upstream=self.name)
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Reserva un pedido al proveedor y registra su resultado en el circuit breaker."""
+        if not self.breaker.allow():
+            raise self._reject("circuit_open", self.breaker.retry_after())
+        self._publish_state()
+        deadline = time.monotonic() + self.wait_seconds
+        if not self.bucket.acquire(self.wait_seconds):
+            self.breaker.release()
+            raise self._reject("rate_limited", 1 / self.bucket.rate)
+        if not self._slots.acquire(timeout=max(deadline - time.monotonic(), 0.0)):
+            self.breaker.release()
+            raise self._reject("saturated", 1.0)
+        try:
+            yield
+        except json.JSONDecodeError as e:
+            # Respuesta no JSON (throttling o página de error): el proveedor falló
+            self.breaker.record_failure()
+            retry_after = self.breaker.retry_after() if self.breaker.state == OPEN else 1.0
+            raise UpstreamUnavailable(self.name, "bad_response", retry_after) from e
+        except (ValueError, LookupError):
+            self.breaker.record_success()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            self._slots.release()
+            self._publish_state()
+
+
+def provider_of(source: str) -> str:
+    """Proveedor de una fuente: `yfinance_chain` -> `yfinance`."""
+    return source.split("_", 1)[0]
+
+
+def _setting(provider: str, name: str) -> float:
+    default = DEFAULTS.get(provider, DEFAULTS["yfinance"])[name]
+    return float(os.getenv(f"UPSTREAM_{provider.upper()}_{name}", default))
+
+
+_upstreams: Dict[str, Upstream] = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(provider: str) -> Upstream:
+    """Controles compartidos de un proveedor (se crean en el primer uso)."""
+    with _upstreams_lock:
+        upstream = _upstreams.get(provider)
+        if upstream is None:
+            upstream = _upstreams[provider] = Upstream(
+                provider,
+                rate=_setting(provider, "RATE"),
+                burst=_setting(provider, "BURST"),
+                concurrency=int(_setting(provider, "CONCURRENCY")),
+                failures=int(_setting(provider, "FAILURES")),
+                reset_seconds=_setting(provider, "RESET_SECONDS"),
+                wait_seconds=_setting(provider, "WAIT_SECONDS"),
+            )
+        return upstream
+
+
+def reset_upstreams() -> None:
+    """Descarta los controles creados (vuelven a leer el entorno en el próximo uso)."""
+    with _upstreams_lock:
+        _upstreams.clear()
+
+
+@contextmanager
+def upstream_call(source: str) -> Iterator[None]:
+    """
+    Envuelve una descarga de `source` con los controles de su proveedor y sus métricas.
+
+    Raises:
+        UpstreamUnavailable: Si el circuito está abierto o no hubo lugar a tiempo.
+    """
+    with get_upstream(provider_of(source)).guard(), track_upstream(source):
+        yield